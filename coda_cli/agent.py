@@ -12,7 +12,7 @@ from deepagents.middleware import MemoryMiddleware, SkillsMiddleware
 from langchain.agents.middleware import (
     InterruptOnConfig,
 )
-from langchain.agents.middleware.types import AgentState
+from langchain.agents.middleware.types import AgentMiddleware, AgentState
 from langchain.messages import ToolCall
 from langchain.tools import BaseTool
 from langchain_core.language_models import BaseChatModel
@@ -22,7 +22,10 @@ from langgraph.pregel import Pregel
 from langgraph.runtime import Runtime
 
 from coda_cli.config import COLORS, config, console, get_default_coding_instructions, settings
+from coda_cli.file_ops import FileSnapshotMiddleware
 from coda_cli.integrations.sandbox_factory import get_default_working_dir
+from coda_cli.output_buffer import SPILL_ROUTE, session_spill_dir
+from coda_cli.process_limits import ResourceLimits
 from coda_cli.shell import ShellMiddleware
 
 
@@ -91,13 +94,19 @@ def reset_agent(agent_name: str, source_agent: str | None = None) -> None:
     console.print(f"Location: {agent_dir}\n", style=COLORS["dim"])
 
 
-def get_system_prompt(assistant_id: str, sandbox_type: str | None = None) -> str:
+def get_system_prompt(
+    assistant_id: str,
+    sandbox_type: str | None = None,
+    sandbox: SandboxBackendProtocol | None = None,
+) -> str:
     """Get the base system prompt for the agent.
 
     Args:
         assistant_id: The agent identifier for path references
-        sandbox_type: Type of sandbox provider ("modal", "runloop", "daytona").
+        sandbox_type: Type of sandbox provider ("modal", "runloop", "daytona", "local").
                      If None, agent is operating in local mode.
+        sandbox: The sandbox backend, for providers whose working directory
+                 differs per sandbox
 
     Returns:
         The system prompt string (without AGENTS.md content)
@@ -107,7 +116,7 @@ def get_system_prompt(assistant_id: str, sandbox_type: str | None = None) -> str
     if sandbox_type:
         # Get provider-specific working directory
 
-        working_dir = get_default_working_dir(sandbox_type)
+        working_dir = get_default_working_dir(sandbox_type, sandbox)
 
         working_dir_section = f"""### Current Working Directory
 
@@ -233,8 +242,30 @@ def _format_fetch_url_description(
     args = tool_call["args"]
     url = args.get("url", "unknown")
     timeout = args.get("timeout", 30)
+    mode = args.get("mode", "full")
+    offset = args.get("offset", 0)
+    page = f"\nOffset: {offset}" if offset else ""
+
+    return (
+        f"URL: {url}\nTimeout: {timeout}s\nMode: {mode}{page}\n\n"
+        "⚠️  Will fetch and convert web content to markdown"
+    )
+
+
+def _format_fetch_urls_description(
+    tool_call: ToolCall, _state: AgentState, _runtime: Runtime
+) -> str:
+    """Format fetch_urls tool call for approval prompt."""
+    args = tool_call["args"]
+    urls = args.get("urls") or []
+    listed = "\n".join(f"  - {url}" for url in urls[:10])
+    if len(urls) > 10:
+        listed += f"\n  ... and {len(urls) - 10} more"
 
-    return f"URL: {url}\nTimeout: {timeout}s\n\n⚠️  Will fetch and convert web content to markdown"
+    return (
+        f"URLs ({len(urls)}):\n{listed}\nMode: {args.get('mode', 'main')}\n\n"
+        "⚠️  Will fetch and convert web content to markdown"
+    )
 
 
 def _format_task_description(tool_call: ToolCall, _state: AgentState, _runtime: Runtime) -> str:
@@ -308,6 +339,11 @@ def _add_interrupt_on() -> dict[str, InterruptOnConfig]:
         "description": _format_fetch_url_description,
     }
 
+    fetch_urls_interrupt_config: InterruptOnConfig = {
+        "allowed_decisions": ["approve", "reject"],
+        "description": _format_fetch_urls_description,
+    }
+
     task_interrupt_config: InterruptOnConfig = {
         "allowed_decisions": ["approve", "reject"],
         "description": _format_task_description,
@@ -319,6 +355,7 @@ def _add_interrupt_on() -> dict[str, InterruptOnConfig]:
         "edit_file": edit_file_interrupt_config,
         "web_search": web_search_interrupt_config,
         "fetch_url": fetch_url_interrupt_config,
+        "fetch_urls": fetch_urls_interrupt_config,
         "task": task_interrupt_config,
     }
 
@@ -336,6 +373,10 @@ def create_cli_agent(
     enable_skills: bool = True,
     enable_shell: bool = True,
     checkpointer: BaseCheckpointSaver | None = None,
+    persistent_shell: bool = False,
+    cache_shell_reads: bool = False,
+    shell_limits: ResourceLimits | None = None,
+    shell_concurrency: int = 4,
 ) -> tuple[Pregel, CompositeBackend]:
     """Create a CLI-configured agent with flexible options.
 
@@ -348,7 +389,7 @@ def create_cli_agent(
         tools: Additional tools to provide to agent
         sandbox: Optional sandbox backend for remote execution (e.g., ModalBackend).
                  If None, uses local filesystem + shell.
-        sandbox_type: Type of sandbox provider ("modal", "runloop", "daytona").
+        sandbox_type: Type of sandbox provider ("modal", "runloop", "daytona", "local").
                      Used for system prompt generation.
         system_prompt: Override the default system prompt. If None, generates one
                       based on sandbox_type and assistant_id.
@@ -359,6 +400,13 @@ def create_cli_agent(
         enable_shell: Enable ShellMiddleware for local shell execution (only in local mode)
         checkpointer: Optional checkpointer for session persistence. If None, uses
                      InMemorySaver (no persistence across CLI invocations).
+        persistent_shell: Run local shell commands in one long-lived bash session
+                          so cwd and environment changes persist between calls
+        cache_shell_reads: Serve repeated read-only shell commands (`git status`,
+                           `ls`, `cat`, ...) from a cache until files change
+        shell_limits: rlimits and nice level applied to local shell commands; when
+                      set, each command's CPU time and peak memory are reported
+        shell_concurrency: Maximum number of local shell commands running at once
 
     Returns:
         2-tuple of (agent_graph, backend)
@@ -382,8 +430,9 @@ def create_cli_agent(
         skills_dir = settings.ensure_user_skills_dir(assistant_id)
         project_skills_dir = settings.get_project_skills_dir()
 
-    # Build middleware stack based on enabled features
-    agent_middleware = []
+    # Build middleware stack based on enabled features; file snapshots are
+    # always taken so the UI can diff writes and edits
+    agent_middleware: list[AgentMiddleware] = [FileSnapshotMiddleware()]
 
     # Add memory middleware
     if enable_memory:
@@ -412,6 +461,9 @@ def create_cli_agent(
             )
         )
 
+    # Extra backend routes (e.g. spilled shell output the agent pages through)
+    routes: dict[str, FilesystemBackend] = {}
+
     # CONDITIONAL SETUP: Local vs Remote Sandbox
     if sandbox is None:
         # ========== LOCAL MODE ==========
@@ -425,10 +477,22 @@ def create_cli_agent(
             if settings.user_langchain_project:
                 shell_env["LANGSMITH_PROJECT"] = settings.user_langchain_project
 
+            # Serve spilled output through its own route: the default backend is
+            # rooted at the project and cannot read the temp dir it lives in
+            spill_dir = session_spill_dir()
+            routes[SPILL_ROUTE] = FilesystemBackend(root_dir=spill_dir, virtual_mode=True)
+
             agent_middleware.append(
                 ShellMiddleware(
                     workspace_root=str(Path.cwd()),
                     env=shell_env,
+                    spill_dir=spill_dir,
+                    spill_route=SPILL_ROUTE,
+                    persistent_session=persistent_shell,
+                    cache_read_only=cache_shell_reads,
+                    max_concurrency=shell_concurrency,
+                    resource_limits=shell_limits,
+                    report_usage=shell_limits is not None,
                 )
             )
     else:
@@ -439,7 +503,9 @@ def create_cli_agent(
 
     # Get or use custom system prompt
     if system_prompt is None:
-        system_prompt = get_system_prompt(assistant_id=assistant_id, sandbox_type=sandbox_type)
+        system_prompt = get_system_prompt(
+            assistant_id=assistant_id, sandbox_type=sandbox_type, sandbox=sandbox
+        )
 
     # Configure interrupt_on based on auto_approve setting
     if auto_approve:
@@ -451,7 +517,7 @@ def create_cli_agent(
 
     composite_backend = CompositeBackend(
         default=backend,
-        routes={},
+        routes=routes,
     )
 
     # Create the agent
@@ -5,7 +5,6 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import shlex
-import subprocess
 import uuid
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar
@@ -18,12 +17,13 @@ from textual.events import MouseUp  # noqa: TC002 - used in type annotation
 from textual.widgets import Static  # noqa: TC002 - used at runtime
 
 from coda_cli.clipboard import copy_selection_to_clipboard
+from coda_cli.pty_command import PtyCommand
 from coda_cli.textual_adapter import TextualUIAdapter, execute_task_textual
 from coda_cli.widgets.approval import ApprovalMenu
 from coda_cli.widgets.chat_input import ChatInput
 from coda_cli.widgets.loading import LoadingWidget
 from coda_cli.widgets.messages import (
-    AssistantMessage,
+    BashOutputMessage,
     ErrorMessage,
     SystemMessage,
     ToolCallMessage,
@@ -155,6 +155,8 @@ class CoDACodeApp(App):
         # Agent task tracking for interruption
         self._agent_worker: Worker[None] | None = None
         self._agent_running = False
+        # Running `!` command, if any
+        self._bash_command: PtyCommand | None = None
         self._loading_widget: LoadingWidget | None = None
         self._token_tracker: TextualTokenTracker | None = None
 
@@ -388,60 +390,61 @@ class CoDACodeApp(App):
     async def _handle_bash_command(self, command: str) -> None:
         """Handle a bash command (! prefix).
 
+        The command runs under a pseudo-terminal in a background worker and its
+        output streams into a `BashOutputMessage`. There is no timeout; Ctrl+C
+        interrupts it.
+
         Args:
             command: The bash command to execute
         """
         # Mount user message showing the bash command
         await self._mount_message(UserMessage(f"!{command}"))
 
-        # Check if this is a cd command
-        new_cwd = self._parse_cd_command(command)
-        
-        # Execute the bash command (shell=True is intentional for user-requested bash)
-        try:
-            result = await asyncio.to_thread(  # noqa: S604
-                subprocess.run,
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=self._cwd,
-                timeout=60,
+        if self._bash_command is not None:
+            await self._mount_message(
+                SystemMessage("A command is already running. Press Ctrl+C to interrupt it.")
             )
-            output = result.stdout.strip()
-            if result.stderr:
-                output += f"\n[stderr]\n{result.stderr.strip()}"
-
-            if output:
-                # Display output as assistant message (uses markdown for code blocks)
-                msg = AssistantMessage(f"```\n{output}\n```")
-                await self._mount_message(msg)
-                await msg.write_initial_content()
-            else:
-                await self._mount_message(SystemMessage("Command completed (no output)"))
+            return
 
-            if result.returncode != 0:
-                await self._mount_message(ErrorMessage(f"Exit code: {result.returncode}"))
+        output = BashOutputMessage()
+        await self._mount_message(output)
+        self._scroll_chat_to_bottom()
 
-            # Scroll to show the output
-            self._scroll_chat_to_bottom()
+        self._bash_command = PtyCommand(
+            command,
+            cwd=self._cwd,
+            on_output=output.append_output,
+            columns=max(self.size.width - 8, 40),
+        )
+        # Use run_worker so the UI (and Ctrl+C) stays responsive while it runs
+        self.run_worker(self._run_bash_command(self._bash_command, output), exclusive=False)
 
-            # Update CWD if this was a successful cd command
-            if new_cwd and result.returncode == 0:
-                self._cwd = new_cwd
-                if self._status_bar:
-                    self._status_bar.cwd = new_cwd
-            
-            # Refresh git branch after any bash command
-            # This handles git operations, scripts that change branches, etc.
-            if self._status_bar:
-                # Use call_later to avoid blocking UI thread
-                self.call_later(self._status_bar.refresh_git_branch)
+    async def _run_bash_command(self, pty_command: PtyCommand, output: BashOutputMessage) -> None:
+        """Run a `!` command to completion in a background worker."""
+        # Check if this is a cd command
+        new_cwd = self._parse_cd_command(pty_command.command)
 
-        except subprocess.TimeoutExpired:
-            await self._mount_message(ErrorMessage("Command timed out (60s limit)"))
+        try:
+            returncode = await pty_command.run()
         except OSError as e:
             await self._mount_message(ErrorMessage(str(e)))
+            return
+        finally:
+            self._bash_command = None
+
+        output.set_finished(returncode, interrupted=pty_command.interrupted)
+
+        # Update CWD if this was a successful cd command
+        if new_cwd and returncode == 0:
+            self._cwd = new_cwd
+            if self._status_bar:
+                self._status_bar.cwd = new_cwd
+
+        # Refresh git branch after any bash command
+        # This handles git operations, scripts that change branches, etc.
+        if self._status_bar:
+            # Use call_later to avoid blocking UI thread
+            self.call_later(self._status_bar.refresh_git_branch)
 
     async def _handle_command(self, command: str) -> None:
         """Handle a slash command.
@@ -581,11 +584,18 @@ class CoDACodeApp(App):
         """Handle Ctrl+C - interrupt agent, reject approval, or quit on double press.
 
         Priority order:
-        1. If agent is running, interrupt it (preserve input)
-        2. If approval menu is active, reject it
-        3. If double press (quit_pending), quit
-        4. Otherwise show quit hint
+        1. If a `!` command is running, send it SIGINT
+        2. If agent is running, interrupt it (preserve input)
+        3. If approval menu is active, reject it
+        4. If double press (quit_pending), quit
+        5. Otherwise show quit hint
         """
+        # If a `!` command is running, pass Ctrl+C through to it
+        if self._bash_command is not None and self._bash_command.running:
+            self._bash_command.interrupt()
+            self._quit_pending = False
+            return
+
         # If agent is running, interrupt it
         if self._agent_running and self._agent_worker:
             self._agent_worker.cancel()
@@ -0,0 +1,236 @@
+"""Memoization of read-only shell commands.
+
+Agents re-run the same probes (`git status`, `ls -R`, `cat pyproject.toml`,
+`pip list`) many times per session. `CommandCache` serves repeats of
+allowlisted, side-effect-free commands from memory as long as a cheap
+fingerprint of the paths they touch is unchanged. Callers invalidate it on
+anything that may write to the filesystem.
+"""
+
+from __future__ import annotations
+
+import shlex
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+# Programs that never modify the filesystem given the arguments accepted below
+_READ_ONLY_PROGRAMS = {
+    "cat",
+    "du",
+    "file",
+    "find",
+    "grep",
+    "head",
+    "ls",
+    "pwd",
+    "rg",
+    "stat",
+    "tail",
+    "tree",
+    "wc",
+}
+_READ_ONLY_SUBCOMMANDS = {
+    "git": {"status", "diff", "log", "show", "ls-files", "rev-parse", "describe", "blame"},
+    "pip": {"list", "freeze", "show"},
+}
+# Arguments that make an otherwise read-only program write files or run others
+_UNSAFE_ARGS = {
+    "find": (
+        "-exec",
+        "-execdir",
+        "-ok",
+        "-okdir",
+        "-delete",
+        "-fprint",
+        "-fprint0",
+        "-fprintf",
+        "-fls",
+    ),
+    "rg": ("--pre",),
+    "tree": ("-o",),
+    "git": ("--output",),
+}
+# Pipeline operators allowed between read-only commands
+_ALLOWED_OPERATORS = {"|", "&&"}
+
+# Upper bound on paths stat'ed for one fingerprint
+_MAX_FINGERPRINT_PATHS = 64
+
+# (path, mtime_ns, size) for every path a command depends on
+Fingerprint = tuple[tuple[str, int | None, int | None], ...]
+
+
+def _split_pipeline(command: str) -> list[list[str]] | None:
+    """Split a command into simple commands, or None if it uses unsupported syntax."""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    try:
+        tokens = list(lexer)
+    except ValueError:
+        return None
+    segments: list[list[str]] = [[]]
+    for token in tokens:
+        if token in _ALLOWED_OPERATORS:
+            segments.append([])
+        elif set(token) <= set("();<>|&"):
+            # Redirection, subshells, background jobs, `;` sequencing
+            return None
+        elif "$" in token or "`" in token:
+            # Expansions make the output depend on more than the command text
+            return None
+        else:
+            segments[-1].append(token)
+    if any(not segment for segment in segments):
+        return None
+    return segments
+
+
+def _is_read_only(argv: list[str]) -> bool:
+    program = Path(argv[0]).name
+    if "=" in argv[0]:
+        # Leading environment assignment
+        return False
+    unsafe = _UNSAFE_ARGS.get(program)
+    if unsafe and any(arg.startswith(unsafe) for arg in argv[1:]):
+        return False
+    if program in _READ_ONLY_PROGRAMS:
+        return True
+    subcommands = _READ_ONLY_SUBCOMMANDS.get(program)
+    return subcommands is not None and len(argv) > 1 and argv[1] in subcommands
+
+
+def is_cacheable_command(command: str) -> bool:
+    """Check whether a shell command is on the read-only allowlist.
+
+    Only pipelines (`|`, `&&`) of allowlisted programs qualify; redirections,
+    `;`, subshells, background jobs and `$`/backtick expansions never do.
+    """
+    segments = _split_pipeline(command)
+    return segments is not None and all(_is_read_only(argv) for argv in segments)
+
+
+def _find_git_dir(cwd: Path) -> Path | None:
+    for directory in (cwd, *cwd.parents):
+        candidate = directory / ".git"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _stat_key(path: Path) -> tuple[str, int, int] | tuple[str, None, None]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return (str(path), None, None)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def fingerprint(command: str, cwd: str) -> Fingerprint:
+    """Build a cheap fingerprint of the filesystem state a command depends on.
+
+    Covers the working directory, every argument that names an existing path,
+    and the git index and HEAD when inside a repository.
+    """
+    base = Path(cwd)
+    paths: list[Path] = [base]
+    for argv in _split_pipeline(command) or []:
+        for arg in argv[1:]:
+            if arg.startswith("-") or len(paths) >= _MAX_FINGERPRINT_PATHS:
+                continue
+            candidate = base / arg
+            if candidate.exists():
+                paths.append(candidate)
+    git_dir = _find_git_dir(base)
+    if git_dir is not None:
+        paths.extend([git_dir / "index", git_dir / "HEAD"])
+    return tuple(_stat_key(path) for path in paths)
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a `CommandCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class CachedResult:
+    """A stored command result."""
+
+    content: str
+    fingerprint: Fingerprint
+    created_at: float
+
+
+class CommandCache:
+    """LRU cache of read-only command output keyed on command, cwd and fingerprint."""
+
+    def __init__(self, *, max_entries: int = 128, ttl: float = 60.0) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Seconds after which an entry expires even if its fingerprint
+                matches, bounding staleness from changes the fingerprint misses
+                (e.g. edits deep inside a directory passed to `ls -R`)
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], CachedResult] = OrderedDict()
+        self.stats = CacheStats()
+
+    def get(self, command: str, cwd: str) -> CachedResult | None:
+        """Return the cached result for a command if it is still valid."""
+        key = (command.strip(), cwd)
+        entry = self._entries.get(key)
+        if entry is not None and (
+            time.monotonic() - entry.created_at > self._ttl
+            or entry.fingerprint != fingerprint(command, cwd)
+        ):
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry
+
+    def put(
+        self,
+        command: str,
+        cwd: str,
+        content: str,
+        *,
+        state: Fingerprint | None = None,
+    ) -> None:
+        """Store a command's output.
+
+        Args:
+            command: The command that was run
+            cwd: Directory it ran in
+            content: Its output
+            state: Fingerprint taken before the command ran; computed now if omitted
+        """
+        key = (command.strip(), cwd)
+        self._entries[key] = CachedResult(
+            content=content,
+            fingerprint=state if state is not None else fingerprint(command, cwd),
+            created_at=time.monotonic(),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached result."""
+        if self._entries:
+            self._entries.clear()
+            self.stats.invalidations += 1
+
+
+__all__ = ["CacheStats", "CommandCache", "Fingerprint", "fingerprint", "is_cacheable_command"]
@@ -63,6 +63,9 @@ COMMANDS = {
 # Maximum argument length for display
 MAX_ARG_LENGTH = 150
 
+# Command output returned by sandbox backends, matching the local shell's limit
+DEFAULT_SANDBOX_MAX_OUTPUT_BYTES = 100_000
+
 # Agent configuration
 config = {"recursion_limit": 1000}
 
@@ -141,6 +144,10 @@ class Settings:
         tavily_api_key: Tavily API key if available
         deepagents_langchain_project: LangSmith project name for deepagents agent tracing
         user_langchain_project: Original LANGSMITH_PROJECT from environment (for user code)
+        http_proxy: Proxy URL for the agent's web tools (CODA_HTTP_PROXY); when unset,
+            the standard HTTP_PROXY/HTTPS_PROXY/NO_PROXY variables apply
+        sandbox_max_output_bytes: Bytes of command output a sandbox backend returns
+            (CODA_SANDBOX_MAX_OUTPUT_BYTES); longer output keeps its head and tail
     """
 
     # API keys
@@ -161,6 +168,12 @@ class Settings:
     # Project information
     project_root: Path | None = None
 
+    # Network configuration
+    http_proxy: str | None = None
+
+    # Sandbox configuration
+    sandbox_max_output_bytes: int = DEFAULT_SANDBOX_MAX_OUTPUT_BYTES
+
     @classmethod
     def from_environment(cls, *, start_path: Path | None = None) -> "Settings":
         """Create settings by detecting the current environment.
@@ -189,6 +202,15 @@ class Settings:
         # Detect project
         project_root = _find_project_root(start_path)
 
+        http_proxy = os.environ.get("CODA_HTTP_PROXY") or None
+
+        try:
+            sandbox_max_output_bytes = int(
+                os.environ.get("CODA_SANDBOX_MAX_OUTPUT_BYTES", DEFAULT_SANDBOX_MAX_OUTPUT_BYTES)
+            )
+        except ValueError:
+            sandbox_max_output_bytes = DEFAULT_SANDBOX_MAX_OUTPUT_BYTES
+
         return cls(
             openai_api_key=openai_key,
             anthropic_api_key=anthropic_key,
@@ -198,6 +220,8 @@ class Settings:
             deepagents_langchain_project=deepagents_langchain_project,
             user_langchain_project=user_langchain_project,
             project_root=project_root,
+            http_proxy=http_proxy,
+            sandbox_max_output_bytes=sandbox_max_output_bytes,
         )
 
     @property
@@ -0,0 +1,447 @@
+"""Time-bounded line diff engine shared by file tracking and diff widgets.
+
+Lines are interned to integers and compared with Myers' O(ND) algorithm after
+trimming the common prefix and suffix. When the edit distance or the time
+budget is exceeded the changed region is reported as a single replaced block,
+so diffing never stalls the UI on large or highly repetitive files.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Literal
+
+DiffLineKind = Literal["context", "add", "remove"]
+
+# Default budgets: wall-clock time for the Myers search and maximum edit distance
+DEFAULT_TIMEOUT = 0.5
+DEFAULT_MAX_EDIT_DISTANCE = 4000
+
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# (tag, i1, i2, j1, j2) in the style of difflib.SequenceMatcher.get_opcodes()
+_Opcode = tuple[str, int, int, int, int]
+
+
+@dataclass(frozen=True)
+class DiffLine:
+    """A single line of a diff hunk."""
+
+    kind: DiffLineKind
+    text: str
+    old_lineno: int | None = None
+    new_lineno: int | None = None
+
+    @property
+    def prefix(self) -> str:
+        """Unified diff prefix character for this line."""
+        if self.kind == "add":
+            return "+"
+        if self.kind == "remove":
+            return "-"
+        return " "
+
+
+@dataclass
+class DiffHunk:
+    """A contiguous group of changes with surrounding context.
+
+    Line numbers are 1-based, matching unified diff headers.
+    """
+
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    lines: list[DiffLine] = field(default_factory=list)
+    replaced: bool = False
+    """True when the diff budget was exceeded and the block is a coarse replacement."""
+
+    @property
+    def header(self) -> str:
+        """Unified diff hunk header (``@@ -a,b +c,d @@``)."""
+        old = _format_range(self.old_start, self.old_count)
+        new = _format_range(self.new_start, self.new_count)
+        return f"@@ -{old} +{new} @@"
+
+
+@dataclass
+class DiffResult:
+    """A computed diff with statistics gathered in the same pass.
+
+    Computed once per operation and handed to previews, metrics and widgets so
+    none of them has to re-scan the diff.
+    """
+
+    hunks: list[DiffHunk] = field(default_factory=list)
+    added: int = 0
+    removed: int = 0
+    total_lines: int = 0
+    """Number of diff body lines across all hunks (context included)."""
+    max_lineno: int = 0
+    """Largest line number referenced by any hunk, for gutter width."""
+
+    @classmethod
+    def from_hunks(cls, hunks: list[DiffHunk]) -> DiffResult:
+        """Build a result and its statistics from hunks in a single pass."""
+        result = cls(hunks=hunks)
+        for hunk in hunks:
+            result.max_lineno = max(
+                result.max_lineno,
+                hunk.old_start + hunk.old_count - 1,
+                hunk.new_start + hunk.new_count - 1,
+            )
+            result.total_lines += len(hunk.lines)
+            for line in hunk.lines:
+                if line.kind == "add":
+                    result.added += 1
+                elif line.kind == "remove":
+                    result.removed += 1
+        return result
+
+    @property
+    def hunk_count(self) -> int:
+        """Number of hunks in the diff."""
+        return len(self.hunks)
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether the diff contains any change."""
+        return bool(self.hunks)
+
+    @property
+    def replaced(self) -> bool:
+        """Whether any hunk is a coarse replacement produced by the budget fallback."""
+        return any(hunk.replaced for hunk in self.hunks)
+
+
+def _format_range(start: int, count: int) -> str:
+    """Format a hunk range the way difflib.unified_diff does."""
+    if count == 1:
+        return str(start)
+    if count == 0:
+        return f"{start - 1 if start else 0},0"
+    return f"{start},{count}"
+
+
+def _intern_lines(a: list[str], b: list[str]) -> tuple[list[int], list[int]]:
+    """Map lines to integer ids so comparisons are cheap."""
+    ids: dict[str, int] = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    return a_ids, b_ids
+
+
+def _myers(
+    a: list[int], b: list[int], *, deadline: float, max_edit_distance: int
+) -> list[_Opcode] | None:
+    """Compute opcodes with Myers' greedy algorithm, or None if over budget."""
+    n, m = len(a), len(b)
+    max_d = min(n + m, max_edit_distance)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace: list[list[int]] = []
+
+    for d in range(max_d + 1):
+        if time.monotonic() > deadline:
+            return None
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                trace.append(v[offset - d : offset + d + 1])
+                return _backtrack(trace, n, m)
+        trace.append(v[offset - d : offset + d + 1])
+    return None
+
+
+def _backtrack(trace: list[list[int]], n: int, m: int) -> list[_Opcode]:
+    """Walk the Myers trace back from (n, m) and merge steps into opcodes."""
+    steps: list[tuple[str, int, int]] = []  # (tag, old_index, new_index), reversed
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = previous[prev_k + d - 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            steps.append(("equal", x, y))
+        if x == prev_x:
+            steps.append(("insert", x, prev_y))
+        else:
+            steps.append(("delete", prev_x, y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        steps.append(("equal", x, y))
+
+    # Merge unit steps: runs of equal lines, and runs of deletes/inserts as one block
+    opcodes: list[_Opcode] = []
+    for tag, i, j in reversed(steps):
+        di = 0 if tag == "insert" else 1
+        dj = 0 if tag == "delete" else 1
+        if opcodes and (opcodes[-1][0] == "equal") == (tag == "equal"):
+            last_tag, i1, i2, j1, j2 = opcodes[-1]
+            i2, j2 = i2 + di, j2 + dj
+            if last_tag != "equal":
+                last_tag = "delete" if j1 == j2 else "insert" if i1 == i2 else "replace"
+            opcodes[-1] = (last_tag, i1, i2, j1, j2)
+        else:
+            opcodes.append((tag, i, i + di, j, j + dj))
+    return opcodes
+
+
+def _compute_opcodes(
+    a: list[str],
+    b: list[str],
+    *,
+    timeout: float,
+    max_edit_distance: int,
+) -> tuple[list[_Opcode], bool]:
+    """Compute opcodes for two line lists, returning (opcodes, replaced)."""
+    n, m = len(a), len(b)
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+
+    opcodes: list[_Opcode] = []
+    if prefix:
+        opcodes.append(("equal", 0, prefix, 0, prefix))
+
+    a_mid = a[prefix : n - suffix]
+    b_mid = b[prefix : m - suffix]
+    replaced = False
+    if a_mid or b_mid:
+        middle: list[_Opcode] | None = None
+        if a_mid and b_mid:
+            a_ids, b_ids = _intern_lines(a_mid, b_mid)
+            middle = _myers(
+                a_ids,
+                b_ids,
+                deadline=time.monotonic() + timeout,
+                max_edit_distance=max_edit_distance,
+            )
+        if middle is None:
+            # One side is empty (pure insert/delete) or the budget ran out
+            replaced = bool(a_mid and b_mid)
+            tag = "replace" if replaced else ("delete" if a_mid else "insert")
+            middle = [(tag, 0, len(a_mid), 0, len(b_mid))]
+        opcodes.extend(
+            (tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix)
+            for tag, i1, i2, j1, j2 in middle
+        )
+
+    if suffix:
+        opcodes.append(("equal", n - suffix, n, m - suffix, m))
+    return opcodes, replaced
+
+
+def _group_opcodes(opcodes: list[_Opcode], context: int) -> list[list[_Opcode]]:
+    """Group opcodes into hunks with ``context`` lines, like difflib's grouping."""
+    if not opcodes or all(op[0] == "equal" for op in opcodes):
+        return []
+    codes = list(opcodes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = (tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = (tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+
+    groups: list[list[_Opcode]] = []
+    group: list[_Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        start_i, start_j = i1, j1
+        if tag == "equal" and i2 - i1 > context * 2:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            start_i, start_j = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, start_i, i2, start_j, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        groups.append(group)
+    return groups
+
+
+def diff_line_lists(
+    before: list[str],
+    after: list[str],
+    *,
+    context_lines: int = 3,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE,
+) -> list[DiffHunk]:
+    """Diff two lists of lines into structured hunks.
+
+    Args:
+        before: Original lines (without line terminators)
+        after: New lines (without line terminators)
+        context_lines: Number of unchanged lines around each change
+        timeout: Time budget in seconds for the Myers search
+        max_edit_distance: Largest edit distance searched before falling back
+
+    Returns:
+        List of hunks; empty when the inputs are identical
+    """
+    opcodes, replaced = _compute_opcodes(
+        before, after, timeout=timeout, max_edit_distance=max_edit_distance
+    )
+    hunks: list[DiffHunk] = []
+    for group in _group_opcodes(opcodes, context_lines):
+        first, last = group[0], group[-1]
+        hunk = DiffHunk(
+            old_start=first[1] + 1,
+            old_count=last[2] - first[1],
+            new_start=first[3] + 1,
+            new_count=last[4] - first[3],
+            replaced=replaced and any(op[0] == "replace" for op in group),
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                hunk.lines.extend(
+                    DiffLine("context", before[i], i + 1, j1 + (i - i1) + 1) for i in range(i1, i2)
+                )
+                continue
+            hunk.lines.extend(DiffLine("remove", before[i], i + 1, None) for i in range(i1, i2))
+            hunk.lines.extend(DiffLine("add", after[j], None, j + 1) for j in range(j1, j2))
+        hunks.append(hunk)
+    return hunks
+
+
+def diff_texts(
+    before: str,
+    after: str,
+    *,
+    context_lines: int = 3,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE,
+) -> list[DiffHunk]:
+    """Diff two texts line by line (see ``diff_line_lists``)."""
+    return diff_line_lists(
+        before.splitlines(),
+        after.splitlines(),
+        context_lines=context_lines,
+        timeout=timeout,
+        max_edit_distance=max_edit_distance,
+    )
+
+
+def compute_diff(
+    before: str,
+    after: str,
+    *,
+    context_lines: int = 3,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_edit_distance: int = DEFAULT_MAX_EDIT_DISTANCE,
+) -> DiffResult:
+    """Diff two texts and gather statistics (see ``diff_line_lists``)."""
+    return DiffResult.from_hunks(
+        diff_texts(
+            before,
+            after,
+            context_lines=context_lines,
+            timeout=timeout,
+            max_edit_distance=max_edit_distance,
+        )
+    )
+
+
+def format_unified(
+    hunks: list[DiffHunk],
+    fromfile: str = "before",
+    tofile: str = "after",
+    *,
+    max_lines: int | None = None,
+) -> str | None:
+    """Render hunks as unified diff text.
+
+    Args:
+        hunks: Hunks produced by the engine
+        fromfile: Label for the ``---`` header
+        tofile: Label for the ``+++`` header
+        max_lines: Maximum number of output lines (None for unlimited); a
+            trailing ``...`` marks truncation
+
+    Returns:
+        Unified diff string, or None when there are no hunks
+    """
+    if not hunks:
+        return None
+    out = [f"--- {fromfile}", f"+++ {tofile}"]
+    for hunk in hunks:
+        out.append(hunk.header)
+        out.extend(line.prefix + line.text for line in hunk.lines)
+        if max_lines is not None and len(out) > max_lines:
+            break
+    if max_lines is not None and len(out) > max_lines:
+        out = out[: max_lines - 1]
+        out.append("...")
+    return "\n".join(out)
+
+
+def parse_unified_diff(diff: str) -> list[DiffHunk]:
+    """Parse unified diff text into hunks.
+
+    Only needed for diffs that did not come from this engine; a trailing
+    ``...`` truncation marker is ignored.
+    """
+    hunks: list[DiffHunk] = []
+    current: DiffHunk | None = None
+    old_num = new_num = 0
+    for line in diff.splitlines():
+        if line.startswith(("---", "+++")) and current is None:
+            continue
+        if m := _HUNK_HEADER_RE.match(line):
+            old_num, new_num = int(m.group(1)), int(m.group(3))
+            current = DiffHunk(
+                old_start=old_num,
+                old_count=int(m.group(2)) if m.group(2) is not None else 1,
+                new_start=new_num,
+                new_count=int(m.group(4)) if m.group(4) is not None else 1,
+            )
+            hunks.append(current)
+            continue
+        if current is None:
+            continue
+        if line.startswith("-"):
+            current.lines.append(DiffLine("remove", line[1:], old_num, None))
+            old_num += 1
+        elif line.startswith("+"):
+            current.lines.append(DiffLine("add", line[1:], None, new_num))
+            new_num += 1
+        elif line.startswith(" "):
+            current.lines.append(DiffLine("context", line[1:], old_num, new_num))
+            old_num += 1
+            new_num += 1
+    return hunks
+
+
+__all__ = [
+    "DiffHunk",
+    "DiffLine",
+    "DiffResult",
+    "compute_diff",
+    "diff_line_lists",
+    "diff_texts",
+    "format_unified",
+    "parse_unified_diff",
+]
@@ -2,20 +2,41 @@
 
 from __future__ import annotations
 
-import difflib
+import asyncio
+import hashlib
+import threading
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal
 
 from deepagents.backends.utils import perform_string_replacement
+from langchain.agents.middleware.types import AgentMiddleware, AgentState
 
 from coda_cli.config import settings
+from coda_cli.diff_engine import DiffResult, compute_diff, format_unified
+from coda_cli.large_files import (
+    FileSummary,
+    is_large_file,
+    read_text_limited,
+    summarize_file,
+    windowed_edit_diff,
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     from deepagents.backends.protocol import BACKEND_TYPES
+    from langchain.agents.middleware.types import ToolCallRequest
+    from langchain_core.messages import ToolMessage
+    from langgraph.types import Command
 
 FileOpStatus = Literal["pending", "success", "error"]
 
+# Tools whose side effects on the filesystem cannot be tracked per path
+_OPAQUE_WRITE_TOOLS = {"shell", "execute"}
+_TRACKED_WRITE_TOOLS = {"write_file", "edit_file"}
+
 
 @dataclass
 class ApprovalPreview:
@@ -26,14 +47,12 @@ class ApprovalPreview:
     diff: str | None = None
     diff_title: str | None = None
     error: str | None = None
+    diff_result: DiffResult | None = None
 
 
 def _safe_read(path: Path) -> str | None:
-    """Read file content, returning None on failure."""
-    try:
-        return path.read_text()
-    except (OSError, UnicodeDecodeError):
-        return None
+    """Read file content, returning None on failure or if the file is too large to diff."""
+    return read_text_limited(path)
 
 
 def _count_lines(text: str) -> int:
@@ -43,45 +62,16 @@ def _count_lines(text: str) -> int:
     return len(text.splitlines())
 
 
-def compute_unified_diff(
-    before: str,
-    after: str,
-    display_path: str,
-    *,
-    max_lines: int | None = 800,
-    context_lines: int = 3,
+def format_diff_result(
+    result: DiffResult, display_path: str, *, max_lines: int | None = 800
 ) -> str | None:
-    """Compute a unified diff between before and after content.
-
-    Args:
-        before: Original content
-        after: New content
-        display_path: Path for display in diff headers
-        max_lines: Maximum number of diff lines (None for unlimited)
-        context_lines: Number of context lines around changes (default 3)
-
-    Returns:
-        Unified diff string or None if no changes
-    """
-    before_lines = before.splitlines()
-    after_lines = after.splitlines()
-    diff_lines = list(
-        difflib.unified_diff(
-            before_lines,
-            after_lines,
-            fromfile=f"{display_path} (before)",
-            tofile=f"{display_path} (after)",
-            lineterm="",
-            n=context_lines,
-        )
+    """Render a computed diff as unified diff text with before/after headers."""
+    return format_unified(
+        result.hunks,
+        f"{display_path} (before)",
+        f"{display_path} (after)",
+        max_lines=max_lines,
     )
-    if not diff_lines:
-        return None
-    if max_lines is not None and len(diff_lines) > max_lines:
-        truncated = diff_lines[: max_lines - 1]
-        truncated.append("...")
-        return "\n".join(truncated)
-    return "\n".join(diff_lines)
 
 
 @dataclass
@@ -110,10 +100,14 @@ class FileOperationRecord:
     error: str | None = None
     metrics: FileOpMetrics = field(default_factory=FileOpMetrics)
     diff: str | None = None
+    diff_result: DiffResult | None = None
     before_content: str | None = None
     after_content: str | None = None
     read_output: str | None = None
     hitl_approved: bool = False
+    # Set for files too large to hold in memory; the diff only covers edited windows
+    large_file: bool = False
+    summary: FileSummary | None = None
 
 
 def resolve_physical_path(path_str: str | None, assistant_id: str | None) -> Path | None:
@@ -146,7 +140,7 @@ def format_display_path(path_str: str | None) -> str:
         return str(path_str)
 
 
-def build_approval_preview(
+def build_approval_preview(  # noqa: PLR0911
     tool_name: str,
     args: dict[str, Any],
     assistant_id: str | None,
@@ -156,29 +150,26 @@ def build_approval_preview(
     display_path = format_display_path(path_str)
     physical_path = resolve_physical_path(path_str, assistant_id)
 
+    if tool_name in {"write_file", "edit_file"} and is_large_file(physical_path):
+        return _large_file_preview(tool_name, path_str, display_path, physical_path, args)
+
     if tool_name == "write_file":
         content = str(args.get("content", ""))
         before = _safe_read(physical_path) if physical_path and physical_path.exists() else ""
         after = content
-        diff = compute_unified_diff(before or "", after, display_path, max_lines=100)
-        additions = 0
-        if diff:
-            additions = sum(
-                1
-                for line in diff.splitlines()
-                if line.startswith("+") and not line.startswith("+++")
-            )
+        result = compute_diff(before or "", after)
         total_lines = _count_lines(after)
         details = [
             f"File: {path_str}",
             "Action: Create new file" + (" (overwrites existing content)" if before else ""),
-            f"Lines to write: {additions or total_lines}",
+            f"Lines to write: {result.added or total_lines}",
         ]
         return ApprovalPreview(
             title=f"Write {display_path}",
             details=details,
-            diff=diff,
+            diff=format_diff_result(result, display_path, max_lines=100),
             diff_title=f"Diff {display_path}",
+            diff_result=result,
         )
 
     if tool_name == "edit_file":
@@ -206,49 +197,282 @@ def build_approval_preview(
                 error=replacement,
             )
         after, occurrences = replacement
-        diff = compute_unified_diff(before, after, display_path, max_lines=None)
-        additions = 0
-        deletions = 0
-        if diff:
-            additions = sum(
-                1
-                for line in diff.splitlines()
-                if line.startswith("+") and not line.startswith("+++")
-            )
-            deletions = sum(
-                1
-                for line in diff.splitlines()
-                if line.startswith("-") and not line.startswith("---")
-            )
+        result = compute_diff(before, after)
         details = [
             f"File: {path_str}",
             f"Action: Replace text ({'all occurrences' if replace_all else 'single occurrence'})",
             f"Occurrences matched: {occurrences}",
-            f"Lines changed: +{additions} / -{deletions}",
+            f"Lines changed: +{result.added} / -{result.removed}",
         ]
         return ApprovalPreview(
             title=f"Update {display_path}",
             details=details,
-            diff=diff,
+            diff=format_diff_result(result, display_path, max_lines=None),
             diff_title=f"Diff {display_path}",
+            diff_result=result,
         )
 
     return None
 
 
+def _large_file_preview(
+    tool_name: str,
+    path_str: str,
+    display_path: str,
+    physical_path: Path,
+    args: dict[str, Any],
+) -> ApprovalPreview:
+    """Preview a change to a file too large to load, diffing only the edited regions."""
+    if tool_name == "write_file":
+        existing = summarize_file(physical_path)
+        return ApprovalPreview(
+            title=f"Write {display_path}",
+            details=[
+                f"File: {path_str}",
+                "Action: Create new file (overwrites existing content)",
+                f"Existing file: {existing.describe() if existing else 'unreadable'}",
+                f"Lines to write: {_count_lines(str(args.get('content', '')))}",
+            ],
+        )
+    replace_all = bool(args.get("replace_all", False))
+    details = [
+        f"File: {path_str}",
+        f"Action: Replace text ({'all occurrences' if replace_all else 'single occurrence'})",
+    ]
+    result = windowed_edit_diff(
+        physical_path,
+        str(args.get("old_string", "")),
+        str(args.get("new_string", "")),
+        max_windows=20 if replace_all else 1,
+    )
+    if result is None:
+        return ApprovalPreview(
+            title=f"Update {display_path}",
+            details=details,
+            error="Unable to locate the text to replace.",
+        )
+    details.append(f"Lines changed: +{result.added} / -{result.removed} (changed regions only)")
+    return ApprovalPreview(
+        title=f"Update {display_path}",
+        details=details,
+        diff=format_diff_result(result, display_path, max_lines=None),
+        diff_title=f"Diff {display_path}",
+        diff_result=result,
+    )
+
+
+def _content_hash(content: str) -> str:
+    """Return the sha256 hex digest of text content encoded as UTF-8."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _local_stamp(path: Path | None) -> tuple[int, int] | None:
+    """Return an (mtime_ns, size) stamp for a local file, or None if unavailable."""
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _is_sandbox_backend(backend: object) -> bool:
+    """Check whether a backend (or the default of a composite) executes remotely."""
+    default = getattr(backend, "default", backend)
+    return callable(getattr(default, "execute", None))
+
+
+@dataclass
+class FileSnapshot:
+    """Cached content of a file together with the stamp used to validate it."""
+
+    content: str
+    stamp: tuple[int, int] | str | None
+
+
+class FileSnapshotCache:
+    """Per-session cache of file contents used for before/after diffs.
+
+    Local files are validated by mtime and size. Sandbox files are validated by
+    a remote content hash when the backend exposes ``hash_files``; otherwise the
+    snapshots are trusted until a shell command runs, since only tracked
+    write/edit calls can have changed them.
+    """
+
+    def __init__(self, backend: BACKEND_TYPES | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            backend: Backend used to download files (None for direct local reads)
+        """
+        self.backend = backend
+        self.remote = backend is not None and _is_sandbox_backend(backend)
+        default = getattr(backend, "default", backend)
+        self._hash_files = getattr(default, "hash_files", None) if self.remote else None
+        self._snapshots: dict[str, FileSnapshot] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, path_str: str, content: str, physical_path: Path | None = None) -> None:
+        """Store the current content of a file."""
+        stamp = _content_hash(content) if self.remote else _local_stamp(physical_path)
+        self._snapshots[path_str] = FileSnapshot(content=content, stamp=stamp)
+
+    def invalidate(self, path_str: str | None = None) -> None:
+        """Drop one snapshot, or every snapshot when no path is given."""
+        if path_str is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(path_str, None)
+
+    def note_untracked_writes(self) -> None:
+        """Forget snapshots that cannot be revalidated after an opaque command runs."""
+        if self.remote and self._hash_files is None:
+            self._snapshots.clear()
+
+    def read_many(
+        self,
+        paths: list[str],
+        physical_paths: dict[str, Path | None] | None = None,
+        *,
+        refresh: bool = False,
+    ) -> dict[str, str | None]:
+        """Return the current content of several files, using valid snapshots.
+
+        Cache misses are fetched with a single batched backend download.
+
+        Args:
+            paths: Paths as passed to the file tools
+            physical_paths: Resolved local paths, used for local validation
+            refresh: Skip the cache and always re-read the files
+
+        Returns:
+            Mapping of path to content, or None when the file could not be read
+        """
+        physical_paths = physical_paths or {}
+        unique = list(dict.fromkeys(p for p in paths if p))
+        results: dict[str, str | None] = {}
+        missing = unique if refresh else self._validated(unique, physical_paths, results)
+        self.misses += len(missing)
+        if missing:
+            results.update(self._fetch(missing, physical_paths))
+        for path_str in missing:
+            content = results.get(path_str)
+            if content is None:
+                self.invalidate(path_str)
+            else:
+                self.put(path_str, content, physical_paths.get(path_str))
+        return results
+
+    def read(
+        self, path_str: str, physical_path: Path | None = None, *, refresh: bool = False
+    ) -> str | None:
+        """Return the current content of a single file (see ``read_many``)."""
+        return self.read_many([path_str], {path_str: physical_path}, refresh=refresh).get(path_str)
+
+    def _validated(
+        self,
+        paths: list[str],
+        physical_paths: dict[str, Path | None],
+        results: dict[str, str | None],
+    ) -> list[str]:
+        """Fill results from valid snapshots and return the paths that must be fetched."""
+        cached = [p for p in paths if p in self._snapshots]
+        missing = [p for p in paths if p not in self._snapshots]
+        if not cached:
+            return missing
+
+        if self.remote:
+            remote_hashes: dict[str, str | None] = {}
+            if self._hash_files is not None:
+                try:
+                    remote_hashes = dict(self._hash_files(cached))
+                except Exception:  # noqa: BLE001
+                    remote_hashes = {}
+            for path_str in cached:
+                snapshot = self._snapshots[path_str]
+                if self._hash_files is None or remote_hashes.get(path_str) == snapshot.stamp:
+                    results[path_str] = snapshot.content
+                    self.hits += 1
+                else:
+                    missing.append(path_str)
+            return missing
+
+        for path_str in cached:
+            snapshot = self._snapshots[path_str]
+            stamp = _local_stamp(physical_paths.get(path_str))
+            if stamp is not None and stamp == snapshot.stamp:
+                results[path_str] = snapshot.content
+                self.hits += 1
+            else:
+                missing.append(path_str)
+        return missing
+
+    def _fetch(
+        self, paths: list[str], physical_paths: dict[str, Path | None]
+    ) -> dict[str, str | None]:
+        """Read files from the backend in one batch, or from disk without a backend."""
+        if self.backend is None:
+            results: dict[str, str | None] = {}
+            for path_str in paths:
+                physical_path = physical_paths.get(path_str)
+                results[path_str] = _safe_read(physical_path) if physical_path else None
+            return results
+
+        try:
+            responses = self.backend.download_files(paths)
+        except Exception:  # noqa: BLE001
+            return dict.fromkeys(paths)
+
+        results = dict.fromkeys(paths)
+        for path_str, response in zip(paths, responses, strict=False):
+            if response.content is None or response.error is not None:
+                continue
+            try:
+                results[path_str] = response.content.decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+        return results
+
+
 class FileOpTracker:
     """Collect file operation metrics during CoDA Code interaction."""
 
-    def __init__(self, *, assistant_id: str | None, backend: BACKEND_TYPES | None = None) -> None:
-        """Initialize the tracker."""
+    def __init__(
+        self,
+        *,
+        assistant_id: str | None,
+        backend: BACKEND_TYPES | None = None,
+        snapshots: FileSnapshotCache | None = None,
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            assistant_id: Agent identifier used to resolve /memories/ paths
+            backend: Backend used to read file contents
+            snapshots: Session-wide snapshot cache to share across trackers
+        """
         self.assistant_id = assistant_id
         self.backend = backend
+        self.snapshots = snapshots if snapshots is not None else FileSnapshotCache(backend)
         self.active: dict[str | None, FileOperationRecord] = {}
         self.completed: list[FileOperationRecord] = []
+        # Sandbox reads are deferred so concurrent tool calls share one download
+        self._pending_before: list[FileOperationRecord] = []
+        # Flushes run off the event loop; the tool wrapper waits for them
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
 
     def start_operation(
         self, tool_name: str, args: dict[str, Any], tool_call_id: str | None
     ) -> None:
+        if tool_call_id is not None and tool_call_id in self.active:
+            # Already started by the tool wrapper, which can run ahead of the UI
+            return
+        if tool_name in _OPAQUE_WRITE_TOOLS:
+            self.snapshots.note_untracked_writes()
+            return
         if tool_name not in {"read_file", "write_file", "edit_file"}:
             return
         path_str = str(args.get("file_path") or args.get("path") or "")
@@ -260,22 +484,8 @@ class FileOpTracker:
             tool_call_id=tool_call_id,
             args=args,
         )
-        if tool_name in {"write_file", "edit_file"}:
-            if self.backend and path_str:
-                try:
-                    responses = self.backend.download_files([path_str])
-                    if (
-                        responses
-                        and responses[0].content is not None
-                        and responses[0].error is None
-                    ):
-                        record.before_content = responses[0].content.decode("utf-8")
-                    else:
-                        record.before_content = ""
-                except Exception:
-                    record.before_content = ""
-            elif record.physical_path:
-                record.before_content = _safe_read(record.physical_path) or ""
+        if tool_name in _TRACKED_WRITE_TOOLS and path_str:
+            self._capture_before_content(record, path_str)
         self.active[tool_call_id] = record
 
     def update_args(self, tool_call_id: str, args: dict[str, Any]) -> None:
@@ -287,26 +497,83 @@ class FileOpTracker:
         record.args.update(args)
 
         # If we haven't captured before_content yet, try again now that we might have the path
-        if record.before_content is None and record.tool_name in {"write_file", "edit_file"}:
+        if (
+            record.before_content is None
+            and record.tool_name in _TRACKED_WRITE_TOOLS
+            and record not in self._pending_before
+        ):
             path_str = str(record.args.get("file_path") or record.args.get("path") or "")
             if path_str:
                 record.display_path = format_display_path(path_str)
                 record.physical_path = resolve_physical_path(path_str, self.assistant_id)
-                if self.backend:
-                    try:
-                        responses = self.backend.download_files([path_str])
-                        if (
-                            responses
-                            and responses[0].content is not None
-                            and responses[0].error is None
-                        ):
-                            record.before_content = responses[0].content.decode("utf-8")
-                        else:
-                            record.before_content = ""
-                    except Exception:
-                        record.before_content = ""
-                elif record.physical_path:
-                    record.before_content = _safe_read(record.physical_path) or ""
+                self._capture_before_content(record, path_str)
+
+    def flush_pending_reads(self) -> None:
+        """Fetch before_content for all deferred operations in one batched download.
+
+        Blocks until any flush already in progress has finished, so once this
+        returns every operation started before the call has its before_content.
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending_before = self._pending_before, []
+            if not pending:
+                return
+            paths = [self._record_path(record) for record in pending]
+            contents = self.snapshots.read_many(
+                paths,
+                {path: record.physical_path for path, record in zip(paths, pending, strict=True)},
+            )
+            for path_str, record in zip(paths, pending, strict=True):
+                record.before_content = contents.get(path_str) or ""
+
+    def capture_before(
+        self, tool_name: str, args: dict[str, Any], tool_call_id: str | None
+    ) -> None:
+        """Make sure a write or edit has its before_content before the tool runs.
+
+        The UI may not have seen the call yet, or its batched read may still be
+        in flight; either way the snapshot must predate the change.
+        """
+        if tool_name not in _TRACKED_WRITE_TOOLS:
+            return
+        self.start_operation(tool_name, args, tool_call_id)
+        if self.snapshots.remote:
+            self.flush_pending_reads()
+
+    async def acapture_before(
+        self, tool_name: str, args: dict[str, Any], tool_call_id: str | None
+    ) -> None:
+        """Async version of `capture_before` that downloads off the event loop."""
+        if tool_name not in _TRACKED_WRITE_TOOLS:
+            return
+        self.start_operation(tool_name, args, tool_call_id)
+        if self.snapshots.remote:
+            await asyncio.to_thread(self.flush_pending_reads)
+
+    def _capture_before_content(self, record: FileOperationRecord, path_str: str) -> None:
+        if self.snapshots.remote:
+            with self._pending_lock:
+                self._pending_before.append(record)
+            return
+        if is_large_file(record.physical_path):
+            # Never load the whole file; diff the edited windows while the old text is on disk
+            record.large_file = True
+            record.before_content = ""
+            if record.tool_name == "edit_file" and record.physical_path is not None:
+                replace_all = bool(record.args.get("replace_all", False))
+                record.diff_result = windowed_edit_diff(
+                    record.physical_path,
+                    str(record.args.get("old_string", "")),
+                    str(record.args.get("new_string", "")),
+                    max_windows=20 if replace_all else 1,
+                )
+            return
+        record.before_content = self.snapshots.read(path_str, record.physical_path) or ""
+
+    @staticmethod
+    def _record_path(record: FileOperationRecord) -> str:
+        return str(record.args.get("file_path") or record.args.get("path") or "")
 
     def complete_with_message(self, tool_message: Any) -> FileOperationRecord | None:
         tool_call_id = getattr(tool_message, "tool_call_id", None)
@@ -314,6 +581,8 @@ class FileOpTracker:
         if record is None:
             return None
 
+        self.flush_pending_reads()
+
         content = tool_message.content
         if isinstance(content, list):
             # Some tool messages may return list segments; join them for analysis.
@@ -354,6 +623,10 @@ class FileOpTracker:
                 record.metrics.end_line = lines
             if isinstance(limit, int) and lines > limit:
                 record.metrics.end_line = (record.metrics.start_line or 1) + limit - 1
+        elif record.large_file or (
+            not self.snapshots.remote and is_large_file(record.physical_path)
+        ):
+            self._complete_large_file(record)
         else:
             # For write/edit operations, read back from backend (or local filesystem)
             self._populate_after_content(record)
@@ -364,38 +637,18 @@ class FileOpTracker:
                 return record
             record.metrics.lines_written = _count_lines(record.after_content)
             before_lines = _count_lines(record.before_content or "")
-            diff = compute_unified_diff(
-                record.before_content or "",
-                record.after_content,
-                record.display_path,
-                max_lines=100,
-            )
-            record.diff = diff
-            if diff:
-                additions = sum(
-                    1
-                    for line in diff.splitlines()
-                    if line.startswith("+") and not line.startswith("+++")
-                )
-                deletions = sum(
-                    1
-                    for line in diff.splitlines()
-                    if line.startswith("-") and not line.startswith("---")
-                )
-                record.metrics.lines_added = additions
-                record.metrics.lines_removed = deletions
+            # Diff once; metrics, the text diff and DiffMessage all reuse this result
+            result = compute_diff(record.before_content or "", record.after_content)
+            record.diff_result = result
+            record.diff = format_diff_result(result, record.display_path, max_lines=100)
+            if result.has_changes:
+                record.metrics.lines_added = result.added
+                record.metrics.lines_removed = result.removed
             elif record.tool_name == "write_file" and (record.before_content or "") == "":
                 record.metrics.lines_added = record.metrics.lines_written
-            record.metrics.bytes_written = len(record.after_content.encode("utf-8"))
-            if record.diff is None and (record.before_content or "") != record.after_content:
-                record.diff = compute_unified_diff(
-                    record.before_content or "",
-                    record.after_content,
-                    record.display_path,
-                    max_lines=100,
-                )
-            if record.diff is None and before_lines != record.metrics.lines_written:
+            elif before_lines != record.metrics.lines_written:
                 record.metrics.lines_added = max(record.metrics.lines_written - before_lines, 0)
+            record.metrics.bytes_written = len(record.after_content.encode("utf-8"))
 
         self._finalize(record)
         return record
@@ -413,32 +666,92 @@ class FileOpTracker:
                 if record_path == file_path:
                     record.hitl_approved = True
 
-    def _populate_after_content(self, record: FileOperationRecord) -> None:
-        # Use backend if available (works for any BackendProtocol implementation)
-        if self.backend:
-            try:
-                file_path = record.args.get("file_path") or record.args.get("path")
-                if file_path:
-                    responses = self.backend.download_files([file_path])
-                    if (
-                        responses
-                        and responses[0].content is not None
-                        and responses[0].error is None
-                    ):
-                        record.after_content = responses[0].content.decode("utf-8")
-                    else:
-                        record.after_content = None
-                else:
-                    record.after_content = None
-            except Exception:
-                record.after_content = None
+    def _complete_large_file(self, record: FileOperationRecord) -> None:
+        """Summarize a written file that is too large to read back and diff in full."""
+        self.snapshots.invalidate(self._record_path(record))
+        overwrote_large_file = record.large_file
+        summary = summarize_file(record.physical_path) if record.physical_path else None
+        if summary is None:
+            record.status = "error"
+            record.error = "Could not read updated file content."
+            return
+        record.large_file = True
+        record.summary = summary
+        record.metrics.lines_written = summary.line_count
+        record.metrics.bytes_written = summary.size
+        result = record.diff_result
+        if result is None and record.tool_name == "edit_file" and record.physical_path:
+            # The old text is gone; recover the windows from where the new text landed
+            replace_all = bool(record.args.get("replace_all", False))
+            result = windowed_edit_diff(
+                record.physical_path,
+                str(record.args.get("new_string", "")),
+                str(record.args.get("old_string", "")),
+                reverse=True,
+                max_windows=20 if replace_all else 1,
+            )
+        if result is not None and result.has_changes:
+            record.diff_result = result
+            record.diff = format_diff_result(result, record.display_path, max_lines=100)
+            record.metrics.lines_added = result.added
+            record.metrics.lines_removed = result.removed
         else:
-            # Fallback: direct filesystem read when no backend provided
-            if record.physical_path is None:
-                record.after_content = None
-                return
-            record.after_content = _safe_read(record.physical_path)
+            record.diff_result = None
+            if record.tool_name == "write_file" and not (
+                record.before_content or overwrote_large_file
+            ):
+                record.metrics.lines_added = summary.line_count
+
+    def _populate_after_content(self, record: FileOperationRecord) -> None:
+        # The file was just modified, so bypass the cache; the fresh content is
+        # stored as the snapshot a later edit of the same file starts from.
+        file_path = self._record_path(record)
+        if self.backend and not file_path:
+            record.after_content = None
+            return
+        if not self.backend and record.physical_path is None:
+            record.after_content = None
+            return
+        record.after_content = self.snapshots.read(
+            file_path or str(record.physical_path), record.physical_path, refresh=True
+        )
 
     def _finalize(self, record: FileOperationRecord) -> None:
         self.completed.append(record)
         self.active.pop(record.tool_call_id, None)
+
+
+# The tracker of the agent run in progress; each UI run binds its own
+active_tracker: ContextVar[FileOpTracker | None] = ContextVar("active_tracker", default=None)
+
+
+class FileSnapshotMiddleware(AgentMiddleware[AgentState, Any]):
+    """Capture the content a write or edit replaces before the tool runs.
+
+    Tool calls execute concurrently with the UI consuming the stream, so the
+    tracker's own read could otherwise see the file after the change.
+    """
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command[Any]],
+    ) -> ToolMessage | Command[Any]:
+        """Capture before_content for the active tracker, then run the tool."""
+        tracker = active_tracker.get()
+        if tracker is not None:
+            call = request.tool_call
+            tracker.capture_before(call["name"], dict(call["args"]), call.get("id"))
+        return handler(request)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command[Any]]],
+    ) -> ToolMessage | Command[Any]:
+        """Async version of `wrap_tool_call`."""
+        tracker = active_tracker.get()
+        if tracker is not None:
+            call = request.tool_call
+            await tracker.acapture_before(call["name"], dict(call["args"]), call.get("id"))
+        return await handler(request)
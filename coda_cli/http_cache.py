@@ -0,0 +1,331 @@
+"""Persistent HTTP cache for `fetch_url`.
+
+Fetched pages are stored under ``~/.coda/cache/http`` together with their
+converted markdown, so a page fetched again (in the same session, by a
+subagent, or in a later session) costs no download and no conversion while it
+is fresh, and only a conditional request (``If-None-Match`` /
+``If-Modified-Since``) once it is stale. Freshness follows ``Cache-Control``,
+``Expires`` and, failing those, the usual ``Last-Modified`` heuristic.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from coda_cli.config import settings
+
+if TYPE_CHECKING:
+    import requests
+
+_MB = 1024 * 1024
+
+DEFAULT_MAX_BYTES = 256 * _MB
+
+# Response headers kept with an entry
+_STORED_HEADERS = (
+    "cache-control",
+    "content-type",
+    "date",
+    "etag",
+    "expires",
+    "last-modified",
+)
+
+# Heuristic freshness for responses with only Last-Modified (RFC 9111 4.2.2)
+_HEURISTIC_FRACTION = 0.1
+_HEURISTIC_MAX_SECONDS = 24 * 60 * 60
+
+
+def _cache_control(headers: dict[str, str]) -> dict[str, str]:
+    directives: dict[str, str] = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _parse_http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_storable(headers: dict[str, str]) -> bool:
+    """Check whether a response may be stored at all."""
+    directives = _cache_control(headers)
+    return "no-store" not in directives and headers.get("vary", "").strip() != "*"
+
+
+def freshness_lifetime(headers: dict[str, str], now: float) -> float:
+    """Seconds a response stays fresh after it was received.
+
+    Args:
+        headers: Lower-cased response headers
+        now: Time the response was received
+
+    Returns:
+        The lifetime, or 0 if it must be revalidated before every use.
+    """
+    directives = _cache_control(headers)
+    if "no-cache" in directives:
+        return 0.0
+    date = _parse_http_date(headers.get("date")) or now
+    if "max-age" in directives:
+        try:
+            lifetime = float(directives["max-age"])
+        except ValueError:
+            return 0.0
+    elif (expires := _parse_http_date(headers.get("expires"))) is not None:
+        lifetime = expires - date
+    elif (modified := _parse_http_date(headers.get("last-modified"))) is not None:
+        lifetime = min((date - modified) * _HEURISTIC_FRACTION, _HEURISTIC_MAX_SECONDS)
+    else:
+        return 0.0
+    try:
+        age = float(headers.get("age", 0))
+    except ValueError:
+        age = 0.0
+    return max(lifetime - age, 0.0)
+
+
+@dataclass
+class CacheStats:
+    """Counters for one `HttpCache` in this process."""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+@dataclass
+class CachedResponse:
+    """Metadata of a cached response; body and markdown are read on demand."""
+
+    key: str
+    url: str
+    final_url: str
+    status_code: int
+    headers: dict[str, str]
+    stored_at: float
+    expires_at: float
+    directory: Path = field(repr=False)
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the entry can be served without contacting the server."""
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Request headers that make a refetch conditional on this entry."""
+        conditional: dict[str, str] = {}
+        if etag := self.headers.get("etag"):
+            conditional["If-None-Match"] = etag
+        if modified := self.headers.get("last-modified"):
+            conditional["If-Modified-Since"] = modified
+        return conditional
+
+    def raw(self) -> bytes:
+        """Return the raw response body."""
+        return (self.directory / f"{self.key}.body").read_bytes()
+
+    def markdown(self) -> str | None:
+        """Return the markdown converted from the body, or None if none was stored."""
+        try:
+            return (self.directory / f"{self.key}.md").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+
+def _serialize(entry: CachedResponse) -> bytes:
+    data = asdict(entry)
+    del data["directory"]
+    return json.dumps(data).encode("utf-8")
+
+
+class HttpCache:
+    """Size-bounded LRU cache of GET responses and their markdown, kept on disk.
+
+    Each entry is three files named after the URL's hash: ``.json`` metadata
+    (written last, so a half-written entry is never seen), ``.body`` and
+    ``.md``. Writes go through temporary files and ``os.replace``, so several
+    CLI processes can share the directory. Recency is the metadata file's mtime.
+    """
+
+    def __init__(self, directory: Path, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the entries (created on first write)
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        """Return the entry for ``url`` if one exists, fresh or not."""
+        key = self._key(url)
+        try:
+            data = json.loads((self.directory / f"{key}.json").read_text(encoding="utf-8"))
+            entry = CachedResponse(directory=self.directory, **data)
+        except (OSError, ValueError, TypeError):
+            return None
+        if not (self.directory / f"{key}.body").exists():
+            return None
+        self._touch(key)
+        return entry
+
+    def store(
+        self,
+        url: str,
+        response: requests.Response,
+        markdown: str | None,
+        *,
+        body: bytes | None = None,
+    ) -> CachedResponse | None:
+        """Store a 200 response and its markdown, unless its headers forbid it.
+
+        Args:
+            url: The requested URL
+            response: The response (its body is not read if ``body`` is given)
+            markdown: The markdown converted from the body, or None if it was not
+                converted in full (it can be added later with `save_markdown`)
+            body: The body, for streamed responses whose content was consumed
+
+        Returns:
+            The new entry, or None if the response was not stored.
+        """
+        headers = {name.lower(): value for name, value in response.headers.items()}
+        if response.status_code != 200 or not is_storable(headers):  # noqa: PLR2004
+            return None
+        now = time.time()
+        entry = CachedResponse(
+            key=self._key(url),
+            url=url,
+            final_url=str(response.url),
+            status_code=response.status_code,
+            headers={name: headers[name] for name in _STORED_HEADERS if name in headers},
+            stored_at=now,
+            expires_at=now + freshness_lifetime(headers, now),
+            directory=self.directory,
+        )
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._write(f"{entry.key}.body", body if body is not None else response.content)
+            if markdown is None:
+                (self.directory / f"{entry.key}.md").unlink(missing_ok=True)
+            else:
+                self._write(f"{entry.key}.md", markdown.encode("utf-8"))
+            self._write(f"{entry.key}.json", _serialize(entry))
+        except OSError:
+            # The cache is an optimization; a read-only or full disk must not fail the fetch
+            return None
+        self._evict()
+        return entry
+
+    def revalidated(self, entry: CachedResponse, response: requests.Response) -> CachedResponse:
+        """Refresh an entry after the server answered 304 Not Modified."""
+        headers = {name.lower(): value for name, value in response.headers.items()}
+        merged = {**entry.headers, **{k: v for k, v in headers.items() if k in _STORED_HEADERS}}
+        now = time.time()
+        entry.headers = merged
+        entry.expires_at = now + freshness_lifetime({**merged, **headers}, now)
+        with contextlib.suppress(OSError):
+            self._write(f"{entry.key}.json", _serialize(entry))
+        return entry
+
+    def save_markdown(self, entry: CachedResponse, markdown: str) -> None:
+        """Add the markdown to an entry stored without it."""
+        with contextlib.suppress(OSError):
+            self._write(f"{entry.key}.md", markdown.encode("utf-8"))
+        self._evict()
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        for path in self._files():
+            path.unlink(missing_ok=True)
+
+    def _write(self, name: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            Path(tmp).replace(self.directory / name)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _touch(self, key: str) -> None:
+        with contextlib.suppress(OSError):
+            os.utime(self.directory / f"{key}.json")
+
+    def _files(self) -> list[Path]:
+        try:
+            return [path for path in self.directory.iterdir() if not path.name.startswith(".")]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in ``max_bytes``."""
+        with self._lock:
+            sizes: dict[str, int] = {}
+            used: dict[str, float] = {}
+            for path in self._files():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                sizes[path.stem] = sizes.get(path.stem, 0) + stat.st_size
+                if path.suffix == ".json":
+                    used[path.stem] = stat.st_mtime
+            total = sum(sizes.values())
+            for key in sorted(sizes, key=lambda k: used.get(k, 0.0)):
+                if total <= self.max_bytes:
+                    break
+                for suffix in (".json", ".body", ".md"):
+                    (self.directory / f"{key}{suffix}").unlink(missing_ok=True)
+                total -= sizes[key]
+
+
+_cache: HttpCache | None = None
+
+
+def get_http_cache() -> HttpCache:
+    """Return the shared cache under ``~/.coda/cache/http``."""
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        _cache = HttpCache(settings.user_deepagents_dir / "cache" / "http")
+    return _cache
+
+
+__all__ = [
+    "CacheStats",
+    "CachedResponse",
+    "HttpCache",
+    "freshness_lifetime",
+    "get_http_cache",
+    "is_storable",
+]
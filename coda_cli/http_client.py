@@ -0,0 +1,227 @@
+"""Shared HTTP transport for the agent's web tools.
+
+`http_request` and `fetch_url` used to open a fresh connection per call. They
+now share one `requests.Session`, so repeated calls to the same host reuse
+pooled keep-alive connections (no new DNS lookup or TCP/TLS handshake).
+Transient failures of idempotent requests are retried with exponential backoff.
+
+The async tool variants use an `httpx.AsyncClient` instead, so parallel tool
+calls wait on the event loop rather than each holding a worker thread. Web
+calls in flight are capped by `web_call_limiter`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+from coda_cli.config import settings
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+USER_AGENT = "Mozilla/5.0 (compatible; CoDA-Code/1.0)"
+
+# Number of hosts with a pool of their own, and keep-alive connections per host
+POOL_HOSTS = 32
+POOL_CONNECTIONS_PER_HOST = 8
+
+# Retries for connection errors and retryable statuses. Only idempotent methods
+# (urllib3's default allowlist: GET, HEAD, PUT, DELETE, OPTIONS, TRACE) are retried
+# after a response; POST/PATCH never are, since the server may have acted on them.
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Web tool calls (requests, fetches and searches) in flight at once, per event loop
+# for the async tools and across threads for the sync ones
+MAX_CONCURRENT_WEB_CALLS = 8
+
+
+class WebCallLimiter:
+    """Context manager capping how many web calls are in flight.
+
+    ``async with`` waits on an `asyncio.Semaphore` belonging to the running
+    event loop, so a waiting call holds no worker thread. ``with`` blocks on a
+    thread semaphore, for the sync tools that run in worker threads anyway.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize the limiter.
+
+        Args:
+            limit: Maximum number of calls in flight (at least 1)
+        """
+        self.limit = max(limit, 1)
+        self._semaphore = threading.BoundedSemaphore(self.limit)
+        self._loop_semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _loop_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._loop_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._loop_semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    def __enter__(self) -> None:
+        """Block until a slot is free."""
+        self._semaphore.acquire()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Release the slot."""
+        self._semaphore.release()
+
+    async def __aenter__(self) -> None:
+        """Wait on the event loop until a slot is free."""
+        await self._loop_semaphore().acquire()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Release the slot."""
+        self._loop_semaphore().release()
+
+
+web_call_limiter = WebCallLimiter(MAX_CONCURRENT_WEB_CALLS)
+
+
+class _Session(requests.Session):
+    """Session whose configured proxy wins over HTTP(S)_PROXY from the environment.
+
+    Plain `requests` lets environment proxies override ``session.proxies``.
+    """
+
+    def __init__(self, proxy: str | None = None) -> None:
+        super().__init__()
+        self._proxy = proxy
+
+    def merge_environment_settings(
+        self,
+        url: str | bytes | None,
+        proxies: dict[str, str] | None,
+        stream: bool | None,  # noqa: FBT001
+        verify: bool | str | None,  # noqa: FBT001
+        cert: str | tuple[str, str] | None,
+    ) -> dict[str, Any]:
+        # Checked first: the base class adds environment proxies to `proxies` in place
+        explicit = bool(proxies)
+        merged = super().merge_environment_settings(url, proxies, stream, verify, cert)
+        if self._proxy and not explicit:
+            merged["proxies"] = {"http": self._proxy, "https": self._proxy}
+        return merged
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=POOL_CONNECTIONS_PER_HOST,
+        max_retries=retry,
+    )
+    session = _Session(settings.http_proxy)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Advertises br/zstd too when urllib3 can decode them (`pip install urllib3[brotli]`)
+    session.headers.update(make_headers(accept_encoding=True))
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session  # noqa: PLW0603
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session and its pooled connections.
+
+    The next `get_session` call builds a new one.
+    """
+    global _session  # noqa: PLW0603
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# An httpx client's pooled connections belong to the event loop that opened them
+_async_client: httpx.AsyncClient | None = None
+_async_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    # Without an explicit proxy, httpx falls back to HTTP(S)_PROXY like requests does
+    return httpx.AsyncClient(
+        proxy=settings.http_proxy,
+        limits=httpx.Limits(
+            max_connections=POOL_HOSTS * POOL_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=POOL_HOSTS,
+        ),
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the pooled async client for the running event loop."""
+    global _async_client, _async_client_loop  # noqa: PLW0603
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = _build_async_client()
+        _async_client_loop = loop
+    return _async_client
+
+
+async def aclose_async_client() -> None:
+    """Close the async client if it belongs to the running event loop."""
+    global _async_client, _async_client_loop  # noqa: PLW0603
+    if _async_client is not None and _async_client_loop is asyncio.get_running_loop():
+        await _async_client.aclose()
+    _async_client = _async_client_loop = None
+
+
+__all__ = [
+    "MAX_CONCURRENT_WEB_CALLS",
+    "USER_AGENT",
+    "WebCallLimiter",
+    "aclose_async_client",
+    "close_session",
+    "get_async_client",
+    "get_session",
+    "web_call_limiter",
+]
@@ -0,0 +1,99 @@
+"""Command output capped at a byte limit for sandbox backends.
+
+A command may print far more than the agent can use, and holding it all in
+the CLI can exhaust memory. Backends keep the head and tail of the output
+up to ``settings.sandbox_max_output_bytes`` and report whether anything was
+dropped. Where the provider streams output, `read_stream` bounds memory
+while reading. Where it only returns complete results, `bounded_command`
+wraps the command so the sandbox itself captures the output and sends back
+just the head and tail, which `unwrap_bounded_output` turns into the same
+form.
+"""
+
+from __future__ import annotations
+
+import shlex
+import uuid
+from typing import TYPE_CHECKING
+
+from coda_cli.output_buffer import HeadTailBuffer, elision_marker
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+def read_stream(chunks: Iterable[str | bytes], max_bytes: int) -> tuple[str, bool]:
+    """Consume a stream of output chunks, keeping at most ``max_bytes``.
+
+    Args:
+        chunks: Output as it arrives, decoded or raw
+        max_bytes: Bytes kept across the head and tail
+
+    Returns:
+        The retained output, with the elided middle marked, and whether
+        anything was dropped.
+    """
+    buffer = HeadTailBuffer(max_bytes)
+    for chunk in chunks:
+        buffer.write(chunk.encode("utf-8", errors="replace") if isinstance(chunk, str) else chunk)
+    return buffer.getvalue(), buffer.truncated
+
+
+def bounded_command(command: str, max_bytes: int) -> tuple[str, str]:
+    """Wrap a command so the sandbox returns only the head and tail of its output.
+
+    The output (stdout and stderr combined) goes to a temporary file in the
+    sandbox. If it fits in ``max_bytes`` it is printed whole; otherwise the
+    head, a marker line carrying the total size, and the tail are printed.
+    The wrapper exits with the command's status.
+
+    Args:
+        command: Shell command to run
+        max_bytes: Bytes returned across the head and tail
+
+    Returns:
+        The wrapped command, and the marker `unwrap_bounded_output` looks for.
+    """
+    marker = f"<<coda-output-elided:{uuid.uuid4().hex}:"
+    head = max_bytes // 2
+    script = (
+        "out=$(mktemp) || exit 125\n"
+        f'bash -c {shlex.quote(command)} >"$out" 2>&1\n'
+        "status=$?\n"
+        'size=$(wc -c < "$out")\n'
+        f'if [ "$size" -gt {max_bytes} ]; then\n'
+        f'  head -c {head} "$out"\n'
+        f"  printf '\\n{marker}%s>>\\n' \"$size\"\n"
+        f'  tail -c {max_bytes - head} "$out"\n'
+        "else\n"
+        '  cat "$out"\n'
+        "fi\n"
+        'rm -f "$out"\n'
+        "exit $status\n"
+    )
+    return f"bash -c {shlex.quote(script)}", marker
+
+
+def unwrap_bounded_output(output: str, marker: str, max_bytes: int) -> tuple[str, bool]:
+    """Turn the output of a `bounded_command` into the retained output and truncation flag.
+
+    Args:
+        output: What the wrapped command printed
+        marker: Marker returned by `bounded_command`
+        max_bytes: Limit the command was wrapped with
+
+    Returns:
+        The output, with the elided middle marked as `read_stream` does, and
+        whether anything was dropped.
+    """
+    head, sep, rest = output.partition(f"\n{marker}")
+    if not sep:
+        return output, False
+    size, sep, tail = rest.partition(">>\n")
+    if not sep or not size.strip().isdigit():
+        return output, False
+    total = int(size)
+    return f"{head}{elision_marker(total - max_bytes, total)}{tail}", True
+
+
+__all__ = ["bounded_command", "read_stream", "unwrap_bounded_output"]
@@ -11,6 +11,10 @@ from deepagents.backends.protocol import (
 )
 from deepagents.backends.sandbox import BaseSandbox
 
+from coda_cli.config import settings
+from coda_cli.integrations.bounded_output import bounded_command, unwrap_bounded_output
+from coda_cli.integrations.transfer import hash_remote_files
+
 if TYPE_CHECKING:
     from daytona import Sandbox
 
@@ -22,14 +26,20 @@ class DaytonaBackend(BaseSandbox):
     and only implements the execute() method using Daytona's API.
     """
 
-    def __init__(self, sandbox: Sandbox) -> None:
+    # Capture oversized output to a file in the sandbox (see BaseSandbox)
+    enable_capture_offload = True
+
+    def __init__(self, sandbox: Sandbox, *, max_output_bytes: int | None = None) -> None:
         """Initialize the DaytonaBackend with a Daytona sandbox client.
 
         Args:
             sandbox: Daytona sandbox instance
+            max_output_bytes: Bytes of command output returned (default: the
+                ``sandbox_max_output_bytes`` setting)
         """
         self._sandbox = sandbox
         self._timeout: int = 30 * 60  # 30 mins
+        self.max_output_bytes = max_output_bytes or settings.sandbox_max_output_bytes
 
     @property
     def id(self) -> str:
@@ -39,21 +49,29 @@ class DaytonaBackend(BaseSandbox):
     def execute(
         self,
         command: str,
+        *,
+        timeout: int | None = None,
     ) -> ExecuteResponse:
         """Execute a command in the sandbox and return ExecuteResponse.
 
+        Long output comes back as its head and tail only (see `bounded_command`).
+
         Args:
             command: Full shell command string to execute.
+            timeout: Maximum execution time in seconds (default: 30 minutes).
 
         Returns:
             ExecuteResponse with combined output, exit code, optional signal, and truncation flag.
         """
-        result = self._sandbox.process.exec(command, timeout=self._timeout)
+        wrapped, marker = bounded_command(command, self.max_output_bytes)
+        result = self._sandbox.process.exec(wrapped, timeout=timeout or self._timeout)
+        # Daytona combines stdout/stderr
+        output, truncated = unwrap_bounded_output(result.result, marker, self.max_output_bytes)
 
         return ExecuteResponse(
-            output=result.result,  # Daytona combines stdout/stderr
+            output=output,
             exit_code=result.exit_code,
-            truncated=False,
+            truncated=truncated,
         )
 
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
@@ -90,6 +108,17 @@ class DaytonaBackend(BaseSandbox):
             for resp in daytona_responses
         ]
 
+    def hash_files(self, paths: list[str]) -> dict[str, str | None]:
+        """Return sha256 digests of files in the Daytona sandbox.
+
+        Args:
+            paths: List of file paths to hash.
+
+        Returns:
+            Digest by path, or None where the file is missing or unreadable.
+        """
+        return hash_remote_files(self, paths)
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the Daytona sandbox.
 
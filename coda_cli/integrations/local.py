@@ -0,0 +1,191 @@
+"""Local subprocess sandbox backend implementation.
+
+A stand-in for the remote providers: commands run in ``bash`` on this machine
+with a private directory as their working directory. It gives no isolation
+beyond that directory, so it is meant for tests and offline development of
+the sandbox code paths, not for running untrusted code.
+
+Every call can be delayed by a fixed latency (``CODA_LOCAL_SANDBOX_LATENCY_MS``
+for sandboxes the CLI creates) to mimic the round trip to a remote provider,
+and `LocalSubprocessSandbox.round_trips` counts calls, so tests and
+benchmarks can measure how chatty an operation is.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+from deepagents.backends.protocol import (
+    ExecuteResponse,
+    FileDownloadResponse,
+    FileUploadResponse,
+)
+from deepagents.backends.sandbox import BaseSandbox
+
+from coda_cli.config import settings
+from coda_cli.integrations.bounded_output import read_stream
+from coda_cli.integrations.transfer import file_error, hash_remote_files
+
+# Exit code reported for commands killed by the timeout (as coreutils `timeout` does)
+_TIMEOUT_EXIT_CODE = 124
+
+_READ_CHUNK_BYTES = 64 * 1024
+
+# Environment variable holding the simulated round-trip latency, in milliseconds
+LATENCY_ENV_VAR = "CODA_LOCAL_SANDBOX_LATENCY_MS"
+
+# Prefix of the temporary directories holding local sandboxes
+SANDBOX_DIR_PREFIX = "coda-sandbox-"
+
+
+def default_latency() -> float:
+    """Return the simulated latency in seconds from the environment (0 if unset)."""
+    try:
+        return max(float(os.environ.get(LATENCY_ENV_VAR, "0")), 0.0) / 1000
+    except ValueError:
+        return 0.0
+
+
+class LocalSubprocessSandbox(BaseSandbox):
+    """Backend running commands as local subprocesses in a workspace directory.
+
+    Relative paths in commands resolve against the workspace; file transfers
+    take paths as given, like the remote backends do.
+    """
+
+    enable_capture_offload = True
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        *,
+        latency: float = 0.0,
+        max_output_bytes: int | None = None,
+    ) -> None:
+        """Initialize the sandbox.
+
+        Args:
+            root: Workspace directory (a new temporary directory if omitted)
+            latency: Seconds to wait before each call, simulating a remote round trip
+            max_output_bytes: Bytes of command output kept (default: the
+                ``sandbox_max_output_bytes`` setting)
+        """
+        if root is None:
+            root = Path(tempfile.mkdtemp(prefix=SANDBOX_DIR_PREFIX))
+        root.mkdir(parents=True, exist_ok=True)
+        self.root = root
+        self.latency = latency
+        self.round_trips = 0
+        self.max_output_bytes = max_output_bytes or settings.sandbox_max_output_bytes
+        self._timeout = 30 * 60
+
+    def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    @property
+    def id(self) -> str:
+        """Unique identifier for the sandbox backend."""
+        return self.root.name
+
+    def execute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:
+        """Execute a command in the workspace and return ExecuteResponse.
+
+        Args:
+            command: Full shell command string to execute.
+            timeout: Maximum time in seconds (default: 30 minutes).
+
+        Returns:
+            ExecuteResponse with combined output, exit code, and truncation flag.
+        """
+        self._round_trip()
+        process = subprocess.Popen(  # noqa: S603
+            ["bash", "-c", command],  # noqa: S607
+            cwd=self.root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        chunks = iter(partial(process.stdout.read1, _READ_CHUNK_BYTES), b"")
+        result: list[tuple[str, bool]] = []
+        reader = threading.Thread(
+            target=lambda: result.append(read_stream(chunks, self.max_output_bytes)), daemon=True
+        )
+        reader.start()
+        try:
+            exit_code = process.wait(timeout=timeout or self._timeout)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            # Kill the whole group so background children release the pipe too
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+            exit_code, timed_out = _TIMEOUT_EXIT_CODE, True
+        reader.join()
+        process.stdout.close()
+
+        output, truncated = result[0]
+        if timed_out:
+            output += f"\nCommand timed out after {timeout or self._timeout} seconds"
+        return ExecuteResponse(output=output, exit_code=exit_code, truncated=truncated)
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Read multiple files, reporting per-file errors.
+
+        Args:
+            paths: List of file paths to download.
+
+        Returns:
+            List of FileDownloadResponse objects in input order.
+        """
+        self._round_trip()
+        responses = []
+        for path in paths:
+            try:
+                content = (self.root / path).read_bytes()
+            except OSError as exc:
+                responses.append(FileDownloadResponse(path=path, error=file_error(exc)))
+            else:
+                responses.append(FileDownloadResponse(path=path, content=content))
+        return responses
+
+    def hash_files(self, paths: list[str]) -> dict[str, str | None]:
+        """Hash files with one ``sha256sum`` command, as the remote backends do.
+
+        Args:
+            paths: List of file paths to hash.
+
+        Returns:
+            Digest by path, or None where the file could not be hashed.
+        """
+        return hash_remote_files(self, paths)
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Write multiple files, creating parent directories and reporting per-file errors.
+
+        Args:
+            files: List of (path, content) tuples to upload.
+
+        Returns:
+            List of FileUploadResponse objects in input order.
+        """
+        self._round_trip()
+        responses = []
+        for path, content in files:
+            target = self.root / path
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(content)
+            except OSError as exc:
+                responses.append(FileUploadResponse(path=path, error=file_error(exc)))
+            else:
+                responses.append(FileUploadResponse(path=path))
+        return responses
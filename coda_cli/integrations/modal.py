@@ -11,6 +11,15 @@ from deepagents.backends.protocol import (
 )
 from deepagents.backends.sandbox import BaseSandbox
 
+from coda_cli.config import settings
+from coda_cli.integrations.bounded_output import read_stream
+from coda_cli.integrations.transfer import (
+    TransferStats,
+    download_batch,
+    hash_remote_files,
+    upload_batch,
+)
+
 if TYPE_CHECKING:
     import modal
 
@@ -22,14 +31,22 @@ class ModalBackend(BaseSandbox):
     and only implements the execute() method using Modal's API.
     """
 
-    def __init__(self, sandbox: modal.Sandbox) -> None:
+    # Large execute output stays in a sandbox file; only a head/tail preview is
+    # returned and the agent pages through the rest with read_file
+    enable_capture_offload = True
+
+    def __init__(self, sandbox: modal.Sandbox, *, max_output_bytes: int | None = None) -> None:
         """Initialize the ModalBackend with a Modal sandbox instance.
 
         Args:
             sandbox: Active Modal Sandbox instance
+            max_output_bytes: Bytes of command output kept (default: the
+                ``sandbox_max_output_bytes`` setting)
         """
         self._sandbox = sandbox
         self._timeout = 30 * 60
+        self.max_output_bytes = max_output_bytes or settings.sandbox_max_output_bytes
+        self.last_transfer: TransferStats | None = None
 
     @property
     def id(self) -> str:
@@ -39,41 +56,40 @@ class ModalBackend(BaseSandbox):
     def execute(
         self,
         command: str,
+        *,
+        timeout: int | None = None,
     ) -> ExecuteResponse:
         """Execute a command in the sandbox and return ExecuteResponse.
 
+        Output is streamed as the process runs and only its head and tail
+        are kept, so memory stays bounded however much the command prints.
+
         Args:
             command: Full shell command string to execute.
+            timeout: Maximum execution time in seconds (default: 30 minutes).
 
         Returns:
             ExecuteResponse with combined output, exit code, and truncation flag.
         """
-        # Execute command using Modal's exec API
-        process = self._sandbox.exec("bash", "-c", command, timeout=self._timeout)
-
-        # Wait for process to complete
+        # Send stderr down stdout so one stream carries both, in order
+        process = self._sandbox.exec(
+            "bash", "-c", f"exec 2>&1\n{command}", timeout=timeout or self._timeout
+        )
+        output, truncated = read_stream(process.stdout, self.max_output_bytes)
         process.wait()
 
-        # Read stdout and stderr
-        stdout = process.stdout.read()
-        stderr = process.stderr.read()
-
-        # Combine stdout and stderr (matching Runloop's approach)
-        output = stdout or ""
-        if stderr:
-            output += "\n" + stderr if output else stderr
-
         return ExecuteResponse(
             output=output,
             exit_code=process.returncode,
-            truncated=False,  # Modal doesn't provide truncation info
+            truncated=truncated,
         )
 
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download multiple files from the Modal sandbox.
 
-        Supports partial success - individual downloads may fail without
-        affecting others.
+        Many small files are fetched as one archive; otherwise files are read
+        concurrently. Supports partial success - individual downloads may
+        fail without affecting others. Stats end up in ``last_transfer``.
 
         Args:
             paths: List of file paths to download.
@@ -81,27 +97,28 @@ class ModalBackend(BaseSandbox):
         Returns:
             List of FileDownloadResponse objects, one per input path.
             Response order matches input order.
-
-        TODO: Implement proper error handling with standardized FileOperationError codes.
-        Need to determine what exceptions Modal's sandbox.open() actually raises.
-        Currently only implements happy path.
         """
-        # This implementation relies on the Modal sandbox file API.
-        # https://modal.com/doc/guide/sandbox-files
-        # The API is currently in alpha and is not recommended for production use.
-        # We're OK using it here as it's targeting the CLI application.
-        responses = []
-        for path in paths:
-            with self._sandbox.open(path, "rb") as f:
-                content = f.read()
-            responses.append(FileDownloadResponse(path=path, content=content, error=None))
+        responses, self.last_transfer = download_batch(self, paths, self._read_file)
         return responses
 
+    def hash_files(self, paths: list[str]) -> dict[str, str | None]:
+        """Hash files in the Modal sandbox with one command instead of reading them.
+
+        Args:
+            paths: List of file paths to hash.
+
+        Returns:
+            sha256 hex digest by path; None for files that could not be hashed.
+        """
+        return hash_remote_files(self, paths)
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the Modal sandbox.
 
-        Supports partial success - individual uploads may fail without
-        affecting others.
+        Many small files are sent as one archive unpacked in the sandbox;
+        otherwise files are written concurrently. Supports partial success -
+        individual uploads may fail without affecting others. Stats end up in
+        ``last_transfer``.
 
         Args:
             files: List of (path, content) tuples to upload.
@@ -109,18 +126,18 @@ class ModalBackend(BaseSandbox):
         Returns:
             List of FileUploadResponse objects, one per input file.
             Response order matches input order.
-
-        TODO: Implement proper error handling with standardized FileOperationError codes.
-        Need to determine what exceptions Modal's sandbox.open() actually raises.
-        Currently only implements happy path.
         """
-        # This implementation relies on the Modal sandbox file API.
-        # https://modal.com/doc/guide/sandbox-files
-        # The API is currently in alpha and is not recommended for production use.
-        # We're OK using it here as it's targeting the CLI application.
-        responses = []
-        for path, content in files:
-            with self._sandbox.open(path, "wb") as f:
-                f.write(content)
-            responses.append(FileUploadResponse(path=path, error=None))
+        responses, self.last_transfer = upload_batch(self, files, self._write_file)
         return responses
+
+    # These rely on the Modal sandbox file API.
+    # https://modal.com/doc/guide/sandbox-files
+    # The API is currently in alpha and is not recommended for production use.
+    # We're OK using it here as it's targeting the CLI application.
+    def _read_file(self, path: str) -> bytes:
+        with self._sandbox.open(path, "rb") as f:
+            return f.read()
+
+    def _write_file(self, path: str, content: bytes) -> None:
+        with self._sandbox.open(path, "wb") as f:
+            f.write(content)
@@ -15,6 +15,15 @@ from deepagents.backends.protocol import ExecuteResponse, FileDownloadResponse,
 from deepagents.backends.sandbox import BaseSandbox
 from runloop_api_client import Runloop
 
+from coda_cli.config import settings
+from coda_cli.integrations.bounded_output import bounded_command, unwrap_bounded_output
+from coda_cli.integrations.transfer import (
+    TransferStats,
+    download_batch,
+    hash_remote_files,
+    upload_batch,
+)
+
 
 class RunloopBackend(BaseSandbox):
     """Backend that operates on files in a Runloop devbox.
@@ -23,11 +32,16 @@ class RunloopBackend(BaseSandbox):
     and manipulate files within a remote devbox environment.
     """
 
+    # Devbox images ship the POSIX shell and coreutils the capture wrapper needs
+    enable_capture_offload = True
+
     def __init__(
         self,
         devbox_id: str,
         client: Runloop | None = None,
         api_key: str | None = None,
+        *,
+        max_output_bytes: int | None = None,
     ) -> None:
         """Initialize Runloop protocol.
 
@@ -36,6 +50,8 @@ class RunloopBackend(BaseSandbox):
             client: Optional existing Runloop client instance
             api_key: Optional API key for creating a new client
                          (defaults to RUNLOOP_API_KEY environment variable)
+            max_output_bytes: Bytes of command output returned (default: the
+                         ``sandbox_max_output_bytes`` setting)
         """
         if client and api_key:
             msg = "Provide either client or bearer_token, not both."
@@ -51,6 +67,8 @@ class RunloopBackend(BaseSandbox):
         self._client = client
         self._devbox_id = devbox_id
         self._timeout = 30 * 60
+        self.max_output_bytes = max_output_bytes or settings.sandbox_max_output_bytes
+        self.last_transfer: TransferStats | None = None
 
     @property
     def id(self) -> str:
@@ -60,9 +78,14 @@ class RunloopBackend(BaseSandbox):
     def execute(
         self,
         command: str,
+        *,
+        timeout: int | None = None,
     ) -> ExecuteResponse:
         """Execute a command in the devbox and return ExecuteResponse.
 
+        The API returns output only once the command completes, so the
+        command is wrapped to send back just the head and tail of long output.
+
         Args:
             command: Full shell command string to execute.
             timeout: Maximum execution time in seconds (default: 30 minutes).
@@ -70,55 +93,58 @@ class RunloopBackend(BaseSandbox):
         Returns:
             ExecuteResponse with combined output, exit code, optional signal, and truncation flag.
         """
+        wrapped, marker = bounded_command(command, self.max_output_bytes)
         result = self._client.devboxes.execute_and_await_completion(
             devbox_id=self._devbox_id,
-            command=command,
-            timeout=self._timeout,
+            command=wrapped,
+            timeout=timeout or self._timeout,
         )
-        # Combine stdout and stderr
+        # Combine stdout and stderr (stderr only holds wrapper failures)
         output = result.stdout or ""
         if result.stderr:
             output += "\n" + result.stderr if output else result.stderr
+        output, truncated = unwrap_bounded_output(output, marker, self.max_output_bytes)
 
         return ExecuteResponse(
             output=output,
             exit_code=result.exit_status,
-            truncated=False,  # Runloop doesn't provide truncation info
+            truncated=truncated,
         )
 
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download multiple files from the Runloop devbox.
 
-        Downloads files individually using the Runloop API. Returns a list of
-        FileDownloadResponse objects preserving order and reporting per-file
-        errors rather than raising exceptions.
-
-        TODO: Implement proper error handling with standardized FileOperationError codes.
-        Currently only implements happy path.
+        Many small files are fetched as one archive; otherwise files are
+        downloaded concurrently. Returns a list of FileDownloadResponse
+        objects preserving order and reporting per-file errors rather than
+        raising exceptions. Stats end up in ``last_transfer``.
         """
-        responses: list[FileDownloadResponse] = []
-        for path in paths:
-            # devboxes.download_file returns a BinaryAPIResponse which exposes .read()
-            resp = self._client.devboxes.download_file(self._devbox_id, path=path)
-            content = resp.read()
-            responses.append(FileDownloadResponse(path=path, content=content, error=None))
-
+        responses, self.last_transfer = download_batch(self, paths, self._download_file)
         return responses
 
+    def hash_files(self, paths: list[str]) -> dict[str, str | None]:
+        """Return sha256 digests of files in the devbox.
+
+        One execute call covers all the paths, so callers can check that a
+        cached copy is current without downloading the file.
+        """
+        return hash_remote_files(self, paths)
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the Runloop devbox.
 
-        Uploads files individually using the Runloop API. Returns a list of
+        Many small files are sent as one archive unpacked in the devbox;
+        otherwise files are uploaded concurrently. Returns a list of
         FileUploadResponse objects preserving order and reporting per-file
-        errors rather than raising exceptions.
-
-        TODO: Implement proper error handling with standardized FileOperationError codes.
-        Currently only implements happy path.
+        errors rather than raising exceptions. Stats end up in ``last_transfer``.
         """
-        responses: list[FileUploadResponse] = []
-        for path, content in files:
-            # The Runloop client expects 'file' as bytes or a file-like object
-            self._client.devboxes.upload_file(self._devbox_id, path=path, file=content)
-            responses.append(FileUploadResponse(path=path, error=None))
-
+        responses, self.last_transfer = upload_batch(self, files, self._upload_file)
         return responses
+
+    def _download_file(self, path: str) -> bytes:
+        # devboxes.download_file returns a BinaryAPIResponse which exposes .read()
+        return self._client.devboxes.download_file(self._devbox_id, path=path).read()
+
+    def _upload_file(self, path: str, content: bytes) -> None:
+        # The Runloop client expects 'file' as bytes or a file-like object
+        self._client.devboxes.upload_file(self._devbox_id, path=path, file=content)
@@ -1,51 +1,334 @@
 """Sandbox lifecycle management with context managers."""
 
+from __future__ import annotations
+
+import asyncio
+import contextlib
 import os
+import random
 import shlex
+import shutil
 import string
+import tempfile
 import time
-from collections.abc import Generator
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-
-from deepagents.backends.protocol import SandboxBackendProtocol
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from coda_cli.config import console
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Callable, Generator, Iterator
 
-def _run_sandbox_setup(backend: SandboxBackendProtocol, setup_script_path: str) -> None:
-    """Run users setup script in sandbox with env var expansion.
+    import modal
+    from daytona import CreateSandboxFromSnapshotParams, Daytona, Sandbox
+    from deepagents.backends.protocol import SandboxBackendProtocol
+    from runloop_api_client import Runloop
+    from runloop_api_client.types import DevboxView
+
+    from coda_cli.integrations.local import LocalSubprocessSandbox
+    from coda_cli.integrations.sandbox_pool import SandboxLease, SandboxPool
+
+_T = TypeVar("_T")
+
+
+def _read_setup_script(setup_script_path: str) -> str:
+    """Read a setup script and expand ${VAR} references from the local environment.
 
     Args:
-        backend: Sandbox backend instance
         setup_script_path: Path to setup script file
+
+    Returns:
+        The expanded script
     """
     script_path = Path(setup_script_path)
     if not script_path.exists():
         msg = f"Setup script not found: {setup_script_path}"
         raise FileNotFoundError(msg)
+    template = string.Template(script_path.read_text())
+    return template.safe_substitute(os.environ)
 
-    console.print(f"[dim]Running setup script: {setup_script_path}...[/dim]")
 
-    # Read script content
-    script_content = script_path.read_text()
+def _run_setup_script(backend: SandboxBackendProtocol, script: str) -> None:
+    """Run an expanded setup script in the sandbox, raising RuntimeError if it fails."""
+    result = backend.execute(f"bash -c {shlex.quote(script)}")
+    if result.exit_code != 0:
+        msg = f"Setup script failed (exit {result.exit_code}):\n{result.output}"
+        raise RuntimeError(msg)
 
-    # Expand ${VAR} syntax using local environment
-    template = string.Template(script_content)
-    expanded_script = template.safe_substitute(os.environ)
 
-    # Execute in sandbox with 5-minute timeout
-    result = backend.execute(f"bash -c {shlex.quote(expanded_script)}")
+def _run_sandbox_setup(backend: SandboxBackendProtocol, setup_script_path: str) -> None:
+    """Run users setup script in sandbox with env var expansion.
 
-    if result.exit_code != 0:
-        console.print(f"[red]❌ Setup script failed (exit {result.exit_code}):[/red]")
-        console.print(f"[dim]{result.output}[/dim]")
+    Args:
+        backend: Sandbox backend instance
+        setup_script_path: Path to setup script file
+    """
+    script = _read_setup_script(setup_script_path)
+
+    console.print(f"[dim]Running setup script: {setup_script_path}...[/dim]")
+
+    try:
+        _run_setup_script(backend, script)
+    except RuntimeError as e:
+        console.print(f"[red]❌ {e}[/red]")
         msg = "Setup failed - aborting"
-        raise RuntimeError(msg)
+        raise RuntimeError(msg) from e
 
     console.print("[green]✓ Setup complete[/green]")
 
 
+@dataclass(frozen=True)
+class ReadinessPolicy:
+    """How long and how often to check whether a new sandbox is ready.
+
+    Checks back off exponentially, with jitter so that sandboxes started
+    together do not poll in lockstep.
+
+    Attributes:
+        timeout: Seconds from the creation request until startup is abandoned
+        initial_delay: Seconds before the second check
+        max_delay: Longest wait between checks
+        multiplier: Factor by which the wait grows after each check
+        jitter: Fraction by which each wait is randomly shortened (0 to 1)
+    """
+
+    timeout: float = 180.0
+    initial_delay: float = 0.5
+    max_delay: float = 8.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+
+    def delays(self) -> Iterator[float]:
+        """Yield the waits between checks, indefinitely."""
+        delay = self.initial_delay
+        while True:
+            yield delay * (1 - self.jitter * random.random())  # noqa: S311
+            delay = min(delay * self.multiplier, self.max_delay)
+
+
+DEFAULT_READINESS = ReadinessPolicy()
+
+
+def _startup_timeout(what: str, policy: ReadinessPolicy) -> RuntimeError:
+    return RuntimeError(f"{what} failed to start within {policy.timeout:g} seconds")
+
+
+def _destroy_quietly(destroy: Callable[[_T], object], sandbox: _T) -> None:
+    with contextlib.suppress(Exception):
+        destroy(sandbox)
+
+
+def _wait_until_ready(
+    sandbox: _T,
+    is_ready: Callable[[_T], bool],
+    *,
+    deadline: float,
+    policy: ReadinessPolicy,
+    what: str,
+) -> None:
+    """Check ``is_ready`` with backoff until it passes or ``deadline`` (monotonic) passes."""
+    for delay in policy.delays():
+        if is_ready(sandbox):
+            return
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise _startup_timeout(what, policy)
+        time.sleep(min(delay, remaining))
+
+
+async def _await_ready(
+    sandbox: _T,
+    is_ready: Callable[[_T], bool],
+    *,
+    deadline: float,
+    policy: ReadinessPolicy,
+    what: str,
+) -> None:
+    """Async variant of `_wait_until_ready`, with the deadline in event loop time."""
+    loop = asyncio.get_running_loop()
+    for delay in policy.delays():
+        if await asyncio.to_thread(is_ready, sandbox):
+            return
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise _startup_timeout(what, policy)
+        await asyncio.sleep(min(delay, remaining))
+
+
+@dataclass(frozen=True)
+class _Startup(Generic[_T]):
+    """How to bring up one kind of sandbox.
+
+    Attributes:
+        what: Name used in error messages
+        create: Requests a new sandbox
+        is_ready: False while the sandbox is starting; raises if it never will be
+        destroy: Tears the sandbox down
+    """
+
+    what: str
+    create: Callable[[], _T]
+    is_ready: Callable[[_T], bool]
+    destroy: Callable[[_T], object]
+
+
+def _start(startup: _Startup[_T], *, policy: ReadinessPolicy) -> _T:
+    """Create a sandbox and wait until it is ready, tearing it down on failure."""
+    deadline = time.monotonic() + policy.timeout
+    sandbox = startup.create()
+    try:
+        _wait_until_ready(
+            sandbox, startup.is_ready, deadline=deadline, policy=policy, what=startup.what
+        )
+    except BaseException:
+        _destroy_quietly(startup.destroy, sandbox)
+        raise
+    return sandbox
+
+
+async def _to_thread_or_undo(call: Callable[[], _T], undo: Callable[[_T], object]) -> _T:
+    """Run ``call`` in a worker thread, undoing its result if the caller is cancelled.
+
+    The thread cannot be interrupted, so a cancelled caller still waits for
+    ``call`` to return and then passes the result to ``undo`` (for example, to
+    tear down a sandbox nobody will use) before the cancellation propagates.
+    """
+    running = asyncio.ensure_future(asyncio.to_thread(call))
+    try:
+        return await asyncio.shield(running)
+    except asyncio.CancelledError:
+        with contextlib.suppress(Exception):
+            await asyncio.to_thread(_destroy_quietly, undo, await running)
+        raise
+
+
+async def _astart(startup: _Startup[_T], *, policy: ReadinessPolicy) -> _T:
+    """Async variant of `_start`; the blocking SDK calls run in worker threads.
+
+    Cancelling it, at any point, tears the sandbox down.
+    """
+    deadline = asyncio.get_running_loop().time() + policy.timeout
+    sandbox = await _to_thread_or_undo(startup.create, startup.destroy)
+    try:
+        await _await_ready(
+            sandbox, startup.is_ready, deadline=deadline, policy=policy, what=startup.what
+        )
+    except BaseException:
+        await asyncio.shield(asyncio.to_thread(_destroy_quietly, startup.destroy, sandbox))
+        raise
+    return sandbox
+
+
+def _modal_ready(sandbox: modal.Sandbox) -> bool:
+    if sandbox.poll() is not None:  # Sandbox terminated unexpectedly
+        msg = "Modal sandbox terminated unexpectedly during startup"
+        raise RuntimeError(msg)
+    # Check if sandbox is ready by attempting a simple command
+    try:
+        process = sandbox.exec("echo", "ready", timeout=5)
+        process.wait()
+    except Exception:
+        return False
+    return process.returncode == 0
+
+
+def _modal_startup(app: modal.App, **options: Any) -> _Startup[modal.Sandbox]:
+    """Startup of a Modal sandbox; ``options`` go to ``modal.Sandbox.create``."""
+    import modal
+
+    return _Startup(
+        what="Modal sandbox",
+        create=partial(modal.Sandbox.create, app=app, workdir="/workspace", **options),
+        is_ready=_modal_ready,
+        destroy=lambda sandbox: sandbox.terminate(),
+    )
+
+
+def _runloop_startup(client: Runloop, **options: Any) -> _Startup[DevboxView]:
+    """Startup of a Runloop devbox; ``options`` go to ``client.devboxes.create``."""
+    return _Startup(
+        what="Devbox",
+        create=partial(client.devboxes.create, **options),
+        is_ready=lambda devbox: client.devboxes.retrieve(id=devbox.id).status == "running",
+        destroy=lambda devbox: client.devboxes.shutdown(id=devbox.id),
+    )
+
+
+def _daytona_ready(sandbox: Sandbox) -> bool:
+    # Check if sandbox is ready by attempting a simple command
+    try:
+        result = sandbox.process.exec("echo ready", timeout=5)
+    except Exception:
+        return False
+    return result.exit_code == 0
+
+
+def _daytona_startup(
+    daytona: Daytona, params: CreateSandboxFromSnapshotParams | None = None
+) -> _Startup[Sandbox]:
+    """Startup of a Daytona sandbox, optionally with creation parameters."""
+    return _Startup(
+        what="Daytona sandbox",
+        create=partial(daytona.create, params) if params is not None else daytona.create,
+        is_ready=_daytona_ready,
+        destroy=lambda sandbox: sandbox.delete(),
+    )
+
+
+def _start_modal_sandbox(
+    app: modal.App, *, policy: ReadinessPolicy = DEFAULT_READINESS, **options: Any
+) -> modal.Sandbox:
+    """Create a Modal sandbox and wait until it runs commands.
+
+    Args:
+        app: App the sandbox belongs to
+        policy: Readiness checks and deadline
+        **options: Extra arguments for ``modal.Sandbox.create``
+
+    Returns:
+        The running sandbox
+    """
+    return _start(_modal_startup(app, **options), policy=policy)
+
+
+def _start_runloop_devbox(
+    client: Runloop, *, policy: ReadinessPolicy = DEFAULT_READINESS, **options: Any
+) -> DevboxView:
+    """Create a Runloop devbox and wait until it is running.
+
+    Args:
+        client: Runloop API client
+        policy: Readiness checks and deadline
+        **options: Extra arguments for ``client.devboxes.create``
+
+    Returns:
+        The devbox as returned on creation
+    """
+    return _start(_runloop_startup(client, **options), policy=policy)
+
+
+def _start_daytona_sandbox(
+    daytona: Daytona,
+    params: CreateSandboxFromSnapshotParams | None = None,
+    *,
+    policy: ReadinessPolicy = DEFAULT_READINESS,
+) -> Sandbox:
+    """Create a Daytona sandbox and wait until it runs commands.
+
+    Args:
+        daytona: Daytona API client
+        params: Optional creation parameters for ``daytona.create``
+        policy: Readiness checks and deadline
+
+    Returns:
+        The running sandbox
+    """
+    return _start(_daytona_startup(daytona, params), policy=policy)
+
+
 @contextmanager
 def create_modal_sandbox(
     *, sandbox_id: str | None = None, setup_script_path: str | None = None
@@ -79,29 +362,9 @@ def create_modal_sandbox(
             sandbox = modal.Sandbox.from_id(sandbox_id=sandbox_id, app=app)
             should_cleanup = False
         else:
-            sandbox = modal.Sandbox.create(app=app, workdir="/workspace")
+            sandbox = _start_modal_sandbox(app)
             should_cleanup = True
 
-            # Poll until running (Modal requires this)
-            for _ in range(90):  # 180s timeout (90 * 2s)
-                if sandbox.poll() is not None:  # Sandbox terminated unexpectedly
-                    msg = "Modal sandbox terminated unexpectedly during startup"
-                    raise RuntimeError(msg)
-                # Check if sandbox is ready by attempting a simple command
-                try:
-                    process = sandbox.exec("echo", "ready", timeout=5)
-                    process.wait()
-                    if process.returncode == 0:
-                        break
-                except Exception:
-                    pass
-                time.sleep(2)
-            else:
-                # Timeout - cleanup and fail
-                sandbox.terminate()
-                msg = "Modal sandbox failed to start within 180 seconds"
-                raise RuntimeError(msg)
-
         backend = ModalBackend(sandbox)
         console.print(f"[green]✓ Modal sandbox ready: {backend.id}[/green]")
 
@@ -157,22 +420,10 @@ def create_runloop_sandbox(
         devbox = client.devboxes.retrieve(id=sandbox_id)
         should_cleanup = False
     else:
-        devbox = client.devboxes.create()
+        devbox = _start_runloop_devbox(client)
         sandbox_id = devbox.id
         should_cleanup = True
 
-        # Poll until running (Runloop requires this)
-        for _ in range(90):  # 180s timeout (90 * 2s)
-            status = client.devboxes.retrieve(id=devbox.id)
-            if status.status == "running":
-                break
-            time.sleep(2)
-        else:
-            # Timeout - cleanup and fail
-            client.devboxes.shutdown(id=devbox.id)
-            msg = "Devbox failed to start within 180 seconds"
-            raise RuntimeError(msg)
-
     console.print(f"[green]✓ Runloop devbox ready: {sandbox_id}[/green]")
 
     backend = RunloopBackend(devbox_id=devbox.id, client=client)
@@ -196,7 +447,7 @@ def create_runloop_sandbox(
 def create_daytona_sandbox(
     *, sandbox_id: str | None = None, setup_script_path: str | None = None
 ) -> Generator[SandboxBackendProtocol, None, None]:
-    """Create Daytona sandbox.
+    """Create or connect to Daytona sandbox.
 
     Args:
         sandbox_id: Optional existing sandbox ID to reuse
@@ -204,10 +455,6 @@ def create_daytona_sandbox(
 
     Yields:
         (DaytonaBackend, sandbox_id)
-
-    Note:
-        Connecting to existing Daytona sandbox by ID may not be supported yet.
-        If sandbox_id is provided, this will raise NotImplementedError.
     """
     from daytona import Daytona, DaytonaConfig
 
@@ -218,36 +465,16 @@ def create_daytona_sandbox(
         msg = "DAYTONA_API_KEY environment variable not set"
         raise ValueError(msg)
 
-    if sandbox_id:
-        msg = (
-            "Connecting to existing Daytona sandbox by ID not yet supported. "
-            "Create a new sandbox by omitting --sandbox-id."
-        )
-        raise NotImplementedError(msg)
-
     console.print("[yellow]Starting Daytona sandbox...[/yellow]")
 
     daytona = Daytona(DaytonaConfig(api_key=api_key))
-    sandbox = daytona.create()
-    sandbox_id = sandbox.id
-
-    # Poll until running (Daytona requires this)
-    for _ in range(90):  # 180s timeout (90 * 2s)
-        # Check if sandbox is ready by attempting a simple command
-        try:
-            result = sandbox.process.exec("echo ready", timeout=5)
-            if result.exit_code == 0:
-                break
-        except Exception:
-            pass
-        time.sleep(2)
+    if sandbox_id:
+        sandbox = daytona.get(sandbox_id)
+        should_cleanup = False
     else:
-        try:
-            # Clean up if possible
-            sandbox.delete()
-        finally:
-            msg = "Daytona sandbox failed to start within 180 seconds"
-            raise RuntimeError(msg)
+        sandbox = _start_daytona_sandbox(daytona)
+        sandbox_id = sandbox.id
+        should_cleanup = True
 
     backend = DaytonaBackend(sandbox)
     console.print(f"[green]✓ Daytona sandbox ready: {backend.id}[/green]")
@@ -258,12 +485,263 @@ def create_daytona_sandbox(
     try:
         yield backend
     finally:
-        console.print(f"[dim]Deleting Daytona sandbox {sandbox_id}...[/dim]")
-        try:
-            sandbox.delete()
-            console.print(f"[dim]✓ Daytona sandbox {sandbox_id} terminated[/dim]")
-        except Exception as e:
-            console.print(f"[yellow]⚠ Cleanup failed: {e}[/yellow]")
+        if should_cleanup:
+            console.print(f"[dim]Deleting Daytona sandbox {sandbox_id}...[/dim]")
+            try:
+                sandbox.delete()
+                console.print(f"[dim]✓ Daytona sandbox {sandbox_id} terminated[/dim]")
+            except Exception as e:
+                console.print(f"[yellow]⚠ Cleanup failed: {e}[/yellow]")
+
+
+@contextmanager
+def create_local_sandbox(
+    *, sandbox_id: str | None = None, setup_script_path: str | None = None
+) -> Generator[SandboxBackendProtocol, None, None]:
+    """Create or connect to a local subprocess sandbox.
+
+    The sandbox is a private temporary directory on this machine; commands run
+    there as subprocesses. Set ``CODA_LOCAL_SANDBOX_LATENCY_MS`` to delay each
+    call like a remote provider would.
+
+    Args:
+        sandbox_id: Optional existing sandbox ID to reuse
+        setup_script_path: Optional path to setup script to run after sandbox starts
+
+    Yields:
+        LocalSubprocessSandbox
+    """
+    console.print("[yellow]Starting local sandbox...[/yellow]")
+
+    backend = _local_sandbox(sandbox_id)
+    console.print(f"[green]✓ Local sandbox ready: {backend.root}[/green]")
+
+    # Run setup script if provided
+    if setup_script_path:
+        _run_sandbox_setup(backend, setup_script_path)
+    try:
+        yield backend
+    finally:
+        if not sandbox_id:
+            console.print(f"[dim]Removing local sandbox {backend.id}...[/dim]")
+            shutil.rmtree(backend.root, ignore_errors=True)
+            console.print(f"[dim]✓ Local sandbox {backend.id} removed[/dim]")
+
+
+def _local_sandbox(sandbox_id: str | None) -> LocalSubprocessSandbox:
+    """Create a local sandbox, or connect to the one with the given ID."""
+    from coda_cli.integrations.local import (
+        SANDBOX_DIR_PREFIX,
+        LocalSubprocessSandbox,
+        default_latency,
+    )
+
+    if not sandbox_id:
+        return LocalSubprocessSandbox(latency=default_latency())
+    root = Path(tempfile.gettempdir()) / sandbox_id
+    valid = sandbox_id.startswith(SANDBOX_DIR_PREFIX) and root.name == sandbox_id
+    if not (valid and root.is_dir()):
+        msg = f"Local sandbox not found: {sandbox_id}"
+        raise ValueError(msg)
+    return LocalSubprocessSandbox(root, latency=default_latency())
+
+
+@asynccontextmanager
+async def _aserve(
+    backend: SandboxBackendProtocol,
+    *,
+    name: str,
+    setup_script_path: str | None,
+    cleanup: Callable[[], object] | None,
+) -> AsyncGenerator[SandboxBackendProtocol, None]:
+    """Run the setup script, yield the backend, then run ``cleanup`` if given.
+
+    Cleanup also runs if the setup script fails or the caller is cancelled.
+    """
+    try:
+        if setup_script_path:
+            await asyncio.to_thread(_run_sandbox_setup, backend, setup_script_path)
+        yield backend
+    finally:
+        if cleanup is not None:
+            try:
+                console.print(f"[dim]Terminating {name}...[/dim]")
+                await asyncio.shield(asyncio.to_thread(cleanup))
+                console.print(f"[dim]✓ {name} terminated[/dim]")
+            except Exception as e:
+                console.print(f"[yellow]⚠ Cleanup failed: {e}[/yellow]")
+
+
+@asynccontextmanager
+async def acreate_modal_sandbox(
+    *,
+    sandbox_id: str | None = None,
+    setup_script_path: str | None = None,
+    policy: ReadinessPolicy = DEFAULT_READINESS,
+) -> AsyncGenerator[SandboxBackendProtocol, None]:
+    """Async variant of `create_modal_sandbox`.
+
+    Args:
+        sandbox_id: Optional existing sandbox ID to reuse
+        setup_script_path: Optional path to setup script to run after sandbox starts
+        policy: Readiness checks and startup deadline
+
+    Yields:
+        ModalBackend
+    """
+    import modal
+
+    from coda_cli.integrations.modal import ModalBackend
+
+    console.print("[yellow]Starting Modal sandbox...[/yellow]")
+
+    # Create ephemeral app (auto-cleans up on exit)
+    app = modal.App("deepagents-sandbox")
+    app_run = app.run()
+    await asyncio.to_thread(app_run.__enter__)
+    try:
+        if sandbox_id:
+            sandbox = await asyncio.to_thread(
+                partial(modal.Sandbox.from_id, sandbox_id=sandbox_id, app=app)
+            )
+        else:
+            sandbox = await _astart(_modal_startup(app), policy=policy)
+
+        backend = ModalBackend(sandbox)
+        console.print(f"[green]✓ Modal sandbox ready: {backend.id}[/green]")
+
+        async with _aserve(
+            backend,
+            name=f"Modal sandbox {backend.id}",
+            setup_script_path=setup_script_path,
+            cleanup=None if sandbox_id else sandbox.terminate,
+        ) as served:
+            yield served
+    finally:
+        await asyncio.shield(asyncio.to_thread(app_run.__exit__, None, None, None))
+
+
+@asynccontextmanager
+async def acreate_runloop_sandbox(
+    *,
+    sandbox_id: str | None = None,
+    setup_script_path: str | None = None,
+    policy: ReadinessPolicy = DEFAULT_READINESS,
+) -> AsyncGenerator[SandboxBackendProtocol, None]:
+    """Async variant of `create_runloop_sandbox`.
+
+    Args:
+        sandbox_id: Optional existing devbox ID to reuse
+        setup_script_path: Optional path to setup script to run after sandbox starts
+        policy: Readiness checks and startup deadline
+
+    Yields:
+        RunloopBackend
+    """
+    from runloop_api_client import Runloop
+
+    from coda_cli.integrations.runloop import RunloopBackend
+
+    bearer_token = os.environ.get("RUNLOOP_API_KEY")
+    if not bearer_token:
+        msg = "RUNLOOP_API_KEY environment variable not set"
+        raise ValueError(msg)
+
+    client = Runloop(bearer_token=bearer_token)
+
+    console.print("[yellow]Starting Runloop devbox...[/yellow]")
+
+    if sandbox_id:
+        devbox = await asyncio.to_thread(partial(client.devboxes.retrieve, id=sandbox_id))
+    else:
+        devbox = await _astart(_runloop_startup(client), policy=policy)
+
+    console.print(f"[green]✓ Runloop devbox ready: {devbox.id}[/green]")
+
+    async with _aserve(
+        RunloopBackend(devbox_id=devbox.id, client=client),
+        name=f"Runloop devbox {devbox.id}",
+        setup_script_path=setup_script_path,
+        cleanup=None if sandbox_id else partial(client.devboxes.shutdown, id=devbox.id),
+    ) as backend:
+        yield backend
+
+
+@asynccontextmanager
+async def acreate_daytona_sandbox(
+    *,
+    sandbox_id: str | None = None,
+    setup_script_path: str | None = None,
+    policy: ReadinessPolicy = DEFAULT_READINESS,
+) -> AsyncGenerator[SandboxBackendProtocol, None]:
+    """Async variant of `create_daytona_sandbox`.
+
+    Args:
+        sandbox_id: Optional existing sandbox ID to reuse
+        setup_script_path: Optional path to setup script to run after sandbox starts
+        policy: Readiness checks and startup deadline
+
+    Yields:
+        DaytonaBackend
+    """
+    from daytona import Daytona, DaytonaConfig
+
+    from coda_cli.integrations.daytona import DaytonaBackend
+
+    api_key = os.environ.get("DAYTONA_API_KEY")
+    if not api_key:
+        msg = "DAYTONA_API_KEY environment variable not set"
+        raise ValueError(msg)
+
+    console.print("[yellow]Starting Daytona sandbox...[/yellow]")
+
+    daytona = Daytona(DaytonaConfig(api_key=api_key))
+    if sandbox_id:
+        sandbox = await asyncio.to_thread(daytona.get, sandbox_id)
+    else:
+        sandbox = await _astart(_daytona_startup(daytona), policy=policy)
+
+    backend = DaytonaBackend(sandbox)
+    console.print(f"[green]✓ Daytona sandbox ready: {backend.id}[/green]")
+
+    async with _aserve(
+        backend,
+        name=f"Daytona sandbox {backend.id}",
+        setup_script_path=setup_script_path,
+        cleanup=None if sandbox_id else sandbox.delete,
+    ) as served:
+        yield served
+
+
+@asynccontextmanager
+async def acreate_local_sandbox(
+    *,
+    sandbox_id: str | None = None,
+    setup_script_path: str | None = None,
+    policy: ReadinessPolicy = DEFAULT_READINESS,  # noqa: ARG001
+) -> AsyncGenerator[SandboxBackendProtocol, None]:
+    """Async variant of `create_local_sandbox`.
+
+    Args:
+        sandbox_id: Optional existing sandbox ID to reuse
+        setup_script_path: Optional path to setup script to run after sandbox starts
+        policy: Unused; a local sandbox is ready as soon as its directory exists
+
+    Yields:
+        LocalSubprocessSandbox
+    """
+    console.print("[yellow]Starting local sandbox...[/yellow]")
+
+    backend = _local_sandbox(sandbox_id)
+    console.print(f"[green]✓ Local sandbox ready: {backend.root}[/green]")
+
+    async with _aserve(
+        backend,
+        name=f"local sandbox {backend.id}",
+        setup_script_path=setup_script_path,
+        cleanup=None if sandbox_id else partial(shutil.rmtree, backend.root, ignore_errors=True),
+    ) as served:
+        yield served
 
 
 _PROVIDER_TO_WORKING_DIR = {
@@ -278,6 +756,14 @@ _SANDBOX_PROVIDERS = {
     "modal": create_modal_sandbox,
     "runloop": create_runloop_sandbox,
     "daytona": create_daytona_sandbox,
+    "local": create_local_sandbox,
+}
+
+_ASYNC_SANDBOX_PROVIDERS = {
+    "modal": acreate_modal_sandbox,
+    "runloop": acreate_runloop_sandbox,
+    "daytona": acreate_daytona_sandbox,
+    "local": acreate_local_sandbox,
 }
 
 
@@ -287,6 +773,8 @@ def create_sandbox(
     *,
     sandbox_id: str | None = None,
     setup_script_path: str | None = None,
+    pool_size: int = 0,
+    pool_max_idle_seconds: float | None = None,
 ) -> Generator[SandboxBackendProtocol, None, None]:
     """Create or connect to a sandbox of the specified provider.
 
@@ -294,9 +782,13 @@ def create_sandbox(
     the appropriate provider-specific context manager.
 
     Args:
-        provider: Sandbox provider ("modal", "runloop", "daytona")
+        provider: Sandbox provider ("modal", "runloop", "daytona", "local")
         sandbox_id: Optional existing sandbox ID to reuse
         setup_script_path: Optional path to setup script to run after sandbox starts
+        pool_size: Number of warm sandboxes to keep between sessions; when
+            positive (and no sandbox_id is given) the sandbox is leased from
+            the pool and returned to it on exit
+        pool_max_idle_seconds: Idle time after which pooled sandboxes are torn down
 
     Yields:
         (SandboxBackend, sandbox_id)
@@ -308,12 +800,161 @@ def create_sandbox(
         )
         raise ValueError(msg)
 
+    if pool_size > 0 and not sandbox_id:
+        with _lease_pooled_sandbox(
+            provider,
+            size=pool_size,
+            max_idle_seconds=pool_max_idle_seconds,
+            setup_script_path=setup_script_path,
+        ) as backend:
+            yield backend
+        return
+
     sandbox_provider = _SANDBOX_PROVIDERS[provider]
 
     with sandbox_provider(sandbox_id=sandbox_id, setup_script_path=setup_script_path) as backend:
         yield backend
 
 
+@asynccontextmanager
+async def acreate_sandbox(
+    provider: str,
+    *,
+    sandbox_id: str | None = None,
+    setup_script_path: str | None = None,
+    pool_size: int = 0,
+    pool_max_idle_seconds: float | None = None,
+    policy: ReadinessPolicy = DEFAULT_READINESS,
+) -> AsyncGenerator[SandboxBackendProtocol, None]:
+    """Async variant of `create_sandbox`.
+
+    Provisioning never blocks the event loop, so several sandboxes can be
+    started concurrently, and cancelling startup tears down whatever was
+    created.
+
+    Args:
+        provider: Sandbox provider ("modal", "runloop", "daytona", "local")
+        sandbox_id: Optional existing sandbox ID to reuse
+        setup_script_path: Optional path to setup script to run after sandbox starts
+        pool_size: Number of warm sandboxes to keep between sessions (see `create_sandbox`)
+        pool_max_idle_seconds: Idle time after which pooled sandboxes are torn down
+        policy: Readiness checks and startup deadline for new sandboxes
+
+    Yields:
+        SandboxBackend
+    """
+    if provider not in _ASYNC_SANDBOX_PROVIDERS:
+        msg = (
+            f"Unknown sandbox provider: {provider}. "
+            f"Available providers: {', '.join(get_available_sandbox_types())}"
+        )
+        raise ValueError(msg)
+
+    if pool_size > 0 and not sandbox_id:
+        async with _alease_pooled_sandbox(
+            provider,
+            size=pool_size,
+            max_idle_seconds=pool_max_idle_seconds,
+            setup_script_path=setup_script_path,
+        ) as backend:
+            yield backend
+        return
+
+    sandbox_provider = _ASYNC_SANDBOX_PROVIDERS[provider]
+
+    async with sandbox_provider(
+        sandbox_id=sandbox_id, setup_script_path=setup_script_path, policy=policy
+    ) as backend:
+        yield backend
+
+
+def _sandbox_pool(
+    provider: str,
+    *,
+    size: int,
+    max_idle_seconds: float | None,
+    setup_script_path: str | None,
+) -> SandboxPool:
+    from coda_cli.integrations.sandbox_pool import (
+        DEFAULT_MAX_IDLE_SECONDS,
+        SandboxPool,
+        get_provider,
+    )
+
+    return SandboxPool(
+        get_provider(provider),
+        size=size,
+        max_idle_seconds=max_idle_seconds or DEFAULT_MAX_IDLE_SECONDS,
+        setup_script_path=setup_script_path,
+    )
+
+
+def _print_leased(provider: str, lease: SandboxLease) -> None:
+    state = "warm" if lease.warm else "new"
+    console.print(f"[green]✓ Leased {state} {provider} sandbox: {lease.sandbox_id}[/green]")
+
+
+def _print_released(lease: SandboxLease, recycled: bool) -> None:  # noqa: FBT001
+    outcome = "recycled" if recycled else "terminated"
+    console.print(f"[dim]✓ Sandbox {lease.sandbox_id} {outcome}[/dim]")
+
+
+@contextmanager
+def _lease_pooled_sandbox(
+    provider: str,
+    *,
+    size: int,
+    max_idle_seconds: float | None,
+    setup_script_path: str | None,
+) -> Generator[SandboxBackendProtocol, None, None]:
+    """Lease a sandbox from the provider's warm pool and return it on exit."""
+    pool = _sandbox_pool(
+        provider,
+        size=size,
+        max_idle_seconds=max_idle_seconds,
+        setup_script_path=setup_script_path,
+    )
+    console.print(f"[yellow]Leasing {provider} sandbox from pool...[/yellow]")
+    lease = pool.acquire()
+    _print_leased(provider, lease)
+    try:
+        yield lease.backend
+    finally:
+        console.print(f"[dim]Returning {provider} sandbox {lease.sandbox_id} to pool...[/dim]")
+        try:
+            _print_released(lease, pool.release(lease))
+        except Exception as e:
+            console.print(f"[yellow]⚠ Cleanup failed: {e}[/yellow]")
+
+
+@asynccontextmanager
+async def _alease_pooled_sandbox(
+    provider: str,
+    *,
+    size: int,
+    max_idle_seconds: float | None,
+    setup_script_path: str | None,
+) -> AsyncGenerator[SandboxBackendProtocol, None]:
+    """Async variant of `_lease_pooled_sandbox`."""
+    pool = _sandbox_pool(
+        provider,
+        size=size,
+        max_idle_seconds=max_idle_seconds,
+        setup_script_path=setup_script_path,
+    )
+    console.print(f"[yellow]Leasing {provider} sandbox from pool...[/yellow]")
+    lease = await _to_thread_or_undo(pool.acquire, partial(pool.release, recycle=False))
+    _print_leased(provider, lease)
+    try:
+        yield lease.backend
+    finally:
+        console.print(f"[dim]Returning {provider} sandbox {lease.sandbox_id} to pool...[/dim]")
+        try:
+            _print_released(lease, await asyncio.shield(asyncio.to_thread(pool.release, lease)))
+        except Exception as e:
+            console.print(f"[yellow]⚠ Cleanup failed: {e}[/yellow]")
+
+
 def get_available_sandbox_types() -> list[str]:
     """Get list of available sandbox provider types.
 
@@ -323,11 +964,13 @@ def get_available_sandbox_types() -> list[str]:
     return list(_SANDBOX_PROVIDERS.keys())
 
 
-def get_default_working_dir(provider: str) -> str:
+def get_default_working_dir(provider: str, backend: SandboxBackendProtocol | None = None) -> str:
     """Get the default working directory for a given sandbox provider.
 
     Args:
-        provider: Sandbox provider name ("modal", "runloop", "daytona")
+        provider: Sandbox provider name ("modal", "runloop", "daytona", "local")
+        backend: The running sandbox; required for "local", whose working
+            directory differs per sandbox
 
     Returns:
         Default working directory path as string
@@ -335,6 +978,13 @@ def get_default_working_dir(provider: str) -> str:
     Raises:
         ValueError: If provider is unknown
     """
+    if provider == "local":
+        from coda_cli.integrations.local import LocalSubprocessSandbox
+
+        if isinstance(backend, LocalSubprocessSandbox):
+            return str(backend.root)
+        msg = "The working directory of a local sandbox is only known once it is running"
+        raise ValueError(msg)
     if provider in _PROVIDER_TO_WORKING_DIR:
         return _PROVIDER_TO_WORKING_DIR[provider]
     msg = f"Unknown sandbox provider: {provider}"
@@ -342,6 +992,9 @@ def get_default_working_dir(provider: str) -> str:
 
 
 __all__ = [
+    "DEFAULT_READINESS",
+    "ReadinessPolicy",
+    "acreate_sandbox",
     "create_sandbox",
     "get_available_sandbox_types",
     "get_default_working_dir",
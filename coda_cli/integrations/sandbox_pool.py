@@ -0,0 +1,593 @@
+"""Pool of pre-warmed sandboxes leased to CLI sessions.
+
+Creating a remote sandbox takes tens of seconds. With a pool, ``size``
+sandboxes per provider are kept started (and set up) between sessions, like
+connections in a connection pool: a session leases an idle one at startup
+(creating one only when all are in use), the pool is topped up to ``size`` in
+the background, and at the end of the session the sandbox's workspace is
+cleared and it goes back to the pool, or is torn down if the pool already has
+``size`` idle sandboxes or clearing failed.
+Idle sandboxes older than ``max_idle_seconds`` are torn down, and are asked to
+shut themselves down after that long too, so an unused pool stops costing
+money even if no CLI runs again.
+
+The pool's state is a JSON file per provider under ``~/.coda/sandbox-pool``,
+guarded by a file lock so concurrent CLI processes lease different sandboxes.
+Sandboxes still being created are recorded there too, so a process that exits
+mid-creation leaves an entry the next process cleans up.
+Providers are pluggable: anything implementing `SandboxProvider` can be
+registered with `register_provider`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Protocol
+
+from coda_cli.config import settings
+from coda_cli.integrations.sandbox_factory import (
+    _read_setup_script,
+    _run_setup_script,
+    _start_daytona_sandbox,
+    _start_modal_sandbox,
+    _start_runloop_devbox,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    from deepagents.backends.protocol import SandboxBackendProtocol
+
+DEFAULT_MAX_IDLE_SECONDS = 30 * 60
+
+# Upper bound on a Modal sandbox's lifetime (Modal's own maximum)
+_MODAL_MAX_LIFETIME_SECONDS = 24 * 60 * 60
+
+# Prefix of the placeholder ID recorded until the provider returns the real one
+_PENDING_PREFIX = "pending-"
+
+
+class SandboxProvider(Protocol):
+    """Creates, connects to and destroys sandboxes of one kind for a `SandboxPool`."""
+
+    name: str
+
+    def create(self, *, max_idle_seconds: float) -> str:
+        """Start a sandbox, wait until it is ready and return its ID.
+
+        The sandbox should shut itself down after ``max_idle_seconds`` without
+        use, where the provider supports it.
+        """
+        ...
+
+    def connect(self, sandbox_id: str) -> SandboxBackendProtocol:
+        """Return a backend for a running sandbox."""
+        ...
+
+    def is_alive(self, sandbox_id: str) -> bool:
+        """Check whether a sandbox is still running."""
+        ...
+
+    def reset(self, backend: SandboxBackendProtocol) -> bool:
+        """Clear the sandbox's workspace for the next session; return False on failure."""
+        ...
+
+    def destroy(self, sandbox_id: str) -> None:
+        """Tear a sandbox down."""
+        ...
+
+
+def clear_directory(backend: SandboxBackendProtocol, path: str) -> bool:
+    """Delete everything inside ``path`` in the sandbox, keeping the directory."""
+    result = backend.execute(f"find {shlex.quote(path)} -mindepth 1 -delete")
+    return result.exit_code == 0
+
+
+class ModalProvider:
+    """Modal sandboxes in a persistent app, so they outlive the CLI process."""
+
+    name = "modal"
+    app_name = "coda-sandbox-pool"
+    working_dir = "/workspace"
+
+    def create(self, *, max_idle_seconds: float) -> str:  # noqa: D102
+        import modal
+
+        app = modal.App.lookup(self.app_name, create_if_missing=True)
+        sandbox = _start_modal_sandbox(
+            app, timeout=_MODAL_MAX_LIFETIME_SECONDS, idle_timeout=int(max_idle_seconds)
+        )
+        return sandbox.object_id
+
+    def connect(self, sandbox_id: str) -> SandboxBackendProtocol:  # noqa: D102
+        import modal
+
+        from coda_cli.integrations.modal import ModalBackend
+
+        return ModalBackend(modal.Sandbox.from_id(sandbox_id))
+
+    def is_alive(self, sandbox_id: str) -> bool:  # noqa: D102
+        import modal
+
+        return modal.Sandbox.from_id(sandbox_id).poll() is None
+
+    def reset(self, backend: SandboxBackendProtocol) -> bool:  # noqa: D102
+        return clear_directory(backend, self.working_dir)
+
+    def destroy(self, sandbox_id: str) -> None:  # noqa: D102
+        import modal
+
+        modal.Sandbox.from_id(sandbox_id).terminate()
+
+
+class RunloopProvider:
+    """Runloop devboxes, shut down by Runloop after ``max_idle_seconds`` idle."""
+
+    name = "runloop"
+    working_dir = "/home/user"
+
+    def __init__(self) -> None:
+        """Initialize the provider from ``RUNLOOP_API_KEY``."""
+        from runloop_api_client import Runloop
+
+        bearer_token = os.environ.get("RUNLOOP_API_KEY")
+        if not bearer_token:
+            msg = "RUNLOOP_API_KEY environment variable not set"
+            raise ValueError(msg)
+        self._client = Runloop(bearer_token=bearer_token)
+
+    def create(self, *, max_idle_seconds: float) -> str:  # noqa: D102
+        after_idle = {"idle_time_seconds": int(max_idle_seconds), "on_idle": "shutdown"}
+        devbox = _start_runloop_devbox(self._client, launch_parameters={"after_idle": after_idle})
+        return devbox.id
+
+    def connect(self, sandbox_id: str) -> SandboxBackendProtocol:  # noqa: D102
+        from coda_cli.integrations.runloop import RunloopBackend
+
+        return RunloopBackend(devbox_id=sandbox_id, client=self._client)
+
+    def is_alive(self, sandbox_id: str) -> bool:  # noqa: D102
+        return self._client.devboxes.retrieve(id=sandbox_id).status == "running"
+
+    def reset(self, backend: SandboxBackendProtocol) -> bool:  # noqa: D102
+        return clear_directory(backend, self.working_dir)
+
+    def destroy(self, sandbox_id: str) -> None:  # noqa: D102
+        self._client.devboxes.shutdown(id=sandbox_id)
+
+
+class DaytonaProvider:
+    """Daytona sandboxes, stopped by Daytona after ``max_idle_seconds`` idle."""
+
+    name = "daytona"
+    working_dir = "/home/daytona"
+
+    def __init__(self) -> None:
+        """Initialize the provider from ``DAYTONA_API_KEY``."""
+        from daytona import Daytona, DaytonaConfig
+
+        api_key = os.environ.get("DAYTONA_API_KEY")
+        if not api_key:
+            msg = "DAYTONA_API_KEY environment variable not set"
+            raise ValueError(msg)
+        self._daytona = Daytona(DaytonaConfig(api_key=api_key))
+
+    def create(self, *, max_idle_seconds: float) -> str:  # noqa: D102
+        from daytona import CreateSandboxFromSnapshotParams
+
+        # Daytona counts idle time in whole minutes
+        params = CreateSandboxFromSnapshotParams(
+            auto_stop_interval=max(1, round(max_idle_seconds / 60))
+        )
+        return _start_daytona_sandbox(self._daytona, params).id
+
+    def connect(self, sandbox_id: str) -> SandboxBackendProtocol:  # noqa: D102
+        from coda_cli.integrations.daytona import DaytonaBackend
+
+        return DaytonaBackend(self._daytona.get(sandbox_id))
+
+    def is_alive(self, sandbox_id: str) -> bool:  # noqa: D102
+        sandbox = self._daytona.get(sandbox_id)
+        return str(getattr(sandbox.state, "value", sandbox.state)) == "started"
+
+    def reset(self, backend: SandboxBackendProtocol) -> bool:  # noqa: D102
+        return clear_directory(backend, self.working_dir)
+
+    def destroy(self, sandbox_id: str) -> None:  # noqa: D102
+        self._daytona.get(sandbox_id).delete()
+
+
+class LocalProvider:
+    """Local subprocess sandboxes, one directory each, for offline use and tests."""
+
+    name = "local"
+
+    def __init__(self, root: Path | None = None) -> None:
+        """Initialize the provider.
+
+        Args:
+            root: Directory holding the sandboxes (default ``~/.coda/sandbox-pool/local``)
+        """
+        self.root = root or settings.user_deepagents_dir / "sandbox-pool" / "local"
+
+    def create(self, *, max_idle_seconds: float) -> str:  # noqa: ARG002, D102
+        sandbox_id = f"local-{uuid.uuid4().hex[:12]}"
+        (self.root / sandbox_id).mkdir(parents=True)
+        return sandbox_id
+
+    def connect(self, sandbox_id: str) -> SandboxBackendProtocol:  # noqa: D102
+        from coda_cli.integrations.local import LocalSubprocessSandbox, default_latency
+
+        return LocalSubprocessSandbox(self.root / sandbox_id, latency=default_latency())
+
+    def is_alive(self, sandbox_id: str) -> bool:  # noqa: D102
+        return (self.root / sandbox_id).is_dir()
+
+    def reset(self, backend: SandboxBackendProtocol) -> bool:  # noqa: D102
+        return clear_directory(backend, str(self.root / backend.id))
+
+    def destroy(self, sandbox_id: str) -> None:  # noqa: D102
+        shutil.rmtree(self.root / sandbox_id, ignore_errors=True)
+
+
+_POOL_PROVIDERS: dict[str, Callable[[], SandboxProvider]] = {
+    "modal": ModalProvider,
+    "runloop": RunloopProvider,
+    "daytona": DaytonaProvider,
+    "local": LocalProvider,
+}
+
+
+def register_provider(name: str, factory: Callable[[], SandboxProvider]) -> None:
+    """Make a provider available to `get_provider` under ``name``."""
+    _POOL_PROVIDERS[name] = factory
+
+
+def get_provider(name: str) -> SandboxProvider:
+    """Return a new instance of the provider registered under ``name``."""
+    if name not in _POOL_PROVIDERS:
+        msg = f"No pool provider for sandbox type: {name}"
+        raise ValueError(msg)
+    return _POOL_PROVIDERS[name]()
+
+
+@dataclass
+class PoolEntry:
+    """One sandbox owned by the pool.
+
+    Attributes:
+        sandbox_id: Provider's ID for the sandbox, or a placeholder starting with
+            ``pending-`` while the provider is still creating it
+        setup: Fingerprint of the setup script it was prepared with, if any
+        created_at: When it was created
+        idle_since: When it was last returned to the pool, None while leased
+        lease_pid: Process holding the lease, None while idle
+        creating_pid: Process creating and preparing it, None once it is ready
+    """
+
+    sandbox_id: str
+    setup: str | None
+    created_at: float
+    idle_since: float | None = None
+    lease_pid: int | None = None
+    creating_pid: int | None = None
+
+    @property
+    def idle(self) -> bool:
+        """Whether the sandbox is ready and not leased."""
+        return self.lease_pid is None and self.creating_pid is None
+
+
+@dataclass
+class SandboxLease:
+    """A sandbox leased from a `SandboxPool`.
+
+    Attributes:
+        backend: Backend for the leased sandbox
+        sandbox_id: Provider's ID for the sandbox
+        warm: Whether it came from the pool rather than being created for the lease
+    """
+
+    backend: SandboxBackendProtocol
+    sandbox_id: str
+    warm: bool
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SandboxPool:
+    """Keeps ``size`` warm sandboxes of one provider and leases them to sessions."""
+
+    def __init__(
+        self,
+        provider: SandboxProvider,
+        *,
+        size: int,
+        max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+        setup_script_path: str | None = None,
+        state_dir: Path | None = None,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            provider: Provider whose sandboxes the pool holds
+            size: Number of idle sandboxes to keep warm
+            max_idle_seconds: Idle time after which a pooled sandbox is torn down
+            setup_script_path: Setup script every pooled sandbox is prepared with;
+                sandboxes prepared with a different script are not leased
+            state_dir: Directory for the state file (default ``~/.coda/sandbox-pool``)
+        """
+        self.provider = provider
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self._script = _read_setup_script(setup_script_path) if setup_script_path else None
+        self._setup = (
+            hashlib.sha256(self._script.encode()).hexdigest()[:16] if self._script else None
+        )
+        directory = state_dir or settings.user_deepagents_dir / "sandbox-pool"
+        self._state_path = directory / f"{provider.name}.json"
+        self._filler: threading.Thread | None = None
+
+    @contextlib.contextmanager
+    def _state(self) -> Iterator[list[PoolEntry]]:
+        """Hold the pool's lock and yield its entries, saving changes on exit."""
+        self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self._state_path.with_suffix(".lock")
+        with lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    data = json.loads(self._state_path.read_text(encoding="utf-8"))
+                    entries = [PoolEntry(**item) for item in data]
+                except (OSError, ValueError, TypeError):
+                    entries = []
+                yield entries
+                tmp = self._state_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps([asdict(e) for e in entries]), encoding="utf-8")
+                tmp.replace(self._state_path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _members(self, entries: list[PoolEntry]) -> list[PoolEntry]:
+        return [e for e in entries if e.setup == self._setup]
+
+    def _idle(self, entries: list[PoolEntry]) -> list[PoolEntry]:
+        return [e for e in self._members(entries) if e.idle]
+
+    def _prepare(self, sandbox_id: str) -> SandboxBackendProtocol:
+        backend = self.provider.connect(sandbox_id)
+        if self._script:
+            _run_setup_script(backend, self._script)
+        return backend
+
+    def _destroy(self, sandbox_ids: list[str]) -> None:
+        for sandbox_id in sandbox_ids:
+            if sandbox_id.startswith(_PENDING_PREFIX):
+                # Never returned by the provider; it shuts itself down once idle
+                continue
+            with contextlib.suppress(Exception):
+                self.provider.destroy(sandbox_id)
+
+    def reap(self) -> int:
+        """Tear down idle sandboxes past their TTL and surplus ones, and forget dead leases.
+
+        Leases held by processes that no longer exist are torn down too: the
+        session ended without returning the sandbox, so its state is unknown.
+        So are sandboxes whose creating process exited before they were ready.
+
+        Returns:
+            Number of sandboxes torn down.
+        """
+        now = time.time()
+        with self._state() as entries:
+            doomed = [
+                e
+                for e in entries
+                if (e.idle and now - (e.idle_since or 0) > self.max_idle_seconds)
+                or (e.lease_pid is not None and not _process_alive(e.lease_pid))
+                or (e.creating_pid is not None and not _process_alive(e.creating_pid))
+            ]
+            idle = [e for e in self._idle(entries) if e not in doomed]
+            idle.sort(key=lambda e: e.idle_since or 0, reverse=True)
+            doomed.extend(idle[self.size :])
+            entries[:] = [e for e in entries if e not in doomed]
+        self._destroy([e.sandbox_id for e in doomed])
+        return len(doomed)
+
+    def acquire(self) -> SandboxLease:
+        """Lease a warm sandbox, or create one if none is idle, then top up the pool.
+
+        Returns:
+            The lease; pass it to `release` when the session ends.
+        """
+        self.reap()
+        while True:
+            with self._state() as entries:
+                idle = self._idle(entries)
+                entry = max(idle, key=lambda e: e.idle_since or 0) if idle else None
+                if entry is not None:
+                    entry.idle_since = None
+                    entry.lease_pid = os.getpid()
+            if entry is None:
+                break
+            try:
+                if self.provider.is_alive(entry.sandbox_id):
+                    lease = SandboxLease(
+                        self.provider.connect(entry.sandbox_id), entry.sandbox_id, warm=True
+                    )
+                    self.start_filling()
+                    return lease
+            except Exception:  # noqa: BLE001, S110
+                pass
+            # Gone (e.g. shut down by the provider for idleness): drop it and try the next
+            self._forget(entry.sandbox_id)
+            self._destroy([entry.sandbox_id])
+
+        sandbox_id = self.provider.create(max_idle_seconds=self.max_idle_seconds)
+        with self._state() as entries:
+            entries.append(
+                PoolEntry(sandbox_id, self._setup, created_at=time.time(), lease_pid=os.getpid())
+            )
+        try:
+            backend = self._prepare(sandbox_id)
+        except BaseException:
+            self._forget(sandbox_id)
+            self._destroy([sandbox_id])
+            raise
+        self.start_filling()
+        return SandboxLease(backend, sandbox_id, warm=False)
+
+    def release(self, lease: SandboxLease, *, recycle: bool = True) -> bool:
+        """Return a leased sandbox to the pool, or tear it down.
+
+        The sandbox is recycled if ``recycle`` is set, its workspace could be
+        cleared (and the setup script rerun) and the pool has room for it.
+        A background `fill` is not waited for: sandboxes it is creating are
+        recorded in the pool's state, so they are adopted or cleaned up later.
+
+        Returns:
+            Whether the sandbox went back to the pool.
+        """
+        if recycle:
+            try:
+                recycle = self.provider.reset(lease.backend)
+                if recycle and self._script:
+                    _run_setup_script(lease.backend, self._script)
+            except Exception:  # noqa: BLE001
+                recycle = False
+        with self._state() as entries:
+            entries[:] = [e for e in entries if e.sandbox_id != lease.sandbox_id]
+            recycle = recycle and len(self._idle(entries)) < self.size
+            if recycle:
+                now = time.time()
+                entries.append(
+                    PoolEntry(lease.sandbox_id, self._setup, created_at=now, idle_since=now)
+                )
+        if not recycle:
+            self._destroy([lease.sandbox_id])
+        return recycle
+
+    @contextlib.contextmanager
+    def lease(self) -> Iterator[SandboxBackendProtocol]:
+        """Lease a sandbox for the duration of a ``with`` block."""
+        lease = self.acquire()
+        try:
+            yield lease.backend
+        finally:
+            self.release(lease)
+
+    def fill(self) -> int:
+        """Create sandboxes until the pool holds ``size``, idle or leased.
+
+        Returns:
+            Number of sandboxes created.
+        """
+        created = 0
+        while True:
+            placeholder = f"{_PENDING_PREFIX}{uuid.uuid4().hex[:12]}"
+            with self._state() as entries:
+                if len(self._members(entries)) >= self.size:
+                    return created
+                # Recorded before creation starts, so other processes count it and
+                # `reap` can clean it up if this process exits before it is ready
+                entries.append(
+                    PoolEntry(
+                        placeholder, self._setup, created_at=time.time(), creating_pid=os.getpid()
+                    )
+                )
+            try:
+                sandbox_id = self.provider.create(max_idle_seconds=self.max_idle_seconds)
+            except BaseException:
+                self._forget(placeholder)
+                raise
+            self._update(placeholder, sandbox_id=sandbox_id)
+            try:
+                self._prepare(sandbox_id)
+            except BaseException:
+                self._forget(sandbox_id)
+                self._destroy([sandbox_id])
+                raise
+            self._update(sandbox_id, creating_pid=None, idle_since=time.time())
+            created += 1
+
+    def start_filling(self) -> None:
+        """Run `fill` in a background thread, unless one is already running."""
+        if self._filler is not None and self._filler.is_alive():
+            return
+
+        def fill_quietly() -> None:
+            # Warming is opportunistic; the next lease creates a sandbox if it failed
+            with contextlib.suppress(Exception):
+                self.fill()
+
+        self._filler = threading.Thread(target=fill_quietly, name="sandbox-pool-fill", daemon=True)
+        self._filler.start()
+
+    def wait_filled(self) -> None:
+        """Wait for a background `fill` to finish."""
+        if self._filler is not None:
+            self._filler.join()
+
+    def drain(self) -> int:
+        """Tear down every idle sandbox.
+
+        Returns:
+            Number of sandboxes torn down.
+        """
+        self.wait_filled()
+        with self._state() as entries:
+            idle = [e for e in entries if e.idle]
+            entries[:] = [e for e in entries if not e.idle]
+        self._destroy([e.sandbox_id for e in idle])
+        return len(idle)
+
+    def entries(self) -> list[PoolEntry]:
+        """Return the pool's current entries."""
+        with self._state() as entries:
+            return list(entries)
+
+    def _forget(self, sandbox_id: str) -> None:
+        with self._state() as entries:
+            entries[:] = [e for e in entries if e.sandbox_id != sandbox_id]
+
+    def _update(self, sandbox_id: str, /, **changes: object) -> None:
+        with self._state() as entries:
+            for entry in entries:
+                if entry.sandbox_id == sandbox_id:
+                    for name, value in changes.items():
+                        setattr(entry, name, value)
+
+
+__all__ = [
+    "DEFAULT_MAX_IDLE_SECONDS",
+    "DaytonaProvider",
+    "LocalProvider",
+    "ModalProvider",
+    "PoolEntry",
+    "RunloopProvider",
+    "SandboxLease",
+    "SandboxPool",
+    "SandboxProvider",
+    "clear_directory",
+    "get_provider",
+    "register_provider",
+]
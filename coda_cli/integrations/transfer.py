@@ -0,0 +1,362 @@
+"""Concurrent and bundled file transfers for remote sandbox backends.
+
+Providers whose APIs move one file per request make a batch of files cost one
+round trip each. `upload_batch` and `download_batch` run those requests on a
+bounded thread pool, and bundle many small files into a single tar archive
+that is packed or unpacked in the sandbox with one command, so the batch
+costs a few round trips however many files it has. Every file still gets its
+own response: a failed bundle falls back to per-file transfers, which
+capture errors per file.
+
+`hash_remote_files` avoids transfers altogether when the caller only needs
+to know whether files changed: it hashes them in the sandbox with one
+command.
+"""
+
+from __future__ import annotations
+
+import io
+import posixpath
+import shlex
+import tarfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, TypeVar
+
+from deepagents.backends.protocol import FileDownloadResponse, FileUploadResponse
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from deepagents.backends.protocol import SandboxBackendProtocol
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+_MB = 1024 * 1024
+
+# Requests in flight at once per batch
+MAX_TRANSFER_WORKERS = 8
+
+# A batch is bundled when it has at least this many files, all small
+BUNDLE_MIN_FILES = 8
+BUNDLE_MAX_FILE_BYTES = 1 * _MB
+BUNDLE_MAX_BYTES = 64 * _MB
+
+# Paths up to this many bytes go on the command line; longer lists are uploaded
+_INLINE_PATHS_BYTES = 64 * 1024
+
+# Output budget of one hashing command, under the backends' default output cap
+_HASH_OUTPUT_BYTES = 64 * 1024
+_SHA256_HEX_LENGTH = 64
+
+
+@dataclass
+class TransferStats:
+    """Outcome of one batch transfer.
+
+    Attributes:
+        direction: ``"upload"`` or ``"download"``
+        method: ``"bundle"`` (one tar archive) or ``"concurrent"`` (one request per file)
+        files: Files in the batch
+        failed: Files that could not be transferred
+        bytes: Content bytes transferred
+        seconds: Wall time of the whole batch
+    """
+
+    direction: str
+    method: str
+    files: int
+    failed: int
+    bytes: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """Content bytes per second."""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> dict[str, float | int | str]:
+        """Return the stats, with throughput, as a plain dict."""
+        return {**asdict(self), "throughput": self.throughput}
+
+
+def file_error(exc: Exception) -> str:
+    """Map an exception from a file transfer to a `FileOperationError` where one fits."""
+    if isinstance(exc, FileNotFoundError):
+        return "file_not_found"
+    if isinstance(exc, IsADirectoryError):
+        return "is_directory"
+    if isinstance(exc, PermissionError):
+        return "permission_denied"
+    return str(exc) or type(exc).__name__
+
+
+def _bundleable(paths: list[str]) -> bool:
+    # Archive member names must match the requested paths exactly
+    return len(paths) >= BUNDLE_MIN_FILES and all(
+        path.startswith("/") and posixpath.normpath(path) == path for path in paths
+    )
+
+
+def should_bundle(files: list[tuple[str, bytes]]) -> bool:
+    """Check whether an upload batch is better sent as one archive."""
+    sizes = [len(content) for _, content in files]
+    return (
+        _bundleable([path for path, _ in files])
+        and max(sizes) <= BUNDLE_MAX_FILE_BYTES
+        and sum(sizes) <= BUNDLE_MAX_BYTES
+    )
+
+
+def _map_concurrently(func: Callable[[_T], _R], items: list[_T], max_workers: int) -> list[_R]:
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
+def _archive(files: list[tuple[str, bytes]]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz", compresslevel=1) as archive:
+        for path, content in files:
+            info = tarfile.TarInfo(path.lstrip("/"))
+            info.size = len(content)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def _upload_bundle(
+    backend: SandboxBackendProtocol,
+    files: list[tuple[str, bytes]],
+    upload_one: Callable[[str, bytes], None],
+) -> list[FileUploadResponse] | None:
+    """Upload files as one archive and unpack it; None if any step failed."""
+    remote = f"/tmp/.coda-upload-{uuid.uuid4().hex}.tar.gz"  # noqa: S108
+    try:
+        upload_one(remote, _archive(files))
+        result = backend.execute(
+            f"tar -xzf {remote} -C / --no-same-owner; status=$?; rm -f {remote}; exit $status"
+        )
+    except Exception:  # noqa: BLE001
+        return None
+    if result.exit_code != 0:
+        return None
+    return [FileUploadResponse(path=path) for path, _ in files]
+
+
+def _download_bundle(
+    backend: SandboxBackendProtocol,
+    paths: list[str],
+    download_one: Callable[[str], bytes],
+) -> dict[str, bytes] | None:
+    """Pack the small files in the sandbox and download the archive.
+
+    The same command sizes the files first and packs only those of at most
+    ``BUNDLE_MAX_FILE_BYTES``, in order, while the total stays within
+    ``BUNDLE_MAX_BYTES``. Paths with a newline are left out, since the list
+    handed to ``tar`` is one path per line.
+
+    Returns:
+        Contents of the regular files packed, by path, or None if the archive
+        could not be made or fetched.
+    """
+    remote = f"/tmp/.coda-download-{uuid.uuid4().hex}.tar.gz"  # noqa: S108
+    quoted = " ".join(shlex.quote(path) for path in paths if "\n" not in path)
+    select = (
+        '{ size = $1; name = substr($0, index($0, " ") + 1) }'
+        f" size <= {BUNDLE_MAX_FILE_BYTES} && total + size <= {BUNDLE_MAX_BYTES}"
+        " { total += size; print name }"
+    )
+    try:
+        result = backend.execute(
+            "list=$(mktemp) || exit 1\n"
+            f"stat -c '%s %n' -- {quoted} 2>/dev/null | awk {shlex.quote(select)} > \"$list\"\n"
+            f"tar -czPf {remote} --no-recursion --ignore-failed-read --no-unquote"
+            ' -T "$list" 2>/dev/null\n'
+            f'rm -f "$list"; test -f {remote}'
+        )
+        if result.exit_code != 0:
+            return None
+        try:
+            data = download_one(remote)
+        finally:
+            backend.execute(f"rm -f {remote}")
+        contents: dict[str, bytes] = {}
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+            for member in archive:
+                if member.isfile() and (extracted := archive.extractfile(member)) is not None:
+                    contents[member.name] = extracted.read()
+    except Exception:  # noqa: BLE001
+        return None
+    return contents
+
+
+def run_over_paths(backend: SandboxBackendProtocol, paths: list[str], command: str) -> str:
+    """Run ``command`` in the sandbox with ``paths`` appended as arguments.
+
+    Short lists are passed inline, so the call is one round trip. Longer ones
+    travel as a NUL-separated file fed to ``xargs``, so any number of paths,
+    with any characters, costs one upload and one command.
+
+    Returns:
+        The command's output.
+    """
+    quoted = " ".join(shlex.quote(path) for path in paths)
+    if len(quoted) <= _INLINE_PATHS_BYTES:
+        return backend.execute(f"{command} {quoted}").output
+    listing = f"/tmp/.coda-paths-{uuid.uuid4().hex}"  # noqa: S108
+    backend.upload_files([(listing, "\0".join(paths).encode("utf-8", errors="surrogateescape"))])
+    return backend.execute(f"xargs -0 {command} < {listing}; rm -f {listing}").output
+
+
+def _hash_batches(paths: list[str]) -> list[list[str]]:
+    """Split paths so each batch's ``sha256sum`` output fits the output budget."""
+    batches: list[list[str]] = [[]]
+    size = 0
+    for path in paths:
+        line = _SHA256_HEX_LENGTH + 3 + len(path.encode("utf-8", errors="surrogateescape"))
+        if batches[-1] and size + line > _HASH_OUTPUT_BYTES:
+            batches.append([])
+            size = 0
+        batches[-1].append(path)
+        size += line
+    return [batch for batch in batches if batch]
+
+
+def hash_remote_files(backend: SandboxBackendProtocol, paths: list[str]) -> dict[str, str | None]:
+    """Return the sha256 hex digest of each file, computed in the sandbox.
+
+    All files are hashed by one ``sha256sum`` command (more only for lists
+    whose output would not fit the backend's output cap).
+
+    Args:
+        backend: Sandbox holding the files
+        paths: Paths to hash
+
+    Returns:
+        Digest by path; None for files that are missing, unreadable or not
+        regular files.
+    """
+    digests: dict[str, str | None] = dict.fromkeys(paths)
+    for batch in _hash_batches(list(digests)):
+        for line in run_over_paths(backend, batch, "sha256sum -- 2>/dev/null").splitlines():
+            # Names with backslashes or newlines come back escaped; they stay None
+            digest, sep, name = line.partition("  ")
+            if sep and len(digest) == _SHA256_HEX_LENGTH and name in digests:
+                digests[name] = digest
+    return digests
+
+
+def upload_batch(
+    backend: SandboxBackendProtocol,
+    files: list[tuple[str, bytes]],
+    upload_one: Callable[[str, bytes], None],
+    *,
+    max_workers: int = MAX_TRANSFER_WORKERS,
+) -> tuple[list[FileUploadResponse], TransferStats]:
+    """Upload files, bundled or concurrently, capturing errors per file.
+
+    Args:
+        backend: Backend whose ``execute`` unpacks bundles
+        files: List of (path, content) tuples
+        upload_one: Writes one file in the sandbox, raising on failure
+        max_workers: Concurrent requests when not bundling
+
+    Returns:
+        Responses in input order, and the transfer's stats.
+    """
+    started = time.monotonic()
+
+    def upload(file: tuple[str, bytes]) -> FileUploadResponse:
+        path, content = file
+        try:
+            upload_one(path, content)
+        except Exception as exc:  # noqa: BLE001
+            return FileUploadResponse(path=path, error=file_error(exc))
+        return FileUploadResponse(path=path)
+
+    method = "bundle"
+    responses = _upload_bundle(backend, files, upload_one) if should_bundle(files) else None
+    if responses is None:
+        method = "concurrent"
+        responses = _map_concurrently(upload, files, max_workers)
+    failed = {r.path for r in responses if r.error is not None}
+    stats = TransferStats(
+        direction="upload",
+        method=method,
+        files=len(files),
+        failed=len(failed),
+        bytes=sum(len(content) for path, content in files if path not in failed),
+        seconds=time.monotonic() - started,
+    )
+    return responses, stats
+
+
+def download_batch(
+    backend: SandboxBackendProtocol,
+    paths: list[str],
+    download_one: Callable[[str], bytes],
+    *,
+    max_workers: int = MAX_TRANSFER_WORKERS,
+) -> tuple[list[FileDownloadResponse], TransferStats]:
+    """Download files, bundled or concurrently, capturing errors per file.
+
+    Files left out of a bundle (too large, not found, directories,
+    unreadable) are requested individually and concurrently, so errors carry
+    the provider's message.
+
+    Args:
+        backend: Backend whose ``execute`` packs bundles
+        paths: Paths to download
+        download_one: Reads one file from the sandbox, raising on failure
+        max_workers: Concurrent requests for files not bundled
+
+    Returns:
+        Responses in input order, and the transfer's stats.
+    """
+    started = time.monotonic()
+
+    def download(path: str) -> FileDownloadResponse:
+        try:
+            content = download_one(path)
+        except Exception as exc:  # noqa: BLE001
+            return FileDownloadResponse(path=path, error=file_error(exc))
+        return FileDownloadResponse(path=path, content=content)
+
+    bundled = (_download_bundle(backend, paths, download_one) if _bundleable(paths) else None) or {}
+    method = "bundle" if bundled else "concurrent"
+    missing = [path for path in dict.fromkeys(paths) if path not in bundled]
+    fetched = dict(zip(missing, _map_concurrently(download, missing, max_workers), strict=True))
+    responses = [
+        FileDownloadResponse(path=path, content=bundled[path]) if path in bundled else fetched[path]
+        for path in paths
+    ]
+    stats = TransferStats(
+        direction="download",
+        method=method,
+        files=len(paths),
+        failed=sum(r.error is not None for r in responses),
+        bytes=sum(len(r.content or b"") for r in responses),
+        seconds=time.monotonic() - started,
+    )
+    return responses, stats
+
+
+__all__ = [
+    "BUNDLE_MAX_BYTES",
+    "BUNDLE_MAX_FILE_BYTES",
+    "BUNDLE_MIN_FILES",
+    "MAX_TRANSFER_WORKERS",
+    "TransferStats",
+    "download_batch",
+    "file_error",
+    "hash_remote_files",
+    "run_over_paths",
+    "should_bundle",
+    "upload_batch",
+]
@@ -0,0 +1,276 @@
+"""Delta sync of a local project into a sandbox workspace.
+
+Only files whose content differs are sent: both sides are hashed (locally
+with a cache keyed on size and mtime, remotely with batched
+``sha256sum``), changed files are uploaded in batches that the backends
+bundle into archives, and files removed locally since the last sync are
+deleted. Files ignored by git (``.gitignore``, ``.git/info/exclude``) are
+never sent, and files that appeared in the sandbox by other means are left
+alone.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import hashlib
+import json
+import os
+import posixpath
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from coda_cli.config import console, settings
+from coda_cli.integrations.transfer import BUNDLE_MAX_BYTES, hash_remote_files, run_over_paths
+
+if TYPE_CHECKING:
+    from deepagents.backends.protocol import SandboxBackendProtocol
+
+# Files per upload batch (each batch is one archive when its files are small)
+SYNC_BATCH_FILES = 500
+
+_HASH_WORKERS = 8
+
+
+@dataclass
+class SyncResult:
+    """Outcome of one `sync_workspace` run.
+
+    Attributes:
+        files: Files in the local project
+        uploaded: Files sent because they were new or changed
+        deleted: Files deleted in the sandbox because they were removed locally
+        unchanged: Files already up to date in the sandbox
+        bytes: Bytes uploaded
+        seconds: Wall time of the sync
+        failed: Paths that could not be uploaded, with the error
+    """
+
+    files: int = 0
+    uploaded: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+def _walk_files(root: Path) -> list[str]:
+    """List files outside git, skipping ``.git`` and top-level ``.gitignore`` patterns."""
+    try:
+        lines = (root / ".gitignore").read_text(encoding="utf-8").splitlines()
+    except OSError:
+        lines = []
+    patterns = [line.strip().strip("/") for line in lines]
+    patterns = [p for p in patterns if p and not p.startswith(("#", "!"))]
+
+    def ignored(relative: str) -> bool:
+        name = posixpath.basename(relative)
+        return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(relative, p) for p in patterns)
+
+    files = []
+    for directory, dirnames, filenames in os.walk(root):
+        base = Path(directory).relative_to(root).as_posix()
+        prefix = "" if base == "." else f"{base}/"
+        dirnames[:] = [d for d in dirnames if d != ".git" and not ignored(prefix + d)]
+        files.extend(prefix + name for name in filenames if not ignored(prefix + name))
+    return files
+
+
+def list_local_files(root: Path) -> list[str]:
+    """Return the project's regular files as sorted POSIX paths relative to ``root``.
+
+    Inside a git work tree this is every tracked or untracked file git does
+    not ignore; elsewhere the tree is walked with the top-level
+    ``.gitignore`` applied.
+    """
+    try:
+        output = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],  # noqa: S607
+            cwd=root,
+            capture_output=True,
+            check=True,
+        ).stdout
+        paths = output.decode("utf-8", errors="surrogateescape").split("\0")
+    except (OSError, subprocess.CalledProcessError):
+        paths = _walk_files(root)
+    # Deleted-but-tracked files and symlinks are not synced
+    return sorted(
+        path
+        for path in set(paths)
+        if path and (root / path).is_file() and not (root / path).is_symlink()
+    )
+
+
+class _SyncState:
+    """Local hash cache and per-target record of synced files, kept as JSON."""
+
+    def __init__(self, root: Path, state_dir: Path) -> None:
+        key = hashlib.sha256(str(root.resolve()).encode()).hexdigest()[:32]
+        self.path = state_dir / f"{key}.json"
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        self.hashes: dict[str, list] = data.get("hashes", {})
+        self.targets: dict[str, list[str]] = data.get("targets", {})
+
+    def save(self) -> None:
+        with contextlib.suppress(OSError):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            tmp.write_text(json.dumps({"hashes": self.hashes, "targets": self.targets}))
+            tmp.replace(self.path)
+
+
+def _hash_local(root: Path, paths: list[str], state: _SyncState) -> dict[str, str]:
+    """Hash the files, reusing cached digests of files whose size and mtime are unchanged."""
+    digests: dict[str, str] = {}
+    stale: list[tuple[str, os.stat_result]] = []
+    for path in paths:
+        stat = (root / path).stat()
+        cached = state.hashes.get(path)
+        if cached and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+            digests[path] = cached[2]
+        else:
+            stale.append((path, stat))
+
+    def digest(path: str) -> str:
+        with (root / path).open("rb") as handle:
+            return hashlib.file_digest(handle, "sha256").hexdigest()
+
+    with ThreadPoolExecutor(max_workers=_HASH_WORKERS) as pool:
+        for (path, stat), value in zip(stale, pool.map(digest, [p for p, _ in stale]), strict=True):
+            digests[path] = value
+            state.hashes[path] = [stat.st_size, stat.st_mtime_ns, value]
+    state.hashes = {path: state.hashes[path] for path in paths}
+    return digests
+
+
+def _hash_remote(backend: SandboxBackendProtocol, target: str, paths: list[str]) -> dict[str, str]:
+    """Hash the files that exist under ``target``."""
+    remote_paths = {posixpath.join(target, path): path for path in paths}
+    digests = hash_remote_files(backend, list(remote_paths))
+    return {remote_paths[name]: digest for name, digest in digests.items() if digest is not None}
+
+
+def _batches(root: Path, paths: list[str]) -> list[list[str]]:
+    """Split paths into upload batches of bounded count and size."""
+    batches: list[list[str]] = [[]]
+    size = 0
+    for path in paths:
+        file_size = (root / path).stat().st_size
+        if batches[-1] and (
+            len(batches[-1]) >= SYNC_BATCH_FILES or size + file_size > BUNDLE_MAX_BYTES
+        ):
+            batches.append([])
+            size = 0
+        batches[-1].append(path)
+        size += file_size
+    return [batch for batch in batches if batch]
+
+
+def sync_workspace(
+    backend: SandboxBackendProtocol,
+    local_root: Path,
+    target: str,
+    *,
+    state_dir: Path | None = None,
+) -> SyncResult:
+    """Bring ``target`` in the sandbox up to date with the project at ``local_root``.
+
+    Args:
+        backend: Sandbox to sync into
+        local_root: Local project directory
+        target: Absolute directory in the sandbox
+        state_dir: Directory for the hash cache and sync records
+            (default ``~/.coda/cache/sync``)
+
+    Returns:
+        What was sent, deleted and left alone.
+    """
+    started = time.monotonic()
+    state = _SyncState(local_root, state_dir or settings.user_deepagents_dir / "cache" / "sync")
+    target_key = f"{backend.id}:{target}"
+
+    paths = list_local_files(local_root)
+    local = _hash_local(local_root, paths, state)
+    remote = _hash_remote(backend, target, paths)
+    changed = [path for path in paths if remote.get(path) != local[path]]
+    removed = sorted(set(state.targets.get(target_key, [])) - set(paths))
+
+    result = SyncResult(files=len(paths), unchanged=len(paths) - len(changed))
+    if changed:
+        parents = sorted({posixpath.dirname(posixpath.join(target, path)) for path in changed})
+        run_over_paths(backend, parents, "mkdir -p --")
+    for batch in _batches(local_root, changed):
+        files = [(posixpath.join(target, path), (local_root / path).read_bytes()) for path in batch]
+        for path, (_, content), response in zip(
+            batch, files, backend.upload_files(files), strict=True
+        ):
+            if response.error is None:
+                result.uploaded += 1
+                result.bytes += len(content)
+            else:
+                result.failed[path] = response.error
+
+    executable = [
+        posixpath.join(target, path)
+        for path in changed
+        if path not in result.failed and os.access(local_root / path, os.X_OK)
+    ]
+    if executable:
+        run_over_paths(backend, executable, "chmod +x --")
+    if removed:
+        run_over_paths(backend, [posixpath.join(target, path) for path in removed], "rm -f --")
+        result.deleted = len(removed)
+
+    state.targets[target_key] = paths
+    state.save()
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def print_sync_result(result: SyncResult) -> None:
+    """Print a one-line summary of a sync, and any failures."""
+    console.print(
+        f"[green]✓ Synced {result.files} files in {result.seconds:.1f}s:[/green] "
+        f"{result.uploaded} uploaded ({result.bytes / 1024:.0f} KB), "
+        f"{result.deleted} deleted, {result.unchanged} unchanged"
+    )
+    for path, error in result.failed.items():
+        console.print(f"[yellow]⚠ Failed to upload {path}: {error}[/yellow]")
+
+
+def sync_workspace_command(
+    provider: str, sandbox_id: str, *, path: str | None = None, target: str | None = None
+) -> None:
+    """Sync a local project into an existing sandbox (``coda sandbox sync``).
+
+    Args:
+        provider: Sandbox provider ("modal", "runloop", "daytona", "local")
+        sandbox_id: ID of the running sandbox
+        path: Local project directory (default: current directory)
+        target: Directory in the sandbox (default: the provider's working directory)
+    """
+    from coda_cli.integrations.sandbox_factory import create_sandbox, get_default_working_dir
+
+    local_root = Path(path or Path.cwd())
+    with create_sandbox(provider, sandbox_id=sandbox_id) as backend:
+        target = target or get_default_working_dir(provider, backend)
+        console.print(f"[dim]Syncing {local_root} to {target}...[/dim]")
+        print_sync_result(sync_workspace(backend, local_root, target))
+
+
+__all__ = [
+    "SyncResult",
+    "list_local_files",
+    "print_sync_result",
+    "sync_workspace",
+    "sync_workspace_command",
+]
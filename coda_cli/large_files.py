@@ -0,0 +1,333 @@
+"""Size-aware file reading for previews, diffs and file mentions.
+
+Files above ``LARGE_FILE_BYTES`` are never loaded into a Python string. They
+are memory-mapped instead, so hashing, line counting and slicing a few windows
+out of them costs the same regardless of file size.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from coda_cli.diff_engine import DiffHunk, DiffLine, DiffResult, diff_line_lists
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Files larger than this are summarized or windowed instead of read whole
+LARGE_FILE_BYTES = 2 * 1024 * 1024
+
+# Bytes of head/tail text included in a summarized preview
+PREVIEW_BYTES = 2048
+
+# Bytes inspected for NUL characters when sniffing binary content
+_BINARY_SNIFF_BYTES = 8192
+
+# Chunk size for streaming hashes and newline counts over a mapping
+_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass
+class FileSummary:
+    """Bounded description of a file that is too large or binary to show in full."""
+
+    size: int
+    sha256: str
+    binary: bool
+    line_count: int
+    head: str
+    tail: str
+
+    def describe(self) -> str:
+        """One-line description (size, hash, line count)."""
+        kind = "binary" if self.binary else f"{self.line_count} lines"
+        return f"{_format_size(self.size)}, {kind}, sha256 {self.sha256[:12]}"
+
+    def to_markdown(self) -> str:
+        """Markdown preview with head and tail excerpts for text files."""
+        parts = [f"Size: {_format_size(self.size)}", f"SHA-256: `{self.sha256}`"]
+        if self.binary:
+            parts.append("Binary file (content not shown)")
+            return "\n".join(parts)
+        parts.append(f"Lines: {self.line_count}")
+        parts.append(f"Head:\n```\n{self.head}\n```")
+        if self.tail:
+            parts.append(f"Tail:\n```\n{self.tail}\n```")
+        return "\n".join(parts)
+
+
+_KB = 1024
+_MB = 1024 * 1024
+
+
+def _format_size(size: int) -> str:
+    """Format a byte count for display."""
+    if size >= _MB:
+        return f"{size / _MB:.1f} MB"
+    if size >= _KB:
+        return f"{size / _KB:.1f} KB"
+    return f"{size} B"
+
+
+def file_size(path: Path | None) -> int | None:
+    """Return the size of a file in bytes, or None if it cannot be stat'ed."""
+    if path is None:
+        return None
+    try:
+        return path.stat().st_size
+    except OSError:
+        return None
+
+
+def is_large_file(path: Path | None, limit: int | None = None) -> bool:
+    """Check whether a file exists and exceeds ``limit`` (default LARGE_FILE_BYTES) bytes."""
+    size = file_size(path)
+    return size is not None and size > (LARGE_FILE_BYTES if limit is None else limit)
+
+
+def _is_binary(data: bytes) -> bool:
+    return b"\x00" in data
+
+
+def read_text_limited(path: Path, limit: int | None = None) -> str | None:
+    """Read a text file only if it is small enough and not binary.
+
+    Args:
+        path: File to read
+        limit: Maximum size in bytes (default LARGE_FILE_BYTES)
+
+    Returns:
+        File content, or None if the file is too large, binary or unreadable
+    """
+    size = file_size(path)
+    if size is None or size > (LARGE_FILE_BYTES if limit is None else limit):
+        return None
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if _is_binary(data[:_BINARY_SNIFF_BYTES]):
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _count_newlines(mapped: mmap.mmap, start: int, end: int) -> int:
+    """Count newlines in ``mapped[start:end]`` without copying the whole range."""
+    count = 0
+    view = memoryview(mapped)
+    try:
+        for offset in range(start, end, _CHUNK_BYTES):
+            count += bytes(view[offset : min(offset + _CHUNK_BYTES, end)]).count(b"\n")
+    finally:
+        view.release()
+    return count
+
+
+def summarize_file(path: Path, preview_bytes: int = PREVIEW_BYTES) -> FileSummary | None:
+    """Hash, count and excerpt a file through a memory map.
+
+    Args:
+        path: File to summarize
+        preview_bytes: Bytes of text to keep from the start and end of the file
+
+    Returns:
+        FileSummary, or None if the file cannot be read
+    """
+    try:
+        with path.open("rb") as f:
+            size = path.stat().st_size
+            if size == 0:
+                return FileSummary(
+                    size=0,
+                    sha256=hashlib.sha256(b"").hexdigest(),
+                    binary=False,
+                    line_count=0,
+                    head="",
+                    tail="",
+                )
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest = hashlib.sha256()
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, _CHUNK_BYTES):
+                        digest.update(view[offset : offset + _CHUNK_BYTES])
+                finally:
+                    view.release()
+                binary = _is_binary(mapped[:_BINARY_SNIFF_BYTES])
+                line_count = 0
+                head = tail = ""
+                if not binary:
+                    line_count = _count_newlines(mapped, 0, size)
+                    if mapped[size - 1 : size] != b"\n":
+                        line_count += 1
+                    head = mapped[:preview_bytes].decode("utf-8", errors="replace")
+                    if size > preview_bytes * 2:
+                        tail = mapped[size - preview_bytes :].decode("utf-8", errors="replace")
+                    elif size > preview_bytes:
+                        tail = mapped[preview_bytes:].decode("utf-8", errors="replace")
+    except (OSError, ValueError):
+        return None
+    return FileSummary(
+        size=size,
+        sha256=digest.hexdigest(),
+        binary=binary,
+        line_count=line_count,
+        head=head,
+        tail=tail,
+    )
+
+
+def _window_bounds(mapped: mmap.mmap, start: int, end: int, context_lines: int) -> tuple[int, int]:
+    """Expand a byte range to whole lines plus ``context_lines`` on each side."""
+    # Step back over the start of the current line plus ``context_lines`` lines
+    lo = start
+    for _ in range(context_lines + 1):
+        newline = mapped.rfind(b"\n", 0, lo)
+        if newline < 0:
+            lo = 0
+            break
+        lo = newline
+    else:
+        lo += 1
+    hi = end
+    for _ in range(context_lines + 1):
+        newline = mapped.find(b"\n", hi)
+        if newline < 0:
+            hi = len(mapped)
+            break
+        hi = newline + 1
+    return lo, hi
+
+
+def _offset_hunks(hunks: list[DiffHunk], old_offset: int, new_offset: int) -> list[DiffHunk]:
+    """Shift hunk line numbers from window-relative to file-relative."""
+    shifted = []
+    for hunk in hunks:
+        lines = [
+            DiffLine(
+                line.kind,
+                line.text,
+                line.old_lineno + old_offset if line.old_lineno is not None else None,
+                line.new_lineno + new_offset if line.new_lineno is not None else None,
+            )
+            for line in hunk.lines
+        ]
+        shifted.append(
+            DiffHunk(
+                old_start=hunk.old_start + old_offset,
+                old_count=hunk.old_count,
+                new_start=hunk.new_start + new_offset,
+                new_count=hunk.new_count,
+                lines=lines,
+                replaced=hunk.replaced,
+            )
+        )
+    return shifted
+
+
+def windowed_edit_diff(
+    path: Path,
+    search: str,
+    replacement: str,
+    *,
+    reverse: bool = False,
+    context_lines: int = 3,
+    max_windows: int = 20,
+) -> DiffResult | None:
+    """Diff a string replacement in a large file using only windows around each match.
+
+    The file is memory-mapped and only the lines surrounding each occurrence of
+    ``search`` are decoded, so memory use does not depend on file size.
+
+    Args:
+        path: File to inspect
+        search: Text whose occurrences in the file mark the changed regions
+        replacement: Text that ``search`` is (or was) replaced with
+        reverse: If True the file already contains the edit, i.e. the file is the
+            "after" side and ``replacement`` restores the "before" side
+        context_lines: Unchanged lines kept around each change
+        max_windows: Maximum number of occurrences to include
+
+    Returns:
+        DiffResult for the windows, or None if the file cannot be mapped or
+        ``search`` is empty or not found
+    """
+    needle = search.encode("utf-8")
+    if not needle:
+        return None
+    try:
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _windowed_diff(
+                mapped,
+                needle,
+                search,
+                replacement,
+                reverse=reverse,
+                context_lines=context_lines,
+                max_windows=max_windows,
+            )
+    except (OSError, ValueError):
+        return None
+
+
+def _windowed_diff(
+    mapped: mmap.mmap,
+    needle: bytes,
+    search: str,
+    replacement: str,
+    *,
+    reverse: bool,
+    context_lines: int,
+    max_windows: int,
+) -> DiffResult | None:
+    # Collect occurrences and merge their line windows
+    windows: list[list[int]] = []
+    position = mapped.find(needle)
+    while position >= 0 and len(windows) < max_windows:
+        lo, hi = _window_bounds(mapped, position, position + len(needle), context_lines)
+        if windows and lo <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], hi)
+        else:
+            windows.append([lo, hi])
+        position = mapped.find(needle, position + len(needle))
+    if not windows:
+        return None
+
+    line_delta = replacement.count("\n") - search.count("\n")
+    hunks: list[DiffHunk] = []
+    counted_to = 0
+    line_before_window = 0
+    occurrences_before = 0
+    for lo, hi in windows:
+        line_before_window += _count_newlines(mapped, counted_to, lo)
+        counted_to = lo
+        current = mapped[lo:hi].decode("utf-8", errors="replace")
+        other = current.replace(search, replacement)
+        current_lines = current.splitlines()
+        other_lines = other.splitlines()
+        # Line numbers on the other side shift by the edits made above this window
+        other_offset = line_before_window + occurrences_before * line_delta
+        if reverse:
+            window_hunks = diff_line_lists(other_lines, current_lines, context_lines=context_lines)
+            hunks.extend(_offset_hunks(window_hunks, other_offset, line_before_window))
+        else:
+            window_hunks = diff_line_lists(current_lines, other_lines, context_lines=context_lines)
+            hunks.extend(_offset_hunks(window_hunks, line_before_window, other_offset))
+        occurrences_before += current.count(search)
+    return DiffResult.from_hunks(hunks)
+
+
+__all__ = [
+    "LARGE_FILE_BYTES",
+    "FileSummary",
+    "is_large_file",
+    "read_text_limited",
+    "summarize_file",
+    "windowed_edit_diff",
+]
@@ -17,7 +17,13 @@ from coda_cli.config import (
     create_model,
     settings,
 )
-from coda_cli.integrations.sandbox_factory import create_sandbox
+from coda_cli.integrations.sandbox_factory import acreate_sandbox, get_default_working_dir
+from coda_cli.integrations.workspace_sync import (
+    print_sync_result,
+    sync_workspace,
+    sync_workspace_command,
+)
+from coda_cli.process_limits import ResourceLimits
 from coda_cli.sessions import (
     delete_thread_command,
     generate_thread_id,
@@ -28,7 +34,12 @@ from coda_cli.sessions import (
     thread_exists,
 )
 from coda_cli.skills import execute_skills_command, setup_skills_parser
-from coda_cli.tools import fetch_url, http_request, web_search
+from coda_cli.tools import (
+    fetch_url_tool,
+    fetch_urls_tool,
+    http_request_tool,
+    web_search_tool,
+)
 from coda_cli.ui import show_help
 
 
@@ -107,6 +118,31 @@ def parse_args() -> argparse.Namespace:
     threads_delete = threads_sub.add_parser("delete", help="Delete a thread")
     threads_delete.add_argument("thread_id", help="Thread ID to delete")
 
+    # Sandbox command
+    sandbox_parser = subparsers.add_parser("sandbox", help="Work with remote sandboxes")
+    sandbox_sub = sandbox_parser.add_subparsers(dest="sandbox_command")
+
+    # sandbox sync
+    sandbox_sync = sandbox_sub.add_parser(
+        "sync", help="Upload local changes into a running sandbox (honors .gitignore)"
+    )
+    sandbox_sync.add_argument(
+        "--sandbox",
+        dest="provider",
+        choices=["modal", "daytona", "runloop", "local"],
+        required=True,
+        help="Sandbox provider",
+    )
+    sandbox_sync.add_argument("--sandbox-id", required=True, help="ID of the running sandbox")
+    sandbox_sync.add_argument(
+        "--path", default=None, help="Local project directory (default: current directory)"
+    )
+    sandbox_sync.add_argument(
+        "--target",
+        default=None,
+        help="Directory in the sandbox (default: the provider's working directory)",
+    )
+
     # Default interactive mode
     parser.add_argument(
         "--agent",
@@ -135,9 +171,32 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Auto-approve tool usage without prompting (disables human-in-the-loop)",
     )
+    parser.add_argument(
+        "--persistent-shell",
+        action="store_true",
+        help="Run local shell commands in one persistent bash session (keeps cd/export)",
+    )
+    parser.add_argument(
+        "--cache-shell-reads",
+        action="store_true",
+        help="Reuse results of repeated read-only shell commands until files change",
+    )
+    parser.add_argument(
+        "--shell-limits",
+        type=ResourceLimits.parse,
+        metavar="SPEC",
+        help="Resource limits for local shell commands, e.g. cpu=60,memory=4096,files=1024,nice=10 "
+        "(cpu in seconds, memory in MB)",
+    )
+    parser.add_argument(
+        "--shell-concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of local shell commands running at once (default: 4)",
+    )
     parser.add_argument(
         "--sandbox",
-        choices=["none", "modal", "daytona", "runloop"],
+        choices=["none", "modal", "daytona", "runloop", "local"],
         default="none",
         help="Remote sandbox for code execution (default: none - local only)",
     )
@@ -149,6 +208,25 @@ def parse_args() -> argparse.Namespace:
         "--sandbox-setup",
         help="Path to setup script to run in sandbox after creation",
     )
+    parser.add_argument(
+        "--sandbox-pool",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Keep N warm sandboxes between sessions and lease one at startup (default: 0 - off)",
+    )
+    parser.add_argument(
+        "--sandbox-pool-ttl",
+        type=float,
+        default=30,
+        metavar="MINUTES",
+        help="Tear down pooled sandboxes idle longer than this (default: 30)",
+    )
+    parser.add_argument(
+        "--sandbox-sync",
+        action="store_true",
+        help="Sync the current directory into the sandbox's working directory at startup",
+    )
     return parser.parse_args()
 
 
@@ -158,20 +236,36 @@ async def run_textual_cli_async(
     auto_approve: bool = False,
     sandbox_type: str = "none",
     sandbox_id: str | None = None,
+    sandbox_setup: str | None = None,
+    sandbox_pool: int = 0,
+    sandbox_pool_ttl: float = 30,
+    sandbox_sync: bool = False,
     model_name: str | None = None,
     thread_id: str | None = None,
     is_resumed: bool = False,
+    persistent_shell: bool = False,
+    cache_shell_reads: bool = False,
+    shell_limits: ResourceLimits | None = None,
+    shell_concurrency: int = 4,
 ) -> None:
     """Run the Textual CLI interface (async version).
 
     Args:
         assistant_id: Agent identifier for memory storage
         auto_approve: Whether to auto-approve tool usage
-        sandbox_type: Type of sandbox ("none", "modal", "runloop", "daytona")
+        sandbox_type: Type of sandbox ("none", "modal", "runloop", "daytona", "local")
         sandbox_id: Optional existing sandbox ID to reuse
+        sandbox_setup: Optional path to a setup script to run in the sandbox after creation
+        sandbox_pool: Number of warm sandboxes to keep between sessions (0 disables the pool)
+        sandbox_pool_ttl: Minutes a pooled sandbox may stay idle before it is torn down
+        sandbox_sync: Whether to sync the current directory into the sandbox at startup
         model_name: Optional model name to use
         thread_id: Thread ID to use (new or resumed)
         is_resumed: Whether this is a resumed session
+        persistent_shell: Whether local shell commands share one bash session
+        cache_shell_reads: Whether repeated read-only shell commands are cached
+        shell_limits: Optional resource limits for local shell commands
+        shell_concurrency: Maximum number of local shell commands running at once
     """
     from coda_cli.app import run_textual_app
 
@@ -186,9 +280,9 @@ async def run_textual_cli_async(
     # Use async context manager for checkpointer
     async with get_checkpointer() as checkpointer:
         # Create agent with conditional tools
-        tools = [http_request, fetch_url]
+        tools = [http_request_tool, fetch_url_tool, fetch_urls_tool]
         if settings.has_tavily:
-            tools.append(web_search)
+            tools.append(web_search_tool)
 
         # Handle sandbox mode
         sandbox_backend = None
@@ -197,8 +291,14 @@ async def run_textual_cli_async(
         if sandbox_type != "none":
             try:
                 # Create sandbox context manager but keep it open
-                sandbox_cm = create_sandbox(sandbox_type, sandbox_id=sandbox_id)
-                sandbox_backend = sandbox_cm.__enter__()
+                sandbox_cm = acreate_sandbox(
+                    sandbox_type,
+                    sandbox_id=sandbox_id,
+                    setup_script_path=sandbox_setup,
+                    pool_size=sandbox_pool,
+                    pool_max_idle_seconds=sandbox_pool_ttl * 60,
+                )
+                sandbox_backend = await sandbox_cm.__aenter__()
             except (ImportError, ValueError, RuntimeError, NotImplementedError) as e:
                 console.print()
                 console.print("[red]❌ Sandbox creation failed[/red]")
@@ -206,6 +306,21 @@ async def run_textual_cli_async(
                 sys.exit(1)
 
         try:
+            # Inside the try so the sandbox is released if the sync fails
+            if sandbox_sync and sandbox_backend is not None:
+                try:
+                    target = get_default_working_dir(sandbox_type, sandbox_backend)
+                    console.print(f"[dim]Syncing {Path.cwd()} to {target}...[/dim]")
+                    result = await asyncio.to_thread(
+                        sync_workspace, sandbox_backend, Path.cwd(), target
+                    )
+                except (OSError, ValueError, RuntimeError) as e:
+                    console.print()
+                    console.print("[red]❌ Workspace sync failed[/red]")
+                    console.print(f"[dim]{e}[/dim]")
+                    sys.exit(1)
+                print_sync_result(result)
+
             agent, composite_backend = create_cli_agent(
                 model=model,
                 assistant_id=assistant_id,
@@ -214,6 +329,10 @@ async def run_textual_cli_async(
                 sandbox_type=sandbox_type if sandbox_type != "none" else None,
                 auto_approve=auto_approve,
                 checkpointer=checkpointer,
+                persistent_shell=persistent_shell,
+                cache_shell_reads=cache_shell_reads,
+                shell_limits=shell_limits,
+                shell_concurrency=shell_concurrency,
             )
 
             # Run Textual app
@@ -232,7 +351,7 @@ async def run_textual_cli_async(
             # Clean up sandbox if we created one
             if sandbox_cm is not None:
                 with contextlib.suppress(Exception):
-                    sandbox_cm.__exit__(None, None, None)
+                    await sandbox_cm.__aexit__(None, None, None)
 
 
 def cli_main() -> None:
@@ -272,6 +391,19 @@ def cli_main() -> None:
                 asyncio.run(delete_thread_command(args.thread_id))
             else:
                 console.print("[yellow]Usage: coda threads <list|delete>[/yellow]")
+        elif args.command == "sandbox":
+            if args.sandbox_command == "sync":
+                try:
+                    sync_workspace_command(
+                        args.provider, args.sandbox_id, path=args.path, target=args.target
+                    )
+                except (ImportError, ValueError, RuntimeError, NotImplementedError) as e:
+                    console.print(f"[red]❌ Sandbox sync failed: {e}[/red]")
+                    sys.exit(1)
+            else:
+                console.print(
+                    "[yellow]Usage: coda sandbox sync --sandbox TYPE --sandbox-id ID[/yellow]"
+                )
         else:
             # Interactive mode - handle thread resume
             thread_id = None
@@ -322,9 +454,17 @@ def cli_main() -> None:
                     auto_approve=args.auto_approve,
                     sandbox_type=args.sandbox,
                     sandbox_id=args.sandbox_id,
+                    sandbox_setup=args.sandbox_setup,
+                    sandbox_pool=args.sandbox_pool,
+                    sandbox_pool_ttl=args.sandbox_pool_ttl,
+                    sandbox_sync=args.sandbox_sync,
                     model_name=getattr(args, "model", None),
                     thread_id=thread_id,
                     is_resumed=is_resumed,
+                    persistent_shell=args.persistent_shell,
+                    cache_shell_reads=args.cache_shell_reads,
+                    shell_limits=args.shell_limits,
+                    shell_concurrency=args.shell_concurrency,
                 )
             )
     except KeyboardInterrupt:
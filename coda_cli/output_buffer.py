@@ -0,0 +1,158 @@
+"""Bounded buffers for command output."""
+
+from __future__ import annotations
+
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+from typing import IO
+
+# Path prefix under which the agent's file backend serves the spill directory
+SPILL_ROUTE = "/.coda-output/"
+
+_session_spill_dir: Path | None = None
+
+
+def session_spill_dir() -> Path:
+    """Return this process's directory for spilled command output, creating it on first use.
+
+    The directory lives under the system temp dir and is removed when the
+    process exits.
+    """
+    global _session_spill_dir  # noqa: PLW0603
+    if _session_spill_dir is None:
+        _session_spill_dir = Path(tempfile.mkdtemp(prefix="coda-output-"))
+        atexit.register(shutil.rmtree, _session_spill_dir, ignore_errors=True)
+    return _session_spill_dir
+
+
+def elision_marker(elided_bytes: int, total_bytes: int) -> str:
+    """Return the note placed where the middle of a long output was dropped."""
+    return (
+        f"\n\n... Output truncated: {elided_bytes} of {total_bytes} bytes "
+        f"omitted from the middle ...\n\n"
+    )
+
+
+class HeadTailBuffer:
+    """Keep the first and last bytes of a stream and drop the middle.
+
+    Memory stays bounded by ``max_bytes`` no matter how much is written, so a
+    command that prints gigabytes still yields its opening lines (usually the
+    invocation and setup) and its closing lines (usually the errors and summary).
+    With a ``spill_path`` the complete stream is also written to that file once
+    it outgrows ``max_bytes``, so nothing is lost.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        *,
+        head_fraction: float = 0.5,
+        spill_path: Path | None = None,
+        spill_display_path: str | None = None,
+    ) -> None:
+        """Initialize the buffer.
+
+        Args:
+            max_bytes: Maximum number of bytes retained across head and tail
+            head_fraction: Share of ``max_bytes`` reserved for the head
+            spill_path: File receiving the full output if it exceeds ``max_bytes``
+            spill_display_path: Path the reader should use to open the spill file,
+                when it differs from ``spill_path`` (e.g. a backend route)
+        """
+        self.max_bytes = max(max_bytes, 0)
+        self._head_cap = int(self.max_bytes * head_fraction)
+        self._tail_cap = self.max_bytes - self._head_cap
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total_bytes = 0
+        self.total_lines = 0
+        self._ends_with_newline = True
+        self.spill_path = spill_path
+        self.spill_display_path = spill_display_path
+        self._spill: IO[bytes] | None = None
+        self.spilled = False
+
+    def write(self, data: bytes) -> None:
+        """Append a chunk of output."""
+        if not data:
+            return
+        if self.spill_path is not None and self.total_bytes + len(data) > self.max_bytes:
+            self._write_spill(data)
+        self.total_bytes += len(data)
+        self.total_lines += data.count(b"\n")
+        self._ends_with_newline = data.endswith(b"\n")
+        room = self._head_cap - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if not data or not self._tail_cap:
+            return
+        if len(data) >= self._tail_cap:
+            self._tail[:] = data[-self._tail_cap :]
+        else:
+            self._tail += data
+            overflow = len(self._tail) - self._tail_cap
+            if overflow > 0:
+                del self._tail[:overflow]
+
+    def _write_spill(self, data: bytes) -> None:
+        if self._spill is None:
+            if self.spilled:
+                return
+            try:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self._spill = self.spill_path.open("wb")
+            except OSError:
+                # Spilling is best effort; fall back to plain head+tail truncation
+                self.spill_path = None
+                return
+            self.spilled = True
+            # Nothing has been dropped yet, so head + tail is the stream so far
+            self._spill.write(self._head)
+            self._spill.write(self._tail)
+        self._spill.write(data)
+
+    def close(self) -> None:
+        """Close the spill file, if one was opened."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines written, counting a final unterminated line."""
+        if self.total_bytes and not self._ends_with_newline:
+            return self.total_lines + 1
+        return self.total_lines
+
+    @property
+    def elided_bytes(self) -> int:
+        """Number of bytes dropped from the middle of the stream."""
+        return self.total_bytes - len(self._head) - len(self._tail)
+
+    @property
+    def truncated(self) -> bool:
+        """Whether any output was dropped."""
+        return self.elided_bytes > 0
+
+    def getvalue(self, encoding: str = "utf-8") -> str:
+        """Decode the retained output, marking where the middle was elided."""
+        head = self._head.decode(encoding, errors="replace")
+        tail = self._tail.decode(encoding, errors="replace")
+        if not self.truncated:
+            return head + tail
+        marker = elision_marker(self.elided_bytes, self.total_bytes)
+        if self.spilled:
+            location = self.spill_display_path or self.spill_path
+            marker += (
+                f"[Full output ({self.line_count} lines) saved to {location}. "
+                f"Use read_file with offset/limit to page through it instead of "
+                f"re-running the command.]\n\n"
+            )
+        return f"{head}{marker}{tail}"
+
+
+__all__ = ["SPILL_ROUTE", "HeadTailBuffer", "elision_marker", "session_spill_dir"]
@@ -0,0 +1,168 @@
+"""Resource limits and usage accounting for local shell commands."""
+
+from __future__ import annotations
+
+import asyncio
+import resource
+import sys
+import threading
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+# Extra CPU seconds between SIGXCPU (soft limit) and SIGKILL (hard limit)
+_CPU_GRACE_SECONDS = 5
+
+_MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """POSIX rlimits and scheduling priority applied to each shell command.
+
+    Limits are applied to the shell process before it runs the command and are
+    inherited by everything it starts. A limit above the current hard limit is
+    clamped to it.
+
+    Attributes:
+        cpu_seconds: CPU time per process; exceeding it sends SIGXCPU
+        memory_bytes: Address space per process (`RLIMIT_AS`); allocations beyond
+            it fail
+        open_files: Maximum number of open file descriptors per process
+        nice: Increment added to the scheduling niceness (higher is lower priority)
+    """
+
+    cpu_seconds: int | None = None
+    memory_bytes: int | None = None
+    open_files: int | None = None
+    nice: int | None = None
+
+    @classmethod
+    def parse(cls, spec: str) -> ResourceLimits:
+        """Parse a spec such as ``"cpu=60,memory=4096,files=1024,nice=10"``.
+
+        ``cpu`` is in seconds and ``memory`` in megabytes.
+
+        Raises:
+            ValueError: If the spec has an unknown key or a non-integer value.
+        """
+        keys = {
+            "cpu": "cpu_seconds",
+            "memory": "memory_bytes",
+            "files": "open_files",
+            "nice": "nice",
+        }
+        values: dict[str, int] = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, raw = item.partition("=")
+            field = keys.get(key.strip())
+            if field is None:
+                msg = f"Unknown resource limit {key!r}; expected one of {', '.join(keys)}"
+                raise ValueError(msg)
+            value = int(raw)
+            values[field] = value * _MB if field == "memory_bytes" else value
+        return cls(**values)
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether no limit is set."""
+        return all(getattr(self, field.name) is None for field in fields(self))
+
+    def command_prefix(self) -> list[str]:
+        """Return the argv prefix that starts the shell at the configured niceness."""
+        return ["nice", "-n", str(self.nice)] if self.nice else []
+
+    def ulimit_script(self) -> str:
+        """Return ``ulimit`` commands that apply the rlimits to the running shell.
+
+        Limits are set in the child shell itself rather than from a
+        ``preexec_fn``, which is unsafe to run after forking a threaded
+        process. Each soft limit is lowered before its hard limit so the pair
+        stays valid at every step.
+        """
+        lines = []
+        for flag, limit, value, grace, unit in (
+            ("t", resource.RLIMIT_CPU, self.cpu_seconds, _CPU_GRACE_SECONDS, 1),
+            ("v", resource.RLIMIT_AS, self.memory_bytes, 0, 1024),
+            ("n", resource.RLIMIT_NOFILE, self.open_files, 0, 1),
+        ):
+            if value is None:
+                continue
+            _, hard = resource.getrlimit(limit)
+            if hard == resource.RLIM_INFINITY:
+                soft, hard = value, value + grace
+            else:
+                soft = min(value, hard)
+                hard = min(soft + grace, hard)
+            lines.append(f"ulimit -S -{flag} {soft // unit} && ulimit -H -{flag} {hard // unit}\n")
+        return "".join(lines)
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    """CPU time and peak memory used by a finished command and its children."""
+
+    user_seconds: float
+    system_seconds: float
+    max_rss_bytes: int
+
+    @classmethod
+    def from_rusage(cls, usage: resource.struct_rusage) -> ResourceUsage:
+        """Convert a `resource.struct_rusage` (from `getrusage` or `os.wait4`)."""
+        # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return cls(
+            user_seconds=usage.ru_utime,
+            system_seconds=usage.ru_stime,
+            max_rss_bytes=usage.ru_maxrss * scale,
+        )
+
+    def describe(self) -> str:
+        """Return a one-line human-readable summary."""
+        return (
+            f"CPU {self.user_seconds:.2f}s user + {self.system_seconds:.2f}s system, "
+            f"peak memory {self.max_rss_bytes / _MB:.1f} MB"
+        )
+
+
+class ConcurrencyLimiter:
+    """Async context manager capping how many commands run at once.
+
+    Backed by a thread semaphore so the cap holds across event loops: the
+    shell's sync tool path runs on a background loop of its own.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize the limiter.
+
+        Args:
+            limit: Maximum number of holders at once (at least 1)
+        """
+        self.limit = max(limit, 1)
+        self._semaphore = threading.BoundedSemaphore(self.limit)
+
+    async def __aenter__(self) -> None:
+        """Wait for a free slot without blocking the event loop."""
+        if self._semaphore.acquire(blocking=False):
+            return
+        waiter = asyncio.ensure_future(asyncio.to_thread(self._semaphore.acquire))
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # The worker thread still takes the slot eventually; give it back
+            waiter.add_done_callback(lambda _: self._semaphore.release())
+            raise
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Release the slot."""
+        self._semaphore.release()
+
+
+__all__ = ["ConcurrencyLimiter", "ResourceLimits", "ResourceUsage"]
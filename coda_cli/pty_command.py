@@ -0,0 +1,189 @@
+"""Run user `!` commands under a pseudo-terminal and keep a bounded scrollback."""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import contextlib
+import fcntl
+import os
+import pty
+import re
+import signal
+import struct
+import subprocess
+import termios
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Bytes read from the PTY per wakeup
+_READ_CHUNK_BYTES = 64 * 1024
+
+# How long to keep reading after the shell exits, for output still in flight
+_DRAIN_SECONDS = 0.2
+
+# Cursor movement, erase and other control sequences that do not set colors
+_NON_SGR_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-ln-z]|\x1b\][^\x07]*\x07|\x1b[()][A-Z0-9]")
+
+
+class TerminalScrollback:
+    """The last lines written to a terminal, with carriage returns applied.
+
+    Progress bars that redraw a line with carriage returns collapse to their
+    latest state, and only ``max_lines`` complete lines are kept, so memory and
+    render cost stay flat however much a command prints.
+    """
+
+    def __init__(self, max_lines: int = 2000, max_line_chars: int = 4096) -> None:
+        """Initialize the scrollback.
+
+        Args:
+            max_lines: Number of complete lines kept
+            max_line_chars: Longest line kept; longer lines keep their end
+        """
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self._max_line_chars = max_line_chars
+        self._current = ""
+        self.dropped_lines = 0
+
+    def write(self, text: str) -> None:
+        """Append terminal output."""
+        text = _NON_SGR_ESCAPE.sub("", text.replace("\r\n", "\n"))
+        *complete, self._current = (self._current + text).split("\n")
+        for line in complete:
+            if len(self._lines) == self._lines.maxlen:
+                self.dropped_lines += 1
+            self._lines.append(self._redraw(line))
+        self._current = self._current[-self._max_line_chars :]
+
+    def _redraw(self, line: str) -> str:
+        # A carriage return moves back to column 0; what follows overwrites the line
+        if "\r" in line:
+            segments = [segment for segment in line.split("\r") if segment]
+            line = segments[-1] if segments else ""
+        return line[-self._max_line_chars :]
+
+    @property
+    def lines(self) -> list[str]:
+        """Kept lines, including the unterminated last line if any."""
+        current = self._redraw(self._current)
+        return [*self._lines, current] if current else list(self._lines)
+
+    def text(self) -> str:
+        """Kept output as one string."""
+        return "\n".join(self.lines)
+
+
+class PtyCommand:
+    """A shell command attached to a pseudo-terminal.
+
+    Programs see a TTY, so they line-buffer, show colors and draw progress as in
+    a real terminal. Output is delivered to ``on_output`` as it is produced.
+    There is no timeout; call `interrupt` to send Ctrl+C.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        *,
+        cwd: str,
+        on_output: Callable[[str], None],
+        columns: int = 120,
+        rows: int = 40,
+    ) -> None:
+        """Initialize the command.
+
+        Args:
+            command: Shell command line
+            cwd: Working directory
+            on_output: Called with decoded output chunks on the event loop
+            columns: Terminal width reported to the command
+            rows: Terminal height reported to the command
+        """
+        self.command = command
+        self._cwd = cwd
+        self._on_output = on_output
+        self._size = (rows, columns)
+        self._process: subprocess.Popen[bytes] | None = None
+        self.interrupted = False
+
+    async def run(self) -> int:
+        """Run the command to completion and return its exit code.
+
+        Cancelling the task kills the command and everything it started.
+        """
+        master, slave = pty.openpty()
+        rows, columns = self._size
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+        env = {**os.environ, "PAGER": "cat", "GIT_PAGER": "cat", "COLUMNS": str(columns)}
+        try:
+            self._process = subprocess.Popen(  # noqa: S602, ASYNC220 - user-typed command
+                self.command,
+                shell=True,
+                stdin=subprocess.DEVNULL,
+                stdout=slave,
+                stderr=slave,
+                cwd=self._cwd,
+                env=env,
+                start_new_session=True,
+            )
+        except OSError:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+
+        loop = asyncio.get_running_loop()
+        eof = loop.create_future()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        def on_readable() -> None:
+            try:
+                data = os.read(master, _READ_CHUNK_BYTES)
+            except OSError:
+                # EIO once every process holding the terminal has closed it
+                data = b""
+            if not data:
+                loop.remove_reader(master)
+                if not eof.done():
+                    eof.set_result(None)
+                return
+            text = decoder.decode(data)
+            if text:
+                self._on_output(text)
+
+        loop.add_reader(master, on_readable)
+        try:
+            returncode = await asyncio.to_thread(self._process.wait)
+            # Background jobs may keep the terminal open; stop reading shortly after
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(asyncio.shield(eof), _DRAIN_SECONDS)
+        except asyncio.CancelledError:
+            self._signal(signal.SIGKILL)
+            raise
+        finally:
+            loop.remove_reader(master)
+            os.close(master)
+        return returncode
+
+    @property
+    def running(self) -> bool:
+        """Whether the command has started and not yet exited."""
+        return self._process is not None and self._process.poll() is None
+
+    def interrupt(self) -> None:
+        """Send SIGINT (Ctrl+C) to the command's process group."""
+        self.interrupted = True
+        self._signal(signal.SIGINT)
+
+    def _signal(self, signum: int) -> None:
+        if self._process is None or self._process.returncode is not None:
+            return
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(self._process.pid, signum)
+
+
+__all__ = ["PtyCommand", "TerminalScrollback"]
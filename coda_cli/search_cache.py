@@ -0,0 +1,256 @@
+"""Cache and request coalescing for `web_search`.
+
+Subagents working in parallel often search for the same thing. Results are
+kept under ``~/.coda/cache/search`` for a while (shorter for news and
+finance, whose results go stale quickly), keyed on the normalized query and
+the parameters that change what Tavily returns. Identical searches that
+start while one is already in flight wait for it instead of spending
+another API call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from coda_cli.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+# Seconds a result is reused, by topic
+DEFAULT_TTL_SECONDS = 60 * 60
+_TOPIC_TTL_SECONDS = {"news": 10 * 60, "finance": 10 * 60}
+
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def normalize_query(query: str) -> str:
+    """Fold case and whitespace so trivially different queries share an entry."""
+    return " ".join(query.casefold().split())
+
+
+def search_key(query: str, *, max_results: int, topic: str, include_raw_content: bool) -> str:
+    """Return the cache key for a search and the parameters that shape its results."""
+    payload = json.dumps([normalize_query(query), max_results, topic, include_raw_content])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def search_ttl(topic: str) -> float:
+    """Seconds a result for ``topic`` stays fresh."""
+    return _TOPIC_TTL_SECONDS.get(topic, DEFAULT_TTL_SECONDS)
+
+
+@dataclass
+class SearchCacheStats:
+    """Counters for one `SearchCache` in this process.
+
+    Attributes:
+        hits: Searches answered from the cache
+        shared: Searches that waited for an identical one already in flight
+        misses: Searches that called the API
+    """
+
+    hits: int = 0
+    shared: int = 0
+    misses: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+class SearchCache:
+    """Search results on disk, with identical concurrent searches coalesced.
+
+    Each entry is a JSON file named after its key, written through a temporary
+    file and ``os.replace`` so several CLI processes can share the directory.
+    Coalescing works across threads (sync tool calls) and event loops (async
+    ones) of this process.
+    """
+
+    def __init__(self, directory: Path, *, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the entries (created on first write)
+            max_entries: Number of entries above which the oldest are deleted
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.stats = SearchCacheStats()
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future[dict[str, Any]]] = {}
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the fresh result stored under ``key``, if any."""
+        try:
+            entry = json.loads((self.directory / f"{key}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or time.time() >= entry.get("expires_at", 0):
+            return None
+        return entry.get("result")
+
+    def put(self, key: str, result: dict[str, Any], ttl: float) -> None:
+        """Store a result for ``ttl`` seconds."""
+        now = time.time()
+        data = json.dumps({"stored_at": now, "expires_at": now + ttl, "result": result})
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    handle.write(data)
+                Path(tmp).replace(self.directory / f"{key}.json")
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        except OSError:
+            return
+        self._evict()
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def search(
+        self, key: str, ttl: float, call: Callable[[], dict[str, Any]]
+    ) -> tuple[dict[str, Any], str]:
+        """Return the cached result for ``key``, or run ``call`` once for all waiters.
+
+        Returns:
+            The result, and ``"hit"``, ``"shared"`` or ``"miss"``.
+        """
+        result = self.get(key)
+        if result is not None:
+            self.stats.hits += 1
+            return result, "hit"
+        future, owner = self._claim(key)
+        if not owner:
+            self.stats.shared += 1
+            return future.result(), "shared"
+        if (result := self._get_claimed(key, future)) is not None:
+            return result, "hit"
+        try:
+            result = call()
+        except BaseException as exc:
+            self._settle(key, future, error=exc)
+            raise
+        self.stats.misses += 1
+        self.put(key, result, ttl)
+        self._settle(key, future, result=result)
+        return result, "miss"
+
+    async def asearch(
+        self, key: str, ttl: float, call: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> tuple[dict[str, Any], str]:
+        """Async variant of `search`."""
+        result = self.get(key)
+        if result is not None:
+            self.stats.hits += 1
+            return result, "hit"
+        future, owner = self._claim(key)
+        if not owner:
+            self.stats.shared += 1
+            # Shielded: a cancelled waiter must not cancel the search others wait on
+            return await asyncio.shield(asyncio.wrap_future(future)), "shared"
+        if (result := self._get_claimed(key, future)) is not None:
+            return result, "hit"
+        try:
+            result = await call()
+        except BaseException as exc:
+            self._settle(key, future, error=exc)
+            raise
+        self.stats.misses += 1
+        self.put(key, result, ttl)
+        self._settle(key, future, result=result)
+        return result, "miss"
+
+    def _claim(self, key: str) -> tuple[Future[dict[str, Any]], bool]:
+        """Return the in-flight future for ``key`` and whether the caller must run it."""
+        with self._lock:
+            if key in self._in_flight:
+                return self._in_flight[key], False
+            future: Future[dict[str, Any]] = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def _get_claimed(self, key: str, future: Future[dict[str, Any]]) -> dict[str, Any] | None:
+        """Check the cache again once claimed, in case a search just finished storing it."""
+        result = self.get(key)
+        if result is not None:
+            self.stats.hits += 1
+            self._settle(key, future, result=result)
+        return result
+
+    def _settle(
+        self,
+        key: str,
+        future: Future[dict[str, Any]],
+        *,
+        result: dict[str, Any] | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is None:
+            future.set_result(result or {})
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # Waiters were not cancelled themselves; give them an error, not a cancellation
+            msg = "The identical search this one waited for was cancelled"
+            future.set_exception(RuntimeError(msg))
+
+    def _entries(self) -> list[Path]:
+        try:
+            return list(self.directory.glob("*.json"))
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        """Delete the oldest entries until at most ``max_entries`` remain."""
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        with self._lock:
+            dated = []
+            for path in entries:
+                with contextlib.suppress(OSError):
+                    dated.append((path.stat().st_mtime, path))
+            dated.sort()
+            for _, path in dated[: len(dated) - self.max_entries]:
+                path.unlink(missing_ok=True)
+
+
+_cache: SearchCache | None = None
+
+
+def get_search_cache() -> SearchCache:
+    """Return the shared cache under ``~/.coda/cache/search``."""
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        _cache = SearchCache(settings.user_deepagents_dir / "cache" / "search")
+    return _cache
+
+
+__all__ = [
+    "SearchCache",
+    "SearchCacheStats",
+    "get_search_cache",
+    "normalize_query",
+    "search_key",
+    "search_ttl",
+]
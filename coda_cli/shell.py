@@ -2,15 +2,43 @@
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+import contextlib
 import os
+import re
+import shlex
+import shutil
+import signal
 import subprocess
-from typing import Any
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
 
 from langchain.agents.middleware.types import AgentMiddleware, AgentState
-from langchain.tools import ToolRuntime, tool
+from langchain.tools import ToolRuntime  # noqa: TC002 - resolved at runtime for injection
 from langchain_core.messages import ToolMessage
+from langchain_core.tools import StructuredTool
 from langchain_core.tools.base import ToolException
 
+from coda_cli.command_cache import CommandCache, fingerprint, is_cacheable_command
+from coda_cli.output_buffer import HeadTailBuffer, session_spill_dir
+from coda_cli.process_limits import ConcurrencyLimiter, ResourceLimits, ResourceUsage
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from langchain.agents.middleware.types import ToolCallRequest
+    from langgraph.types import Command, StreamWriter
+
+# Bytes read from a subprocess pipe per iteration
+_READ_CHUNK_BYTES = 64 * 1024
+
+# Tool calls that modify files and so invalidate cached command output
+_WRITE_TOOLS = {"write_file", "edit_file"}
+
 
 class ShellMiddleware(AgentMiddleware[AgentState, Any]):
     """Give basic shell access to CoDA Code via the shell.
@@ -26,6 +54,14 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
         timeout: float = 120.0,
         max_output_bytes: int = 100_000,
         env: dict[str, str] | None = None,
+        persistent_session: bool = False,
+        spill_outputs: bool = True,
+        spill_dir: str | Path | None = None,
+        spill_route: str | None = None,
+        cache_read_only: bool = False,
+        max_concurrency: int = 4,
+        resource_limits: ResourceLimits | None = None,
+        report_usage: bool = False,
     ) -> None:
         """Initialize an instance of `ShellMiddleware`.
 
@@ -33,10 +69,36 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
             workspace_root: Working directory for shell commands.
             timeout: Maximum time in seconds to wait for command completion.
                 Defaults to 120 seconds.
-            max_output_bytes: Maximum number of bytes to capture from command output.
-                Defaults to 100,000 bytes.
+            max_output_bytes: Maximum number of bytes of command output to keep. Longer
+                output keeps its head and tail with the middle elided. Defaults to
+                100,000 bytes.
             env: Environment variables to pass to the subprocess. If None,
                 uses the current process's environment. Defaults to None.
+            persistent_session: Run every command in one long-lived bash process so
+                `cd`, `export` and virtualenv activation carry over between calls.
+                The session is restarted (keeping only the working directory) if a
+                command times out or exits the shell. Defaults to False.
+            spill_outputs: Save the complete output of commands that exceed
+                `max_output_bytes` to a file the agent can page through with
+                `read_file`. Defaults to True.
+            spill_dir: Directory for spilled output. Defaults to a temporary
+                directory removed when the process exits.
+            spill_route: Path prefix under which the agent's file backend serves
+                `spill_dir`. Spilled files are reported under this prefix so
+                `read_file` can open them. Defaults to None (report the real path).
+            cache_read_only: Serve repeats of allowlisted read-only commands
+                (`git status`, `ls`, `cat`, `pip list`, ...) from memory while the
+                paths they touch are unchanged. Any `write_file`/`edit_file` call or
+                other shell command clears the cache. Defaults to False.
+            max_concurrency: Maximum number of commands running at once when the
+                model issues several shell calls in one turn; further calls wait for
+                a free slot. Defaults to 4.
+            resource_limits: CPU time, address space and open-file rlimits plus a
+                nice level applied to every command (or to the shell itself in
+                persistent-session mode). Defaults to None (no limits).
+            report_usage: Append each command's CPU time and peak memory to its
+                output. The usage is always attached as the ToolMessage artifact.
+                Not available in persistent-session mode. Defaults to False.
         """
         super().__init__()
         self._timeout = timeout
@@ -44,16 +106,46 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
         self._tool_name = "shell"
         self._env = env if env is not None else os.environ.copy()
         self._workspace_root = workspace_root
+        self._spill_outputs = spill_outputs
+        self._spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._spill_route = spill_route
+        self._limits = (
+            resource_limits
+            if resource_limits is not None and not resource_limits.is_empty
+            else None
+        )
+        self._report_usage = report_usage
+        self._limiter = ConcurrencyLimiter(max_concurrency)
+        self._session = (
+            _ShellSession(cwd=workspace_root, env=self._env, limits=self._limits)
+            if persistent_session
+            else None
+        )
+        self._command_cache = CommandCache() if cache_read_only else None
+        # Event loop running sync tool calls, kept for the middleware's lifetime so the
+        # persistent session (whose pipes belong to one loop) survives between them
+        self._sync_loop: asyncio.AbstractEventLoop | None = None
+        self._sync_loop_lock = threading.Lock()
 
         # Build description with working directory information
+        if persistent_session:
+            session_note = (
+                "All commands run in one persistent bash session, so the working directory, "
+                "exported variables and activated virtualenvs carry over between calls."
+            )
+        else:
+            session_note = (
+                "Each command runs in a fresh shell environment with the current process's "
+                "environment variables."
+            )
         description = (
             f"Execute a shell command directly on the host. Commands will run in "
-            f"the working directory: {workspace_root}. Each command runs in a fresh shell "
-            f"environment with the current process's environment variables. Commands may "
-            f"be truncated if they exceed the configured timeout or output limits."
+            f"the working directory: {workspace_root}. {session_note} Commands may "
+            f"be truncated if they exceed the configured timeout or output limits; long "
+            f"output keeps its beginning and end with the middle elided, and the full "
+            f"output is saved to a file you can page through with read_file."
         )
 
-        @tool(self._tool_name, description=description)
         def shell_tool(
             command: str,
             runtime: ToolRuntime[None, AgentState],
@@ -66,7 +158,28 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
             """
             return self._run_shell_command(command, tool_call_id=runtime.tool_call_id)
 
-        self._shell_tool = shell_tool
+        async def ashell_tool(
+            command: str,
+            runtime: ToolRuntime[None, AgentState],
+        ) -> ToolMessage | str:
+            """Execute a shell command, streaming its output as it arrives.
+
+            Args:
+                command: The shell command to execute.
+                runtime: The tool runtime context.
+            """
+            return await self._arun_shell_command(
+                command,
+                tool_call_id=runtime.tool_call_id,
+                stream_writer=runtime.stream_writer,
+            )
+
+        self._shell_tool = StructuredTool.from_function(
+            func=shell_tool,
+            coroutine=ashell_tool,
+            name=self._tool_name,
+            description=description,
+        )
         self.tools = [self._shell_tool]
 
     def _run_shell_command(
@@ -81,6 +194,45 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
             command: The shell command to execute.
             tool_call_id: The tool call ID for creating a ToolMessage.
 
+        Returns:
+            A ToolMessage with the command output or an error message.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._arun_shell_command(command, tool_call_id=tool_call_id), self._get_sync_loop()
+        )
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def _get_sync_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the background event loop for sync calls, starting it on first use."""
+        with self._sync_loop_lock:
+            if self._sync_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="coda-shell", daemon=True).start()
+                self._sync_loop = loop
+            return self._sync_loop
+
+    async def _arun_shell_command(
+        self,
+        command: str,
+        *,
+        tool_call_id: str | None,
+        stream_writer: StreamWriter | None = None,
+    ) -> ToolMessage:
+        """Execute a shell command asynchronously, streaming output as it arrives.
+
+        Output is kept in a head+tail buffer capped at ``max_output_bytes``, so
+        memory stays flat for arbitrarily large outputs. Chunks are forwarded to
+        ``stream_writer`` as ``{"type": "tool_output", ...}`` custom stream events.
+
+        Args:
+            command: The shell command to execute.
+            tool_call_id: The tool call ID for creating a ToolMessage.
+            stream_writer: Optional LangGraph stream writer for live output.
+
         Returns:
             A ToolMessage with the command output or an error message.
         """
@@ -88,51 +240,494 @@ class ShellMiddleware(AgentMiddleware[AgentState, Any]):
             msg = "Shell tool expects a non-empty command string."
             raise ToolException(msg)
 
+        cache = self._command_cache
+        cwd = self._session.cwd if self._session is not None else self._workspace_root
+        cacheable = cache is not None and is_cacheable_command(command)
+        if cache is not None and cacheable:
+            cached = cache.get(command, cwd)
+            if cached is not None:
+                return ToolMessage(
+                    content=f"{cached.content}\n\n[Cached result: no changes detected since "
+                    f"this command last ran]",
+                    tool_call_id=tool_call_id,
+                    name=self._tool_name,
+                    status="success",
+                )
+            state = fingerprint(command, cwd)
+        elif cache is not None:
+            cache.invalidate()
+
+        spill_path = self._spill_path(tool_call_id)
+        buffer = HeadTailBuffer(
+            self._max_output_bytes,
+            spill_path=spill_path,
+            spill_display_path=(
+                f"{self._spill_route.rstrip('/')}/{spill_path.name}"
+                if spill_path is not None and self._spill_route
+                else None
+            ),
+        )
+        emitter = _OutputEmitter(stream_writer, tool_call_id)
+        try:
+            message = await self._execute(command, buffer, emitter, tool_call_id=tool_call_id)
+        finally:
+            buffer.close()
+
+        if cache is not None and not cacheable:
+            # Also drop anything cached while this command was running
+            cache.invalidate()
+        elif cache is not None and message.status == "success" and not buffer.truncated:
+            cache.put(command, cwd, str(message.content), state=state)
+        return message
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command[Any]],
+    ) -> ToolMessage | Command[Any]:
+        """Invalidate cached command output around file-writing tool calls."""
+        self._invalidate_for(request)
+        try:
+            return handler(request)
+        finally:
+            self._invalidate_for(request)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command[Any]]],
+    ) -> ToolMessage | Command[Any]:
+        """Async version of `wrap_tool_call`."""
+        self._invalidate_for(request)
         try:
-            result = subprocess.run(
-                command,
-                check=False,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=self._timeout,
-                env=self._env,
-                cwd=self._workspace_root,
+            return await handler(request)
+        finally:
+            self._invalidate_for(request)
+
+    def _invalidate_for(self, request: ToolCallRequest) -> None:
+        if self._command_cache is not None and request.tool_call.get("name") in _WRITE_TOOLS:
+            self._command_cache.invalidate()
+
+    def _spill_path(self, tool_call_id: str | None) -> Path | None:
+        """Return the file that receives this call's full output if it overflows."""
+        if not self._spill_outputs:
+            return None
+        spill_dir = self._spill_dir or session_spill_dir()
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", tool_call_id or uuid.uuid4().hex)
+        return spill_dir / f"shell-{name}.log"
+
+    async def _execute(
+        self,
+        command: str,
+        buffer: HeadTailBuffer,
+        emitter: _OutputEmitter,
+        *,
+        tool_call_id: str | None,
+    ) -> ToolMessage:
+        """Run a command in a fresh shell or the persistent session."""
+        stdout_sink = _PipeSink(buffer, emitter)
+        stderr_sink = _PipeSink(buffer, emitter, prefix=b"[stderr] ")
+        if self._session is not None:
+            return await self._run_in_session(
+                command, stdout_sink, stderr_sink, buffer, emitter, tool_call_id=tool_call_id
+            )
+
+        async with self._limiter:
+            return await self._run_local(
+                command, stdout_sink, stderr_sink, buffer, emitter, tool_call_id=tool_call_id
             )
 
-            # Combine stdout and stderr
-            output_parts = []
-            if result.stdout:
-                output_parts.append(result.stdout)
-            if result.stderr:
-                stderr_lines = result.stderr.strip().split("\n")
-                for line in stderr_lines:
-                    output_parts.append(f"[stderr] {line}")
-
-            output = "\n".join(output_parts) if output_parts else "<no output>"
-
-            # Truncate output if needed
-            if len(output) > self._max_output_bytes:
-                output = output[: self._max_output_bytes]
-                output += f"\n\n... Output truncated at {self._max_output_bytes} bytes."
-
-            # Add exit code info if non-zero
-            if result.returncode != 0:
-                output = f"{output.rstrip()}\n\nExit code: {result.returncode}"
-                status = "error"
-            else:
-                status = "success"
-
-        except subprocess.TimeoutExpired:
-            output = f"Error: Command timed out after {self._timeout:.1f} seconds."
+    async def _run_local(
+        self,
+        command: str,
+        stdout_sink: _PipeSink,
+        stderr_sink: _PipeSink,
+        buffer: HeadTailBuffer,
+        emitter: _OutputEmitter,
+        *,
+        tool_call_id: str | None,
+    ) -> ToolMessage:
+        """Run a command in a fresh shell and collect its resource usage.
+
+        The child is reaped with ``os.wait4`` rather than by asyncio so the
+        rusage returned is exactly this command's, even while others run
+        concurrently (``getrusage(RUSAGE_CHILDREN)`` would mix them together).
+        """
+        prefix, script = (
+            (self._limits.command_prefix(), self._limits.ulimit_script())
+            if self._limits is not None
+            else ([], "")
+        )
+        process = subprocess.Popen(  # noqa: S603, ASYNC220
+            [*prefix, "/bin/sh", "-c", script + command],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self._env,
+            cwd=self._workspace_root,
+            start_new_session=True,
+        )
+        reaper = asyncio.ensure_future(asyncio.to_thread(_wait_with_usage, process))
+        transports: list[asyncio.BaseTransport] = []
+        readers: list[asyncio.Task[bytes | None]] = []
+        try:
+            for pipe, sink in ((process.stdout, stdout_sink), (process.stderr, stderr_sink)):
+                stream = await _pipe_reader(pipe, transports)
+                readers.append(asyncio.create_task(_pump(stream, sink)))
+            try:
+                await asyncio.wait_for(_gather(*readers, asyncio.shield(reaper)), self._timeout)
+            except TimeoutError:
+                _kill_process_group(process)
+                for reader in readers:
+                    reader.cancel()
+                await asyncio.gather(*readers, return_exceptions=True)
+                await reaper
+                emitter.flush()
+                return self._timeout_message(buffer, tool_call_id)
+        except asyncio.CancelledError:
+            _kill_process_group(process)
+            for reader in readers:
+                reader.cancel()
+            raise
+        finally:
+            for transport in transports:
+                transport.close()
+        emitter.flush()
+        returncode, usage = reaper.result()
+        return self._result_message(buffer, returncode, tool_call_id, usage=usage)
+
+    async def _run_in_session(
+        self,
+        command: str,
+        stdout_sink: _PipeSink,
+        stderr_sink: _PipeSink,
+        buffer: HeadTailBuffer,
+        emitter: _OutputEmitter,
+        *,
+        tool_call_id: str | None,
+    ) -> ToolMessage:
+        """Run a command in the persistent session, restarting it on timeout."""
+        session = self._session
+        assert session is not None  # noqa: S101
+        async with session.lock():
+            try:
+                returncode = await asyncio.wait_for(
+                    session.run(command, stdout_sink, stderr_sink), self._timeout
+                )
+            except TimeoutError:
+                session.close()
+                emitter.flush()
+                return self._timeout_message(
+                    buffer,
+                    tool_call_id,
+                    note=(
+                        f"The shell session was restarted in {session.cwd}; exported "
+                        f"variables and other shell state were reset."
+                    ),
+                )
+            except asyncio.CancelledError:
+                session.close()
+                raise
+        emitter.flush()
+        message = self._result_message(buffer, returncode, tool_call_id)
+        if not session.alive:
+            message.content = (
+                f"{message.content}\n\nThe shell exited; a new session will start in "
+                f"{session.cwd} with the original environment."
+            )
+        return message
+
+    def _result_message(
+        self,
+        buffer: HeadTailBuffer,
+        returncode: int | None,
+        tool_call_id: str | None,
+        *,
+        usage: ResourceUsage | None = None,
+    ) -> ToolMessage:
+        """Build the ToolMessage for a finished command."""
+        output = buffer.getvalue() or "<no output>"
+
+        # Add exit code info if non-zero
+        if returncode != 0:
+            output = f"{output.rstrip()}\n\nExit code: {returncode}"
             status = "error"
+        else:
+            status = "success"
+
+        if usage is not None and self._report_usage:
+            output = f"{output.rstrip()}\n\nResource usage: {usage.describe()}"
 
         return ToolMessage(
             content=output,
             tool_call_id=tool_call_id,
             name=self._tool_name,
             status=status,
+            artifact=usage,
+        )
+
+    def _timeout_message(
+        self, buffer: HeadTailBuffer, tool_call_id: str | None, *, note: str | None = None
+    ) -> ToolMessage:
+        """Build the ToolMessage for a command that timed out, keeping partial output."""
+        output = buffer.getvalue().rstrip()
+        timeout_msg = f"Error: Command timed out after {self._timeout:.1f} seconds."
+        if note:
+            timeout_msg = f"{timeout_msg} {note}"
+        return ToolMessage(
+            content=f"{output}\n\n{timeout_msg}" if output else timeout_msg,
+            tool_call_id=tool_call_id,
+            name=self._tool_name,
+            status="error",
+        )
+
+
+class _ShellSession:
+    """A long-lived bash process that runs one command at a time.
+
+    Each command is evaluated in the session's own shell (so `cd` and `export`
+    persist) with stdin redirected from /dev/null, then followed by sentinel lines
+    on stdout and stderr that carry its exit code and the new working directory.
+    """
+
+    def __init__(
+        self, *, cwd: str, env: dict[str, str], limits: ResourceLimits | None = None
+    ) -> None:
+        self.cwd = cwd
+        self._env = env
+        self._limits = limits
+        self._process: asyncio.subprocess.Process | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the shell process is running on the current event loop."""
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self._loop is asyncio.get_running_loop()
+        )
+
+    def lock(self) -> asyncio.Lock:
+        """Return the lock serializing commands, bound to the current event loop."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def _start(self) -> None:
+        # Subprocess transports belong to one event loop; a session created by
+        # another loop (e.g. the sync tool path's) cannot be reused and is replaced
+        self.close()
+        shell = shutil.which("bash")
+        args = [shell, "--noprofile", "--norc"] if shell else ["/bin/sh"]
+        if self._limits is not None:
+            args[:0] = self._limits.command_prefix()
+        self._process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._env,
+            cwd=self.cwd if os.path.isdir(self.cwd) else None,  # noqa: ASYNC240, PTH112
+            start_new_session=True,
+        )
+        if self._limits is not None and self._process.stdin is not None:
+            # Inherited by every command; RLIMIT_CPU is per process, so the idle
+            # shell's own CPU time does not eat into its commands' budget
+            self._process.stdin.write(self._limits.ulimit_script().encode())
+        self._loop = asyncio.get_running_loop()
+
+    async def run(self, command: str, stdout_sink: _PipeSink, stderr_sink: _PipeSink) -> int | None:
+        """Run a command and return its exit code.
+
+        Returns:
+            The command's exit code, or the shell's exit code if the command exited
+            the shell.
+        """
+        if not self.alive:
+            await self._start()
+        process = self._process
+        assert process is not None  # noqa: S101
+        assert process.stdin is not None  # noqa: S101
+        token = f"__CODA_{uuid.uuid4().hex}__"
+        script = (
+            f"eval {shlex.quote(command)} < /dev/null\n"
+            f'printf \'\\n{token} %s %s\\n\' "$?" "$PWD"\n'
+            f"printf '\\n{token}\\n' >&2\n"
         )
+        process.stdin.write(script.encode())
+        with contextlib.suppress(ConnectionError):
+            await process.stdin.drain()
+        sentinel = f"\n{token}".encode()
+        status, _ = await asyncio.gather(
+            _pump(process.stdout, stdout_sink, sentinel=sentinel),
+            _pump(process.stderr, stderr_sink, sentinel=sentinel),
+        )
+        if status is None:
+            # The command exited the shell (e.g. `exit 1` or `set -e` tripped)
+            returncode = await process.wait()
+            self._process = None
+            return returncode
+        code, _, cwd = status.decode("utf-8", errors="replace").strip().partition(" ")
+        if cwd:
+            self.cwd = cwd
+        try:
+            return int(code)
+        except ValueError:
+            return None
+
+    def close(self) -> None:
+        """Kill the shell and everything it spawned."""
+        if self._process is not None:
+            with contextlib.suppress(RuntimeError):
+                _kill_process_group(self._process)
+        self._process = None
+
+
+class _OutputEmitter:
+    """Forward output chunks to a stream writer, batching to limit UI updates."""
+
+    _FLUSH_INTERVAL = 0.1
+    _FLUSH_BYTES = 8192
+
+    def __init__(self, writer: StreamWriter | None, tool_call_id: str | None) -> None:
+        self._writer = writer
+        self._tool_call_id = tool_call_id
+        self._pending = bytearray()
+        self._last_flush = time.monotonic()
+        self._timer: asyncio.TimerHandle | None = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def emit(self, data: bytes) -> None:
+        if self._writer is None:
+            return
+        # Only the most recent output matters for a live view; cap what is queued
+        self._pending += data
+        if len(self._pending) > self._FLUSH_BYTES * 8:
+            del self._pending[: len(self._pending) - self._FLUSH_BYTES * 8]
+        wait = self._FLUSH_INTERVAL - (time.monotonic() - self._last_flush)
+        if len(self._pending) >= self._FLUSH_BYTES or wait <= 0:
+            self.flush()
+        elif self._timer is None:
+            # Deliver output that arrives just before a quiet period
+            self._timer = asyncio.get_running_loop().call_later(wait, self.flush)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._writer is None or not self._pending:
+            return
+        chunk = self._decoder.decode(bytes(self._pending))
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+        if chunk:
+            self._writer(
+                {"type": "tool_output", "tool_call_id": self._tool_call_id, "chunk": chunk}
+            )
+
+
+class _PipeSink:
+    """Send pipe output to a buffer and emitter, prefixing each line if requested."""
+
+    def __init__(
+        self, buffer: HeadTailBuffer, emitter: _OutputEmitter, *, prefix: bytes | None = None
+    ) -> None:
+        self._buffer = buffer
+        self._emitter = emitter
+        self._prefix = prefix
+        self._at_line_start = True
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        if self._prefix is not None:
+            ends_with_newline = data.endswith(b"\n")
+            body = data[:-1] if ends_with_newline else data
+            data = body.replace(b"\n", b"\n" + self._prefix)
+            data += b"\n" if ends_with_newline else b""
+            if self._at_line_start:
+                data = self._prefix + data
+            self._at_line_start = ends_with_newline
+        self._buffer.write(data)
+        self._emitter.emit(data)
+
+
+async def _pump(
+    stream: asyncio.StreamReader | None, sink: _PipeSink, *, sentinel: bytes | None = None
+) -> bytes | None:
+    """Copy a subprocess pipe into ``sink`` until EOF or until ``sentinel`` is seen.
+
+    Returns:
+        The rest of the sentinel's line, or None if the pipe reached EOF first.
+    """
+    if stream is None:
+        return None
+    # Bytes held back because they could be the start of the sentinel
+    pending = b""
+    while True:
+        data = await stream.read(_READ_CHUNK_BYTES)
+        if not data:
+            sink.write(pending)
+            return None
+        if sentinel is None:
+            sink.write(data)
+            continue
+        pending += data
+        index = pending.find(sentinel)
+        if index >= 0:
+            sink.write(pending[:index])
+            rest = pending[index + len(sentinel) :]
+            while b"\n" not in rest:
+                more = await stream.read(_READ_CHUNK_BYTES)
+                if not more:
+                    break
+                rest += more
+            return rest.split(b"\n", 1)[0]
+        keep = len(sentinel) - 1
+        sink.write(pending[:-keep])
+        pending = pending[-keep:]
+
+
+async def _gather(*aws: Awaitable[Any]) -> list[Any]:
+    """Await ``aws`` together inside a coroutine, so cancellation is not logged as unretrieved."""
+    return await asyncio.gather(*aws)
+
+
+async def _pipe_reader(
+    pipe: IO[bytes] | None, transports: list[asyncio.BaseTransport]
+) -> asyncio.StreamReader | None:
+    """Wrap a blocking subprocess pipe in a StreamReader on the running loop."""
+    if pipe is None:
+        return None
+    reader = asyncio.StreamReader()
+    transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), pipe
+    )
+    transports.append(transport)
+    return reader
+
+
+def _wait_with_usage(process: subprocess.Popen[bytes]) -> tuple[int, ResourceUsage]:
+    """Block until the process exits and return its exit code and resource usage."""
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, ResourceUsage.from_rusage(rusage)
+
+
+def _kill_process_group(process: asyncio.subprocess.Process | subprocess.Popen[bytes]) -> None:
+    """Kill a shell and everything it spawned."""
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        with contextlib.suppress(ProcessLookupError):
+            process.kill()
 
 
-__all__ = ["ShellMiddleware"]
+__all__ = ["ResourceLimits", "ShellMiddleware"]
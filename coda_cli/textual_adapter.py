@@ -18,9 +18,10 @@ from langchain_core.messages import HumanMessage, ToolMessage
 from langgraph.types import Command, Interrupt
 from pydantic import TypeAdapter, ValidationError
 
-from coda_cli.file_ops import FileOpTracker
+from coda_cli.file_ops import FileOpTracker, FileSnapshotCache, active_tracker
 from coda_cli.image_utils import create_multimodal_content
 from coda_cli.input import ImageTracker, parse_file_mentions
+from coda_cli.large_files import read_text_limited, summarize_file
 from coda_cli.ui import format_tool_display, format_tool_message_content
 from coda_cli.widgets.messages import (
     AssistantMessage,
@@ -71,6 +72,8 @@ class TextualUIAdapter:
         self._current_tool_messages: dict[str, ToolCallMessage] = {}
         self._pending_text = ""
         self._token_tracker: Any = None
+        # File snapshots live for the whole session so later turns reuse them
+        self._file_snapshots: FileSnapshotCache | None = None
 
     def set_token_tracker(self, tracker: Any) -> None:
         """Set the token tracker for usage tracking."""
@@ -104,24 +107,30 @@ async def execute_task_textual(
     prompt_text, mentioned_files = parse_file_mentions(user_input)
 
     # Max file size to embed inline (256KB, matching mistral-vibe)
-    # Larger files get a reference instead - use read_file tool to view them
+    # Larger or binary files get a summary (size, hash, head/tail) instead
     max_embed_bytes = 256 * 1024
 
     if mentioned_files:
         context_parts = [prompt_text, "\n\n## Referenced Files\n"]
         for file_path in mentioned_files:
             try:
-                file_size = file_path.stat().st_size
-                if file_size > max_embed_bytes:
-                    # File too large - include reference instead of content
-                    size_kb = file_size // 1024
+                content = await asyncio.to_thread(read_text_limited, file_path, max_embed_bytes)
+                summary = (
+                    await asyncio.to_thread(summarize_file, file_path) if content is None else None
+                )
+                if content is None and summary is None:
+                    context_parts.append(
+                        f"\n### {file_path.name}\n[Error reading file: {file_path}]"
+                    )
+                elif summary is not None:
+                    # Too large or binary - include a bounded summary instead of content
                     context_parts.append(
                         f"\n### {file_path.name}\n"
                         f"Path: `{file_path}`\n"
-                        f"Size: {size_kb}KB (too large to embed, use read_file tool to view)"
+                        f"{summary.to_markdown()}\n"
+                        "(too large or binary to embed, use read_file tool to view)"
                     )
                 else:
-                    content = file_path.read_text()
                     context_parts.append(
                         f"\n### {file_path.name}\nPath: `{file_path}`\n```\n{content}\n```"
                     )
@@ -158,7 +167,14 @@ async def execute_task_textual(
     # Update status to show thinking
     adapter._update_status("Agent is thinking...")
 
-    file_op_tracker = FileOpTracker(assistant_id=assistant_id, backend=backend)
+    if adapter._file_snapshots is None or adapter._file_snapshots.backend is not backend:
+        adapter._file_snapshots = FileSnapshotCache(backend)
+    file_op_tracker = FileOpTracker(
+        assistant_id=assistant_id, backend=backend, snapshots=adapter._file_snapshots
+    )
+    # Tool calls capture their before-content through this tracker; each run is
+    # its own worker task, so the binding ends with it
+    active_tracker.set(file_op_tracker)
     displayed_tool_ids: set[str] = set()
     tool_call_buffers: dict[str | int, dict] = {}
 
@@ -182,7 +198,7 @@ async def execute_task_textual(
 
             async for chunk in agent.astream(
                 stream_input,
-                stream_mode=["messages", "updates"],
+                stream_mode=["messages", "updates", "custom"],
                 subgraphs=True,
                 config=config,
                 durability="exit",
@@ -223,6 +239,15 @@ async def execute_task_textual(
                     if chunk_data and isinstance(chunk_data, dict) and "todos" in chunk_data:
                         pass  # Future: render todo list widget
 
+                # Handle CUSTOM stream - live output from running tools (e.g. shell)
+                elif current_stream_mode == "custom":
+                    if not is_main_agent or not isinstance(data, dict):
+                        continue
+                    if data.get("type") == "tool_output":
+                        tool_msg = adapter._current_tool_messages.get(data.get("tool_call_id"))
+                        if tool_msg is not None:
+                            tool_msg.append_output(str(data.get("chunk", "")))
+
                 # Handle MESSAGES stream - for content and tool calls
                 elif current_stream_mode == "messages":
                     # Skip subagent outputs - only render main agent content in chat
@@ -249,7 +274,10 @@ async def execute_task_textual(
                         tool_name = getattr(message, "name", "")
                         tool_status = getattr(message, "status", "success")
                         tool_content = format_tool_message_content(message.content)
-                        record = file_op_tracker.complete_with_message(message)
+                        # Reading back and diffing large files must not block the UI
+                        record = await asyncio.to_thread(
+                            file_op_tracker.complete_with_message, message
+                        )
 
                         adapter._update_status("Agent is thinking...")
 
@@ -286,7 +314,17 @@ async def execute_task_textual(
                                 pending_text_by_namespace[ns_key] = ""
                             if record.diff:
                                 await adapter._mount_message(
-                                    DiffMessage(record.diff, record.display_path)
+                                    DiffMessage(
+                                        record.diff,
+                                        record.display_path,
+                                        result=record.diff_result,
+                                    )
+                                )
+                            elif record.summary is not None:
+                                await adapter._mount_message(
+                                    SystemMessage(
+                                        f"{record.display_path}: {record.summary.describe()}"
+                                    )
                                 )
                         continue
 
@@ -409,6 +447,9 @@ async def execute_task_textual(
                             adapter._update_status(f"Executing {display_str}...")
 
                     if getattr(message, "chunk_position", None) == "last":
+                        # All tool calls of this message are known; read their
+                        # before-content in one batch (the tools wait for it)
+                        await asyncio.to_thread(file_op_tracker.flush_pending_reads)
                         pending_text = pending_text_by_namespace.get(ns_key, "")
                         if pending_text:
                             await _flush_assistant_text_ns(
@@ -428,6 +469,7 @@ async def execute_task_textual(
 
             # Handle HITL after stream completes
             if interrupt_occurred:
+                await asyncio.to_thread(file_op_tracker.flush_pending_reads)
                 any_rejected = False
 
                 for interrupt_id, hitl_request in pending_interrupts.items():
@@ -1,16 +1,52 @@
-"""Custom tools for the CoDA Code."""
+"""Custom tools for the CoDA Code.
 
-from typing import Any, Literal
+Each web tool has a sync function and an async variant (``a``-prefixed). The
+``*_tool`` objects bundle both, so the agent awaits the async one when the
+graph runs on an event loop and calls the sync one otherwise.
+"""
 
+import asyncio
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal, NamedTuple
+from urllib.parse import urldefrag
+
+import httpx
 import requests
-from markdownify import markdownify
-from tavily import TavilyClient
+from langchain_core.tools import StructuredTool
+from tavily import AsyncTavilyClient, TavilyClient
 
 from coda_cli.config import settings
+from coda_cli.http_cache import CachedResponse, get_http_cache
+from coda_cli.http_client import get_async_client, get_session, web_call_limiter
+from coda_cli.search_cache import get_search_cache, search_key, search_ttl
+from coda_cli.web_content import (
+    Extraction,
+    MarkdownBuilder,
+    binary_reason,
+    detect_encoding,
+    extract_content,
+    is_html,
+)
 
 # Initialize Tavily client if API key is available
 tavily_client = TavilyClient(api_key=settings.tavily_api_key) if settings.has_tavily else None
 
+# Largest (decompressed) response body fetch_url downloads
+FETCH_MAX_BYTES = 10_000_000
+DEFAULT_FETCH_MAX_CHARS = 50_000
+_FETCH_CHUNK_BYTES = 64 * 1024
+
+FetchMode = Literal["full", "main", "outline"]
+
+# fetch_urls: URLs per call, pages fetched at once, and default budgets
+FETCH_URLS_MAX_URLS = 20
+FETCH_URLS_WORKERS = 4
+DEFAULT_FETCH_URLS_MAX_CHARS_EACH = 10_000
+DEFAULT_FETCH_URLS_TOTAL_CHARS = 60_000
+
 
 def http_request(
     url: str,
@@ -34,19 +70,15 @@ def http_request(
         Dictionary with response data including status, headers, and content
     """
     try:
-        kwargs = {"url": url, "method": method.upper(), "timeout": timeout}
-
-        if headers:
-            kwargs["headers"] = headers
-        if params:
-            kwargs["params"] = params
-        if data:
-            if isinstance(data, dict):
-                kwargs["json"] = data
-            else:
-                kwargs["data"] = data
+        kwargs = {
+            "url": url,
+            "method": method.upper(),
+            "timeout": timeout,
+            **_request_options(headers, data, params),
+        }
 
-        response = requests.request(**kwargs)
+        with web_call_limiter:
+            response = get_session().request(**kwargs)
 
         try:
             content = response.json()
@@ -62,30 +94,77 @@ def http_request(
         }
 
     except requests.exceptions.Timeout:
-        return {
-            "success": False,
-            "status_code": 0,
-            "headers": {},
-            "content": f"Request timed out after {timeout} seconds",
-            "url": url,
-        }
+        return _request_failure(url, f"Request timed out after {timeout} seconds")
     except requests.exceptions.RequestException as e:
-        return {
-            "success": False,
-            "status_code": 0,
-            "headers": {},
-            "content": f"Request error: {e!s}",
-            "url": url,
-        }
+        return _request_failure(url, f"Request error: {e!s}")
     except Exception as e:
+        return _request_failure(url, f"Error making request: {e!s}")
+
+
+async def ahttp_request(
+    url: str,
+    method: str = "GET",
+    headers: dict[str, str] | None = None,
+    data: str | dict | None = None,
+    params: dict[str, str] | None = None,
+    timeout: int = 30,  # noqa: ASYNC109 - same arguments as the sync tool
+) -> dict[str, Any]:
+    """Async variant of `http_request`; ``timeout`` bounds the whole request."""
+    try:
+        async with web_call_limiter, asyncio.timeout(timeout):
+            response = await get_async_client().request(
+                method.upper(), url, timeout=timeout, **_request_options(headers, data, params)
+            )
+
+        try:
+            content = response.json()
+        except ValueError:
+            content = response.text
+
         return {
-            "success": False,
-            "status_code": 0,
-            "headers": {},
-            "content": f"Error making request: {e!s}",
-            "url": url,
+            "success": response.status_code < 400,
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "content": content,
+            "url": str(response.url),
         }
 
+    except (TimeoutError, httpx.TimeoutException):
+        return _request_failure(url, f"Request timed out after {timeout} seconds")
+    except httpx.HTTPError as e:
+        return _request_failure(url, f"Request error: {e!s}")
+    except Exception as e:
+        return _request_failure(url, f"Error making request: {e!s}")
+
+
+def _request_options(
+    headers: dict[str, str] | None,
+    data: str | dict | None,
+    params: dict[str, str] | None,
+) -> dict[str, Any]:
+    """Keyword arguments shared by the requests and httpx request calls."""
+    options: dict[str, Any] = {}
+    if headers:
+        options["headers"] = headers
+    if params:
+        options["params"] = params
+    if data:
+        if isinstance(data, dict):
+            options["json"] = data
+        else:
+            options["data"] = data
+    return options
+
+
+def _request_failure(url: str, content: str) -> dict[str, Any]:
+    return {
+        "success": False,
+        "status_code": 0,
+        "headers": {},
+        "content": content,
+        "url": url,
+    }
+
 
 def web_search(
     query: str,
@@ -112,6 +191,8 @@ def web_search(
             - content: Relevant excerpt from the page
             - score: Relevance score (0-1)
         - query: The original search query
+        - cache: Cache outcome for this call ("hit", "shared" with an identical
+          search in flight, or "miss") and the session's counts
 
     IMPORTANT: After using this tool:
     1. Read through the 'content' field of each result
@@ -126,27 +207,101 @@ def web_search(
             "query": query,
         }
 
+    def search() -> dict[str, Any]:
+        with web_call_limiter:
+            return tavily_client.search(
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic=topic,
+            )
+
+    cache = get_search_cache()
+    key = search_key(
+        query, max_results=max_results, topic=topic, include_raw_content=include_raw_content
+    )
     try:
-        return tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic,
-        )
+        result, status = cache.search(key, search_ttl(topic), search)
+        return {**result, "cache": {"status": status, **cache.stats.as_dict()}}
+    except Exception as e:
+        return {"error": f"Web search error: {e!s}", "query": query}
+
+
+# Tavily's async client pools connections on the event loop that first used it
+_async_tavily: tuple[asyncio.AbstractEventLoop, AsyncTavilyClient] | None = None
+
+
+def _async_tavily_client() -> AsyncTavilyClient:
+    global _async_tavily  # noqa: PLW0603
+    loop = asyncio.get_running_loop()
+    if _async_tavily is None or _async_tavily[0] is not loop:
+        _async_tavily = (loop, AsyncTavilyClient(api_key=settings.tavily_api_key))
+    return _async_tavily[1]
+
+
+async def aweb_search(
+    query: str,
+    max_results: int = 5,
+    topic: Literal["general", "news", "finance"] = "general",
+    include_raw_content: bool = False,
+) -> dict[str, Any]:
+    """Async variant of `web_search`."""
+    if tavily_client is None:
+        return {
+            "error": "Tavily API key not configured. Please set TAVILY_API_KEY environment variable.",
+            "query": query,
+        }
+
+    async def search() -> dict[str, Any]:
+        async with web_call_limiter:
+            return await _async_tavily_client().search(
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic=topic,
+            )
+
+    cache = get_search_cache()
+    key = search_key(
+        query, max_results=max_results, topic=topic, include_raw_content=include_raw_content
+    )
+    try:
+        result, status = await cache.asearch(key, search_ttl(topic), search)
+        return {**result, "cache": {"status": status, **cache.stats.as_dict()}}
     except Exception as e:
         return {"error": f"Web search error: {e!s}", "query": query}
 
 
-def fetch_url(url: str, timeout: int = 30) -> dict[str, Any]:
+def fetch_url(
+    url: str,
+    timeout: int = 30,
+    max_chars: int = DEFAULT_FETCH_MAX_CHARS,
+    mode: FetchMode = "full",
+    offset: int = 0,
+) -> dict[str, Any]:
     """Fetch content from a URL and convert HTML to markdown format.
 
     This tool fetches web page content and converts it to clean markdown text,
     making it easy to read and process HTML content. After receiving the markdown,
     you MUST synthesize the information into a natural, helpful response for the user.
 
+    Prefer mode="main" for articles and documentation pages: it drops navigation,
+    footers, banners and other boilerplate. Use mode="outline" to see how a long
+    page is organized before reading it.
+
+    Long pages are returned one chunk of max_chars characters at a time. When
+    next_offset is set, call fetch_url again with the same url and mode and
+    offset=next_offset to read the next chunk; it is served from the copy
+    already downloaded, so it is fast and consistent with the first chunk.
+
     Args:
         url: The URL to fetch (must be a valid HTTP/HTTPS URL)
         timeout: Request timeout in seconds (default: 30)
+        max_chars: Maximum characters of markdown to return (default: 50000)
+        mode: "full" converts the whole page, "main" only its main content, and
+            "outline" lists the main content's headings with the length of each
+            section (default: "full"). Non-HTML content is always returned in full.
+        offset: Character offset in the converted page to start from (default: 0)
 
     Returns:
         Dictionary containing:
@@ -155,6 +310,16 @@ def fetch_url(url: str, timeout: int = 30) -> dict[str, Any]:
         - markdown_content: The page content converted to markdown
         - status_code: HTTP status code
         - content_length: Length of the markdown content in characters
+        - truncated: Whether the content was cut short
+        - truncation_reason: "max_chars" or "max_bytes" when truncated, else None
+        - offset: Offset of this chunk in the converted page
+        - next_offset: Offset of the next chunk, or None if this is the last one
+        - total_chars: Length of the converted page, if known
+        - mode: The mode that was applied ("full" for non-HTML content)
+        - extraction: For "main" and "outline", the characters of text on the page,
+          the characters kept, and the share dropped ("reduction"); else None
+        - cache: Cache outcome for this call ("hit", "revalidated" or "miss") and
+          the session's hit/revalidated/miss counts
 
     IMPORTANT: After using this tool:
     1. Read through the markdown content
@@ -162,22 +327,421 @@ def fetch_url(url: str, timeout: int = 30) -> dict[str, Any]:
     3. Synthesize this into a clear, natural language response
     4. NEVER show the raw markdown to the user unless specifically requested
     """
+    cache = get_http_cache()
+    page = _Page(offset=max(offset, 0), max_chars=max_chars)
     try:
-        response = requests.get(
-            url,
-            timeout=timeout,
-            headers={"User-Agent": "Mozilla/5.0 (compatible; CoDA-Code/1.0)"},
-        )
-        response.raise_for_status()
+        if result := _stored_page(url, mode, page):
+            return result
+        entry = cache.lookup(url)
+        # Later chunks come from the stored copy, even if stale, so they match the first
+        if entry and (entry.is_fresh or page.offset):
+            cache.stats.hits += 1
+            return _cached_fetch_result(url, entry, "hit", mode=mode, page=page)
 
-        # Convert HTML content to markdown
-        markdown_content = markdownify(response.text)
+        with (
+            web_call_limiter,
+            get_session().get(
+                url, timeout=timeout, headers=entry.validators() if entry else None, stream=True
+            ) as response,
+        ):
+            if entry and response.status_code == 304:  # noqa: PLR2004
+                entry = cache.revalidated(entry, response)
+                cache.stats.revalidated += 1
+                return _cached_fetch_result(url, entry, "revalidated", mode=mode, page=page)
+            response.raise_for_status()
+            reader = _FetchReader(response.headers.get("Content-Type", ""), page.end, mode)
+            for chunk in response.iter_content(_FETCH_CHUNK_BYTES):
+                if reader.feed(chunk):
+                    break
+            content = reader.finish()
+        return _fetched_result(url, response, content, mode=mode, page=page)
+    except Exception as e:
+        return {"error": f"Fetch URL error: {e!s}", "url": url}
 
-        return {
-            "url": str(response.url),
-            "markdown_content": markdown_content,
-            "status_code": response.status_code,
-            "content_length": len(markdown_content),
-        }
+
+async def afetch_url(
+    url: str,
+    timeout: int = 30,  # noqa: ASYNC109 - same arguments as the sync tool
+    max_chars: int = DEFAULT_FETCH_MAX_CHARS,
+    mode: FetchMode = "full",
+    offset: int = 0,
+) -> dict[str, Any]:
+    """Async variant of `fetch_url`; ``timeout`` bounds the whole download."""
+    cache = get_http_cache()
+    page = _Page(offset=max(offset, 0), max_chars=max_chars)
+    try:
+        if result := _stored_page(url, mode, page):
+            return result
+        entry = cache.lookup(url)
+        if entry and (entry.is_fresh or page.offset):
+            cache.stats.hits += 1
+            return await asyncio.to_thread(
+                _cached_fetch_result, url, entry, "hit", mode=mode, page=page
+            )
+
+        async with web_call_limiter, asyncio.timeout(timeout):
+            async with get_async_client().stream(
+                "GET", url, headers=entry.validators() if entry else None, timeout=timeout
+            ) as response:
+                if entry and response.status_code == 304:  # noqa: PLR2004
+                    entry = cache.revalidated(entry, response)
+                    cache.stats.revalidated += 1
+                    return await asyncio.to_thread(
+                        _cached_fetch_result, url, entry, "revalidated", mode=mode, page=page
+                    )
+                response.raise_for_status()
+                reader = _FetchReader(response.headers.get("Content-Type", ""), page.end, mode)
+                async for chunk in response.aiter_bytes(_FETCH_CHUNK_BYTES):
+                    if reader.feed(chunk):
+                        break
+            # Conversion and extraction are CPU-bound; keep them off the event loop
+            content = await asyncio.to_thread(reader.finish)
+        return _fetched_result(url, response, content, mode=mode, page=page)
+    except TimeoutError:
+        return {"error": f"Fetch URL error: timed out after {timeout} seconds", "url": url}
     except Exception as e:
         return {"error": f"Fetch URL error: {e!s}", "url": url}
+
+
+def fetch_urls(
+    urls: list[str],
+    max_chars_each: int = DEFAULT_FETCH_URLS_MAX_CHARS_EACH,
+    total_max_chars: int = DEFAULT_FETCH_URLS_TOTAL_CHARS,
+    timeout: int = 30,
+    mode: FetchMode = "main",
+) -> dict[str, Any]:
+    """Fetch several URLs at once and convert each page to markdown.
+
+    Use this instead of several fetch_url calls when you already know which pages
+    you need (e.g. the top results of a search). Pages are fetched concurrently;
+    a page that fails or times out is reported in its own entry and does not
+    affect the others. After receiving the pages, you MUST synthesize the
+    information into a natural, helpful response for the user.
+
+    Args:
+        urls: The URLs to fetch (at most 20; duplicates are fetched once)
+        max_chars_each: Maximum characters of markdown per page (default: 10000)
+        total_max_chars: Maximum characters of markdown across all pages, split
+            evenly between them (default: 60000)
+        timeout: Request timeout in seconds for each page (default: 30)
+        mode: "full", "main" or "outline", as for fetch_url (default: "main")
+
+    Returns:
+        Dictionary containing:
+        - results: One entry per unique URL, in the order given. Each is a
+          fetch_url result, or {"url", "error"} if that page failed
+        - succeeded: Number of pages fetched
+        - failed: Number of pages that failed
+        - max_chars_each: The per-page limit that was applied
+        - duplicates: URLs that were dropped as duplicates
+        - skipped: URLs beyond the first 20 unique ones, not fetched
+
+    IMPORTANT: After using this tool:
+    1. Read through each page's markdown content
+    2. Extract relevant information that answers the user's question
+    3. Synthesize this into a clear, natural language response
+    4. Cite sources by mentioning the page URLs
+    """
+    batch = _plan_batch(urls, max_chars_each, total_max_chars)
+    with ThreadPoolExecutor(max_workers=FETCH_URLS_WORKERS) as pool:
+        results = list(
+            pool.map(
+                lambda url: fetch_url(url, timeout=timeout, max_chars=batch.max_chars, mode=mode),
+                batch.urls,
+            )
+        )
+    return _batch_result(batch, results)
+
+
+async def afetch_urls(
+    urls: list[str],
+    max_chars_each: int = DEFAULT_FETCH_URLS_MAX_CHARS_EACH,
+    total_max_chars: int = DEFAULT_FETCH_URLS_TOTAL_CHARS,
+    timeout: int = 30,  # noqa: ASYNC109 - same arguments as the sync tool
+    mode: FetchMode = "main",
+) -> dict[str, Any]:
+    """Async variant of `fetch_urls`; ``timeout`` bounds each page's download."""
+    batch = _plan_batch(urls, max_chars_each, total_max_chars)
+    workers = asyncio.Semaphore(FETCH_URLS_WORKERS)
+
+    async def fetch(url: str) -> dict[str, Any]:
+        async with workers:
+            return await afetch_url(url, timeout=timeout, max_chars=batch.max_chars, mode=mode)
+
+    results = await asyncio.gather(*(fetch(url) for url in batch.urls))
+    return _batch_result(batch, results)
+
+
+class _Batch(NamedTuple):
+    urls: list[str]
+    duplicates: list[str]
+    skipped: list[str]
+    max_chars: int
+
+
+def _plan_batch(urls: list[str], max_chars_each: int, total_max_chars: int) -> _Batch:
+    """Drop duplicate URLs, cap their number and split the character budget."""
+    unique: dict[str, str] = {}
+    duplicates = []
+    for url in urls:
+        # Fragments never reach the server, so page#a and page#b are the same fetch
+        key = urldefrag(url.strip()).url
+        if key in unique:
+            duplicates.append(url)
+        else:
+            unique[key] = url.strip()
+    fetched = list(unique.values())[:FETCH_URLS_MAX_URLS]
+    skipped = list(unique.values())[FETCH_URLS_MAX_URLS:]
+    share = total_max_chars // len(fetched) if fetched else total_max_chars
+    return _Batch(fetched, duplicates, skipped, max(min(max_chars_each, share), 1))
+
+
+def _batch_result(batch: _Batch, results: list[dict[str, Any]]) -> dict[str, Any]:
+    failed = sum(1 for result in results if "error" in result)
+    return {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "max_chars_each": batch.max_chars,
+        "duplicates": batch.duplicates,
+        "skipped": batch.skipped,
+    }
+
+
+class _Page(NamedTuple):
+    """The chunk of a converted page a call asks for."""
+
+    offset: int
+    max_chars: int
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.max_chars
+
+
+class _FetchedContent(NamedTuple):
+    markdown: str
+    body: bytes
+    body_complete: bool
+    truncation: str | None
+    extraction: Extraction | None
+
+
+class _FetchReader:
+    """Consume a response body chunk by chunk and convert it to markdown within the limits.
+
+    Reading stops at ``FETCH_MAX_BYTES`` of (decompressed) body. `feed` only
+    buffers the body, so it is cheap enough to call from the event loop;
+    `finish` does the CPU-bound conversion. In ``full`` mode the body is
+    converted block by block and conversion stops as soon as ``max_chars`` of
+    markdown have been produced; the whole body is still read, so that later
+    chunks of the page can be served from the cache. The other modes need the
+    whole document to find its main content.
+    """
+
+    def __init__(self, content_type: str, max_chars: int, mode: FetchMode) -> None:
+        self._content_type = content_type
+        self._max_chars = max_chars
+        self._mode = mode
+        self._builder: MarkdownBuilder | None = None
+        self._encoding = "utf-8"
+        self._started = False
+        self._body = bytearray()
+        self._body_complete = True
+
+    def _start(self, first: bytes) -> None:
+        """Inspect the first chunk.
+
+        Raises:
+            ValueError: If the content is binary.
+        """
+        self._started = True
+        reason = binary_reason(self._content_type, first)
+        if reason:
+            msg = f"Refusing to fetch binary content ({reason})"
+            raise ValueError(msg)
+        html = is_html(self._content_type, first)
+        self._encoding = detect_encoding(self._content_type, first)
+        if self._mode == "full" or not html:
+            self._builder = MarkdownBuilder(
+                html=html, encoding=self._encoding, max_chars=self._max_chars
+            )
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk of the body; return True once the rest is not needed."""
+        if not self._started:
+            self._start(chunk)
+        room = FETCH_MAX_BYTES - len(self._body)
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self._body_complete = False
+        self._body += chunk
+        return not self._body_complete
+
+    def finish(self) -> _FetchedContent:
+        """Return the markdown, the body read, the truncation reason and the extraction."""
+        if not self._started:
+            self._start(b"")
+        body = bytes(self._body)
+        truncation = None if self._body_complete else "max_bytes"
+        if self._builder is None:
+            text = body.decode(self._encoding, errors="replace")
+            extraction = extract_content(text, self._mode)
+            return _FetchedContent(
+                extraction.markdown, body, self._body_complete, truncation, extraction
+            )
+        for start in range(0, len(body), _FETCH_CHUNK_BYTES):
+            if self._builder.truncated:
+                break
+            self._builder.feed(body[start : start + _FETCH_CHUNK_BYTES])
+        markdown_content = self._builder.finish()
+        if self._builder.truncated:
+            truncation = "max_chars"
+        return _FetchedContent(markdown_content, body, self._body_complete, truncation, None)
+
+
+class _ConvertedPage(NamedTuple):
+    """A page converted in full, from which chunks are served."""
+
+    url: str
+    status_code: int
+    markdown: str
+    truncation: str | None
+    extraction: Extraction | None
+
+
+# Recently converted pages by (requested URL, mode), so that reading a page
+# chunk by chunk neither refetches nor reconverts it
+_CONVERTED_PAGES_MAX = 16
+_converted_pages: OrderedDict[tuple[str, str], _ConvertedPage] = OrderedDict()
+_converted_pages_lock = threading.Lock()
+
+
+def _remember_page(url: str, mode: FetchMode, converted: _ConvertedPage) -> None:
+    with _converted_pages_lock:
+        _converted_pages[url, mode] = converted
+        _converted_pages.move_to_end((url, mode))
+        while len(_converted_pages) > _CONVERTED_PAGES_MAX:
+            _converted_pages.popitem(last=False)
+
+
+def _stored_page(url: str, mode: FetchMode, page: _Page) -> dict[str, Any] | None:
+    """Serve a later chunk of a page converted earlier in this session."""
+    if not page.offset:
+        return None
+    with _converted_pages_lock:
+        converted = _converted_pages.get((url, mode))
+        if converted is None:
+            return None
+        _converted_pages.move_to_end((url, mode))
+    cache = get_http_cache()
+    cache.stats.hits += 1
+    return _fetch_result(converted, "hit", page=page)
+
+
+def _fetched_result(
+    url: str,
+    response: requests.Response | httpx.Response,
+    content: _FetchedContent,
+    *,
+    mode: FetchMode,
+    page: _Page,
+) -> dict[str, Any]:
+    """Cache a freshly downloaded page and build its result."""
+    cache = get_http_cache()
+    # Only complete bodies are cached; a truncated one would be served short later.
+    # The markdown is stored with it only if it was converted in full.
+    if content.body_complete:
+        complete = content.truncation is None and content.extraction is None
+        cache.store(url, response, content.markdown if complete else None, body=content.body)
+    cache.stats.misses += 1
+    converted = _ConvertedPage(
+        str(response.url),
+        response.status_code,
+        content.markdown,
+        content.truncation,
+        content.extraction,
+    )
+    if content.truncation != "max_chars":
+        _remember_page(url, mode, converted)
+    return _fetch_result(converted, "miss", page=page)
+
+
+def _cached_fetch_result(
+    url: str, entry: CachedResponse, cache_status: str, *, mode: FetchMode, page: _Page
+) -> dict[str, Any]:
+    """Build the result for a cached entry, converting its body if needed."""
+    content_type = entry.headers.get("content-type", "")
+    markdown_content = entry.markdown() if mode == "full" else None
+    extraction = None
+    if markdown_content is None:
+        body = entry.raw()
+        html = is_html(content_type, body[:1024])
+        encoding = detect_encoding(content_type, body)
+        if mode != "full" and html:
+            extraction = extract_content(body.decode(encoding, errors="replace"), mode)
+            markdown_content = extraction.markdown
+        else:
+            builder = MarkdownBuilder(html=html, encoding=encoding, max_chars=sys.maxsize)
+            builder.feed(body)
+            markdown_content = builder.finish()
+            get_http_cache().save_markdown(entry, markdown_content)
+    converted = _ConvertedPage(
+        entry.final_url, entry.status_code, markdown_content, None, extraction
+    )
+    _remember_page(url, mode, converted)
+    return _fetch_result(converted, cache_status, page=page)
+
+
+def _fetch_result(converted: _ConvertedPage, cache_status: str, *, page: _Page) -> dict[str, Any]:
+    """Cut the requested chunk out of a converted page and describe it."""
+    markdown = converted.markdown
+    # A page whose conversion stopped at the budget continues past what was converted
+    partial = converted.truncation == "max_chars"
+    has_more = partial or len(markdown) > page.end
+    total_chars = None if partial else len(markdown)
+    markdown_content = markdown[page.offset : page.end]
+    # A budget-stopped conversion may end short of page.end; continue where it ended
+    next_offset = page.offset + len(markdown_content) if has_more else None
+    if has_more:
+        of_total = f" of {total_chars:,}" if total_chars is not None else ""
+        markdown_content += (
+            f"\n\n[Content truncated: showing characters {page.offset:,}-{next_offset:,}"
+            f"{of_total}. Call fetch_url again with offset={next_offset} to read further.]"
+        )
+    elif converted.truncation == "max_bytes":
+        markdown_content += (
+            f"\n\n[Content truncated: the page exceeds {FETCH_MAX_BYTES:,} bytes; "
+            f"only its beginning was downloaded.]"
+        )
+    elif page.offset and page.offset >= len(markdown):
+        markdown_content = (
+            f"[No content at offset {page.offset}: the page has {len(markdown):,} characters.]"
+        )
+    extraction = converted.extraction
+    return {
+        "url": converted.url,
+        "markdown_content": markdown_content,
+        "status_code": converted.status_code,
+        "content_length": len(markdown_content),
+        "truncated": has_more or converted.truncation is not None,
+        "truncation_reason": "max_chars" if has_more else converted.truncation,
+        "offset": page.offset,
+        "next_offset": next_offset,
+        "total_chars": total_chars,
+        "mode": extraction.mode if extraction else "full",
+        "extraction": None
+        if extraction is None
+        else {
+            "page_chars": extraction.page_chars,
+            "kept_chars": extraction.kept_chars,
+            "reduction": extraction.reduction,
+        },
+        "cache": {"status": cache_status, **get_http_cache().stats.as_dict()},
+    }
+
+
+http_request_tool = StructuredTool.from_function(func=http_request, coroutine=ahttp_request)
+fetch_url_tool = StructuredTool.from_function(func=fetch_url, coroutine=afetch_url)
+fetch_urls_tool = StructuredTool.from_function(func=fetch_urls, coroutine=afetch_urls)
+web_search_tool = StructuredTool.from_function(func=web_search, coroutine=aweb_search)
@@ -125,6 +125,11 @@ def format_tool_display(tool_name: str, tool_args: dict) -> str:
             url = truncate_value(url, 80)
             return f'{tool_name}("{url}")'
 
+    elif tool_name == "fetch_urls":
+        # Fetch URLs: show how many URLs are fetched
+        if isinstance(tool_args.get("urls"), list):
+            return f"{tool_name}({len(tool_args['urls'])} URLs)"
+
     elif tool_name == "task":
         # Task: show the task description
         if "description" in tool_args:
@@ -176,8 +181,16 @@ def show_help() -> None:
     console.print("  --agent <NAME>                               Agent identifier (default: agent)")
     console.print("  --model <MODEL>                              Model to use (e.g., claude-sonnet-4-5-20250929, gpt-4o)")
     console.print("  --auto-approve                               Auto-approve tool usage without prompting")
-    console.print("  --sandbox <TYPE>                             Remote sandbox for execution (modal, runloop, daytona)")
+    console.print("  --sandbox <TYPE>                             Remote sandbox for execution (modal, runloop, daytona, local)")
     console.print("  --sandbox-id <ID>                            Reuse existing sandbox (skips creation/cleanup)")
+    console.print("  --sandbox-sync                               Sync the current directory into the sandbox at startup")
+    console.print("  --sandbox-setup <PATH>                       Setup script to run in the sandbox after creation")
+    console.print("  --sandbox-pool <N>                           Keep N warm sandboxes between sessions (default: 0 - off)")
+    console.print("  --sandbox-pool-ttl <MINUTES>                 Tear down pooled sandboxes idle longer than this (default: 30)")
+    console.print("  --persistent-shell                           Run shell commands in one persistent bash session")
+    console.print("  --cache-shell-reads                          Reuse repeated read-only shell command results until files change")
+    console.print("  --shell-limits <SPEC>                        Shell resource limits, e.g. cpu=60,memory=4096,files=1024,nice=10")
+    console.print("  --shell-concurrency <N>                      Maximum shell commands running at once (default: 4)")
     console.print("  -r, --resume <ID>                            Resume thread: -r for most recent, -r <ID> for specific")
     console.print()
 
@@ -197,6 +210,10 @@ style=COLORS["dim"],)
     console.print("  coda threads delete <ID>                     Delete a session", style=COLORS["dim"])
     console.print()
 
+    console.print("[bold]Sandbox Management:[/bold]", style=COLORS["primary"])
+    console.print("  coda sandbox sync --sandbox <TYPE> --sandbox-id <ID>  Upload local changes to a sandbox", style=COLORS["dim"])
+    console.print()
+
     console.print("[bold]Skills Management:[/bold]", style=COLORS["primary"])
     console.print("  coda skills list [--project]                 List all or project skills", style=COLORS["dim"])
     console.print("  coda skills create <NAME> [--project]        Create a user or project skill", style=COLORS["dim"])
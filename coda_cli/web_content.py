@@ -0,0 +1,483 @@
+"""Incremental conversion of fetched web content to markdown.
+
+`fetch_url` streams responses instead of buffering them, so the helpers here
+work on chunks: sniff the first bytes to reject binaries early, pick a text
+encoding, and convert HTML to markdown block by block so conversion can stop
+as soon as the character budget is spent.
+
+`extract_content` implements the ``main`` and ``outline`` modes, which reduce
+a page to its article (or the article's headings) before conversion.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from typing import Literal
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from markdownify import MarkdownConverter, markdownify
+
+# Content types treated as text even though they are not text/*
+_TEXT_APPLICATION_TYPES = (
+    "json",
+    "xml",
+    "javascript",
+    "ecmascript",
+    "x-www-form-urlencoded",
+    "x-sh",
+    "x-python",
+    "yaml",
+    "toml",
+    "graphql",
+)
+_HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+# Leading bytes of common binary formats
+_BINARY_SIGNATURES = (
+    b"%PDF",
+    b"\x89PNG",
+    b"GIF8",
+    b"\xff\xd8\xff",
+    b"PK\x03\x04",
+    b"\x1f\x8b",
+    b"BZh",
+    b"\xfd7zXZ",
+    b"7z\xbc\xaf",
+    b"Rar!",
+    b"\x7fELF",
+    b"MZ",
+    b"\x00asm",
+    b"RIFF",
+    b"OggS",
+    b"ID3",
+    b"\x00\x00\x01\x00",
+    b"wOFF",
+    b"wOF2",
+)
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+_HTML_START = re.compile(
+    rb"^\s*(<!--.*?-->\s*)*<(!doctype\s+html|html|head|body)\b", re.IGNORECASE | re.DOTALL
+)
+
+# Tags or comments. Blocks are cut after a closing tag in _BLOCK_TAGS, unless it
+# is nested inside an element in _ATOMIC_TAGS (whose markdown needs the whole
+# element, e.g. a list's numbering or a table's header row).
+_TAG = re.compile(r"<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*?(/?)>", re.DOTALL)
+_BLOCK_TAGS = frozenset(
+    {
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "dd",
+        "div",
+        "dl",
+        "footer",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hr",
+        "main",
+        "nav",
+        "ol",
+        "p",
+        "pre",
+        "section",
+        "table",
+        "ul",
+    }
+)
+_ATOMIC_TAGS = frozenset({"dl", "ol", "pre", "script", "style", "table", "ul"})
+
+
+def is_html(content_type: str, first_chunk: bytes) -> bool:
+    """Check whether a response is HTML by its content type or opening bytes."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type in _HTML_TYPES or bool(_HTML_START.match(first_chunk[:1024]))
+
+
+def binary_reason(content_type: str, first_chunk: bytes) -> str | None:
+    """Explain why a response looks binary, or return None if it looks like text.
+
+    Args:
+        content_type: The Content-Type header (may be empty)
+        first_chunk: The first bytes of the body
+
+    Returns:
+        A short reason, e.g. ``"content type image/png"``, or None.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type.startswith(("image/", "audio/", "video/", "font/")):
+        return f"content type {media_type}"
+    if media_type.startswith("application/") and media_type not in _HTML_TYPES:
+        subtype = media_type.removeprefix("application/")
+        # octet-stream says nothing about the content; leave it to the sniffing below
+        if subtype != "octet-stream" and not any(
+            marker in subtype for marker in _TEXT_APPLICATION_TYPES
+        ):
+            return f"content type {media_type}"
+    head = first_chunk[:512]
+    if head.startswith(_BINARY_SIGNATURES):
+        return "binary file signature"
+    if b"\x00" in head and not head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "NUL bytes in content"
+    return None
+
+
+def detect_encoding(content_type: str, first_chunk: bytes) -> str:
+    """Pick the text encoding from the Content-Type charset, a <meta> tag, or UTF-8."""
+    for part in content_type.split(";")[1:]:
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "charset" and value:
+            candidate = value.strip("\"'")
+            break
+    else:
+        match = _META_CHARSET.search(first_chunk[:4096])
+        candidate = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return codecs.lookup(candidate).name
+    except LookupError:
+        return "utf-8"
+
+
+class MarkdownBuilder:
+    """Convert a document to markdown as it arrives, within a character budget.
+
+    HTML is split after top-level block elements (paragraphs, headings, lists,
+    tables, ...) and each block is converted with markdownify on its own, so
+    work and memory are proportional to what is kept rather than to the whole
+    page. Other text is passed through unchanged.
+    """
+
+    def __init__(self, *, html: bool, encoding: str, max_chars: int) -> None:
+        """Initialize the builder.
+
+        Args:
+            html: Whether to convert HTML to markdown
+            encoding: Text encoding of the incoming bytes
+            max_chars: Stop after this many characters of output
+        """
+        self.html = html
+        self.max_chars = max_chars
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._pending = ""
+        self._scan_from = 0
+        self._open: list[str] = []
+        self._parts: list[str] = []
+        self._chars = 0
+        self.truncated = False
+
+    def feed(self, data: bytes) -> None:
+        """Add the next chunk of the response body."""
+        if self.truncated:
+            return
+        self._pending += self._decoder.decode(data)
+        if not self.html:
+            self._emit_text(self._pending)
+            self._pending = ""
+            return
+        cut = self._find_cut()
+        if cut:
+            block, self._pending = self._pending[:cut], self._pending[cut:]
+            self._emit_markdown(block)
+
+    def finish(self) -> str:
+        """Convert whatever is left and return the markdown."""
+        self._pending += self._decoder.decode(b"", final=True)
+        if not self.truncated and self._pending.strip():
+            if self.html:
+                self._emit_markdown(self._pending)
+            else:
+                self._emit_text(self._pending)
+        self._pending = ""
+        joiner = "\n\n" if self.html else ""
+        return joiner.join(self._parts)
+
+    def _find_cut(self) -> int:
+        """Return the offset just after the last top-level block ending in the buffer."""
+        cut = 0
+        position = self._scan_from
+        for match in _TAG.finditer(self._pending, self._scan_from):
+            position = match.end()
+            closing, name, self_closing = match.group(1), match.group(2), match.group(3)
+            if name is None:
+                continue
+            name = name.lower()
+            if name in _ATOMIC_TAGS and not self_closing:
+                if not closing:
+                    self._open.append(name)
+                    continue
+                if name in self._open:
+                    # Close it, and anything left unclosed inside it
+                    del self._open[len(self._open) - 1 - self._open[::-1].index(name) :]
+            if name in _BLOCK_TAGS and not self._open and (closing or name == "hr"):
+                cut = match.end()
+        # Resume after the last complete tag; a partial tag is re-scanned next time
+        self._scan_from = position - cut if cut else position
+        return cut
+
+    def _emit_markdown(self, block: str) -> None:
+        markdown = markdownify(block).strip()
+        if markdown:
+            self._append(markdown, separator=2)
+
+    def _emit_text(self, text: str) -> None:
+        self._append(text, separator=0)
+
+    def _append(self, text: str, *, separator: int) -> None:
+        room = self.max_chars - self._chars - (separator if self._parts else 0)
+        if len(text) > room:
+            text = _cut_at_line(text, max(room, 0))
+            self.truncated = True
+        if text:
+            self._parts.append(text)
+            self._chars += len(text) + (separator if len(self._parts) > 1 else 0)
+
+
+def _cut_at_line(text: str, limit: int) -> str:
+    """Cut text to at most ``limit`` characters, preferring a line boundary."""
+    cut = text[:limit]
+    newline = cut.rfind("\n")
+    return cut[:newline] if newline > limit // 2 else cut
+
+
+# Elements that never hold the article
+_NOISE_TAGS = (
+    "aside",
+    "button",
+    "footer",
+    "iframe",
+    "input",
+    "nav",
+    "noscript",
+    "script",
+    "select",
+    "style",
+    "svg",
+    "template",
+)
+_NOISE_ROLES = frozenset(
+    {"alertdialog", "banner", "complementary", "contentinfo", "dialog", "navigation", "search"}
+)
+
+# class/id hints, as in Readability
+# "ad" only counts as a whole word, so "lead-paragraph" or "download" are not penalized
+_UNLIKELY_HINTS = re.compile(
+    r"(?:^|[\s_-])ads?(?:$|[\s_-])|advert|banner|breadcrumb|comment|consent|cookie|disqus|"
+    r"footer|gdpr|masthead|menu|modal|navbar|newsletter|pagination|popup|promo|related|share|"
+    r"sidebar|social|sponsor|subscribe|toolbar|widget",
+    re.IGNORECASE,
+)
+_LIKELY_HINTS = re.compile(r"article|body|content|entry|main|post|story|text", re.IGNORECASE)
+_HINT_WEIGHT = 25
+_ARTICLE_BONUS = 5
+
+# An element holding more than this share of the page's text is never removed as noise
+# (e.g. a page wrapper whose class mentions its sidebar)
+_MAX_NOISE_SHARE = 0.5
+# If less than this share of the page's text is kept, the whole page is used instead
+_MIN_KEPT_SHARE = 0.05
+
+# Elements whose text is scored, and the shortest text that counts
+_SCORED_TAGS = ("blockquote", "dd", "li", "p", "pre", "td")
+_MIN_SCORED_CHARS = 25
+# Ancestor levels credited with an element's score
+_SCORED_LEVELS = 3
+
+# A sibling of the best candidate is kept if it scores this share of the best score
+_SIBLING_SCORE_SHARE = 0.2
+_MIN_SIBLING_SCORE = 10
+_SIBLING_PARAGRAPH_CHARS = 80
+_SIBLING_LINK_DENSITY = 0.25
+
+_HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+
+@dataclass
+class Extraction:
+    """A page reduced to its main content or outline.
+
+    Attributes:
+        mode: ``"main"`` or ``"outline"``
+        markdown: The kept content as markdown
+        page_chars: Characters of visible text on the whole page
+        kept_chars: Characters of visible text that were kept
+    """
+
+    mode: Literal["main", "outline"]
+    markdown: str
+    page_chars: int
+    kept_chars: int
+
+    @property
+    def reduction(self) -> float:
+        """Share of the page's text that was dropped, from 0 to 1."""
+        if not self.page_chars:
+            return 0.0
+        return round(1 - self.kept_chars / self.page_chars, 3)
+
+
+def extract_content(html: str, mode: Literal["main", "outline"]) -> Extraction:
+    """Reduce an HTML page to its main content (``main``) or its headings (``outline``).
+
+    Boilerplate (navigation, footers, cookie banners, scripts, ...) is removed,
+    then the element whose paragraphs carry the most text and the fewest links
+    is picked as the article, together with siblings that score nearly as well.
+    The outline lists the article's headings with the length of each section.
+    If that keeps almost none of the page's text, the whole page is used
+    instead (``kept_chars`` then equals ``page_chars``).
+
+    Args:
+        html: The decoded page
+        mode: ``"main"`` for the article as markdown, ``"outline"`` for its headings
+
+    Returns:
+        The kept content and how much of the page's text it covers.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    root = soup.body or soup
+    page_chars = len(_text(root))
+    title = _text(soup.title) if soup.title else ""
+    _remove_noise(root, page_chars)
+    nodes = _main_nodes(root)
+    kept_chars = sum(len(_text(node)) for node in nodes)
+    if kept_chars <= page_chars * _MIN_KEPT_SHARE:
+        # The heuristics dropped the article itself; keep the page rather than nothing
+        soup = BeautifulSoup(html, "html.parser")
+        nodes, kept_chars = [soup.body or soup], page_chars
+    has_h1 = any(node.name == "h1" or node.find("h1") for node in nodes)
+    heading = f"# {title}" if title and not has_h1 else ""
+    if mode == "outline":
+        lines = _outline(nodes)
+        kept_chars = sum(len(line) for line in lines)
+        body = "\n".join(lines) if lines else "(The page has no headings.)"
+    else:
+        converter = MarkdownConverter()
+        blocks = (converter.convert_soup(node).strip() for node in nodes)
+        body = "\n\n".join(block for block in blocks if block)
+    markdown = f"{heading}\n\n{body}" if heading else body
+    return Extraction(mode=mode, markdown=markdown, page_chars=page_chars, kept_chars=kept_chars)
+
+
+def _text(node: Tag) -> str:
+    return " ".join(node.get_text(" ").split())
+
+
+def _link_density(node: Tag) -> float:
+    text_length = len(_text(node))
+    if not text_length:
+        return 0.0
+    return sum(len(_text(link)) for link in node.find_all("a")) / text_length
+
+
+def _hint_weight(node: Tag) -> int:
+    hints = " ".join([*node.get("class", []), node.get("id", "")])
+    if not hints.strip():
+        return 0
+    weight = 0
+    if _LIKELY_HINTS.search(hints):
+        weight += _HINT_WEIGHT
+    if _UNLIKELY_HINTS.search(hints):
+        weight -= _HINT_WEIGHT
+    return weight
+
+
+def _remove_noise(root: Tag, page_chars: int) -> None:
+    for node in root.find_all(_NOISE_TAGS):
+        node.decompose()
+    for node in root.find_all():
+        if node.decomposed or node.name in {"article", "body", "html", "main"}:
+            continue
+        hidden = node.get("aria-hidden") == "true" or node.has_attr("hidden")
+        # A negative weight means an unlikely hint and no likely one
+        if not (hidden or node.get("role") in _NOISE_ROLES or _hint_weight(node) < 0):
+            continue
+        if len(_text(node)) <= page_chars * _MAX_NOISE_SHARE:
+            node.decompose()
+
+
+def _score_candidates(root: Tag) -> tuple[dict[int, Tag], dict[int, float]]:
+    """Score the ancestors of paragraph-like elements by the text they hold."""
+    scores: dict[int, float] = {}
+    candidates: dict[int, Tag] = {}
+    for element in root.find_all(_SCORED_TAGS):
+        text = _text(element)
+        if len(text) < _MIN_SCORED_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        # Credit the parent fully and the levels above it partially
+        for level, ancestor in enumerate(element.parents, start=1):
+            if level > _SCORED_LEVELS or ancestor.name == "[document]":
+                break
+            if id(ancestor) not in scores:
+                candidates[id(ancestor)] = ancestor
+                bonus = _ARTICLE_BONUS if ancestor.name == "article" else 0
+                scores[id(ancestor)] = _hint_weight(ancestor) + bonus
+            scores[id(ancestor)] += score / level
+    for key, candidate in candidates.items():
+        scores[key] *= 1 - _link_density(candidate)
+    return candidates, scores
+
+
+def _main_nodes(root: Tag) -> list[Tag]:
+    """Pick the article element and its qualifying siblings, in document order."""
+    candidates, scores = _score_candidates(root)
+    if not candidates:
+        return [root]
+    best_key = max(scores, key=scores.__getitem__)
+    best = candidates[best_key]
+    if best.parent is None or best is root:
+        return [best]
+    threshold = max(_MIN_SIBLING_SCORE, scores[best_key] * _SIBLING_SCORE_SHARE)
+    nodes = []
+    for sibling in best.parent.children:
+        if not isinstance(sibling, Tag):
+            continue
+        if sibling is best or scores.get(id(sibling), 0) >= threshold or _is_content(sibling):
+            nodes.append(sibling)
+    return nodes
+
+
+def _is_content(node: Tag) -> bool:
+    """Whether a heading or a long, mostly unlinked paragraph."""
+    if node.name in _HEADINGS:
+        return True
+    return (
+        node.name == "p"
+        and len(_text(node)) >= _SIBLING_PARAGRAPH_CHARS
+        and _link_density(node) < _SIBLING_LINK_DENSITY
+    )
+
+
+def _outline(nodes: list[Tag]) -> list[str]:
+    """List headings as markdown headings, each with its section's text length."""
+    sections: list[list] = []
+    for node in nodes:
+        for element in [node, *node.descendants]:
+            if isinstance(element, Tag) and element.name in _HEADINGS:
+                sections.append([int(element.name[1]), _text(element), 0])
+            elif (
+                type(element) is NavigableString
+                and sections
+                and element.find_parent(_HEADINGS) is None
+            ):
+                sections[-1][2] += len(" ".join(element.split()))
+    return [f"{'#' * level} {title} ({chars:,} chars)" for level, title, chars in sections if title]
+
+
+__all__ = [
+    "Extraction",
+    "MarkdownBuilder",
+    "binary_reason",
+    "detect_encoding",
+    "extract_content",
+    "is_html",
+]
@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-import re
 from typing import TYPE_CHECKING, Any
 
 from textual.containers import Vertical
 from textual.widgets import Static
 
+from coda_cli.diff_engine import DiffResult, parse_unified_diff
+
 if TYPE_CHECKING:
     from textual.app import ComposeResult
 
@@ -25,95 +26,92 @@ def _escape_markup(text: str) -> str:
     return text.replace("[", r"\[").replace("]", r"\]")
 
 
-def format_diff_textual(diff: str, max_lines: int | None = 100) -> str:
-    """Format a unified diff with line numbers and colors.
+def format_diff_result_textual(
+    result: DiffResult, max_lines: int | None = 100, *, truncated: bool = False
+) -> str:
+    """Format a computed diff with line numbers and colors.
 
     Args:
-        diff: Unified diff string
+        result: Diff computed by the diff engine, with precomputed statistics
         max_lines: Maximum number of diff lines to show (None for unlimited)
+        truncated: Whether the hunks were already cut short upstream
 
     Returns:
         Rich-formatted diff string with line numbers
     """
-    if not diff:
+    if not result.has_changes:
         return "[dim]No changes detected[/dim]"
 
-    lines = diff.splitlines()
-
-    # Compute stats first
-    additions = sum(1 for ln in lines if ln.startswith("+") and not ln.startswith("+++"))
-    deletions = sum(1 for ln in lines if ln.startswith("-") and not ln.startswith("---"))
-
-    # Find max line number for width calculation
-    max_line = 0
-    for line in lines:
-        if m := re.match(r"@@ -(\d+)(?:,\d+)? \+(\d+)", line):
-            max_line = max(max_line, int(m.group(1)), int(m.group(2)))
-    width = max(3, len(str(max_line + len(lines))))
+    width = max(3, len(str(result.max_lineno)))
 
     formatted = []
 
     # Add stats header
     stats_parts = []
-    if additions:
-        stats_parts.append(f"[green]+{additions}[/green]")
-    if deletions:
-        stats_parts.append(f"[red]-{deletions}[/red]")
+    if result.added:
+        stats_parts.append(f"[green]+{result.added}[/green]")
+    if result.removed:
+        stats_parts.append(f"[red]-{result.removed}[/red]")
     if stats_parts:
         formatted.append(" ".join(stats_parts))
         formatted.append("")  # Blank line after stats
 
-    old_num = new_num = 0
     line_count = 0
-
-    for line in lines:
-        if max_lines and line_count >= max_lines:
-            formatted.append(f"\n[dim]... ({len(lines) - line_count} more lines)[/dim]")
-            break
-
-        # Skip file headers (--- and +++)
-        if line.startswith(("---", "+++")):
-            continue
-
-        # Handle hunk headers - just update line numbers, don't display
-        if m := re.match(r"@@ -(\d+)(?:,\d+)? \+(\d+)", line):
-            old_num, new_num = int(m.group(1)), int(m.group(2))
-            continue
-
-        # Handle diff lines - use gutter bar instead of +/- prefix
-        content = line[1:] if line else ""
-        escaped_content = _escape_markup(content)
-
-        if line.startswith("-"):
-            # Deletion - red gutter bar, subtle red background
-            formatted.append(
-                f"[red bold]▌[/red bold][dim]{old_num:>{width}}[/dim] "
-                f"[on #2d1515]{escaped_content}[/on #2d1515]"
-            )
-            old_num += 1
-            line_count += 1
-        elif line.startswith("+"):
-            # Addition - green gutter bar, subtle green background
-            formatted.append(
-                f"[green bold]▌[/green bold][dim]{new_num:>{width}}[/dim] "
-                f"[on #152d15]{escaped_content}[/on #152d15]"
-            )
-            new_num += 1
-            line_count += 1
-        elif line.startswith(" "):
-            # Context line - dim gutter
-            formatted.append(f"[dim]│{old_num:>{width}}[/dim]  {escaped_content}")
-            old_num += 1
-            new_num += 1
-            line_count += 1
-        elif line.strip() == "...":
-            # Truncation marker
-            formatted.append("[dim]...[/dim]")
+    for hunk in result.hunks:
+        if hunk.replaced:
+            formatted.append("[dim]File replaced (diff too large to align)[/dim]")
+        for line in hunk.lines:
+            if max_lines and line_count >= max_lines:
+                remaining = result.total_lines - line_count
+                formatted.append(f"\n[dim]... ({remaining} more lines)[/dim]")
+                return "\n".join(formatted)
+
+            # Use gutter bar instead of +/- prefix
+            escaped_content = _escape_markup(line.text)
+            if line.kind == "remove":
+                # Deletion - red gutter bar, subtle red background
+                formatted.append(
+                    f"[red bold]▌[/red bold][dim]{line.old_lineno:>{width}}[/dim] "
+                    f"[on #2d1515]{escaped_content}[/on #2d1515]"
+                )
+            elif line.kind == "add":
+                # Addition - green gutter bar, subtle green background
+                formatted.append(
+                    f"[green bold]▌[/green bold][dim]{line.new_lineno:>{width}}[/dim] "
+                    f"[on #152d15]{escaped_content}[/on #152d15]"
+                )
+            else:
+                # Context line - dim gutter
+                formatted.append(f"[dim]│{line.old_lineno:>{width}}[/dim]  {escaped_content}")
             line_count += 1
 
+    if truncated:
+        # Truncation marker
+        formatted.append("[dim]...[/dim]")
+
     return "\n".join(formatted)
 
 
+def format_diff_textual(diff: str, max_lines: int | None = 100) -> str:
+    """Format a unified diff string with line numbers and colors.
+
+    Prefer ``format_diff_result_textual`` when a computed diff is available;
+    this parses the text once for diffs that only exist as strings.
+
+    Args:
+        diff: Unified diff string
+        max_lines: Maximum number of diff lines to show (None for unlimited)
+
+    Returns:
+        Rich-formatted diff string with line numbers
+    """
+    if not diff:
+        return "[dim]No changes detected[/dim]"
+    truncated = diff.rstrip().endswith("\n...")
+    result = DiffResult.from_hunks(parse_unified_diff(diff))
+    return format_diff_result_textual(result, max_lines, truncated=truncated)
+
+
 class EnhancedDiff(Vertical):
     """Widget for displaying a unified diff with syntax highlighting."""
 
@@ -143,7 +141,7 @@ class EnhancedDiff(Vertical):
 
     def __init__(
         self,
-        diff: str,
+        diff: str | DiffResult,
         title: str = "Diff",
         max_lines: int | None = 100,
         **kwargs: Any,
@@ -151,40 +149,26 @@ class EnhancedDiff(Vertical):
         """Initialize the diff widget.
 
         Args:
-            diff: Unified diff string
+            diff: Computed diff, or a unified diff string
             title: Title to display above the diff
             max_lines: Maximum number of diff lines to show
             **kwargs: Additional arguments passed to parent
         """
         super().__init__(**kwargs)
-        self._diff = diff
+        if isinstance(diff, str):
+            diff = DiffResult.from_hunks(parse_unified_diff(diff))
+        self._result = diff
         self._title = title
         self._max_lines = max_lines
-        self._stats = self._compute_stats()
-
-    def _compute_stats(self) -> tuple[int, int]:
-        """Compute additions and deletions count.
-
-        Returns:
-            Tuple of (additions, deletions)
-        """
-        additions = 0
-        deletions = 0
-        for line in self._diff.splitlines():
-            if line.startswith("+") and not line.startswith("+++"):
-                additions += 1
-            elif line.startswith("-") and not line.startswith("---"):
-                deletions += 1
-        return additions, deletions
 
     def compose(self) -> ComposeResult:
         """Compose the diff widget layout."""
         yield Static(f"[bold cyan]═══ {self._title} ═══[/bold cyan]", classes="diff-title")
 
-        formatted = format_diff_textual(self._diff, self._max_lines)
+        formatted = format_diff_result_textual(self._result, self._max_lines)
         yield Static(formatted, classes="diff-content")
 
-        additions, deletions = self._stats
+        additions, deletions = self._result.added, self._result.removed
         if additions or deletions:
             stats_parts = []
             if additions:
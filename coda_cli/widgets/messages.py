@@ -4,16 +4,21 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+from rich.text import Text
 from textual.containers import Vertical
 from textual.css.query import NoMatches
 from textual.widgets import Markdown, Static
 from textual.widgets._markdown import MarkdownStream
 
+from coda_cli.pty_command import TerminalScrollback
 from coda_cli.ui import format_tool_display
-from coda_cli.widgets.diff import format_diff_textual
+from coda_cli.widgets.diff import format_diff_result_textual, format_diff_textual
 
 if TYPE_CHECKING:
     from textual.app import ComposeResult
+    from textual.timer import Timer
+
+    from coda_cli.diff_engine import DiffResult
 
 # Maximum number of tool arguments to display inline
 _MAX_INLINE_ARGS = 3
@@ -221,6 +226,9 @@ class ToolCallMessage(Vertical):
     _PREVIEW_LINES = 3
     _PREVIEW_CHARS = 200
 
+    # Max chars of live output kept while the tool is still running
+    _STREAM_CHARS = 16_000
+
     def __init__(
         self,
         tool_name: str,
@@ -273,6 +281,20 @@ class ToolCallMessage(Vertical):
         except NoMatches:
             pass
 
+    def append_output(self, chunk: str) -> None:
+        """Append output streamed by a running tool.
+
+        Only the most recent output is kept; the final result passed to
+        ``set_success``/``set_error`` replaces it.
+
+        Args:
+            chunk: Newly produced output
+        """
+        if self._status != "pending" or not chunk:
+            return
+        self._output = (self._output + chunk)[-self._STREAM_CHARS :]
+        self._update_output_display()
+
     def set_success(self, result: str = "") -> None:
         """Mark the tool call as successful.
 
@@ -357,8 +379,10 @@ class ToolCallMessage(Vertical):
                 # Show preview
                 full.display = False
                 if needs_truncation:
-                    # Truncate by lines first, then by chars
-                    if total_lines > self._PREVIEW_LINES:
+                    # Truncate by lines first, then by chars; running tools show the latest lines
+                    if total_lines > self._PREVIEW_LINES and self._status == "pending":
+                        preview_text = "\n".join(lines[-self._PREVIEW_LINES :])
+                    elif total_lines > self._PREVIEW_LINES:
                         preview_text = "\n".join(lines[: self._PREVIEW_LINES])
                     else:
                         preview_text = output_stripped
@@ -438,17 +462,26 @@ class DiffMessage(Static):
     }
     """
 
-    def __init__(self, diff_content: str, file_path: str = "", **kwargs: Any) -> None:
+    def __init__(
+        self,
+        diff_content: str,
+        file_path: str = "",
+        *,
+        result: DiffResult | None = None,
+        **kwargs: Any,
+    ) -> None:
         """Initialize a diff message.
 
         Args:
             diff_content: The unified diff content
             file_path: Path to the file being modified
+            result: Precomputed diff for diff_content; rendered directly when given
             **kwargs: Additional arguments passed to parent
         """
         super().__init__(**kwargs)
         self._diff_content = diff_content
         self._file_path = file_path
+        self._result = result
 
     def compose(self) -> ComposeResult:
         """Compose the diff message layout."""
@@ -456,10 +489,91 @@ class DiffMessage(Static):
             yield Static(f"[bold]File: {self._file_path}[/bold]", classes="diff-header")
 
         # Render the diff with enhanced formatting
-        rendered = format_diff_textual(self._diff_content, max_lines=100)
+        if self._result is not None:
+            rendered = format_diff_result_textual(self._result, max_lines=100)
+        else:
+            rendered = format_diff_textual(self._diff_content, max_lines=100)
         yield Static(rendered)
 
 
+class BashOutputMessage(Static):
+    """Widget streaming the output of a user `!` command.
+
+    Only the last lines are kept (see `TerminalScrollback`) and redraws are
+    batched, so commands that print heavily do not slow down the UI.
+    """
+
+    DEFAULT_CSS = """
+    BashOutputMessage {
+        height: auto;
+        padding: 0 1;
+        margin: 1 0;
+        background: $surface-darken-1;
+    }
+    """
+
+    # Minimum seconds between redraws while output is arriving
+    _RENDER_INTERVAL = 0.1
+
+    def __init__(self, *, max_lines: int = 2000, **kwargs: Any) -> None:
+        """Initialize a bash output message.
+
+        Args:
+            max_lines: Number of output lines kept in the scrollback
+            **kwargs: Additional arguments passed to parent
+        """
+        super().__init__("", **kwargs)
+        self._scrollback = TerminalScrollback(max_lines=max_lines)
+        self._footer = Text("Running... (Ctrl+C to interrupt)", style="dim italic")
+        self._render_timer: Timer | None = None
+
+    def on_mount(self) -> None:
+        """Show the running hint until output arrives."""
+        self._refresh_output()
+
+    def append_output(self, chunk: str) -> None:
+        """Add output from the command, scheduling a redraw if none is pending.
+
+        Args:
+            chunk: Newly produced terminal output
+        """
+        self._scrollback.write(chunk)
+        if self._render_timer is None and self.is_mounted:
+            self._render_timer = self.set_timer(self._RENDER_INTERVAL, self._refresh_output)
+
+    def set_finished(self, returncode: int, *, interrupted: bool = False) -> None:
+        """Replace the running hint with the command's outcome and redraw.
+
+        Args:
+            returncode: The command's exit code
+            interrupted: Whether the user interrupted the command
+        """
+        if interrupted:
+            self._footer = Text("Interrupted", style="yellow")
+        elif returncode != 0:
+            self._footer = Text(f"Exit code: {returncode}", style="red")
+        elif not self._scrollback.lines:
+            self._footer = Text("Command completed (no output)", style="dim italic")
+        else:
+            self._footer = Text("")
+        if self._render_timer is not None:
+            self._render_timer.stop()
+        self._refresh_output()
+
+    def _refresh_output(self) -> None:
+        self._render_timer = None
+        parts: list[Text] = []
+        if self._scrollback.dropped_lines:
+            parts.append(
+                Text(f"... {self._scrollback.dropped_lines} earlier lines not shown", style="dim")
+            )
+        if self._scrollback.lines:
+            parts.append(Text.from_ansi(self._scrollback.text()))
+        if self._footer:
+            parts.append(self._footer)
+        self.update(Text("\n").join(parts))
+
+
 class ErrorMessage(Static):
     """Widget displaying an error message."""
 
@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
-import difflib
 from typing import TYPE_CHECKING, Any
 
+from coda_cli.diff_engine import DiffResult, diff_line_lists
 from coda_cli.widgets.tool_widgets import (
     BashApprovalWidget,
     EditFileApprovalWidget,
@@ -66,38 +66,25 @@ class EditFileRenderer(ToolRenderer):
         old_string = tool_args.get("old_string", "")
         new_string = tool_args.get("new_string", "")
 
-        # Generate unified diff
-        diff_lines = self._generate_diff(old_string, new_string)
+        # Diff once; the widget reads hunks and stats from the result
+        diff_result = self._generate_diff(old_string, new_string)
 
         data = {
             "file_path": file_path,
-            "diff_lines": diff_lines,
+            "diff_result": diff_result,
             "old_string": old_string,
             "new_string": new_string,
         }
         return EditFileApprovalWidget, data
 
-    def _generate_diff(self, old_string: str, new_string: str) -> list[str]:
-        """Generate unified diff lines from old and new strings."""
+    def _generate_diff(self, old_string: str, new_string: str) -> DiffResult:
+        """Generate a diff result from old and new strings."""
         if not old_string and not new_string:
-            return []
+            return DiffResult()
 
         old_lines = old_string.split("\n") if old_string else []
         new_lines = new_string.split("\n") if new_string else []
-
-        # Generate unified diff
-        diff = difflib.unified_diff(
-            old_lines,
-            new_lines,
-            fromfile="before",
-            tofile="after",
-            lineterm="",
-            n=3,  # Context lines
-        )
-
-        # Skip the first two header lines (--- and +++)
-        diff_list = list(diff)
-        return diff_list[2:] if len(diff_list) > 2 else diff_list
+        return DiffResult.from_hunks(diff_line_lists(old_lines, new_lines, context_lines=3))
 
 
 class BashRenderer(ToolRenderer):
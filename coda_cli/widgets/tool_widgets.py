@@ -10,6 +10,8 @@ from textual.widgets import Markdown, Static
 if TYPE_CHECKING:
     from textual.app import ComposeResult
 
+    from coda_cli.diff_engine import DiffLine, DiffResult
+
 # Constants for display limits
 _MAX_VALUE_LEN = 200
 _MAX_LINES = 30
@@ -101,39 +103,35 @@ class EditFileApprovalWidget(ToolApprovalWidget):
     def compose(self) -> ComposeResult:
         """Compose the diff display with colored additions and deletions."""
         file_path = self.data.get("file_path", "")
-        diff_lines = self.data.get("diff_lines", [])
+        diff_result: DiffResult | None = self.data.get("diff_result")
         old_string = self.data.get("old_string", "")
         new_string = self.data.get("new_string", "")
 
         # Calculate stats first for header
-        additions, deletions = self._count_stats(diff_lines, old_string, new_string)
+        additions, deletions = self._count_stats(diff_result, old_string, new_string)
 
         # File path header with stats
         stats_str = self._format_stats(additions, deletions)
         yield Static(f"[bold cyan]File:[/bold cyan] {file_path}  {stats_str}")
         yield Static("")
 
-        if not diff_lines and not old_string and not new_string:
+        has_diff = diff_result is not None and diff_result.has_changes
+        if not has_diff and not old_string and not new_string:
             yield Static("No changes to display", classes="approval-description")
             return
 
         # Render content
-        if diff_lines:
-            yield from self._render_diff_lines_only(diff_lines)
+        if has_diff:
+            yield from self._render_diff_lines_only(diff_result)
         else:
             yield from self._render_strings_only(old_string, new_string)
 
     def _count_stats(
-        self, diff_lines: list[str], old_string: str, new_string: str
+        self, diff_result: DiffResult | None, old_string: str, new_string: str
     ) -> tuple[int, int]:
         """Count additions and deletions from diff data."""
-        if diff_lines:
-            additions = sum(
-                1 for line in diff_lines if line.startswith("+") and not line.startswith("+++")
-            )
-            deletions = sum(
-                1 for line in diff_lines if line.startswith("-") and not line.startswith("---")
-            )
+        if diff_result is not None and diff_result.has_changes:
+            additions, deletions = diff_result.added, diff_result.removed
         else:
             additions = new_string.count("\n") + 1 if new_string else 0
             deletions = old_string.count("\n") + 1 if old_string else 0
@@ -148,21 +146,18 @@ class EditFileApprovalWidget(ToolApprovalWidget):
             parts.append(f"[red]-{deletions}[/red]")
         return " ".join(parts)
 
-    def _render_diff_lines_only(self, diff_lines: list[str]) -> ComposeResult:
-        """Render unified diff lines without returning stats."""
+    def _render_diff_lines_only(self, diff_result: DiffResult) -> ComposeResult:
+        """Render diff hunk lines without returning stats."""
         lines_shown = 0
+        total = diff_result.total_lines
 
-        for line in diff_lines:
-            if lines_shown >= _MAX_DIFF_LINES:
-                yield Static(f"[dim]... ({len(diff_lines) - lines_shown} more lines)[/dim]")
-                break
-
-            if line.startswith(("@@", "---", "+++")):
-                continue
+        for hunk in diff_result.hunks:
+            for line in hunk.lines:
+                if lines_shown >= _MAX_DIFF_LINES:
+                    yield Static(f"[dim]... ({total - lines_shown} more lines)[/dim]")
+                    return
 
-            widget = self._render_diff_line(line)
-            if widget:
-                yield widget
+                yield self._render_diff_line(line)
                 lines_shown += 1
 
     def _render_strings_only(self, old_string: str, new_string: str) -> ComposeResult:
@@ -176,19 +171,15 @@ class EditFileApprovalWidget(ToolApprovalWidget):
             yield Static("[bold green]Adding:[/bold green]")
             yield from self._render_string_lines(new_string, is_addition=True)
 
-    def _render_diff_line(self, line: str) -> Static | None:
+    def _render_diff_line(self, line: DiffLine) -> Static:
         """Render a single diff line with appropriate styling."""
-        content = _escape_markup(line[1:] if len(line) > 1 else "")
+        content = _escape_markup(line.text)
 
-        if line.startswith("-"):
+        if line.kind == "remove":
             return Static(f"[on #3d1f1f][red]- {content}[/red][/on #3d1f1f]")
-        if line.startswith("+"):
+        if line.kind == "add":
             return Static(f"[on #1f3d1f][green]+ {content}[/green][/on #1f3d1f]")
-        if line.startswith(" "):
-            return Static(f"[dim]  {content}[/dim]")
-        if line.strip():
-            return Static(line, markup=False)
-        return None
+        return Static(f"[dim]  {content}[/dim]")
 
     def _render_string_lines(self, text: str, *, is_addition: bool) -> ComposeResult:
         """Render lines from a string with appropriate styling."""
@@ -0,0 +1,57 @@
+"""Benchmark the diff engine against difflib.
+
+Run with ``pytest tests/integration_tests/benchmarks -s`` to see the timings.
+"""
+
+import difflib
+import random
+import time
+from collections.abc import Callable
+
+import pytest
+
+from coda_cli.diff_engine import diff_line_lists
+
+
+def _time(func: Callable[[], object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _large_file(lines: int, seed: int) -> tuple[list[str], list[str]]:
+    rng = random.Random(seed)
+    before = [f"line {i}: {rng.random():.6f}" for i in range(lines)]
+    after = list(before)
+    for _ in range(lines // 100):
+        after[rng.randrange(len(after))] = f"edited {rng.random():.6f}"
+    return before, after
+
+
+def _repetitive_file(lines: int) -> tuple[list[str], list[str]]:
+    before = ["}", "", "    return None"] * (lines // 3)
+    after = list(before)
+    after[lines // 2 : lines // 2] = ["    pass"] * 20
+    return before, after
+
+
+@pytest.mark.timeout(120)
+@pytest.mark.parametrize(
+    ("name", "inputs"),
+    [
+        ("large-scattered", _large_file(20_000, 1)),
+        ("repetitive", _repetitive_file(30_000)),
+    ],
+)
+def test_engine_vs_difflib(name: str, inputs: tuple[list[str], list[str]]) -> None:
+    before, after = inputs
+
+    engine = _time(lambda: diff_line_lists(before, after))
+    reference = _time(lambda: list(difflib.unified_diff(before, after, lineterm="")))
+
+    print(f"\n{name}: engine={engine * 1000:.1f}ms difflib={reference * 1000:.1f}ms")  # noqa: T201
+    # The engine is bounded by its time budget plus linear pre/post-processing
+    assert engine < max(reference * 2, 2.0)
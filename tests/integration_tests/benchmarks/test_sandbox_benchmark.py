@@ -0,0 +1,49 @@
+"""Benchmark sandbox file operations over a simulated remote round trip.
+
+Runs on the local subprocess sandbox with a fixed per-call latency, so the
+numbers approximate a remote provider without credentials. Run with
+``pytest tests/integration_tests/benchmarks -s`` to see the timings.
+"""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from coda_cli.integrations.local import LocalSubprocessSandbox
+
+LATENCY = 0.05
+
+
+def _measure(sandbox: LocalSubprocessSandbox, func: Callable[[], object]) -> tuple[int, float]:
+    trips = sandbox.round_trips
+    start = time.perf_counter()
+    func()
+    return sandbox.round_trips - trips, time.perf_counter() - start
+
+
+@pytest.mark.timeout(120)
+def test_operation_round_trips(tmp_path: Path) -> None:
+    sandbox = LocalSubprocessSandbox(tmp_path / "sandbox", latency=LATENCY)
+    work = tmp_path / "work"
+    path = str(work / "module.py")
+    content = "\n".join(f"def f{i}():\n    return {i}" for i in range(2000))
+
+    operations: dict[str, Callable[[], object]] = {
+        "write": lambda: sandbox.write(path, content),
+        "read": lambda: sandbox.read(path),
+        "edit": lambda: sandbox.edit(path, "return 1999", "return -1"),
+        "ls": lambda: sandbox.ls(str(work)),
+        "grep": lambda: sandbox.grep("return -1", str(work)),
+        "glob": lambda: sandbox.glob("**/*.py", str(work)),
+        "upload 50 files": lambda: sandbox.upload_files(
+            [(str(work / f"file{i}.txt"), b"x" * 1024) for i in range(50)]
+        ),
+    }
+
+    for name, operation in operations.items():
+        trips, seconds = _measure(sandbox, operation)
+        print(f"\n{name}: {trips} round trips, {seconds * 1000:.0f}ms")  # noqa: T201
+        # Each operation should cost a small, constant number of round trips
+        assert trips <= 3
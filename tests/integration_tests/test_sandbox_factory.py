@@ -327,3 +327,13 @@ class TestModalIntegration(BaseSandboxIntegrationTest):
             pytest.skip("MODAL_TOKEN_ID and MODAL_TOKEN_SECRET environment variables not set")
         with create_sandbox("modal") as sandbox:
             yield sandbox
+
+
+class TestLocalIntegration(BaseSandboxIntegrationTest):
+    """Test the local subprocess backend, which needs no credentials."""
+
+    @pytest.fixture(scope="class")
+    def sandbox(self) -> Iterator[BaseSandbox]:
+        """Provide a local sandbox instance."""
+        with create_sandbox("local") as sandbox:
+            yield sandbox
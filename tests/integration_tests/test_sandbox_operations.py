@@ -1,35 +1,44 @@
 """Integration tests for BaseSandbox file operations.
 
 This module tests the core file operations implemented in BaseSandbox:
-- write(): Create new files
-- read(): Read file contents with line numbers
+- write(): Create or overwrite files
+- read(): Read file contents a page of lines at a time
 - edit(): String replacement in files
-- ls_info(): List directory contents
-- grep_raw(): Search for patterns
-- glob_info(): Pattern matching for files
+- ls(): List directory contents
+- grep(): Search for literal patterns
+- glob(): Pattern matching for files
 
-All tests run on a single sandbox instance (class-scoped fixture)
-to avoid the overhead of spinning up multiple containers.
+All tests run on a single sandbox instance per provider (class-scoped
+fixture) to avoid the overhead of spinning up multiple containers. The
+``local`` provider runs everywhere; Runloop needs ``RUNLOOP_API_KEY``.
 """
 
 import os
 from collections.abc import Iterator
+from pathlib import PurePosixPath
 
 import pytest
-from deepagents.backends.protocol import SandboxBackendProtocol
+from deepagents.backends.protocol import ReadResult, SandboxBackendProtocol
 
 from coda_cli.integrations.sandbox_factory import create_sandbox
 
 
+def _content(result: ReadResult) -> str:
+    """Return the text of a successful read."""
+    assert result.error is None
+    assert result.file_data is not None
+    return result.file_data["content"]
+
+
 class TestSandboxOperations:
     """Test core sandbox file operations using a single sandbox instance."""
 
-    @pytest.fixture(scope="class")
-    def sandbox(self) -> Iterator[SandboxBackendProtocol]:
+    @pytest.fixture(scope="class", params=["local", "runloop"])
+    def sandbox(self, request: pytest.FixtureRequest) -> Iterator[SandboxBackendProtocol]:
         """Provide a single sandbox instance for all tests."""
-        if not os.environ.get("RUNLOOP_API_KEY"):
+        if request.param == "runloop" and not os.environ.get("RUNLOOP_API_KEY"):
             pytest.skip("RUNLOOP_API_KEY environment variable not set")
-        with create_sandbox("runloop") as sandbox:
+        with create_sandbox(request.param) as sandbox:
             yield sandbox
 
     @pytest.fixture(autouse=True)
@@ -64,20 +73,18 @@ class TestSandboxOperations:
         exec_result = sandbox.execute(f"cat {test_path}")
         assert exec_result.output.strip() == content
 
-    def test_write_existing_file_fails(self, sandbox: SandboxBackendProtocol) -> None:
-        """Test that writing to an existing file returns an error."""
+    def test_write_existing_file_overwrites(self, sandbox: SandboxBackendProtocol) -> None:
+        """Test that writing to an existing file replaces its content."""
         test_path = "/tmp/test_sandbox_ops/existing.txt"
         # Create file first
         sandbox.write(test_path, "First content")
 
-        # Try to write again
+        # Write again
         result = sandbox.write(test_path, "Second content")
 
-        assert result.error is not None
-        assert "already exists" in result.error.lower()
-        # Verify original content unchanged
+        assert result.error is None
         exec_result = sandbox.execute(f"cat {test_path}")
-        assert exec_result.output.strip() == "First content"
+        assert exec_result.output.strip() == "Second content"
 
     def test_write_special_characters(self, sandbox: SandboxBackendProtocol) -> None:
         """Test writing content with special characters and escape sequences."""
@@ -173,12 +180,8 @@ class TestSandboxOperations:
 
         result = sandbox.read(test_path)
 
-        assert "Error:" not in result
-        # Should have line numbers
-        assert "1\t" in result or "     1\t" in result
-        assert "Line 1" in result
-        assert "Line 2" in result
-        assert "Line 3" in result
+        assert _content(result) == content
+        assert (result.start_line, result.end_line, result.total_lines) == (1, 3, 3)
 
     def test_read_nonexistent_file(self, sandbox: SandboxBackendProtocol) -> None:
         """Test reading a file that doesn't exist."""
@@ -186,15 +189,15 @@ class TestSandboxOperations:
 
         result = sandbox.read(test_path)
 
-        assert "Error:" in result
-        assert "not found" in result.lower()
+        assert result.file_data is None
+        assert "file_not_found" in result.error
 
     def test_read_empty_file(self, sandbox: SandboxBackendProtocol) -> None:
         """Test reading an empty file."""
         test_path = "/tmp/test_sandbox_ops/empty_read.txt"
         sandbox.write(test_path, "")
 
-        result = sandbox.read(test_path)
+        result = _content(sandbox.read(test_path))
 
         # Empty files should return a system reminder
         assert "empty" in result.lower() or result.strip() == ""
@@ -205,7 +208,7 @@ class TestSandboxOperations:
         content = "\n".join([f"Row_{i}_content" for i in range(1, 11)])
         sandbox.write(test_path, content)
 
-        result = sandbox.read(test_path, offset=5)
+        result = _content(sandbox.read(test_path, offset=5))
 
         # Should start from line 6 (offset=5 means skip first 5 lines)
         assert "Row_6_content" in result
@@ -217,7 +220,7 @@ class TestSandboxOperations:
         content = "\n".join([f"Row_{i}_content" for i in range(1, 101)])
         sandbox.write(test_path, content)
 
-        result = sandbox.read(test_path, offset=0, limit=5)
+        result = _content(sandbox.read(test_path, offset=0, limit=5))
 
         # Should only have first 5 lines
         assert "Row_1_content" in result
@@ -230,7 +233,7 @@ class TestSandboxOperations:
         content = "\n".join([f"Row_{i}_content" for i in range(1, 21)])
         sandbox.write(test_path, content)
 
-        result = sandbox.read(test_path, offset=10, limit=5)
+        result = _content(sandbox.read(test_path, offset=10, limit=5))
 
         # Should have lines 11-15
         assert "Row_11_content" in result
@@ -244,9 +247,8 @@ class TestSandboxOperations:
         content = "Hello 👋 世界\nПривет мир\nمرحبا العالم"
         sandbox.write(test_path, content)
 
-        result = sandbox.read(test_path)
+        result = _content(sandbox.read(test_path))
 
-        assert "Error:" not in result
         assert "👋" in result
         assert "世界" in result
         assert "Привет" in result
@@ -259,10 +261,9 @@ class TestSandboxOperations:
         content = f"Short line\n{long_line}\nAnother short line"
         sandbox.write(test_path, content)
 
-        result = sandbox.read(test_path)
+        result = _content(sandbox.read(test_path))
 
         # Should still read successfully (implementation may truncate)
-        assert "Error:" not in result
         assert "Short line" in result
 
     def test_read_with_zero_limit(self, sandbox: SandboxBackendProtocol) -> None:
@@ -273,8 +274,8 @@ class TestSandboxOperations:
 
         result = sandbox.read(test_path, offset=0, limit=0)
 
-        # Should return empty or no content lines
-        assert "Line 1" not in result or result.strip() == ""
+        assert result.no_lines_requested
+        assert _content(result) == ""
 
     def test_read_offset_beyond_file_length(self, sandbox: SandboxBackendProtocol) -> None:
         """Test reading with offset beyond the file length."""
@@ -284,11 +285,9 @@ class TestSandboxOperations:
 
         result = sandbox.read(test_path, offset=100, limit=10)
 
-        # Should return empty result (no lines to read)
-        # Check that there's no actual content (only possible header/formatting)
-        assert "Line 1" not in result
-        assert "Line 2" not in result
-        assert "Line 3" not in result
+        # No lines to read: reported as an error rather than empty content
+        assert result.file_data is None
+        assert "exceeds file length" in result.error
 
     def test_read_offset_at_exact_file_length(self, sandbox: SandboxBackendProtocol) -> None:
         """Test reading with offset exactly at file length."""
@@ -298,9 +297,9 @@ class TestSandboxOperations:
 
         result = sandbox.read(test_path, offset=5, limit=10)
 
-        # Should return empty (offset=5 means skip first 5 lines)
-        assert "Line 1" not in result
-        assert "Line 5" not in result
+        # offset=5 skips all 5 lines, leaving nothing to read
+        assert result.file_data is None
+        assert "exceeds file length" in result.error
 
     def test_read_very_large_file_in_chunks(self, sandbox: SandboxBackendProtocol) -> None:
         """Test reading a large file in chunks using offset and limit."""
@@ -310,19 +309,19 @@ class TestSandboxOperations:
         sandbox.write(test_path, content)
 
         # Read first chunk
-        chunk1 = sandbox.read(test_path, offset=0, limit=100)
+        chunk1 = _content(sandbox.read(test_path, offset=0, limit=100))
         assert "Line_0000_content" in chunk1
         assert "Line_0099_content" in chunk1
         assert "Line_0100_content" not in chunk1
 
         # Read middle chunk
-        chunk2 = sandbox.read(test_path, offset=500, limit=100)
+        chunk2 = _content(sandbox.read(test_path, offset=500, limit=100))
         assert "Line_0500_content" in chunk2
         assert "Line_0599_content" in chunk2
         assert "Line_0499_content" not in chunk2
 
         # Read last chunk
-        chunk3 = sandbox.read(test_path, offset=900, limit=100)
+        chunk3 = _content(sandbox.read(test_path, offset=900, limit=100))
         assert "Line_0900_content" in chunk3
         assert "Line_0999_content" in chunk3
 
@@ -339,7 +338,7 @@ class TestSandboxOperations:
         assert result.error is None
         assert result.occurrences == 1
         # Verify change
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "Farewell world" in file_content
         assert "Goodbye" not in file_content
 
@@ -356,7 +355,7 @@ class TestSandboxOperations:
         assert result.error is not None
         assert "multiple times" in result.error.lower()
         # Verify file unchanged
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "apple" in file_content
         assert "pear" not in file_content
 
@@ -373,7 +372,7 @@ class TestSandboxOperations:
         assert result.error is None
         assert result.occurrences == 3
         # Verify all replaced
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "apple" not in file_content
         assert file_content.count("pear") == 3
 
@@ -412,7 +411,7 @@ class TestSandboxOperations:
         assert result.error is None
 
         # Verify changes
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "$200.00" in file_content
         assert "[0-9]+" in file_content
 
@@ -428,7 +427,7 @@ class TestSandboxOperations:
         assert result.error is None
         assert result.occurrences == 1
         # Verify the replacement worked correctly
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "Combined" in file_content
         assert "Line 3" in file_content
         assert "Line 1" not in file_content
@@ -443,7 +442,7 @@ class TestSandboxOperations:
 
         assert result.error is None
         assert result.occurrences == 1
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "Keep this" in file_content
         assert "Keep this too" in file_content
         assert "Delete this part" not in file_content
@@ -459,7 +458,7 @@ class TestSandboxOperations:
         # Should succeed with 1 occurrence
         assert result.error is None
         assert result.occurrences == 1
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "Same text" in file_content
 
     def test_edit_unicode_content(self, sandbox: SandboxBackendProtocol) -> None:
@@ -472,7 +471,7 @@ class TestSandboxOperations:
 
         assert result.error is None
         assert result.occurrences == 1
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "🌍" in file_content
         assert "👋" not in file_content
 
@@ -486,7 +485,7 @@ class TestSandboxOperations:
 
         assert result.error is None
         assert result.occurrences == 1
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "Line1 Line2" in file_content
 
     def test_edit_with_very_long_strings(self, sandbox: SandboxBackendProtocol) -> None:
@@ -501,7 +500,7 @@ class TestSandboxOperations:
 
         assert result.error is None
         assert result.occurrences == 1
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "y" * 100 in file_content  # Check partial presence
         assert "x" * 100 not in file_content
 
@@ -514,7 +513,7 @@ class TestSandboxOperations:
         result = sandbox.edit(test_path, "Line 2", "Modified Line 2")
 
         assert result.error is None
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "Line 1" in file_content
         assert "Modified Line 2" in file_content
         assert "Line 3" in file_content
@@ -529,13 +528,13 @@ class TestSandboxOperations:
 
         assert result.error is None
         assert result.occurrences == 1
-        file_content = sandbox.read(test_path)
+        file_content = _content(sandbox.read(test_path))
         assert "red cat" in file_content
         assert "The quick red cat jumps" in file_content
 
-    # ==================== ls_info() tests ====================
+    # ==================== ls() tests ====================
 
-    def test_ls_info_basic_directory(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_basic_directory(self, sandbox: SandboxBackendProtocol) -> None:
         """Test listing a directory with files and subdirectories."""
         base_dir = "/tmp/test_sandbox_ops/ls_test"
         sandbox.execute(f"mkdir -p {base_dir}")
@@ -543,77 +542,78 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file2.txt", "content2")
         sandbox.execute(f"mkdir -p {base_dir}/subdir")
 
-        result = sandbox.ls_info(base_dir)
+        result = sandbox.ls(base_dir).entries
 
         assert len(result) == 3
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert "file1.txt" in paths
         assert "file2.txt" in paths
         assert "subdir" in paths
         # Check is_dir flag
         for info in result:
-            if info["path"] == "subdir":
+            if info["path"].endswith("/subdir"):
                 assert info["is_dir"] is True
             else:
                 assert info["is_dir"] is False
 
-    def test_ls_info_empty_directory(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_empty_directory(self, sandbox: SandboxBackendProtocol) -> None:
         """Test listing an empty directory."""
         empty_dir = "/tmp/test_sandbox_ops/empty_dir"
         sandbox.execute(f"mkdir -p {empty_dir}")
 
-        result = sandbox.ls_info(empty_dir)
+        result = sandbox.ls(empty_dir).entries
 
         assert result == []
 
-    def test_ls_info_nonexistent_directory(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_nonexistent_directory(self, sandbox: SandboxBackendProtocol) -> None:
         """Test listing a directory that doesn't exist."""
         nonexistent_dir = "/tmp/test_sandbox_ops/does_not_exist"
 
-        result = sandbox.ls_info(nonexistent_dir)
+        result = sandbox.ls(nonexistent_dir)
 
-        assert result == []
+        assert result.entries is None
+        assert "path_not_found" in result.error
 
-    def test_ls_info_hidden_files(self, sandbox: SandboxBackendProtocol) -> None:
-        """Test that ls_info includes hidden files (starting with .)."""
+    def test_ls_hidden_files(self, sandbox: SandboxBackendProtocol) -> None:
+        """Test that ls() includes hidden files (starting with .)."""
         base_dir = "/tmp/test_sandbox_ops/hidden_test"
         sandbox.execute(f"mkdir -p {base_dir}")
         sandbox.write(f"{base_dir}/.hidden", "hidden content")
         sandbox.write(f"{base_dir}/visible.txt", "visible content")
 
-        result = sandbox.ls_info(base_dir)
+        result = sandbox.ls(base_dir).entries
 
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert ".hidden" in paths
         assert "visible.txt" in paths
 
-    def test_ls_info_directory_with_spaces(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_directory_with_spaces(self, sandbox: SandboxBackendProtocol) -> None:
         """Test listing a directory that has spaces in file/dir names."""
         base_dir = "/tmp/test_sandbox_ops/ls_spaces"
         sandbox.execute(f"mkdir -p '{base_dir}'")
         sandbox.write(f"{base_dir}/file with spaces.txt", "content")
         sandbox.execute(f"mkdir -p '{base_dir}/dir with spaces'")
 
-        result = sandbox.ls_info(base_dir)
+        result = sandbox.ls(base_dir).entries
 
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert "file with spaces.txt" in paths
         assert "dir with spaces" in paths
 
-    def test_ls_info_unicode_filenames(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_unicode_filenames(self, sandbox: SandboxBackendProtocol) -> None:
         """Test listing directory with unicode filenames."""
         base_dir = "/tmp/test_sandbox_ops/ls_unicode"
         sandbox.execute(f"mkdir -p {base_dir}")
         sandbox.write(f"{base_dir}/测试文件.txt", "content")
         sandbox.write(f"{base_dir}/файл.txt", "content")
 
-        result = sandbox.ls_info(base_dir)
+        result = sandbox.ls(base_dir).entries
 
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         # Should contain the unicode filenames
         assert len(paths) == 2
 
-    def test_ls_info_large_directory(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_large_directory(self, sandbox: SandboxBackendProtocol) -> None:
         """Test listing a directory with many files."""
         base_dir = "/tmp/test_sandbox_ops/ls_large"
         # Create 50 files in a single command (much faster than loop)
@@ -623,26 +623,26 @@ class TestSandboxOperations:
             f"for i in {{0..49}}; do echo 'content' > file_$(printf '%03d' $i).txt; done"
         )
 
-        result = sandbox.ls_info(base_dir)
+        result = sandbox.ls(base_dir).entries
 
         assert len(result) == 50
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert "file_000.txt" in paths
         assert "file_049.txt" in paths
 
-    def test_ls_info_path_with_trailing_slash(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_path_with_trailing_slash(self, sandbox: SandboxBackendProtocol) -> None:
         """Test that trailing slash in path is handled correctly."""
         base_dir = "/tmp/test_sandbox_ops/ls_trailing"
         sandbox.execute(f"mkdir -p {base_dir}")
         sandbox.write(f"{base_dir}/file.txt", "content")
 
         # List with trailing slash
-        result = sandbox.ls_info(f"{base_dir}/")
+        result = sandbox.ls(f"{base_dir}/").entries
 
         # Should work the same as without trailing slash
-        assert len(result) >= 1 or result == []  # Implementation dependent
+        assert [PurePosixPath(info["path"]).name for info in result] == ["file.txt"]
 
-    def test_ls_info_special_characters_in_filenames(self, sandbox: SandboxBackendProtocol) -> None:
+    def test_ls_special_characters_in_filenames(self, sandbox: SandboxBackendProtocol) -> None:
         """Test listing files with special characters in names."""
         base_dir = "/tmp/test_sandbox_ops/ls_special"
         sandbox.execute(f"mkdir -p {base_dir}")
@@ -651,14 +651,14 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file[2].txt", "content")
         sandbox.write(f"{base_dir}/file-3.txt", "content")
 
-        result = sandbox.ls_info(base_dir)
+        result = sandbox.ls(base_dir).entries
 
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert "file(1).txt" in paths
         assert "file[2].txt" in paths
         assert "file-3.txt" in paths
 
-    # ==================== grep_raw() tests ====================
+    # ==================== grep() tests ====================
 
     def test_grep_basic_search(self, sandbox: SandboxBackendProtocol) -> None:
         """Test basic grep search for a literal pattern (not regex)."""
@@ -667,7 +667,7 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file1.txt", "Hello world\nGoodbye world")
         sandbox.write(f"{base_dir}/file2.txt", "Hello there\nGoodbye friend")
 
-        result = sandbox.grep_raw("Hello", path=base_dir)
+        result = sandbox.grep("Hello", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 2
@@ -688,7 +688,7 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/test.py", "pattern")
         sandbox.write(f"{base_dir}/test.md", "pattern")
 
-        result = sandbox.grep_raw("pattern", path=base_dir, glob="*.py")
+        result = sandbox.grep("pattern", path=base_dir, glob="*.py").matches
 
         assert isinstance(result, list)
         assert len(result) == 1
@@ -700,7 +700,7 @@ class TestSandboxOperations:
         sandbox.execute(f"mkdir -p {base_dir}")
         sandbox.write(f"{base_dir}/file.txt", "Hello world")
 
-        result = sandbox.grep_raw("nonexistent", path=base_dir)
+        result = sandbox.grep("nonexistent", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 0
@@ -712,7 +712,7 @@ class TestSandboxOperations:
         content = "apple\nbanana\napple\norange\napple"
         sandbox.write(f"{base_dir}/fruits.txt", content)
 
-        result = sandbox.grep_raw("apple", path=base_dir)
+        result = sandbox.grep("apple", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 3
@@ -727,7 +727,7 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/numbers.txt", "test123\ntest456\nabcdef")
 
         # Pattern is treated as literal string, not regex
-        result = sandbox.grep_raw("test123", path=base_dir)
+        result = sandbox.grep("test123", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 1
@@ -739,7 +739,7 @@ class TestSandboxOperations:
         sandbox.execute(f"mkdir -p {base_dir}")
         sandbox.write(f"{base_dir}/unicode.txt", "Hello 世界\nПривет мир\n测试 pattern")
 
-        result = sandbox.grep_raw("世界", path=base_dir)
+        result = sandbox.grep("世界", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 1
@@ -751,7 +751,7 @@ class TestSandboxOperations:
         sandbox.execute(f"mkdir -p {base_dir}")
         sandbox.write(f"{base_dir}/case.txt", "Hello\nhello\nHELLO")
 
-        result = sandbox.grep_raw("Hello", path=base_dir)
+        result = sandbox.grep("Hello", path=base_dir).matches
 
         assert isinstance(result, list)
         # Should only match "Hello", not "hello" or "HELLO"
@@ -765,13 +765,13 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/special.txt", "Price: $100\nPath: /usr/bin\nPattern: [a-z]*")
 
         # Test with dollar sign (treated as literal)
-        result = sandbox.grep_raw("$100", path=base_dir)
+        result = sandbox.grep("$100", path=base_dir).matches
         assert isinstance(result, list)
         assert len(result) == 1
         assert "$100" in result[0]["text"]
 
         # Test with brackets (treated as literal)
-        result = sandbox.grep_raw("[a-z]*", path=base_dir)
+        result = sandbox.grep("[a-z]*", path=base_dir).matches
         assert isinstance(result, list)
         assert len(result) == 1
         assert "[a-z]*" in result[0]["text"]
@@ -781,7 +781,7 @@ class TestSandboxOperations:
         base_dir = "/tmp/test_sandbox_ops/grep_empty_dir"
         sandbox.execute(f"mkdir -p {base_dir}")
 
-        result = sandbox.grep_raw("anything", path=base_dir)
+        result = sandbox.grep("anything", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 0
@@ -794,7 +794,7 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/sub1/level1.txt", "target here")
         sandbox.write(f"{base_dir}/sub1/sub2/level2.txt", "target here")
 
-        result = sandbox.grep_raw("target", path=base_dir)
+        result = sandbox.grep("target", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 3
@@ -807,13 +807,13 @@ class TestSandboxOperations:
         content = "\n".join([f"Line {i}" for i in range(1, 101)])
         sandbox.write(f"{base_dir}/long.txt", content)
 
-        result = sandbox.grep_raw("Line 50", path=base_dir)
+        result = sandbox.grep("Line 50", path=base_dir).matches
 
         assert isinstance(result, list)
         assert len(result) == 1
         assert result[0]["line"] == 50
 
-    # ==================== glob_info() tests ====================
+    # ==================== glob() tests ====================
 
     def test_glob_basic_pattern(self, sandbox: SandboxBackendProtocol) -> None:
         """Test glob with basic wildcard pattern."""
@@ -823,10 +823,10 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file2.txt", "content")
         sandbox.write(f"{base_dir}/file3.py", "content")
 
-        result = sandbox.glob_info("*.txt", path=base_dir)
+        result = sandbox.glob("*.txt", path=base_dir).matches
 
         assert len(result) == 2
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert "file1.txt" in paths
         assert "file2.txt" in paths
         assert not any(".py" in p for p in paths)
@@ -839,10 +839,10 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/subdir1/nested1.txt", "content")
         sandbox.write(f"{base_dir}/subdir2/nested2.txt", "content")
 
-        result = sandbox.glob_info("**/*.txt", path=base_dir)
+        result = sandbox.glob("**/*.txt", path=base_dir).matches
 
         assert len(result) >= 2  # At least the nested files
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert any("nested1.txt" in p for p in paths)
         assert any("nested2.txt" in p for p in paths)
 
@@ -852,24 +852,20 @@ class TestSandboxOperations:
         sandbox.execute(f"mkdir -p {base_dir}")
         sandbox.write(f"{base_dir}/file.txt", "content")
 
-        result = sandbox.glob_info("*.py", path=base_dir)
+        result = sandbox.glob("*.py", path=base_dir).matches
 
         assert result == []
 
-    def test_glob_with_directories(self, sandbox: SandboxBackendProtocol) -> None:
-        """Test that glob includes directories in results."""
+    def test_glob_skips_directories(self, sandbox: SandboxBackendProtocol) -> None:
+        """Test that glob matches files only."""
         base_dir = "/tmp/test_sandbox_ops/glob_dirs"
         sandbox.execute(f"mkdir -p {base_dir}/dir1 {base_dir}/dir2")
         sandbox.write(f"{base_dir}/file.txt", "content")
 
-        result = sandbox.glob_info("*", path=base_dir)
+        result = sandbox.glob("*", path=base_dir).matches
 
-        assert len(result) == 3
-        # Check is_dir flags
-        dir_count = sum(1 for info in result if info["is_dir"])
-        file_count = sum(1 for info in result if not info["is_dir"])
-        assert dir_count == 2
-        assert file_count == 1
+        assert [PurePosixPath(info["path"]).name for info in result] == ["file.txt"]
+        assert not result[0]["is_dir"]
 
     def test_glob_specific_extension(self, sandbox: SandboxBackendProtocol) -> None:
         """Test glob with specific file extension pattern."""
@@ -879,7 +875,7 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/test.txt", "content")
         sandbox.write(f"{base_dir}/test.md", "content")
 
-        result = sandbox.glob_info("*.py", path=base_dir)
+        result = sandbox.glob("*.py", path=base_dir).matches
 
         assert len(result) == 1
         assert "test.py" in result[0]["path"]
@@ -892,10 +888,10 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/.hidden2", "content")
         sandbox.write(f"{base_dir}/visible.txt", "content")
 
-        result = sandbox.glob_info(".*", path=base_dir)
+        result = sandbox.glob(".*", path=base_dir).matches
 
         # Should only match hidden files
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert ".hidden1" in paths or ".hidden2" in paths
         # Should not match visible.txt
         assert not any("visible" in p for p in paths)
@@ -909,10 +905,10 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file3.txt", "content")
         sandbox.write(f"{base_dir}/fileA.txt", "content")
 
-        result = sandbox.glob_info("file[1-2].txt", path=base_dir)
+        result = sandbox.glob("file[1-2].txt", path=base_dir).matches
 
         assert len(result) == 2
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert "file1.txt" in paths
         assert "file2.txt" in paths
         assert "file3.txt" not in paths
@@ -926,11 +922,11 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file2.txt", "content")
         sandbox.write(f"{base_dir}/file10.txt", "content")
 
-        result = sandbox.glob_info("file?.txt", path=base_dir)
+        result = sandbox.glob("file?.txt", path=base_dir).matches
 
         # Should match file1.txt and file2.txt, but not file10.txt
         assert len(result) == 2
-        paths = [info["path"] for info in result]
+        paths = [PurePosixPath(info["path"]).name for info in result]
         assert "file10.txt" not in paths
 
     def test_glob_multiple_extensions(self, sandbox: SandboxBackendProtocol) -> None:
@@ -943,8 +939,8 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file.js", "content")
 
         # Using separate patterns (implementation may support brace expansion)
-        result_txt = sandbox.glob_info("*.txt", path=base_dir)
-        result_py = sandbox.glob_info("*.py", path=base_dir)
+        result_txt = sandbox.glob("*.txt", path=base_dir).matches
+        result_py = sandbox.glob("*.py", path=base_dir).matches
 
         assert len(result_txt) == 1
         assert len(result_py) == 1
@@ -956,7 +952,7 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/a/b/c/d/deep.txt", "content")
         sandbox.write(f"{base_dir}/a/b/other.txt", "content")
 
-        result = sandbox.glob_info("**/deep.txt", path=base_dir)
+        result = sandbox.glob("**/deep.txt", path=base_dir).matches
 
         assert len(result) >= 1
         # Should find the deeply nested file
@@ -968,7 +964,7 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/file.txt", "content")
 
         # Call with explicit path to match expected signature
-        result = sandbox.glob_info("*.txt", path=base_dir)
+        result = sandbox.glob("*.txt", path=base_dir).matches
 
         # Should work with explicit path
         assert isinstance(result, list)
@@ -984,7 +980,7 @@ class TestSandboxOperations:
         assert write_result.error is None
 
         # Read it back
-        content = sandbox.read(test_path)
+        content = _content(sandbox.read(test_path))
         assert "Original content" in content
 
         # Edit it
@@ -992,7 +988,7 @@ class TestSandboxOperations:
         assert edit_result.error is None
 
         # Read again to verify
-        updated_content = sandbox.read(test_path)
+        updated_content = _content(sandbox.read(test_path))
         assert "Modified content" in updated_content
         assert "Original" not in updated_content
 
@@ -1007,16 +1003,16 @@ class TestSandboxOperations:
         sandbox.write(f"{base_dir}/subdir2/file3.txt", "file 3")
 
         # List root directory
-        ls_result = sandbox.ls_info(base_dir)
-        paths = [info["path"] for info in ls_result]
+        ls_result = sandbox.ls(base_dir).entries
+        paths = [PurePosixPath(info["path"]).name for info in ls_result]
         assert "root.txt" in paths
         assert "subdir1" in paths
         assert "subdir2" in paths
 
         # Glob for txt files
-        glob_result = sandbox.glob_info("**/*.txt", path=base_dir)
+        glob_result = sandbox.glob("**/*.txt", path=base_dir).matches
         assert len(glob_result) == 3
 
         # Grep for a pattern
-        grep_result = sandbox.grep_raw("file", path=base_dir)
+        grep_result = sandbox.grep("file", path=base_dir).matches
         assert len(grep_result) >= 3  # At least 3 matches
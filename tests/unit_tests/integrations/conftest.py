@@ -0,0 +1,13 @@
+"""Shared fixtures for sandbox integration tests."""
+
+from pathlib import Path
+
+import pytest
+
+from coda_cli.integrations.sandbox_pool import LocalProvider
+
+
+@pytest.fixture
+def local_provider(tmp_path: Path) -> LocalProvider:
+    """Local sandboxes under a temporary directory instead of ~/.coda."""
+    return LocalProvider(tmp_path / "sandboxes")
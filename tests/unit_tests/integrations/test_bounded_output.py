@@ -0,0 +1,114 @@
+"""Tests for capped command output on sandbox backends."""
+
+import subprocess
+from collections.abc import Iterator
+from types import SimpleNamespace
+
+from coda_cli.integrations.bounded_output import (
+    bounded_command,
+    read_stream,
+    unwrap_bounded_output,
+)
+from coda_cli.integrations.daytona import DaytonaBackend
+from coda_cli.integrations.local import LocalSubprocessSandbox
+from coda_cli.integrations.modal import ModalBackend
+
+LONG_OUTPUT = "".join(f"line {i}\n" for i in range(10_000))
+
+
+def _run(command: str) -> SimpleNamespace:
+    result = subprocess.run(command, shell=True, capture_output=True, text=True, check=False)  # noqa: S602
+    return SimpleNamespace(result=result.stdout + result.stderr, exit_code=result.returncode)
+
+
+class _FakeModalProcess:
+    def __init__(self, chunks: list[str], returncode: int) -> None:
+        self._chunks = chunks
+        self.returncode = returncode
+        self.read = 0
+
+    @property
+    def stdout(self) -> Iterator[str]:
+        for chunk in self._chunks:
+            self.read += 1
+            yield chunk
+
+    def wait(self) -> None:
+        pass
+
+
+def test_stream_keeps_head_and_tail() -> None:
+    chunks = (chunk.encode() for chunk in LONG_OUTPUT.splitlines(keepends=True))
+
+    output, truncated = read_stream(chunks, 64)
+    short, short_truncated = read_stream(["a\n", b"b\n"], 64)
+
+    assert truncated
+    assert output.startswith("line 0\nline 1\n")
+    assert output.endswith("line 9998\nline 9999\n")
+    assert "Output truncated" in output
+    assert (short, short_truncated) == ("a\nb\n", False)
+
+
+def test_wrapped_command_matches_streamed_output() -> None:
+    command = "for i in $(seq 0 9999); do echo line $i; done; echo oops >&2; exit 3"
+
+    wrapped, marker = bounded_command(command, 64)
+    result = _run(wrapped)
+    output, truncated = unwrap_bounded_output(result.result, marker, 64)
+
+    assert result.exit_code == 3
+    assert truncated
+    assert output == read_stream([LONG_OUTPUT, "oops\n"], 64)[0]
+
+
+def test_wrapped_command_passes_short_output_through() -> None:
+    wrapped, marker = bounded_command("echo 'it''s fine'; exit 0", 1000)
+    result = _run(wrapped)
+
+    assert unwrap_bounded_output(result.result, marker, 1000) == ("its fine\n", False)
+    assert result.exit_code == 0
+
+
+def test_daytona_returns_head_and_tail() -> None:
+    def execute(command: str, timeout: int) -> SimpleNamespace:  # noqa: ARG001
+        return _run(command)
+
+    sandbox = SimpleNamespace(id="daytona-1", process=SimpleNamespace(exec=execute))
+    backend = DaytonaBackend(sandbox, max_output_bytes=64)
+
+    result = backend.execute("seq 0 100000; exit 2")
+
+    assert result.truncated
+    assert result.exit_code == 2
+    assert result.output.startswith("0\n1\n")
+    assert result.output.endswith("99999\n100000\n")
+
+
+def test_modal_streams_output() -> None:
+    process = _FakeModalProcess(["x" * 1000] * 100, returncode=0)
+    calls = []
+
+    def execute(*args: str, timeout: int) -> _FakeModalProcess:
+        calls.append((args, timeout))
+        return process
+
+    backend = ModalBackend(SimpleNamespace(exec=execute), max_output_bytes=100)
+
+    result = backend.execute("yes | head", timeout=5)
+
+    assert process.read == 100
+    assert result.truncated
+    assert len(result.output.encode()) < 200
+    assert calls[0][1] == 5
+    assert calls[0][0][-1].startswith("exec 2>&1\n")
+
+
+def test_local_sandbox_caps_output() -> None:
+    sandbox = LocalSubprocessSandbox(max_output_bytes=100)
+
+    result = sandbox.execute("head -c 1000000 /dev/zero | tr '\\0' a; echo; echo done")
+
+    assert result.truncated
+    assert result.output.endswith("a\ndone\n")
+    assert "999906 of 1000006 bytes omitted" in result.output
@@ -0,0 +1,108 @@
+"""Tests for the local subprocess sandbox and its provider."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from coda_cli.integrations.local import LATENCY_ENV_VAR, LocalSubprocessSandbox, default_latency
+from coda_cli.integrations.sandbox_factory import (
+    _run_sandbox_setup,
+    acreate_sandbox,
+    create_sandbox,
+    get_available_sandbox_types,
+    get_default_working_dir,
+)
+
+
+@pytest.fixture
+def sandbox(tmp_path: Path) -> LocalSubprocessSandbox:
+    return LocalSubprocessSandbox(tmp_path / "sandbox")
+
+
+def test_file_operations(sandbox: LocalSubprocessSandbox, tmp_path: Path) -> None:
+    path = str(tmp_path / "work" / "app.py")
+
+    assert sandbox.write(path, "alpha\nbeta\n").error is None
+    assert sandbox.edit(path, "beta", "gamma").occurrences == 1
+    read = sandbox.read(path)
+    listing = sandbox.ls(str(tmp_path / "work"))
+    grep = sandbox.grep("gamma", str(tmp_path / "work"))
+    glob = sandbox.glob("**/*.py", str(tmp_path))
+
+    assert read.file_data is not None
+    assert read.file_data["content"] == "alpha\ngamma"
+    assert [entry["path"] for entry in listing.entries or []] == [path]
+    assert [(m["path"], m["line"]) for m in grep.matches or []] == [(path, 2)]
+    assert [match["path"] for match in glob.matches or []] == [path]
+
+
+def test_missing_files_report_errors(sandbox: LocalSubprocessSandbox, tmp_path: Path) -> None:
+    missing = str(tmp_path / "missing.txt")
+
+    assert sandbox.download_files([missing])[0].error == "file_not_found"
+    assert sandbox.read(missing).error is not None
+
+
+def test_commands_run_in_the_workspace(sandbox: LocalSubprocessSandbox) -> None:
+    result = sandbox.execute("pwd; exit 3")
+
+    assert result.output.strip() == str(sandbox.root)
+    assert result.exit_code == 3
+    assert sandbox.execute("sleep 5", timeout=1).exit_code == 124
+
+
+def test_latency_is_added_to_each_call(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(LATENCY_ENV_VAR, "50")
+    sandbox = LocalSubprocessSandbox(tmp_path / "sandbox", latency=default_latency())
+
+    started = time.monotonic()
+    sandbox.execute("true")
+    sandbox.upload_files([(str(tmp_path / "a.txt"), b"a")])
+    elapsed = time.monotonic() - started
+
+    assert sandbox.latency == 0.05
+    assert sandbox.round_trips == 2
+    assert elapsed >= 0.1
+
+
+def test_setup_script_expands_environment(
+    sandbox: LocalSubprocessSandbox, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CODA_TEST_GREETING", "hello")
+    script = tmp_path / "setup.sh"
+    script.write_text("echo ${CODA_TEST_GREETING} > greeting.txt\n")
+    failing = tmp_path / "failing.sh"
+    failing.write_text("exit 7\n")
+
+    _run_sandbox_setup(sandbox, str(script))
+
+    assert (sandbox.root / "greeting.txt").read_text() == "hello\n"
+    with pytest.raises(RuntimeError, match="Setup failed"):
+        _run_sandbox_setup(sandbox, str(failing))
+
+
+def test_provider_creates_and_removes_the_sandbox() -> None:
+    assert "local" in get_available_sandbox_types()
+
+    with create_sandbox("local") as backend:
+        assert isinstance(backend, LocalSubprocessSandbox)
+        root = backend.root
+        assert get_default_working_dir("local", backend) == str(root)
+        with create_sandbox("local", sandbox_id=backend.id) as reused:
+            assert reused.execute("pwd").output.strip() == str(root)
+        assert root.is_dir()
+
+    assert not root.exists()
+    with pytest.raises(ValueError, match="not found"):
+        create_sandbox("local", sandbox_id="../etc").__enter__()
+
+
+def test_async_provider_removes_the_sandbox() -> None:
+    async def run() -> Path:
+        async with acreate_sandbox("local") as backend:
+            assert isinstance(backend, LocalSubprocessSandbox)
+            return backend.root
+
+    assert not asyncio.run(run()).exists()
@@ -0,0 +1,176 @@
+"""Tests for the warm sandbox pool, using the local subprocess provider."""
+
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from coda_cli.integrations.sandbox_pool import LocalProvider, SandboxPool
+
+
+class _SlowProvider(LocalProvider):
+    """Local provider whose creations block until ``ready`` is set."""
+
+    def __init__(self, root: Path) -> None:
+        super().__init__(root)
+        self.ready = threading.Event()
+
+    def create(self, *, max_idle_seconds: float) -> str:
+        self.ready.wait()
+        return super().create(max_idle_seconds=max_idle_seconds)
+
+
+def _pool(provider: LocalProvider, tmp_path: Path, **kwargs: object) -> SandboxPool:
+    return SandboxPool(provider, state_dir=tmp_path / "state", **{"size": 1, **kwargs})
+
+
+def test_lease_prefers_a_warm_sandbox(local_provider: LocalProvider, tmp_path: Path) -> None:
+    pool = _pool(local_provider, tmp_path, size=2)
+    assert pool.fill() == 2
+
+    lease = pool.acquire()
+    pool.wait_filled()
+
+    assert lease.warm
+    assert lease.backend.execute("echo hi").output == "hi\n"
+    # Leased sandboxes count towards the pool's size
+    assert len(pool.entries()) == 2
+    pool.release(lease)
+
+
+def test_cold_lease_tops_up_the_pool(local_provider: LocalProvider, tmp_path: Path) -> None:
+    pool = _pool(local_provider, tmp_path, size=2)
+
+    lease = pool.acquire()
+    pool.wait_filled()
+
+    assert not lease.warm
+    assert [e.lease_pid is None for e in pool.entries()] == [False, True]
+    pool.release(lease)
+
+
+def test_release_recycles_with_a_clean_workspace(
+    local_provider: LocalProvider, tmp_path: Path
+) -> None:
+    pool = _pool(local_provider, tmp_path)
+    lease = pool.acquire()
+    pool.wait_filled()
+    assert not lease.warm
+    lease.backend.execute("mkdir -p src && echo data > src/file.txt")
+
+    assert pool.release(lease)
+
+    again = pool.acquire()
+    assert again.warm
+    assert again.sandbox_id == lease.sandbox_id
+    assert again.backend.execute("ls -A").output == ""
+    pool.release(again)
+
+
+def test_release_tears_down_when_the_pool_is_full(
+    local_provider: LocalProvider, tmp_path: Path
+) -> None:
+    pool = _pool(local_provider, tmp_path)
+    first = pool.acquire()
+    # All sandboxes are leased, so this one is created beyond the pool's size
+    second = pool.acquire()
+
+    assert pool.release(first)
+    assert not pool.release(second)
+    assert not local_provider.is_alive(second.sandbox_id)
+    assert [e.sandbox_id for e in pool.entries()] == [first.sandbox_id]
+
+
+def test_idle_sandboxes_expire(local_provider: LocalProvider, tmp_path: Path) -> None:
+    pool = _pool(local_provider, tmp_path, max_idle_seconds=0.1)
+    pool.fill()
+    (entry,) = pool.entries()
+
+    time.sleep(0.2)
+
+    assert pool.reap() == 1
+    assert pool.entries() == []
+    assert not local_provider.is_alive(entry.sandbox_id)
+
+
+def test_leases_of_dead_processes_are_reaped(local_provider: LocalProvider, tmp_path: Path) -> None:
+    pool = _pool(local_provider, tmp_path)
+    lease = pool.acquire()
+    pool.wait_filled()
+    crashed = subprocess.Popen(["true"])  # noqa: S607
+    crashed.wait()
+    with pool._state() as entries:
+        for entry in entries:
+            if entry.sandbox_id == lease.sandbox_id:
+                entry.lease_pid = crashed.pid
+
+    assert pool.reap() == 1
+    assert not local_provider.is_alive(lease.sandbox_id)
+
+
+def test_release_does_not_wait_for_the_refill(tmp_path: Path) -> None:
+    provider = _SlowProvider(tmp_path / "sandboxes")
+    pool = _pool(provider, tmp_path, size=2)
+    provider.ready.set()
+    lease = pool.acquire()
+    provider.ready.clear()
+
+    # The refill is blocked creating the second sandbox, which is recorded as pending
+    assert pool.release(lease)
+    pending = [e for e in pool.entries() if e.creating_pid is not None]
+    assert len(pending) == 1
+    assert pending[0].sandbox_id.startswith("pending-")
+
+    provider.ready.set()
+    pool.wait_filled()
+    assert [e.idle for e in pool.entries()] == [True, True]
+
+
+def test_creations_of_dead_processes_are_reaped(
+    local_provider: LocalProvider, tmp_path: Path
+) -> None:
+    pool = _pool(local_provider, tmp_path)
+    pool.fill()
+    (entry,) = pool.entries()
+    crashed = subprocess.Popen(["true"])  # noqa: S607
+    crashed.wait()
+    with pool._state() as entries:
+        entries[0].creating_pid = crashed.pid
+        entries[0].idle_since = None
+
+    assert pool.reap() == 1
+    assert pool.entries() == []
+    assert not local_provider.is_alive(entry.sandbox_id)
+
+
+def test_vanished_sandboxes_are_skipped(local_provider: LocalProvider, tmp_path: Path) -> None:
+    pool = _pool(local_provider, tmp_path)
+    pool.fill()
+    (gone,) = pool.entries()
+    local_provider.destroy(gone.sandbox_id)
+
+    lease = pool.acquire()
+
+    assert lease.sandbox_id != gone.sandbox_id
+    assert not lease.warm
+    pool.release(lease, recycle=False)
+    pool.wait_filled()
+
+
+def test_setup_script_partitions_the_pool(local_provider: LocalProvider, tmp_path: Path) -> None:
+    script = tmp_path / "setup.sh"
+    script.write_text("touch prepared\n")
+    plain = _pool(local_provider, tmp_path)
+    plain.fill()
+
+    prepared = _pool(local_provider, tmp_path, setup_script_path=str(script))
+    lease = prepared.acquire()
+
+    assert not lease.warm
+    assert lease.backend.execute("ls").output == "prepared\n"
+    prepared.release(lease)
+    prepared.wait_filled()
+    # Recycling reran the setup after clearing the workspace
+    again = prepared.acquire()
+    assert again.backend.execute("ls").output == "prepared\n"
+    prepared.release(again)
@@ -0,0 +1,153 @@
+"""Tests for sandbox readiness checks, deadlines and async startup."""
+
+import asyncio
+import itertools
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from coda_cli.integrations.sandbox_factory import (
+    ReadinessPolicy,
+    _astart,
+    _start,
+    _Startup,
+    acreate_daytona_sandbox,
+    create_daytona_sandbox,
+)
+
+FAST = ReadinessPolicy(timeout=2, initial_delay=0.01, max_delay=0.05)
+
+
+class _FakeSandboxes:
+    """Sandboxes that become ready after a number of checks."""
+
+    def __init__(self, *, checks_until_ready: int = 3, create_seconds: float = 0.0) -> None:
+        self.checks_until_ready = checks_until_ready
+        self.create_seconds = create_seconds
+        self.checks = 0
+        self.destroyed: list[str] = []
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def startup(self) -> _Startup[str]:
+        return _Startup(
+            what="Fake sandbox",
+            create=self._create,
+            is_ready=self._is_ready,
+            destroy=self.destroyed.append,
+        )
+
+    def _create(self) -> str:
+        time.sleep(self.create_seconds)
+        return f"sandbox-{next(self._ids)}"
+
+    def _is_ready(self, _sandbox: str) -> bool:
+        with self._lock:
+            self.checks += 1
+            return self.checks >= self.checks_until_ready
+
+
+def test_delays_back_off_with_bounded_jitter() -> None:
+    policy = ReadinessPolicy(initial_delay=1, max_delay=8, multiplier=2, jitter=0.5)
+
+    delays = list(itertools.islice(policy.delays(), 6))
+
+    for delay, ceiling in zip(delays, [1, 2, 4, 8, 8, 8], strict=True):
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_start_waits_until_ready() -> None:
+    sandboxes = _FakeSandboxes(checks_until_ready=3)
+
+    assert _start(sandboxes.startup(), policy=FAST) == "sandbox-0"
+    assert sandboxes.checks == 3
+    assert sandboxes.destroyed == []
+
+
+def test_start_tears_down_after_the_deadline() -> None:
+    sandboxes = _FakeSandboxes(checks_until_ready=10**6)
+    policy = ReadinessPolicy(timeout=0.1, initial_delay=0.01, max_delay=0.02)
+
+    with pytest.raises(RuntimeError, match=r"failed to start within 0\.1 seconds"):
+        _start(sandboxes.startup(), policy=policy)
+
+    assert sandboxes.destroyed == ["sandbox-0"]
+
+
+def test_async_startups_run_concurrently() -> None:
+    sandboxes = _FakeSandboxes(checks_until_ready=1, create_seconds=0.3)
+
+    async def start_three() -> list[str]:
+        return await asyncio.gather(*(_astart(sandboxes.startup(), policy=FAST) for _ in range(3)))
+
+    started = time.monotonic()
+    ids = asyncio.run(start_three())
+
+    assert sorted(ids) == ["sandbox-0", "sandbox-1", "sandbox-2"]
+    assert time.monotonic() - started < 0.8
+
+
+def test_cancelled_startup_tears_down_the_sandbox() -> None:
+    sandboxes = _FakeSandboxes(create_seconds=0.2)
+
+    async def cancel_during_create() -> None:
+        task = asyncio.create_task(_astart(sandboxes.startup(), policy=FAST))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_during_create())
+
+    assert sandboxes.destroyed == ["sandbox-0"]
+
+
+def test_async_startup_reports_failed_sandboxes() -> None:
+    def never_starts(_sandbox: str) -> bool:
+        msg = "Fake sandbox terminated unexpectedly during startup"
+        raise RuntimeError(msg)
+
+    sandboxes = _FakeSandboxes()
+    startup = sandboxes.startup()
+    failing = _Startup(startup.what, startup.create, never_starts, startup.destroy)
+
+    with pytest.raises(RuntimeError, match="terminated unexpectedly"):
+        asyncio.run(_astart(failing, policy=FAST))
+
+    assert sandboxes.destroyed == ["sandbox-0"]
+
+
+class _FakeDaytona:
+    """A Daytona client holding existing sandboxes."""
+
+    def __init__(self, _config: object) -> None:
+        self.deleted: list[str] = []
+
+    def get(self, sandbox_id: str) -> SimpleNamespace:
+        return SimpleNamespace(id=sandbox_id, delete=lambda: self.deleted.append(sandbox_id))
+
+
+def test_daytona_connects_to_an_existing_sandbox_by_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    clients: list[_FakeDaytona] = []
+
+    def make_client(config: object) -> _FakeDaytona:
+        clients.append(_FakeDaytona(config))
+        return clients[-1]
+
+    monkeypatch.setenv("DAYTONA_API_KEY", "test-key")
+    monkeypatch.setitem(
+        sys.modules, "daytona", SimpleNamespace(Daytona=make_client, DaytonaConfig=dict)
+    )
+
+    async def connect() -> str:
+        async with acreate_daytona_sandbox(sandbox_id="dtn-2") as backend:
+            return backend.id
+
+    with create_daytona_sandbox(sandbox_id="dtn-1") as backend:
+        assert backend.id == "dtn-1"
+    assert asyncio.run(connect()) == "dtn-2"
+    # Sandboxes the CLI did not create are left running
+    assert [client.deleted for client in clients] == [[], []]
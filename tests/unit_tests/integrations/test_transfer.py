@@ -0,0 +1,168 @@
+"""Tests for concurrent and bundled sandbox file transfers."""
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from coda_cli.integrations import transfer
+from coda_cli.integrations.local import LocalSubprocessSandbox
+from coda_cli.integrations.transfer import (
+    BUNDLE_MAX_FILE_BYTES,
+    BUNDLE_MIN_FILES,
+    download_batch,
+    hash_remote_files,
+    upload_batch,
+)
+
+
+class _PerFileApi:
+    """A per-file transfer API over the local filesystem that counts requests."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.requests: list[str] = []
+        self.peak = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _request(self, path: str) -> None:
+        with self._lock:
+            self.requests.append(path)
+            self._in_flight += 1
+            self.peak = max(self.peak, self._in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self._in_flight -= 1
+
+    def upload(self, path: str, content: bytes) -> None:
+        self._request(path)
+        Path(path).write_bytes(content)
+
+    def download(self, path: str) -> bytes:
+        self._request(path)
+        return Path(path).read_bytes()
+
+
+def test_many_small_files_upload_as_one_bundle(tmp_path: Path) -> None:
+    api = _PerFileApi()
+    files = [(f"{tmp_path}/src/pkg{i % 3}/mod{i}.py", f"x = {i}\n".encode()) for i in range(30)]
+
+    responses, stats = upload_batch(LocalSubprocessSandbox(tmp_path), files, api.upload)
+
+    assert [r.path for r in responses] == [path for path, _ in files]
+    assert all(r.error is None for r in responses)
+    assert Path(files[7][0]).read_bytes() == b"x = 7\n"
+    assert stats.method == "bundle"
+    assert len(api.requests) == 1
+    assert stats.bytes == sum(len(content) for _, content in files)
+    # The archive was removed after unpacking
+    assert not Path(api.requests[0]).exists()
+
+
+def test_large_files_upload_concurrently_with_per_file_errors(tmp_path: Path) -> None:
+    api = _PerFileApi(delay=0.05)
+    big = b"x" * (BUNDLE_MAX_FILE_BYTES + 1)
+    files = [(f"{tmp_path}/big{i}.bin", big) for i in range(BUNDLE_MIN_FILES)]
+    files.append((f"{tmp_path}/missing-dir/file.txt", b"data"))
+
+    responses, stats = upload_batch(LocalSubprocessSandbox(tmp_path), files, api.upload)
+
+    assert stats.method == "concurrent"
+    assert api.peak > 1
+    assert responses[-1].error == "file_not_found"
+    assert all(r.error is None for r in responses[:-1])
+    assert stats.failed == 1
+    assert stats.throughput > 0
+
+
+def test_bundled_download_falls_back_per_file_for_missing_entries(tmp_path: Path) -> None:
+    api = _PerFileApi()
+    paths = []
+    for i in range(BUNDLE_MIN_FILES):
+        path = tmp_path / f"file{i}.txt"
+        path.write_text(f"content {i}")
+        paths.append(str(path))
+    paths += [str(tmp_path / "absent.txt"), str(tmp_path)]
+
+    responses, stats = download_batch(LocalSubprocessSandbox(tmp_path), paths, api.download)
+
+    assert stats.method == "bundle"
+    assert [r.content for r in responses[:3]] == [b"content 0", b"content 1", b"content 2"]
+    assert responses[-2].error == "file_not_found"
+    assert responses[-1].error == "is_directory"
+    # One request for the archive, then one for each file it lacked
+    assert len(api.requests) == 3
+
+
+def test_download_bundle_leaves_out_large_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(transfer, "BUNDLE_MAX_BYTES", 5 * 100)
+    api = _PerFileApi()
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"file{i}.txt"
+        path.write_bytes(b"s" * 100)
+        paths.append(str(path))
+    big = tmp_path / "big.bin"
+    big.write_bytes(b"b" * (BUNDLE_MAX_FILE_BYTES + 1))
+    paths.insert(2, str(big))
+
+    responses, stats = download_batch(LocalSubprocessSandbox(tmp_path), paths, api.download)
+
+    assert stats.method == "bundle"
+    assert [len(r.content) for r in responses] == [
+        BUNDLE_MAX_FILE_BYTES + 1 if path == str(big) else 100 for path in paths
+    ]
+    # The archive held the first five small files; the rest came one by one
+    assert len(api.requests) == 1 + 1 + 5
+    assert str(big) in api.requests
+    assert not set(paths[:2] + paths[3:6]) & set(api.requests)
+
+
+def test_small_batches_are_not_bundled(tmp_path: Path) -> None:
+    api = _PerFileApi()
+    (tmp_path / "a.txt").write_text("a")
+
+    responses, stats = download_batch(
+        LocalSubprocessSandbox(tmp_path), [str(tmp_path / "a.txt")], api.download
+    )
+
+    assert stats.method == "concurrent"
+    assert responses[0].content == b"a"
+    assert api.requests == [str(tmp_path / "a.txt")]
+
+
+def test_files_are_hashed_in_one_command(tmp_path: Path) -> None:
+    sandbox = LocalSubprocessSandbox(tmp_path / "sandbox")
+    (tmp_path / "it's a file.txt").write_bytes(b"content\n")
+    paths = [str(tmp_path / "it's a file.txt"), str(tmp_path / "missing.txt"), str(tmp_path)]
+
+    digests = sandbox.hash_files(paths)
+
+    assert digests == {
+        paths[0]: hashlib.sha256(b"content\n").hexdigest(),
+        paths[1]: None,
+        paths[2]: None,
+    }
+    assert sandbox.round_trips == 1
+
+
+def test_long_path_lists_are_hashed_in_batches(tmp_path: Path) -> None:
+    sandbox = LocalSubprocessSandbox(tmp_path / "sandbox")
+    directory = tmp_path / ("d" * 100)
+    directory.mkdir()
+    paths = []
+    for i in range(1500):
+        (directory / f"{i}.txt").write_text(str(i))
+        paths.append(str(directory / f"{i}.txt"))
+
+    digests = hash_remote_files(sandbox, paths)
+
+    assert digests[paths[-1]] == hashlib.sha256(b"1499").hexdigest()
+    assert all(digests.values())
+    # Batched to keep each command's output under the backend's cap
+    assert 1 < sandbox.round_trips < 10
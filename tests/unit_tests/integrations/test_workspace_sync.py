@@ -0,0 +1,88 @@
+"""Tests for delta workspace sync into a sandbox."""
+
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from coda_cli.integrations.local import LocalSubprocessSandbox
+from coda_cli.integrations.workspace_sync import (
+    SyncResult,
+    list_local_files,
+    sync_workspace,
+)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("print('hello')\n")
+    (root / "README.md").write_text("# Project\n")
+    (root / "run.sh").write_text("#!/bin/sh\necho run\n")
+    (root / "run.sh").chmod(0o755)
+    (root / "build").mkdir()
+    (root / "build" / "out.bin").write_bytes(b"\0" * 32)
+    (root / ".gitignore").write_text("build/\n")
+    return root
+
+
+def _sync(sandbox: LocalSubprocessSandbox, project: Path, target: Path, state: Path) -> SyncResult:
+    return sync_workspace(sandbox, project, str(target), state_dir=state)
+
+
+def test_git_ignored_files_are_not_listed(project: Path) -> None:
+    subprocess.run(["git", "init", "-q"], cwd=project, check=True)  # noqa: S607
+
+    files = list_local_files(project)
+
+    assert files == [".gitignore", "README.md", "run.sh", "src/app.py"]
+
+
+def test_walk_applies_gitignore_outside_git(project: Path) -> None:
+    assert "build/out.bin" not in list_local_files(project)
+
+
+def test_only_changed_files_are_resent(project: Path, tmp_path: Path) -> None:
+    sandbox = LocalSubprocessSandbox(tmp_path / "sandbox")
+    target = tmp_path / "sandbox" / "workspace"
+    state = tmp_path / "state"
+
+    first = _sync(sandbox, project, target, state)
+    (project / "src" / "app.py").write_text("print('hello, world')\n")
+    second = _sync(sandbox, project, target, state)
+
+    assert (first.files, first.uploaded, first.unchanged) == (4, 4, 0)
+    assert (second.uploaded, second.unchanged) == (1, 3)
+    assert (target / "src" / "app.py").read_text() == "print('hello, world')\n"
+    assert not (target / "build").exists()
+    assert os.access(target / "run.sh", os.X_OK)
+
+
+def test_remote_edits_are_overwritten(project: Path, tmp_path: Path) -> None:
+    sandbox = LocalSubprocessSandbox(tmp_path / "sandbox")
+    target = tmp_path / "sandbox" / "workspace"
+    state = tmp_path / "state"
+
+    _sync(sandbox, project, target, state)
+    (target / "README.md").write_text("changed in the sandbox\n")
+    result = _sync(sandbox, project, target, state)
+
+    assert result.uploaded == 1
+    assert (target / "README.md").read_text() == "# Project\n"
+
+
+def test_files_removed_locally_are_deleted(project: Path, tmp_path: Path) -> None:
+    sandbox = LocalSubprocessSandbox(tmp_path / "sandbox")
+    target = tmp_path / "sandbox" / "workspace"
+    state = tmp_path / "state"
+
+    _sync(sandbox, project, target, state)
+    (target / "notes.txt").write_text("made in the sandbox\n")
+    (project / "README.md").unlink()
+    result = _sync(sandbox, project, target, state)
+
+    assert result.deleted == 1
+    assert not (target / "README.md").exists()
+    assert (target / "notes.txt").exists()
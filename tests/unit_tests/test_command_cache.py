@@ -0,0 +1,61 @@
+"""Tests for the read-only shell command cache."""
+
+from pathlib import Path
+
+import pytest
+
+from coda_cli.command_cache import CommandCache, is_cacheable_command
+
+
+@pytest.mark.parametrize(
+    "command",
+    ["ls -la", "git status", "cat a.txt | wc -l", "git log --oneline && git diff", "pip list"],
+)
+def test_read_only_commands_are_cacheable(command: str) -> None:
+    assert is_cacheable_command(command)
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "rm -rf build",
+        "ls > listing.txt",
+        "git commit -m x",
+        "git status; touch x",
+        "find . -delete",
+        "cat $HOME/a",
+        "ls | tee out.txt",
+        "FOO=1 ls",
+        "echo 'unterminated",
+    ],
+)
+def test_mutating_commands_are_not_cacheable(command: str) -> None:
+    assert not is_cacheable_command(command)
+
+
+def test_cache_hits_until_argument_changes(tmp_path: Path) -> None:
+    cache = CommandCache()
+    target = tmp_path / "a.txt"
+    target.write_text("one")
+    cache.put("cat a.txt", str(tmp_path), "one")
+
+    hit = cache.get("cat a.txt", str(tmp_path))
+    target.write_text("changed")
+    miss = cache.get("cat a.txt", str(tmp_path))
+
+    assert hit is not None
+    assert hit.content == "one"
+    assert miss is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_cache_expires_and_evicts(tmp_path: Path) -> None:
+    cache = CommandCache(max_entries=1, ttl=0.0)
+    cache.put("ls", str(tmp_path), "a")
+    assert cache.get("ls", str(tmp_path)) is None
+
+    cache = CommandCache(max_entries=1)
+    cache.put("ls", str(tmp_path), "a")
+    cache.put("pwd", str(tmp_path), "b")
+    assert cache.get("ls", str(tmp_path)) is None
+    assert cache.get("pwd", str(tmp_path)) is not None
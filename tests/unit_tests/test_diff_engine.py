@@ -0,0 +1,123 @@
+"""Tests for the line diff engine."""
+
+import difflib
+import random
+
+from coda_cli.diff_engine import (
+    DiffHunk,
+    DiffResult,
+    compute_diff,
+    diff_line_lists,
+    diff_texts,
+    format_unified,
+    parse_unified_diff,
+)
+from coda_cli.widgets.diff import format_diff_result_textual, format_diff_textual
+
+
+def _apply(hunks: list[DiffHunk], before: list[str]) -> list[str]:
+    """Rebuild the new lines from the old lines and a list of hunks."""
+    result: list[str] = []
+    position = 0
+    for hunk in hunks:
+        start = hunk.old_start - 1 if hunk.old_count else hunk.old_start
+        result.extend(before[position:start])
+        position = start
+        for line in hunk.lines:
+            if line.kind == "context":
+                result.append(line.text)
+                position += 1
+            elif line.kind == "remove":
+                position += 1
+            else:
+                result.append(line.text)
+    result.extend(before[position:])
+    return result
+
+
+def test_identical_texts_have_no_hunks() -> None:
+    assert diff_texts("a\nb\n", "a\nb\n") == []
+    assert format_unified([]) is None
+
+
+def test_matches_difflib_output_for_simple_edit() -> None:
+    before = ["one", "two", "three", "four", "five"]
+    after = ["one", "2", "three", "four", "five", "six"]
+
+    ours = format_unified(diff_line_lists(before, after), "a", "b")
+    reference = "\n".join(difflib.unified_diff(before, after, "a", "b", lineterm=""))
+
+    assert ours == reference
+
+
+def test_hunks_carry_line_numbers() -> None:
+    hunks = diff_texts("a\nb\nc\n", "a\nB\nc\n")
+
+    assert len(hunks) == 1
+    removed = [line for line in hunks[0].lines if line.kind == "remove"]
+    added = [line for line in hunks[0].lines if line.kind == "add"]
+    assert removed[0].old_lineno == 2
+    assert added[0].new_lineno == 2
+
+
+def test_random_edits_round_trip() -> None:
+    rng = random.Random(7)
+    for _ in range(500):
+        before = [rng.choice("abcde") for _ in range(rng.randint(0, 40))]
+        after = list(before)
+        for _ in range(rng.randint(0, 10)):
+            roll = rng.random()
+            if roll < 0.33 and after:
+                del after[rng.randrange(len(after))]
+            elif roll < 0.66:
+                after.insert(rng.randint(0, len(after)), rng.choice("abcdefg"))
+            elif after:
+                after[rng.randrange(len(after))] = rng.choice("xyz")
+
+        hunks = diff_line_lists(before, after)
+
+        assert _apply(hunks, before) == after
+        assert _apply(parse_unified_diff(format_unified(hunks) or ""), before) == after
+
+
+def test_budget_falls_back_to_replaced_block() -> None:
+    before = [f"old {i}" for i in range(200)]
+    after = [f"new {i}" for i in range(200)]
+
+    hunks = diff_line_lists(before, after, max_edit_distance=10)
+
+    assert len(hunks) == 1
+    assert hunks[0].replaced
+    assert _apply(hunks, before) == after
+
+
+def test_format_unified_truncates() -> None:
+    hunks = diff_texts("", "\n".join(str(i) for i in range(50)))
+
+    text = format_unified(hunks, max_lines=10)
+
+    assert text is not None
+    assert len(text.splitlines()) == 10
+    assert text.endswith("...")
+
+
+def test_diff_result_stats() -> None:
+    result = compute_diff("a\nb\nc\nd\n", "a\nB\nc\nd\ne\n")
+
+    assert result.added == 2
+    assert result.removed == 1
+    assert result.hunk_count == 1
+    assert result.total_lines == 6
+    assert result.max_lineno == 5
+    assert not DiffResult().has_changes
+
+
+def test_textual_formatting_from_result_and_text_agree() -> None:
+    result = compute_diff("alpha\nbeta\n", "alpha\ngamma\n")
+
+    from_result = format_diff_result_textual(result)
+    from_text = format_diff_textual(format_unified(result.hunks) or "")
+
+    assert from_result == from_text
+    assert "[green]+1[/green]" in from_result
+    assert "gamma" in from_result
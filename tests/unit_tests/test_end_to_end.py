@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any
 from unittest.mock import patch
 
+import pytest
 from deepagents.backends import CompositeBackend
 from deepagents.backends.filesystem import FilesystemBackend
 from langchain_core.language_models import LanguageModelInput
@@ -77,6 +78,7 @@ def mock_settings(tmp_path: Path, assistant_id: str = "test-agent") -> Generator
         mock_settings_obj.get_project_agent_md_path.return_value = None
         mock_settings_obj.get_agent_dir = get_agent_dir
         mock_settings_obj.project_root = None
+        mock_settings_obj.user_langchain_project = None
 
         yield agent_dir
 
@@ -333,3 +335,64 @@ class TestDeepAgentsCLIEndToEnd:
 
             assert isinstance(backend, CompositeBackend)
             assert isinstance(backend.default, FilesystemBackend)
+
+    def test_cli_agent_reads_spilled_shell_output(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that spilled shell output can be paged through with read_file.
+
+        The spill file lives outside the project, so it must be reachable
+        through the agent's backend at the path the shell tool reports.
+        """
+        # The agent's project is the working directory
+        monkeypatch.chdir(tmp_path)
+        with mock_settings(tmp_path):
+            model = FixedGenericFakeChatModel(
+                messages=iter(
+                    [
+                        AIMessage(
+                            content="",
+                            tool_calls=[
+                                {
+                                    "name": "shell",
+                                    "args": {"command": "seq 1 50000"},
+                                    "id": "call_big",
+                                    "type": "tool_call",
+                                }
+                            ],
+                        ),
+                        AIMessage(
+                            content="",
+                            tool_calls=[
+                                {
+                                    "name": "read_file",
+                                    "args": {
+                                        "file_path": "/.coda-output/shell-call_big.log",
+                                        "offset": 30000,
+                                        "limit": 3,
+                                    },
+                                    "id": "call_read",
+                                    "type": "tool_call",
+                                }
+                            ],
+                        ),
+                        AIMessage(content="Done."),
+                    ]
+                )
+            )
+
+            agent, _ = create_cli_agent(
+                model=model,
+                assistant_id="test-agent",
+                tools=[],
+                auto_approve=True,
+            )
+            result = agent.invoke(
+                {"messages": [HumanMessage(content="Count to 50000")]},
+                {"configurable": {"thread_id": str(uuid.uuid4())}},
+            )
+
+            read_message = next(msg for msg in result["messages"] if msg.name == "read_file")
+            assert "30001" in read_message.content
+            assert "30003" in read_message.content
+            assert "30004" not in read_message.content
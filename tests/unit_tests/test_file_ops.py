@@ -1,9 +1,19 @@
+import asyncio
 import textwrap
 from pathlib import Path
+from types import SimpleNamespace
 
+from deepagents.backends.protocol import FileDownloadResponse
 from langchain_core.messages import ToolMessage
 
-from coda_cli.file_ops import FileOpTracker, build_approval_preview
+from coda_cli.file_ops import (
+    FileOpTracker,
+    FileSnapshotCache,
+    FileSnapshotMiddleware,
+    active_tracker,
+    build_approval_preview,
+)
+from coda_cli.integrations.local import LocalSubprocessSandbox
 
 
 def test_tracker_records_read_lines(tmp_path: Path) -> None:
@@ -98,6 +108,9 @@ def test_tracker_records_edit_diff(tmp_path: Path) -> None:
     assert record.diff is not None
     assert '-    return "hello"' in record.diff
     assert '+    return "hi"' in record.diff
+    assert record.diff_result is not None
+    assert record.metrics.lines_added == record.diff_result.added
+    assert record.metrics.lines_removed == record.diff_result.removed
 
 
 def test_build_approval_preview_generates_diff(tmp_path: Path) -> None:
@@ -118,3 +131,148 @@ def test_build_approval_preview_generates_diff(tmp_path: Path) -> None:
     assert preview is not None
     assert preview.diff is not None
     assert "+gamma" in preview.diff
+    assert preview.diff_result is not None
+    assert (preview.diff_result.added, preview.diff_result.removed) == (1, 1)
+    assert "Lines changed: +1 / -1" in preview.details
+
+
+class _CountingSandbox:
+    """Minimal sandbox-like backend that records download batches."""
+
+    def __init__(self, files: dict[str, bytes]) -> None:
+        self.files = files
+        self.download_calls: list[list[str]] = []
+
+    def execute(self, command: str) -> None:  # pragma: no cover - marks backend as remote
+        raise NotImplementedError(command)
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        self.download_calls.append(list(paths))
+        return [
+            FileDownloadResponse(path=path, content=self.files.get(path), error=None)
+            if path in self.files
+            else FileDownloadResponse(path=path, content=None, error="file_not_found")
+            for path in paths
+        ]
+
+
+def test_tracker_batches_sandbox_before_content() -> None:
+    backend = _CountingSandbox({"/workspace/a.txt": b"a\n", "/workspace/b.txt": b"b\n"})
+    tracker = FileOpTracker(assistant_id=None, backend=backend)
+
+    tracker.start_operation("edit_file", {"file_path": "/workspace/a.txt"}, "edit-a")
+    tracker.start_operation("edit_file", {"file_path": "/workspace/b.txt"}, "edit-b")
+    assert backend.download_calls == []
+
+    tracker.flush_pending_reads()
+
+    assert backend.download_calls == [["/workspace/a.txt", "/workspace/b.txt"]]
+    assert tracker.active["edit-a"].before_content == "a\n"
+    assert tracker.active["edit-b"].before_content == "b\n"
+
+
+def test_tracker_reuses_after_content_as_next_before() -> None:
+    backend = _CountingSandbox({"/workspace/a.txt": b"one\n"})
+    snapshots = FileSnapshotCache(backend)
+
+    first = FileOpTracker(assistant_id=None, backend=backend, snapshots=snapshots)
+    first.start_operation("edit_file", {"file_path": "/workspace/a.txt"}, "edit-1")
+    backend.files["/workspace/a.txt"] = b"two\n"
+    first.complete_with_message(
+        ToolMessage(content="Successfully replaced", tool_call_id="edit-1", name="edit_file")
+    )
+    calls_after_first = len(backend.download_calls)
+
+    second = FileOpTracker(assistant_id=None, backend=backend, snapshots=snapshots)
+    second.start_operation("edit_file", {"file_path": "/workspace/a.txt"}, "edit-2")
+    second.flush_pending_reads()
+
+    assert len(backend.download_calls) == calls_after_first
+    assert second.active["edit-2"].before_content == "two\n"
+    assert snapshots.hits == 1
+
+
+def _run_wrapped_edit(tracker: FileOpTracker, backend: _CountingSandbox) -> ToolMessage:
+    """Run an edit of /workspace/a.txt through the snapshot middleware."""
+    call = {"name": "edit_file", "args": {"file_path": "/workspace/a.txt"}, "id": "edit-1"}
+
+    async def edit(_request: object) -> ToolMessage:
+        backend.files["/workspace/a.txt"] = b"two\n"
+        return ToolMessage(content="Successfully replaced", tool_call_id="edit-1", name="edit_file")
+
+    async def run() -> ToolMessage:
+        active_tracker.set(tracker)
+        request = SimpleNamespace(tool_call=call)
+        return await FileSnapshotMiddleware().awrap_tool_call(request, edit)  # type: ignore[arg-type]
+
+    return asyncio.run(run())
+
+
+def test_tool_wrapper_captures_before_content_ahead_of_the_ui() -> None:
+    backend = _CountingSandbox({"/workspace/a.txt": b"one\n"})
+    tracker = FileOpTracker(assistant_id=None, backend=backend)
+
+    message = _run_wrapped_edit(tracker, backend)
+    # The UI only gets to the tool call after the tool has run
+    tracker.start_operation("edit_file", {"file_path": "/workspace/a.txt"}, "edit-1")
+    record = tracker.complete_with_message(message)
+
+    assert record is not None
+    assert record.before_content == "one\n"
+    assert record.diff is not None
+    assert "+two" in record.diff
+
+
+def test_tool_wrapper_waits_for_the_pending_batch() -> None:
+    backend = _CountingSandbox({"/workspace/a.txt": b"one\n", "/workspace/b.txt": b"b\n"})
+    tracker = FileOpTracker(assistant_id=None, backend=backend)
+    tracker.start_operation("edit_file", {"file_path": "/workspace/a.txt"}, "edit-1")
+    tracker.start_operation("edit_file", {"file_path": "/workspace/b.txt"}, "edit-2")
+
+    _run_wrapped_edit(tracker, backend)
+
+    assert backend.download_calls == [["/workspace/a.txt", "/workspace/b.txt"]]
+    assert tracker.active["edit-1"].before_content == "one\n"
+
+
+def test_snapshot_cache_revalidates_local_files(tmp_path: Path) -> None:
+    target = tmp_path / "notes.txt"
+    target.write_text("alpha\n")
+    snapshots = FileSnapshotCache()
+
+    assert snapshots.read(str(target), target) == "alpha\n"
+    assert snapshots.read(str(target), target) == "alpha\n"
+    assert snapshots.hits == 1
+
+    target.write_text("alpha\nbeta\n")
+    assert snapshots.read(str(target), target) == "alpha\nbeta\n"
+    assert snapshots.misses == 2
+
+
+def test_shell_call_drops_unverifiable_snapshots() -> None:
+    backend = _CountingSandbox({"/workspace/a.txt": b"one\n"})
+    tracker = FileOpTracker(assistant_id=None, backend=backend)
+    tracker.snapshots.read("/workspace/a.txt")
+
+    tracker.start_operation("execute", {"command": "sed -i s/one/two/ a.txt"}, "exec-1")
+
+    backend.files["/workspace/a.txt"] = b"two\n"
+    assert tracker.snapshots.read("/workspace/a.txt") == "two\n"
+
+
+def test_sandbox_snapshots_are_revalidated_by_remote_hash(tmp_path: Path) -> None:
+    target = tmp_path / "a.txt"
+    target.write_text("one\n")
+    backend = LocalSubprocessSandbox(tmp_path / "sandbox")
+    snapshots = FileSnapshotCache(backend)
+
+    assert snapshots.read(str(target)) == "one\n"
+    trips = backend.round_trips
+    assert snapshots.read(str(target)) == "one\n"
+    # One hashing command, no download
+    assert backend.round_trips == trips + 1
+
+    target.write_text("two\n")
+    snapshots.note_untracked_writes()
+    assert snapshots.read(str(target)) == "two\n"
+    assert (snapshots.hits, snapshots.misses) == (1, 2)
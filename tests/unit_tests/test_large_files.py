@@ -0,0 +1,147 @@
+"""Tests for size-aware reading and windowed diffs of large files."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import ToolMessage
+
+from coda_cli import large_files
+from coda_cli.diff_engine import diff_texts
+from coda_cli.file_ops import FileOpTracker, build_approval_preview
+from coda_cli.large_files import read_text_limited, summarize_file, windowed_edit_diff
+
+
+def _numbered_lines(count: int) -> str:
+    return "".join(f"line {i}\n" for i in range(1, count + 1))
+
+
+def test_read_text_limited_rejects_large_and_binary(tmp_path: Path) -> None:
+    text = tmp_path / "small.txt"
+    text.write_text("hello\n")
+    binary = tmp_path / "blob.bin"
+    binary.write_bytes(b"\x00\x01\x02")
+
+    assert read_text_limited(text) == "hello\n"
+    assert read_text_limited(text, limit=3) is None
+    assert read_text_limited(binary) is None
+    assert read_text_limited(tmp_path / "missing.txt") is None
+
+
+def test_summarize_file_reports_hash_and_head_tail(tmp_path: Path) -> None:
+    path = tmp_path / "big.txt"
+    content = _numbered_lines(2000)
+    path.write_text(content)
+
+    summary = summarize_file(path, preview_bytes=32)
+
+    assert summary is not None
+    assert summary.size == len(content)
+    assert summary.sha256 == hashlib.sha256(content.encode()).hexdigest()
+    assert summary.line_count == 2000
+    assert summary.head.startswith("line 1\n")
+    assert summary.tail.endswith("line 2000\n")
+    assert "Lines: 2000" in summary.to_markdown()
+
+
+def test_summarize_file_detects_binary(tmp_path: Path) -> None:
+    path = tmp_path / "image.png"
+    path.write_bytes(b"\x89PNG\x00\x00" * 100)
+
+    summary = summarize_file(path)
+
+    assert summary is not None
+    assert summary.binary
+    assert summary.head == ""
+    assert "binary" in summary.describe()
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_windowed_edit_diff_matches_full_diff(tmp_path: Path, *, reverse: bool) -> None:
+    before = _numbered_lines(500).replace("line 100\n", "MARK\n").replace("line 400\n", "MARK\n")
+    after = before.replace("MARK\n", "first\nsecond\n")
+    path = tmp_path / "data.txt"
+    path.write_text(after if reverse else before)
+
+    if reverse:
+        result = windowed_edit_diff(path, "first\nsecond\n", "MARK\n", reverse=True)
+    else:
+        result = windowed_edit_diff(path, "MARK\n", "first\nsecond\n")
+
+    expected = diff_texts(before, after)
+    assert result is not None
+    assert [hunk.header for hunk in result.hunks] == [hunk.header for hunk in expected]
+    assert result.added == 4
+    assert result.removed == 2
+
+
+def test_windowed_edit_diff_returns_none_when_not_found(tmp_path: Path) -> None:
+    path = tmp_path / "data.txt"
+    path.write_text(_numbered_lines(10))
+
+    assert windowed_edit_diff(path, "absent", "x") is None
+    assert windowed_edit_diff(path, "", "x") is None
+
+
+def test_tracker_windows_large_file_edits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(large_files, "LARGE_FILE_BYTES", 1024)
+    path = tmp_path / "huge.log"
+    before = _numbered_lines(1000)
+    path.write_text(before)
+    args = {"file_path": str(path), "old_string": "line 500\n", "new_string": "changed\n"}
+
+    tracker = FileOpTracker(assistant_id=None)
+    tracker.start_operation("edit_file", args, "edit-1")
+    assert tracker.active["edit-1"].before_content == ""
+    path.write_text(before.replace("line 500\n", "changed\n"))
+    record = tracker.complete_with_message(
+        ToolMessage(content="Edited", tool_call_id="edit-1", name="edit_file")
+    )
+
+    assert record is not None
+    assert record.status == "success"
+    assert record.large_file
+    assert record.after_content is None
+    assert record.summary is not None
+    assert record.metrics.lines_written == 1000
+    assert record.metrics.lines_added == 1
+    assert record.metrics.lines_removed == 1
+    assert record.diff is not None
+    assert "@@ -497,7 +497,7 @@" in record.diff
+
+
+def test_tracker_summarizes_large_write(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(large_files, "LARGE_FILE_BYTES", 1024)
+    path = tmp_path / "generated.txt"
+
+    tracker = FileOpTracker(assistant_id=None)
+    tracker.start_operation("write_file", {"file_path": str(path)}, "write-1")
+    path.write_text(_numbered_lines(1000))
+    record = tracker.complete_with_message(
+        ToolMessage(content="Written", tool_call_id="write-1", name="write_file")
+    )
+
+    assert record is not None
+    assert record.diff is None
+    assert record.summary is not None
+    assert record.metrics.lines_added == 1000
+
+
+def test_approval_preview_windows_large_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(large_files, "LARGE_FILE_BYTES", 1024)
+    path = tmp_path / "huge.log"
+    path.write_text(_numbered_lines(1000))
+
+    preview = build_approval_preview(
+        "edit_file",
+        {"file_path": str(path), "old_string": "line 10\n", "new_string": "ten\n"},
+        assistant_id=None,
+    )
+
+    assert preview is not None
+    assert preview.error is None
+    assert preview.diff is not None
+    assert "-line 10" in preview.diff
+    assert "+ten" in preview.diff
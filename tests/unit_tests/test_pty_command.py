@@ -0,0 +1,75 @@
+"""Tests for running `!` commands under a pseudo-terminal."""
+
+import asyncio
+import shlex
+import signal
+import sys
+from pathlib import Path
+
+from coda_cli.pty_command import PtyCommand, TerminalScrollback
+
+# Python turns SIGINT into KeyboardInterrupt; restore the default so it kills the process
+_DEFAULT_SIGINT = "import signal, time; signal.signal(signal.SIGINT, signal.SIG_DFL); "
+
+
+def test_scrollback_applies_carriage_returns_and_bounds_lines() -> None:
+    scrollback = TerminalScrollback(max_lines=3)
+    scrollback.write("progress 10%\rprogress 5")
+    scrollback.write("0%\rprogress 100%\r\n")
+    scrollback.write("\x1b[2K\x1b[32mok\x1b[0m\n")
+    for i in range(5):
+        scrollback.write(f"line {i}\n")
+    scrollback.write("partial")
+
+    assert scrollback.lines == ["line 2", "line 3", "line 4", "partial"]
+    assert scrollback.dropped_lines == 4
+
+    colored = TerminalScrollback()
+    colored.write("\x1b[2K\x1b[32mok\x1b[0m\n")
+    assert colored.lines == ["\x1b[32mok\x1b[0m"]
+
+
+def test_pty_command_streams_output_through_a_tty(tmp_path: Path) -> None:
+    chunks: list[str] = []
+    command = PtyCommand(
+        "test -t 1 && echo tty; echo first; sleep 0.2; echo second; exit 3",
+        cwd=str(tmp_path),
+        on_output=chunks.append,
+    )
+
+    returncode = asyncio.run(command.run())
+
+    assert returncode == 3
+    assert "".join(chunks).replace("\r\n", "\n") == "tty\nfirst\nsecond\n"
+    assert len(chunks) >= 2
+
+
+def test_pty_command_interrupt_sends_sigint(tmp_path: Path) -> None:
+    chunks: list[str] = []
+
+    async def run_and_interrupt() -> tuple[PtyCommand, int]:
+        ready = asyncio.Event()
+
+        def on_output(chunk: str) -> None:
+            chunks.append(chunk)
+            if "ready" in "".join(chunks):
+                ready.set()
+
+        # One process prints and then blocks: a signal arriving while the shell is
+        # still starting the next command can be lost, making the test flaky
+        program = "print('ready', flush=True); time.sleep(30); print('after')"
+        command = PtyCommand(
+            f"exec {shlex.quote(sys.executable)} -c {shlex.quote(_DEFAULT_SIGINT + program)}",
+            cwd=str(tmp_path),
+            on_output=on_output,
+        )
+        task = asyncio.create_task(command.run())
+        await asyncio.wait_for(ready.wait(), 5)
+        command.interrupt()
+        return command, await asyncio.wait_for(task, 5)
+
+    command, returncode = asyncio.run(run_and_interrupt())
+
+    assert returncode == -signal.SIGINT
+    assert command.interrupted
+    assert "after" not in "".join(chunks)
@@ -0,0 +1,303 @@
+"""Tests for the local shell middleware."""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain.tools import ToolRuntime
+
+from coda_cli.output_buffer import HeadTailBuffer
+from coda_cli.process_limits import ResourceLimits, ResourceUsage
+from coda_cli.shell import ShellMiddleware
+
+
+def _runtime(events: list[Any] | None = None, tool_call_id: str = "call-1") -> ToolRuntime:
+    writer = events.append if events is not None else (lambda _chunk: None)
+    return ToolRuntime(
+        state={},
+        context=None,
+        config={},
+        stream_writer=writer,
+        tool_call_id=tool_call_id,
+        store=None,
+    )
+
+
+def test_head_tail_buffer_keeps_both_ends() -> None:
+    buffer = HeadTailBuffer(10)
+    for i in range(1000):
+        buffer.write(f"{i:04d}".encode())
+
+    value = buffer.getvalue()
+
+    assert buffer.truncated
+    assert buffer.total_bytes == 4000
+    assert buffer.elided_bytes == 3990
+    assert value.startswith("00000")
+    assert value.endswith("80999")
+    assert "3990 of 4000 bytes omitted" in value
+
+
+def test_head_tail_buffer_untruncated_roundtrip() -> None:
+    buffer = HeadTailBuffer(100)
+    buffer.write(b"hello ")
+    buffer.write(b"world")
+
+    assert not buffer.truncated
+    assert buffer.getvalue() == "hello world"
+
+
+def test_shell_combines_stdout_and_stderr(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path))
+
+    result = shell.tools[0].invoke(
+        {"command": "echo out; echo err >&2; exit 2", "runtime": _runtime()}
+    )
+
+    assert result.status == "error"
+    assert "out" in result.content
+    assert "[stderr] err" in result.content
+    assert result.content.endswith("Exit code: 2")
+
+
+def test_shell_keeps_tail_of_large_output(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), max_output_bytes=200)
+
+    result = shell.tools[0].invoke({"command": "seq 1 100000", "runtime": _runtime()})
+
+    assert result.status == "success"
+    assert result.content.startswith("1\n2\n")
+    assert result.content.rstrip().endswith("99999\n100000")
+    assert "omitted from the middle" in result.content
+
+
+def test_shell_streams_output_to_writer(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path))
+    events: list[Any] = []
+
+    result = asyncio.run(
+        shell.tools[0].ainvoke(
+            {"command": "echo first; sleep 0.3; echo second", "runtime": _runtime(events)}
+        )
+    )
+
+    assert result.status == "success"
+    chunks = [event["chunk"] for event in events]
+    assert all(event["type"] == "tool_output" for event in events)
+    assert all(event["tool_call_id"] == "call-1" for event in events)
+    assert len(chunks) >= 2
+    assert "".join(chunks) == "first\nsecond\n"
+
+
+def test_shell_timeout_keeps_partial_output(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), timeout=0.5)
+
+    result = shell.tools[0].invoke({"command": "echo started; sleep 10", "runtime": _runtime()})
+
+    assert result.status == "error"
+    assert result.content.startswith("started")
+    assert "timed out after 0.5 seconds" in result.content
+
+
+def test_persistent_session_keeps_cwd_and_env(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+    (tmp_path / "sub").mkdir()
+
+    async def run_all() -> list[Any]:
+        results = []
+        for command in ("cd sub && export GREETING=hi", "pwd; echo $GREETING", "false"):
+            results.append(
+                await shell.tools[0].ainvoke({"command": command, "runtime": _runtime()})
+            )
+        return results
+
+    setup, check, failing = asyncio.run(run_all())
+
+    assert setup.status == "success"
+    assert check.content == f"{tmp_path / 'sub'}\nhi\n"
+    assert failing.status == "error"
+    assert failing.content.endswith("Exit code: 1")
+
+
+def test_persistent_session_keeps_env_across_sync_calls(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+
+    shell.tools[0].invoke({"command": "export X=1", "runtime": _runtime()})
+    result = shell.tools[0].invoke({"command": "echo $X", "runtime": _runtime()})
+
+    assert result.content == "1\n"
+
+
+def test_persistent_session_restarts_after_timeout(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True, timeout=0.5)
+    (tmp_path / "sub").mkdir()
+
+    async def run_all() -> list[Any]:
+        results = []
+        for command in ("cd sub && export GREETING=hi", "sleep 10", "pwd; echo ${GREETING:-unset}"):
+            results.append(
+                await shell.tools[0].ainvoke({"command": command, "runtime": _runtime()})
+            )
+        return results
+
+    _, timed_out, after = asyncio.run(run_all())
+
+    assert timed_out.status == "error"
+    assert "session was restarted" in timed_out.content
+    assert after.content == f"{tmp_path / 'sub'}\nunset\n"
+
+
+def test_persistent_session_survives_exit(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), persistent_session=True)
+
+    async def run_all() -> list[Any]:
+        return [
+            await shell.tools[0].ainvoke({"command": command, "runtime": _runtime()})
+            for command in ("exit 4", "echo back")
+        ]
+
+    exited, after = asyncio.run(run_all())
+
+    assert "Exit code: 4" in exited.content
+    assert after.content == "back\n"
+
+
+def test_head_tail_buffer_spills_full_stream(tmp_path: Path) -> None:
+    spill = tmp_path / "out" / "full.log"
+    buffer = HeadTailBuffer(16, spill_path=spill)
+    data = b"".join(f"line {i}\n".encode() for i in range(100))
+    for offset in range(0, len(data), 7):
+        buffer.write(data[offset : offset + 7])
+    buffer.close()
+
+    assert buffer.spilled
+    assert spill.read_bytes() == data
+    assert buffer.line_count == 100
+    assert f"saved to {spill}" in buffer.getvalue()
+
+
+def test_head_tail_buffer_does_not_spill_small_output(tmp_path: Path) -> None:
+    spill = tmp_path / "full.log"
+    buffer = HeadTailBuffer(100, spill_path=spill)
+    buffer.write(b"short\n")
+    buffer.close()
+
+    assert not buffer.spilled
+    assert not spill.exists()
+
+
+def test_shell_spills_large_output_for_paging(tmp_path: Path) -> None:
+    spill_dir = tmp_path / "spill"
+    shell = ShellMiddleware(workspace_root=str(tmp_path), max_output_bytes=200, spill_dir=spill_dir)
+
+    result = shell.tools[0].invoke(
+        {"command": "seq 1 50000", "runtime": _runtime(tool_call_id="call/big")}
+    )
+
+    spill_file = spill_dir / "shell-call_big.log"
+    assert spill_file.read_text().splitlines() == [str(i) for i in range(1, 50001)]
+    assert f"Full output (50000 lines) saved to {spill_file}" in result.content
+
+
+def test_shell_reports_spill_under_backend_route(tmp_path: Path) -> None:
+    shell = ShellMiddleware(
+        workspace_root=str(tmp_path),
+        max_output_bytes=200,
+        spill_dir=tmp_path / "spill",
+        spill_route="/.coda-output/",
+    )
+
+    result = shell.tools[0].invoke(
+        {"command": "seq 1 50000", "runtime": _runtime(tool_call_id="call_big")}
+    )
+
+    assert "saved to /.coda-output/shell-call_big.log" in result.content
+    assert (tmp_path / "spill" / "shell-call_big.log").exists()
+
+
+def test_shell_caches_read_only_commands(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), cache_read_only=True)
+    (tmp_path / "a.txt").write_text("one\n")
+
+    first = shell.tools[0].invoke({"command": "cat a.txt", "runtime": _runtime()})
+    second = shell.tools[0].invoke({"command": "cat a.txt", "runtime": _runtime()})
+    shell.tools[0].invoke({"command": "echo two > a.txt", "runtime": _runtime()})
+    third = shell.tools[0].invoke({"command": "cat a.txt", "runtime": _runtime()})
+
+    assert first.content == "one\n"
+    assert "[Cached result" in second.content
+    assert third.content == "two\n"
+
+
+def _run_concurrently(shell: ShellMiddleware, commands: list[str]) -> tuple[list[Any], float]:
+    async def run_all() -> list[Any]:
+        return await asyncio.gather(
+            *(
+                shell.tools[0].ainvoke({"command": command, "runtime": _runtime()})
+                for command in commands
+            )
+        )
+
+    start = time.monotonic()
+    results = asyncio.run(run_all())
+    return results, time.monotonic() - start
+
+
+def test_shell_runs_commands_concurrently_up_to_limit(tmp_path: Path) -> None:
+    commands = ["sleep 0.5; echo a", "sleep 0.5; echo b"]
+
+    parallel, parallel_elapsed = _run_concurrently(
+        ShellMiddleware(workspace_root=str(tmp_path), max_concurrency=2), commands
+    )
+    serial, serial_elapsed = _run_concurrently(
+        ShellMiddleware(workspace_root=str(tmp_path), max_concurrency=1), commands
+    )
+
+    assert [result.content for result in parallel] == ["a\n", "b\n"]
+    assert [result.content for result in serial] == ["a\n", "b\n"]
+    assert parallel_elapsed < 0.9
+    assert serial_elapsed >= 1.0
+
+
+@pytest.mark.parametrize("persistent_session", [False, True])
+def test_shell_applies_resource_limits(tmp_path: Path, persistent_session: bool) -> None:  # noqa: FBT001
+    limits = ResourceLimits(cpu_seconds=30, open_files=64, nice=5)
+    shell = ShellMiddleware(
+        workspace_root=str(tmp_path),
+        resource_limits=limits,
+        persistent_session=persistent_session,
+    )
+    baseline = os.nice(0)
+
+    result = shell.tools[0].invoke(
+        {"command": "ulimit -St; ulimit -Ht; ulimit -n; nice", "runtime": _runtime()}
+    )
+
+    assert result.content.split() == ["30", "35", "64", str(min(baseline + 5, 19))]
+
+
+def test_shell_reports_resource_usage(tmp_path: Path) -> None:
+    shell = ShellMiddleware(workspace_root=str(tmp_path), report_usage=True)
+
+    result = shell.tools[0].invoke(
+        {"command": "python -c 'sum(range(3_000_000))'", "runtime": _runtime()}
+    )
+
+    assert isinstance(result.artifact, ResourceUsage)
+    assert result.artifact.user_seconds > 0
+    assert result.artifact.max_rss_bytes > 0
+    assert "Resource usage: CPU" in result.content
+
+
+def test_resource_limits_parse() -> None:
+    limits = ResourceLimits.parse("cpu=60, memory=512,files=256,nice=10")
+
+    assert limits == ResourceLimits(
+        cpu_seconds=60, memory_bytes=512 * 1024 * 1024, open_files=256, nice=10
+    )
+    assert ResourceLimits.parse("").is_empty
+    with pytest.raises(ValueError, match="Unknown resource limit"):
+        ResourceLimits.parse("disk=1")
@@ -0,0 +1,46 @@
+"""Shared fixtures for tool tests."""
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+import pytest
+
+from coda_cli import http_cache as http_cache_module
+from coda_cli import http_client, tools
+from coda_cli import search_cache as search_cache_module
+from coda_cli.http_cache import HttpCache
+from coda_cli.search_cache import SearchCache
+
+
+@pytest.fixture(autouse=True)
+def http_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> HttpCache:
+    """Point fetch_url at an empty cache instead of ~/.coda/cache/http."""
+    cache = HttpCache(tmp_path / "http-cache")
+    monkeypatch.setattr(http_cache_module, "_cache", cache)
+    monkeypatch.setattr(tools, "_converted_pages", OrderedDict())
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def search_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SearchCache:
+    """Point web_search at an empty cache instead of ~/.coda/cache/search."""
+    cache = SearchCache(tmp_path / "search-cache")
+    monkeypatch.setattr(search_cache_module, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def serve(monkeypatch: pytest.MonkeyPatch) -> Callable[..., None]:
+    """Route the async web tools to an in-process handler."""
+
+    def install(handler: Callable[[httpx.Request], Awaitable[httpx.Response]]) -> None:
+        monkeypatch.setattr(http_client, "_async_client", None)
+        monkeypatch.setattr(
+            http_client,
+            "_build_async_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+    return install
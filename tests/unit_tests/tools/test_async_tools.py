@@ -0,0 +1,130 @@
+"""Tests for the async web tool variants."""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable
+
+import httpx
+import pytest
+from markdownify import markdownify
+
+from coda_cli import tools, web_content
+from coda_cli.http_client import WebCallLimiter
+from coda_cli.tools import afetch_url, ahttp_request, fetch_url, fetch_url_tool
+
+Handler = Callable[[httpx.Request], Awaitable[httpx.Response]]
+
+
+def test_afetch_url_converts_and_caches(serve: Callable[[Handler], None]) -> None:
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(
+            200,
+            html="<html><body><h1>Docs</h1><p>Content</p></body></html>",
+            headers={"Cache-Control": "max-age=600"},
+        )
+
+    serve(handler)
+
+    async def fetch_twice() -> tuple[dict, dict]:
+        first = await afetch_url("http://docs.example.com/")
+        return first, await afetch_url("http://docs.example.com/")
+
+    first, second = asyncio.run(fetch_twice())
+
+    assert "Docs" in first["markdown_content"]
+    assert first["cache"]["status"] == "miss"
+    assert second["cache"]["status"] == "hit"
+    assert len(calls) == 1
+    # The sync variant shares the cache
+    assert fetch_url("http://docs.example.com/")["cache"]["status"] == "hit"
+
+
+def test_afetch_url_converts_off_the_event_loop(
+    serve: Callable[[Handler], None], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    converted_on = []
+
+    def record_markdownify(html: str) -> str:
+        converted_on.append(threading.current_thread())
+        return markdownify(html)
+
+    monkeypatch.setattr(web_content, "markdownify", record_markdownify)
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, html="".join(f"<p>Paragraph {i}</p>" for i in range(100)))
+
+    serve(handler)
+
+    result = asyncio.run(afetch_url("http://docs.example.com/long"))
+
+    assert "Paragraph 99" in result["markdown_content"]
+    assert converted_on
+    assert threading.main_thread() not in converted_on
+
+
+def test_ahttp_request_enforces_timeout(serve: Callable[[Handler], None]) -> None:
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    serve(handler)
+
+    result = asyncio.run(ahttp_request("http://slow.example.com/", timeout=1))
+
+    assert not result["success"]
+    assert result["content"] == "Request timed out after 1 seconds"
+
+
+def test_web_calls_share_a_concurrency_limit(
+    serve: Callable[[Handler], None], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(tools, "web_call_limiter", WebCallLimiter(2))
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return httpx.Response(200, json={"path": request.url.path})
+
+    serve(handler)
+
+    async def run_all() -> list[dict]:
+        return await asyncio.gather(
+            *(ahttp_request(f"http://api.example.com/{i}") for i in range(6))
+        )
+
+    results = asyncio.run(run_all())
+
+    assert [result["content"]["path"] for result in results] == [f"/{i}" for i in range(6)]
+    assert peak == 2
+
+
+def test_waiting_web_calls_hold_no_threads() -> None:
+    limiter = WebCallLimiter(1)
+    thread_counts = []
+
+    async def call() -> None:
+        async with limiter:
+            thread_counts.append(threading.active_count())
+            await asyncio.sleep(0.01)
+
+    async def run_all() -> None:
+        await asyncio.gather(*(call() for _ in range(10)))
+
+    before = threading.active_count()
+    asyncio.run(run_all())
+
+    assert thread_counts == [before] * 10
+
+
+def test_tools_expose_both_variants() -> None:
+    assert fetch_url_tool.name == "fetch_url"
+    assert fetch_url_tool.func is fetch_url
+    assert fetch_url_tool.coroutine is afetch_url
+    assert "mode" in fetch_url_tool.args
@@ -0,0 +1,75 @@
+"""Tests for reading long fetch_url results chunk by chunk."""
+
+import responses
+from markdownify import markdownify
+
+from coda_cli.tools import fetch_url
+
+PAGE = (
+    "<html><body><h1>Manual</h1>"
+    + "".join(
+        f"<h2>Section {i}</h2><p>Paragraph {i} explains one more detail.</p>" for i in range(300)
+    )
+    + "</body></html>"
+)
+
+
+def _read_all(url: str, **kwargs: object) -> tuple[str, list[dict]]:
+    chunks, results, offset = [], [], 0
+    while offset is not None:
+        result = fetch_url(url, max_chars=2000, offset=offset, **kwargs)
+        results.append(result)
+        chunks.append(result["markdown_content"].split("\n\n[Content truncated")[0])
+        offset = result["next_offset"]
+    return "".join(chunks), results
+
+
+@responses.activate
+def test_chunks_reassemble_the_page_from_one_download() -> None:
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/manual",
+        body=PAGE,
+        content_type="text/html",
+        headers={"Cache-Control": "max-age=600"},
+    )
+
+    markdown, results = _read_all("http://docs.example.com/manual")
+
+    assert markdown == markdownify(PAGE).strip()
+    assert len(results) > 3
+    assert results[0]["total_chars"] is None
+    assert results[-1]["total_chars"] == len(markdown)
+    assert all(result["cache"]["status"] == "hit" for result in results[1:])
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_later_chunks_come_from_the_stored_copy_even_when_stale() -> None:
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/manual",
+        body=PAGE,
+        content_type="text/html",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+    first = fetch_url("http://docs.example.com/manual", max_chars=2000)
+    second = fetch_url(
+        "http://docs.example.com/manual", max_chars=2000, offset=first["next_offset"]
+    )
+
+    assert second["offset"] == first["next_offset"]
+    assert second["markdown_content"].startswith(markdownify(PAGE).strip()[second["offset"] :][:50])
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_offset_past_the_end() -> None:
+    responses.add(responses.GET, "http://docs.example.com/short", body="<p>Short page.</p>")
+
+    fetch_url("http://docs.example.com/short")
+    result = fetch_url("http://docs.example.com/short", offset=10_000)
+
+    assert result["markdown_content"].startswith("[No content at offset 10000")
+    assert result["next_offset"] is None
@@ -0,0 +1,80 @@
+"""Tests for the batch fetch_urls tool."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import httpx
+import responses
+
+from coda_cli.tools import afetch_urls, fetch_urls
+
+Handler = Callable[[httpx.Request], Awaitable[httpx.Response]]
+
+PAGE = "<html><body><h1>{name}</h1><p>{text}</p></body></html>"
+
+
+@responses.activate
+def test_fetch_urls_dedupes_and_keeps_partial_results() -> None:
+    responses.add(
+        responses.GET, "http://docs.example.com/a", body=PAGE.format(name="A", text="alpha")
+    )
+    responses.add(responses.GET, "http://docs.example.com/missing", status=404)
+
+    result = fetch_urls(
+        [
+            "http://docs.example.com/a",
+            "http://docs.example.com/missing",
+            "http://docs.example.com/a#intro",
+        ]
+    )
+
+    assert [entry["url"] for entry in result["results"]] == [
+        "http://docs.example.com/a",
+        "http://docs.example.com/missing",
+    ]
+    assert "alpha" in result["results"][0]["markdown_content"]
+    assert "error" in result["results"][1]
+    assert (result["succeeded"], result["failed"]) == (1, 1)
+    assert result["duplicates"] == ["http://docs.example.com/a#intro"]
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_fetch_urls_splits_the_total_budget() -> None:
+    for name in ("a", "b", "c", "d"):
+        responses.add(
+            responses.GET,
+            f"http://docs.example.com/{name}",
+            body=PAGE.format(name=name, text="word " * 500),
+        )
+
+    result = fetch_urls(
+        [f"http://docs.example.com/{name}" for name in ("a", "b", "c", "d")],
+        max_chars_each=5000,
+        total_max_chars=1000,
+        mode="full",
+    )
+
+    assert result["max_chars_each"] == 250
+    for entry in result["results"]:
+        assert entry["truncated"]
+        content, _note = entry["markdown_content"].split("\n\n[Content truncated")
+        assert len(content) <= 250
+
+
+def test_afetch_urls_isolates_timeouts(serve: Callable[[Handler], None]) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            await asyncio.sleep(10)
+        return httpx.Response(200, html=PAGE.format(name="Fast", text="quick"))
+
+    serve(handler)
+
+    result = asyncio.run(
+        afetch_urls(["http://docs.example.com/slow", "http://docs.example.com/fast"], timeout=1)
+    )
+
+    slow, fast = result["results"]
+    assert "timed out" in slow["error"]
+    assert "quick" in fast["markdown_content"]
+    assert (result["succeeded"], result["failed"]) == (1, 1)
@@ -0,0 +1,99 @@
+"""Tests for the on-disk fetch_url cache."""
+
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+import responses
+
+from coda_cli.http_cache import HttpCache, freshness_lifetime
+from coda_cli.tools import fetch_url
+
+PAGE = "<html><body><h1>Docs</h1><p>Content</p></body></html>"
+
+
+@responses.activate
+def test_fresh_entry_is_served_without_network() -> None:
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/page",
+        body=PAGE,
+        headers={"Cache-Control": "max-age=600"},
+    )
+
+    first = fetch_url("http://docs.example.com/page")
+    second = fetch_url("http://docs.example.com/page")
+
+    assert first["cache"]["status"] == "miss"
+    assert second["cache"] == {"status": "hit", "hits": 1, "revalidated": 0, "misses": 1}
+    assert second["markdown_content"] == first["markdown_content"]
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_stale_entry_is_revalidated_with_etag() -> None:
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/page",
+        body=PAGE,
+        headers={"ETag": '"v1"', "Cache-Control": "no-cache"},
+    )
+    responses.add(responses.GET, "http://docs.example.com/page", status=304)
+
+    first = fetch_url("http://docs.example.com/page")
+    second = fetch_url("http://docs.example.com/page")
+
+    assert second["cache"]["status"] == "revalidated"
+    assert second["markdown_content"] == first["markdown_content"]
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+
+@responses.activate
+def test_no_store_responses_are_not_cached(http_cache: HttpCache) -> None:
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/private",
+        body=PAGE,
+        headers={"Cache-Control": "no-store"},
+    )
+
+    fetch_url("http://docs.example.com/private")
+
+    assert http_cache.lookup("http://docs.example.com/private") is None
+
+
+def test_freshness_lifetime_rules() -> None:
+    now = time.time()
+
+    assert freshness_lifetime({"cache-control": "public, max-age=60", "age": "10"}, now) == 50
+    assert freshness_lifetime({"cache-control": "max-age=60, no-cache"}, now) == 0
+    assert freshness_lifetime({}, now) == 0
+    heuristic = freshness_lifetime(
+        {
+            "date": formatdate(now, usegmt=True),
+            "last-modified": formatdate(now - 1000, usegmt=True),
+        },
+        now,
+    )
+    assert 99 <= heuristic <= 101
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    class _Response:
+        status_code = 200
+        content = b"x" * 400
+
+        def __init__(self, url: str) -> None:
+            self.url = url
+            self.headers = {"Cache-Control": "max-age=600"}
+
+    cache = HttpCache(tmp_path, max_bytes=3500)
+    for name in ("a", "b", "c"):
+        cache.store(f"http://e.com/{name}", _Response(f"http://e.com/{name}"), "m" * 400)
+        time.sleep(0.01)
+    cache.lookup("http://e.com/a")
+    cache.store("http://e.com/d", _Response("http://e.com/d"), "m" * 400)
+
+    assert cache.lookup("http://e.com/a") is not None
+    assert cache.lookup("http://e.com/b") is None
+    assert cache.lookup("http://e.com/d") is not None
@@ -0,0 +1,58 @@
+"""Tests for the shared HTTP session."""
+
+from collections.abc import Iterator
+
+import pytest
+import responses
+
+from coda_cli import http_client
+from coda_cli.http_client import close_session, get_session
+from coda_cli.tools import http_request
+
+
+@pytest.fixture(autouse=True)
+def fresh_session() -> Iterator[None]:
+    close_session()
+    yield
+    close_session()
+
+
+def test_session_is_shared() -> None:
+    assert get_session() is get_session()
+    assert "gzip" in get_session().headers["Accept-Encoding"]
+
+
+@responses.activate
+def test_idempotent_requests_are_retried() -> None:
+    responses.add(responses.GET, "http://api.example.com/items", status=503)
+    responses.add(responses.GET, "http://api.example.com/items", json={"ok": True})
+
+    result = http_request("http://api.example.com/items")
+
+    assert result["success"]
+    assert result["content"] == {"ok": True}
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_post_is_not_retried_after_response() -> None:
+    responses.add(responses.POST, "http://api.example.com/items", status=503)
+    responses.add(responses.POST, "http://api.example.com/items", status=201)
+
+    result = http_request("http://api.example.com/items", method="POST", data={"a": 1})
+
+    assert result["status_code"] == 503
+    assert len(responses.calls) == 1
+
+
+def test_configured_proxy_overrides_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HTTPS_PROXY", "http://env-proxy:3128")
+    monkeypatch.setattr(http_client.settings, "http_proxy", "http://coda-proxy:8080")
+
+    merged = get_session().merge_environment_settings("https://example.com", {}, None, None, None)
+    explicit = get_session().merge_environment_settings(
+        "https://example.com", {"https": "http://explicit:1"}, None, None, None
+    )
+
+    assert merged["proxies"]["https"] == "http://coda-proxy:8080"
+    assert explicit["proxies"]["https"] == "http://explicit:1"
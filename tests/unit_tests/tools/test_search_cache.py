@@ -0,0 +1,121 @@
+"""Tests for the web_search cache and request coalescing."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from coda_cli import tools
+from coda_cli.search_cache import SearchCache, search_key, search_ttl
+from coda_cli.tools import aweb_search, web_search
+
+
+class _FakeTavily:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls: list[dict[str, Any]] = []
+        self.delay = delay
+        self.fail_next = False
+        self._lock = threading.Lock()
+
+    def search(self, query: str, **kwargs: Any) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append({"query": query, **kwargs})
+        time.sleep(self.delay)
+        if self.fail_next:
+            self.fail_next = False
+            msg = "rate limited"
+            raise RuntimeError(msg)
+        return {"query": query, "results": [{"title": "Result", "url": "http://r.example.com"}]}
+
+
+class _FakeAsyncTavily(_FakeTavily):
+    async def search(self, query: str, **kwargs: Any) -> dict[str, Any]:  # type: ignore[override]
+        self.calls.append({"query": query, **kwargs})
+        await asyncio.sleep(self.delay)
+        return {"query": query, "results": []}
+
+
+@pytest.fixture
+def tavily(monkeypatch: pytest.MonkeyPatch) -> _FakeTavily:
+    client = _FakeTavily()
+    monkeypatch.setattr(tools, "tavily_client", client)
+    return client
+
+
+def test_normalized_queries_share_an_entry(tavily: _FakeTavily) -> None:
+    first = web_search("Python  asyncio timeouts")
+    second = web_search(" python asyncio TIMEOUTS ")
+    news = web_search("python asyncio timeouts", topic="news")
+
+    assert first["cache"]["status"] == "miss"
+    assert second["cache"]["status"] == "hit"
+    assert news["cache"]["status"] == "miss"
+    assert second["results"] == first["results"]
+    assert len(tavily.calls) == 2
+
+
+def test_key_covers_result_shaping_parameters() -> None:
+    base = {"max_results": 5, "topic": "general", "include_raw_content": False}
+    keys = {
+        search_key("q", **base),
+        search_key("q", **{**base, "max_results": 10}),
+        search_key("q", **{**base, "topic": "news"}),
+        search_key("q", **{**base, "include_raw_content": True}),
+    }
+
+    assert len(keys) == 4
+    assert search_ttl("news") < search_ttl("general")
+
+
+def test_entries_expire(tmp_path: Path) -> None:
+    cache = SearchCache(tmp_path)
+    cache.put("fresh", {"results": []}, ttl=60)
+    cache.put("stale", {"results": []}, ttl=0)
+
+    assert cache.get("fresh") == {"results": []}
+    assert cache.get("stale") is None
+
+
+def test_concurrent_identical_searches_share_one_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _FakeTavily(delay=0.3)
+    monkeypatch.setattr(tools, "tavily_client", client)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: web_search("same query"), range(4)))
+
+    assert len(client.calls) == 1
+    assert sorted(result["cache"]["status"] for result in results) == [
+        "miss",
+        "shared",
+        "shared",
+        "shared",
+    ]
+
+
+def test_async_searches_are_coalesced(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _FakeAsyncTavily(delay=0.1)
+    monkeypatch.setattr(tools, "tavily_client", _FakeTavily())
+    monkeypatch.setattr(tools, "_async_tavily_client", lambda: client)
+
+    async def run_all() -> list[dict[str, Any]]:
+        return await asyncio.gather(*(aweb_search("same query") for _ in range(3)))
+
+    results = asyncio.run(run_all())
+
+    assert len(client.calls) == 1
+    assert all(result["results"] == [] for result in results)
+
+
+def test_failures_are_not_cached(tavily: _FakeTavily) -> None:
+    tavily.fail_next = True
+
+    failed = web_search("flaky query")
+    retried = web_search("flaky query")
+
+    assert "rate limited" in failed["error"]
+    assert retried["cache"]["status"] == "miss"
+    assert len(tavily.calls) == 2
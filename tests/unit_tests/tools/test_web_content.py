@@ -0,0 +1,228 @@
+"""Tests for streaming fetch and incremental markdown conversion."""
+
+import pytest
+import responses
+from markdownify import markdownify
+
+from coda_cli import tools
+from coda_cli.tools import fetch_url
+from coda_cli.web_content import (
+    MarkdownBuilder,
+    binary_reason,
+    detect_encoding,
+    extract_content,
+    is_html,
+)
+
+PAGE = (
+    "<html><head><title>Guide</title><style>p {}</style></head><body><h1>Guide</h1>"
+    + "".join(
+        f"<p>Step {i} uses <code>cmd</code>.</p><ol><li>one</li><li>two<ul><li>x</li></ul></li>"
+        f"</ol><pre>line 1\n</p>\nline 2</pre>"
+        for i in range(200)
+    )
+    + "<table><tr><th>a</th></tr><tr><td>1</td></tr></table></body></html>"
+)
+
+
+def test_incremental_conversion_matches_whole_document() -> None:
+    data = PAGE.encode()
+    builder = MarkdownBuilder(html=True, encoding="utf-8", max_chars=10**9)
+    for offset in range(0, len(data), 333):
+        builder.feed(data[offset : offset + 333])
+
+    assert builder.finish() == markdownify(PAGE).strip()
+    assert not builder.truncated
+
+
+def test_incremental_conversion_stops_at_budget() -> None:
+    builder = MarkdownBuilder(html=True, encoding="utf-8", max_chars=300)
+    builder.feed(PAGE.encode())
+
+    markdown = builder.finish()
+
+    assert builder.truncated
+    assert len(markdown) <= 300
+    assert markdown.startswith("Guide")
+
+
+@pytest.mark.parametrize(
+    ("content_type", "first_chunk", "binary"),
+    [
+        ("image/png", b"\x89PNG\r\n", True),
+        ("application/pdf", b"%PDF-1.7", True),
+        ("application/octet-stream", b"PK\x03\x04", True),
+        ("", b"\x00\x01\x02", True),
+        ("application/json", b'{"a": 1}', False),
+        ("application/octet-stream", b"plain text", False),
+        ("text/html; charset=utf-8", b"<html>", False),
+    ],
+)
+def test_binary_detection(content_type: str, first_chunk: bytes, binary: bool) -> None:  # noqa: FBT001
+    assert (binary_reason(content_type, first_chunk) is not None) is binary
+
+
+def test_encoding_and_html_sniffing() -> None:
+    assert detect_encoding("text/html; charset=ISO-8859-1", b"") == "iso8859-1"
+    assert detect_encoding("text/html", b'<meta charset="shift_jis">') == "shift_jis"
+    assert detect_encoding("text/html", b"<p>") == "utf-8"
+    assert is_html("text/plain", b"  <!DOCTYPE html><html>")
+    assert not is_html("text/plain", b"# README")
+
+
+@responses.activate
+def test_fetch_url_reports_char_truncation() -> None:
+    responses.add(responses.GET, "http://docs.example.com/big", body=PAGE, content_type="text/html")
+
+    result = fetch_url("http://docs.example.com/big", max_chars=500)
+
+    assert result["truncated"]
+    assert result["truncation_reason"] == "max_chars"
+    assert result["next_offset"] <= 500
+    assert f"Call fetch_url again with offset={result['next_offset']}" in result["markdown_content"]
+
+
+@responses.activate
+def test_fetch_url_caps_downloaded_bytes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tools, "FETCH_MAX_BYTES", 1000)
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/log.txt",
+        body="x\n" * 100_000,
+        content_type="text/plain",
+    )
+
+    result = fetch_url("http://docs.example.com/log.txt")
+
+    assert result["truncation_reason"] == "max_bytes"
+    assert result["markdown_content"].startswith("x\nx\n")
+    content, note = result["markdown_content"].split("\n\n[")
+    assert content.count("x") == 500
+    assert note.startswith("Content truncated: the page exceeds 1,000 bytes")
+
+
+@responses.activate
+def test_fetch_url_rejects_binary_content() -> None:
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/manual.pdf",
+        body=b"%PDF-1.7 ...",
+        content_type="application/pdf",
+    )
+
+    result = fetch_url("http://docs.example.com/manual.pdf")
+
+    assert "Refusing to fetch binary content" in result["error"]
+
+
+ARTICLE_PAGE = """<html><head><title>Install guide</title><script>var x = 1;</script></head>
+<body>
+<div class="cookie-banner">We use cookies to improve your experience. Accept all cookies.</div>
+<nav><ul><li><a href="/a">Getting started with the thing, a long menu label</a></li></ul></nav>
+<div id="wrapper">
+<div class="sidebar"><p>Related: <a href="/x">an interesting, long title</a></p></div>
+<article><h1>Installing Widget</h1>
+<p>Widget is a tool for doing things; this paragraph explains, in detail, how to install it.</p>
+<h2>Requirements</h2><p>You need Python 3.11, a working compiler, and 200 MB of free disk space.</p>
+<h2>Steps</h2><ol><li>Download the archive, then unpack it.</li><li>Run the installer.</li></ol>
+</article></div>
+<footer><p>Copyright 2024, Widget Inc. All rights reserved, everywhere, forever.</p></footer>
+</body></html>"""
+
+
+def test_main_mode_keeps_only_the_article() -> None:
+    extraction = extract_content(ARTICLE_PAGE, "main")
+
+    assert "Installing Widget" in extraction.markdown
+    assert "1. Download the archive" in extraction.markdown
+    for boilerplate in ("cookies", "menu label", "Related", "Copyright", "var x"):
+        assert boilerplate not in extraction.markdown
+    assert 0 < extraction.kept_chars < extraction.page_chars
+    assert extraction.reduction == round(1 - extraction.kept_chars / extraction.page_chars, 3)
+
+
+def test_main_mode_does_not_penalize_words_containing_ad() -> None:
+    page = """<html><head><title>Release notes</title></head><body>
+<div class="lead-paragraph">
+<p>Version 2.0 rewrites the scheduler, so jobs start sooner and use less memory.</p>
+<p>Upgrading is a drop-in change for most users; see below for the exceptions.</p>
+</div>
+<div class="notes"><p>Previous release notes are kept in the archive for reference.</p></div>
+</body></html>"""
+
+    extraction = extract_content(page, "main")
+
+    assert "rewrites the scheduler" in extraction.markdown
+    assert "Previous release notes" not in extraction.markdown
+
+
+def test_main_mode_keeps_an_article_inside_a_page_form() -> None:
+    # ASP.NET pages wrap the whole body in a <form>
+    page = ARTICLE_PAGE.replace("<body>", '<body><form id="aspnetForm" method="post">').replace(
+        "</body>", "</form></body>"
+    )
+
+    extraction = extract_content(page, "main")
+
+    assert "Installing Widget" in extraction.markdown
+    assert "1. Download the archive" in extraction.markdown
+    assert "Related" not in extraction.markdown
+
+
+def test_main_mode_keeps_a_wrapper_named_after_its_sidebar() -> None:
+    page = ARTICLE_PAGE.replace('<div id="wrapper">', '<div class="layout has-sidebar">')
+
+    extraction = extract_content(page, "main")
+
+    assert "Installing Widget" in extraction.markdown
+    assert "1. Download the archive" in extraction.markdown
+    assert "Related" not in extraction.markdown
+
+
+def test_main_mode_falls_back_to_the_whole_page() -> None:
+    page = """<html><head><title>Notice</title></head><body>
+<div class="modal">Maintenance is scheduled for Sunday, from 02:00 to 04:00 UTC.</div>
+<div class="toolbar">Status: all systems operational, no incidents reported.</div>
+<div class="promo">Upgrade to the team plan for priority support.</div>
+</body></html>"""
+
+    extraction = extract_content(page, "main")
+
+    assert "Maintenance is scheduled" in extraction.markdown
+    assert "all systems operational" in extraction.markdown
+    assert extraction.kept_chars == extraction.page_chars
+
+
+def test_outline_mode_lists_headings_with_section_sizes() -> None:
+    extraction = extract_content(ARTICLE_PAGE, "outline")
+
+    lines = extraction.markdown.splitlines()
+    assert [line.split(" (")[0] for line in lines] == [
+        "# Installing Widget",
+        "## Requirements",
+        "## Steps",
+    ]
+    assert lines[1].endswith("(72 chars)")
+
+
+@responses.activate
+def test_fetch_url_reports_extraction_and_reuses_cached_body() -> None:
+    responses.add(
+        responses.GET,
+        "http://docs.example.com/install",
+        body=ARTICLE_PAGE,
+        content_type="text/html",
+        headers={"Cache-Control": "max-age=600"},
+    )
+
+    main = fetch_url("http://docs.example.com/install", mode="main")
+    full = fetch_url("http://docs.example.com/install")
+
+    assert main["mode"] == "main"
+    assert main["extraction"]["reduction"] > 0
+    assert "Copyright" not in main["markdown_content"]
+    assert full["cache"]["status"] == "hit"
+    assert full["mode"] == "full"
+    assert full["extraction"] is None
+    assert "Copyright" in full["markdown_content"]
+    assert len(responses.calls) == 1